@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure the cost of rescheduling flush events with the scheduler used by the flush thread.
+
+Every active logger has a flush event scheduled. Whenever a logger fills its buffer, its flush event
+is canceled and a new one is scheduled to run immediately, as BufferedHandler.emit() does, and the
+flush thread then runs it and schedules the next periodic flush. The old scheduler did a linear
+search and re-heapified the queue on every cancel.
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sched
+import sys
+import time
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from buildscripts.resmokelib.utils import scheduler as _scheduler
+
+# The interval between the periodic flushes of a logger, as for the buildlogger handlers.
+_INTERVAL_SECS = 10
+
+
+class LinearCancelScheduler(sched.scheduler):
+    """The scheduler used before cancel() was made constant time."""
+
+    def cancel(self, event):
+        """Remove an event from the queue with a linear search."""
+        with self._lock:
+            for i in range(len(self._queue)):
+                if self._queue[i] is event:
+                    del self._queue[i]
+                    heapq.heapify(self._queue)
+                    return
+            raise ValueError("event not in list")
+
+
+SCHEDULERS = {"linear": LinearCancelScheduler, "lazy": _scheduler.Scheduler}
+
+
+def run_benchmark(scheduler_class, num_loggers, num_flushes, seed):
+    """Return the number of early flushes per second with 'scheduler_class'."""
+
+    rng = random.Random(seed)
+    now = [0.0]
+    scheduler = scheduler_class(lambda: now[0], lambda secs: None)
+    events = [None] * num_loggers
+
+    def flush(logger_num):
+        events[logger_num] = scheduler.enter(_INTERVAL_SECS, 0, flush, (logger_num, ))
+
+    for logger_num in range(num_loggers):
+        events[logger_num] = scheduler.enter(rng.uniform(0, _INTERVAL_SECS), 0, flush,
+                                             (logger_num, ))
+
+    start_time = time.perf_counter()
+    for _ in range(num_flushes):
+        logger_num = rng.randrange(num_loggers)
+        scheduler.cancel(events[logger_num])
+        events[logger_num] = scheduler.enter(0, 0, flush, (logger_num, ))
+        scheduler.run(blocking=False)
+        now[0] += 0.001
+    elapsed_secs = time.perf_counter() - start_time
+
+    return num_flushes / elapsed_secs
+
+
+def main():
+    """Execute Main program."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scheduler", dest="schedulers", action="append",
+                        choices=sorted(SCHEDULERS),
+                        help="The scheduler to measure. Defaults to all of them.")
+    parser.add_argument("--loggers", type=int, default=5000,
+                        help="The number of loggers with a scheduled flush. Defaults to 5000.")
+    parser.add_argument("--flushes", type=int, default=20000,
+                        help="The number of early flushes. Defaults to 20000.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="The seed for choosing which logger to flush. Defaults to 0.")
+    options = parser.parse_args()
+
+    for name in options.schedulers or sorted(SCHEDULERS):
+        flushes_per_sec = run_benchmark(SCHEDULERS[name], options.loggers, options.flushes,
+                                        options.seed)
+        print("{:<8} {:>12.1f} flushes/sec".format(name, flushes_per_sec))
+
+
+if __name__ == "__main__":
+    main()
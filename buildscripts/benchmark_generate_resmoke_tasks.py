@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Time each stage of splitting a suite into generated sub-suites.
+
+A suite of synthetic test files is written to a temporary directory together with a history of
+daily test stats, some of which are for tests that were since removed. The stages are then run as
+GenerateSubSuites runs them. The filtering stage is also run the way it was before the suite was
+indexed by a TestCatalog, i.e. with a list membership check and a file system check for every test
+in the history.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import buildscripts.evergreen_generate_resmoke_tasks as generate_resmoke
+import buildscripts.resmokelib.suitesconfig as suitesconfig
+import buildscripts.util.teststats as teststats
+
+_SUITE = "benchmark_suite"
+_TESTS_PER_DIR = 100
+
+
+class BenchmarkSubSuites(generate_resmoke.GenerateSubSuites):
+    """GenerateSubSuites for a suite file outside of the resmokeconfig directory."""
+
+    def list_tests(self):
+        """List the test files of the synthetic suite."""
+        return suitesconfig.get_suite(
+            os.path.join(self.config_options.test_suites_dir, _SUITE + ".yml")).tests
+
+
+def write_suite(num_tests):
+    """Write the test files and the suite configuration to the current directory."""
+    for i in range(num_tests):
+        dirname = os.path.join("jstests", "dir_{}".format(i // _TESTS_PER_DIR))
+        os.makedirs(dirname, exist_ok=True)
+        open(os.path.join(dirname, "test_{}.js".format(i)), "w").close()
+    os.makedirs("suites")
+    with open(os.path.join("suites", _SUITE + ".yml"), "w") as fh:
+        fh.write("test_kind: js_test\nselector:\n  roots:\n  - jstests/**/*.js\n")
+
+
+def make_history(num_tests, num_removed, num_days, seed):
+    """Return the daily test stats of the suite's tests and of the removed tests."""
+    rng = random.Random(seed)
+    test_files = [
+        "jstests/dir_{}/test_{}.js".format(i // _TESTS_PER_DIR, i) for i in range(num_tests)
+    ] + ["jstests/removed/test_{}.js".format(i) for i in range(num_removed)]
+    return [
+        SimpleNamespace(test_file=test_file, avg_duration_pass=rng.lognormvariate(2.5, 1.2),
+                        num_pass=rng.randint(1, 3)) for _ in range(num_days)
+        for test_file in test_files
+    ]
+
+
+def filter_with_list(gen_sub_suites, tests_runtimes):
+    """Filter the tests as filter_existing_tests() did before the suite was indexed."""
+    all_tests = [teststats.normalize_test_name(test) for test in gen_sub_suites.list_tests()]
+    return [
+        info for info in tests_runtimes
+        if os.path.exists(info.test_name) and info.test_name in all_tests
+    ]
+
+
+def timed(name, func, *args):
+    """Run 'func', print how long it took and return its result."""
+    start = time.perf_counter()
+    result = func(*args)
+    print("{:<20} {:>10.3f}".format(name, time.perf_counter() - start))
+    return result
+
+
+def main():
+    """Execute Main program."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tests", dest="num_tests", type=int, default=5000,
+                        help="The number of tests in the suite. Defaults to 5000.")
+    parser.add_argument("--removedTests", dest="num_removed", type=int, default=500,
+                        help="The number of tests in the history which were removed. Defaults to"
+                        " 500.")
+    parser.add_argument("--days", dest="num_days", type=int, default=14,
+                        help="The number of days of history. Defaults to 14.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="The seed for the synthetic runtimes. Defaults to 0.")
+    options = parser.parse_args()
+
+    config_options = generate_resmoke.ConfigOptions(
+        {"suite": _SUITE, "task": _SUITE, "variant": "variant", "test_suites_dir": "suites"},
+        defaults=generate_resmoke.DEFAULT_CONFIG_VALUES, formats=generate_resmoke.CONFIG_FORMAT_FN)
+    # The resmoke options are read relative to the root of the repository.
+    gen_sub_suites = BenchmarkSubSuites(None, config_options)
+    history = make_history(options.num_tests, options.num_removed, options.num_days, options.seed)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            write_suite(options.num_tests)
+            print("{} tests, {} stats documents".format(options.num_tests, len(history)))
+            print("{:<20} {:>10}".format("stage", "secs"))
+            tests_runtimes = timed("test stats", lambda: teststats.TestStats(history)
+                                   .get_tests_runtimes())
+            timed("filter (list)", filter_with_list, gen_sub_suites, tests_runtimes)
+            timed("list suite", lambda: gen_sub_suites.test_catalog)
+            filtered = timed("filter (catalog)", gen_sub_suites.filter_tests, tests_runtimes)
+            gen_sub_suites.test_list = [info.test_name for info in filtered]
+            suites = timed("split", generate_resmoke.divide_tests_into_suites, _SUITE, filtered,
+                           config_options.target_resmoke_time * 60,
+                           config_options.max_sub_suites, config_options.max_tests_per_suite)
+            timed("render suites", gen_sub_suites.generate_suites_config, suites)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
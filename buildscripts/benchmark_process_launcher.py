@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Measure how many processes per second resmoke.py spawns with each --processLauncher mode.
+
+Every thread repeatedly starts a short-lived program through resmokelib's Process class and waits
+for it to exit, as the Job threads do when a hook starts a mongo shell after every test.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from buildscripts.resmokelib import config as _config
+from buildscripts.resmokelib.core import process as _process
+
+LAUNCHERS = ("locked", "concurrent", "posix_spawn")
+
+
+def spawn_repeatedly(logger, args, num_spawns):
+    """Start 'args' 'num_spawns' times, waiting for each process to exit before the next."""
+
+    for _ in range(num_spawns):
+        proc = _process.Process(logger, list(args))
+        proc.start()
+        proc.wait()
+
+
+def run_benchmark(launcher, args, num_threads, num_spawns):
+    """Return the number of processes spawned per second with 'launcher'."""
+
+    _config.PROCESS_LAUNCHER = launcher
+    logger = logging.getLogger("benchmark")
+
+    threads = [
+        threading.Thread(target=spawn_repeatedly, args=(logger, args, num_spawns))
+        for _ in range(num_threads)
+    ]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed_secs = time.perf_counter() - start_time
+
+    return num_threads * num_spawns / elapsed_secs
+
+
+def main():
+    """Execute Main program."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--launcher", dest="launchers", action="append", choices=LAUNCHERS,
+                        help="The --processLauncher mode to measure. Defaults to all of them.")
+    parser.add_argument("--threads", type=int, default=8,
+                        help="The number of threads spawning processes. Defaults to 8.")
+    parser.add_argument("--spawns", type=int, default=50,
+                        help="The number of processes spawned by each thread. Defaults to 50.")
+    parser.add_argument("--ballastMB", type=int, default=0,
+                        help=("Allocate this much memory before spawning to mimic the size of the"
+                              " resmoke.py process. Defaults to 0."))
+    parser.add_argument("program", nargs="*", default=["true"],
+                        help="The program and arguments to spawn. Defaults to 'true'.")
+    options = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    ballast = bytearray(options.ballastMB * 1024 * 1024)  # pylint: disable=unused-variable
+
+    for launcher in options.launchers or LAUNCHERS:
+        spawns_per_sec = run_benchmark(launcher, options.program, options.threads,
+                                       options.spawns)
+        print("{:<12} {:>10.1f} spawns/sec".format(launcher, spawns_per_sec))
+
+
+if __name__ == "__main__":
+    main()
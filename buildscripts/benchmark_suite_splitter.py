@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compare how evenly the greedy and balanced strategies split a suite into sub-suites.
+
+The test runtimes are read from a JSON file of test stats as returned by the Evergreen test_stats
+endpoint, i.e. a list of documents with 'test_file', 'avg_duration_pass' and 'num_pass' fields, or
+are drawn from a lognormal distribution when no file is given.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import buildscripts.evergreen_generate_resmoke_tasks as generate_resmoke
+import buildscripts.util.teststats as teststats
+
+STRATEGIES = {
+    "greedy": generate_resmoke.divide_tests_into_suites,
+    "balanced": generate_resmoke.divide_tests_into_balanced_suites,
+}
+
+
+def load_tests_runtimes(test_stats_file, num_tests, seed):
+    """Return the (test_name, runtime) tuples of the recorded or synthetic test stats."""
+    if test_stats_file:
+        with open(test_stats_file) as fh:
+            docs = [SimpleNamespace(**doc) for doc in json.load(fh)]
+    else:
+        rng = random.Random(seed)
+        docs = [
+            SimpleNamespace(test_file="jstests/core/test_{}.js".format(i),
+                            avg_duration_pass=rng.lognormvariate(2.5, 1.2), num_pass=1)
+            for i in range(num_tests)
+        ]
+    return teststats.TestStats(docs).get_tests_runtimes()
+
+
+def main():
+    """Execute Main program."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--testStats", dest="test_stats_file", metavar="FILE",
+                        help="A JSON file of test stats. Defaults to synthetic runtimes.")
+    parser.add_argument("--tests", dest="num_tests", type=int, default=500,
+                        help="The number of synthetic tests. Defaults to 500.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="The seed for the synthetic runtimes. Defaults to 0.")
+    parser.add_argument("--targetTime", dest="target_secs", type=float, default=600,
+                        help="The target runtime of a sub-suite in seconds. Defaults to 600.")
+    parser.add_argument("--maxSubSuites", dest="max_sub_suites", type=int, default=None,
+                        help="The maximum number of sub-suites. Defaults to no limit.")
+    parser.add_argument("--maxTestsPerSuite", dest="max_tests_per_suite", type=int, default=None,
+                        help="The maximum number of tests in a sub-suite. Defaults to no limit.")
+    options = parser.parse_args()
+
+    tests_runtimes = load_tests_runtimes(options.test_stats_file, options.num_tests, options.seed)
+    print("{} tests, {:.1f} secs total".format(len(tests_runtimes),
+                                               sum(runtime for (_, runtime) in tests_runtimes)))
+    print("{:<10} {:>7} {:>12} {:>12} {:>12}".format("strategy", "suites", "slowest", "fastest",
+                                                     "spread"))
+    for name, divide in STRATEGIES.items():
+        suites = divide("suite", tests_runtimes, options.target_secs, options.max_sub_suites,
+                        options.max_tests_per_suite)
+        runtimes = [suite.get_runtime() for suite in suites]
+        print("{:<10} {:>7} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+            name, len(suites), max(runtimes), min(runtimes),
+            max(runtimes) - min(runtimes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ if __name__ == "__main__" and __package__ is None:
 # pylint: disable=wrong-import-position
 from buildscripts.util.fileops import write_file_to_dir
 import buildscripts.util.read_config as read_config
+import buildscripts.util.testhistory as testhistory
 from buildscripts.ciconfig import evergreen
 from buildscripts.ciconfig.evergreen import EvergreenProjectConfig, Variant
 from buildscripts.burn_in_tests import create_generate_tasks_config, create_tests_by_task, \
@@ -184,9 +185,11 @@ def main(expansion_file: str):
     \f
     :param expansion_file: The expansion file containing the configuration params.
     """
-    evg_api = RetryingEvergreenApi.get_api(config_file=EVG_CONFIG_FILE)
-    repos = [Repo(x) for x in DEFAULT_REPO_LOCATIONS if os.path.isdir(x)]
     expansions_file_data = read_config.read_config_file(expansion_file)
+    evg_api = testhistory.wrap_evergreen_api(
+        RetryingEvergreenApi.get_api(config_file=EVG_CONFIG_FILE),
+        expansions_file_data.get("test_history_file"))
+    repos = [Repo(x) for x in DEFAULT_REPO_LOCATIONS if os.path.isdir(x)]
     evg_conf = evergreen.parse_evergreen_file(EVERGREEN_FILE)
 
     burn_in(expansions_file_data, evg_conf, evg_api, repos)
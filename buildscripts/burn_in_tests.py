@@ -30,11 +30,13 @@ from buildscripts.patch_builds.change_data import generate_revision_map, \
     generate_revision_map_from_manifest, RevisionMap, find_changed_files_in_repos
 import buildscripts.resmokelib.parser
 from buildscripts.resmokelib.suitesconfig import create_test_membership_map, get_suites
-from buildscripts.resmokelib.utils import default_if_none, globstar
+from buildscripts.resmokelib.utils import default_if_none
 from buildscripts.ciconfig.evergreen import parse_evergreen_file, ResmokeArgs, \
     EvergreenProjectConfig, VariantTask
 from buildscripts.util.fileops import write_file
+from buildscripts.util.testcatalog import TestCatalog
 from buildscripts.util.teststats import TestStats
+from buildscripts.util.testhistory import wrap_evergreen_api
 from buildscripts.util.taskname import name_generated_task
 from buildscripts.patch_builds.task_generation import (resmoke_commands, TimeoutInfo,
                                                        validate_task_generation_limit)
@@ -63,6 +65,9 @@ MIN_AVG_TEST_TIME_SEC = 5 * 60
 # The executor_file and suite_files defaults are required to make the suite resolver work
 # correctly.
 SELECTOR_FILE = "etc/burn_in_tests.yml"
+# Used instead of AVG_TEST_TIME_MULTIPLIER when the runtime of a test is estimated from a high
+# percentile of its historical runtimes.
+TAIL_TEST_TIME_MULTIPLIER = 2
 SUITE_FILES = ["with_server"]
 
 SUPPORTED_TEST_KINDS = ("fsm_workload_test", "js_test", "json_schema_test",
@@ -140,7 +145,8 @@ class GenerateConfig(object):
     """Configuration for how to generate tasks."""
 
     def __init__(self, build_variant: str, project: str, run_build_variant: Optional[str] = None,
-                 distro: Optional[str] = None, task_id: Optional[str] = None):
+                 distro: Optional[str] = None, task_id: Optional[str] = None,
+                 timeout_percentile: Optional[float] = None):
         # pylint: disable=too-many-arguments,too-many-locals
         """
         Create a GenerateConfig.
@@ -150,12 +156,15 @@ class GenerateConfig(object):
         :param run_build_variant: Build variant to run new tasks on.
         :param distro: Distro to run tasks on.
         :param task_id: Evergreen task being run under.
+        :param timeout_percentile: Percentile of the historical test runtimes to base timeouts on,
+            or None to base them on the average runtime.
         """
         self.build_variant = build_variant
         self._run_build_variant = run_build_variant
         self.distro = distro
         self.project = project
         self.task_id = task_id
+        self.timeout_percentile = timeout_percentile
 
     @property
     def run_build_variant(self):
@@ -276,9 +285,10 @@ def filter_tests(tests: Set[str], exclude_tests: [str]) -> Set[str]:
         return tests
 
     # The exclude_tests can be specified using * and ** to specify directory and file patterns.
+    catalog = TestCatalog(tests)
     excluded_globbed = set()
     for exclude_test_pattern in exclude_tests:
-        excluded_globbed.update(globstar.iglob(exclude_test_pattern))
+        excluded_globbed.update(catalog.glob(exclude_test_pattern))
 
     LOGGER.debug("Excluding test pattern", excluded=excluded_globbed)
     return tests - excluded_globbed
@@ -450,23 +460,27 @@ def _parse_avg_test_runtime(test: str, task_avg_test_runtime_stats: [TestStats])
     return None
 
 
-def _calculate_timeout(avg_test_runtime: float) -> int:
+def _calculate_timeout(avg_test_runtime: float,
+                       multiplier: float = AVG_TEST_TIME_MULTIPLIER) -> int:
     """
     Calculate timeout_secs for the Evergreen task.
 
     :param avg_test_runtime: How long a test has historically taken to run.
-    :return: The test runtime times AVG_TEST_TIME_MULTIPLIER, or MIN_AVG_TEST_TIME_SEC (whichever
-        is higher).
+    :param multiplier: Multiple of the test runtime to allow.
+    :return: The test runtime times the multiplier, or MIN_AVG_TEST_TIME_SEC (whichever is
+        higher).
     """
-    return max(MIN_AVG_TEST_TIME_SEC, ceil(avg_test_runtime * AVG_TEST_TIME_MULTIPLIER))
+    return max(MIN_AVG_TEST_TIME_SEC, ceil(avg_test_runtime * multiplier))
 
 
-def _calculate_exec_timeout(repeat_config: RepeatConfig, avg_test_runtime: float) -> int:
+def _calculate_exec_timeout(repeat_config: RepeatConfig, avg_test_runtime: float,
+                            multiplier: float = AVG_TEST_TIME_MULTIPLIER) -> int:
     """
     Calculate exec_timeout_secs for the Evergreen task.
 
     :param repeat_config: Information about how the test will repeat.
     :param avg_test_runtime: How long a test has historically taken to run.
+    :param multiplier: Multiple of the test runtime to allow for each execution.
     :return: repeat_tests_secs + an amount of padding time so that the test has time to finish on
         its final run.
     """
@@ -477,22 +491,24 @@ def _calculate_exec_timeout(repeat_config: RepeatConfig, avg_test_runtime: float
         # If a single execution of the test takes longer than the repeat time, then we don't
         # have to worry about the repeat time at all and can just use the average test runtime
         # and minimum number of executions to calculate the exec timeout value.
-        return ceil(avg_test_runtime * AVG_TEST_TIME_MULTIPLIER * repeat_config.repeat_tests_min)
+        return ceil(avg_test_runtime * multiplier * repeat_config.repeat_tests_min)
 
     test_execution_time_over_limit = avg_test_runtime - (repeat_tests_secs % avg_test_runtime)
     test_execution_time_over_limit = max(MIN_AVG_TEST_OVERFLOW_SEC, test_execution_time_over_limit)
-    return ceil(repeat_tests_secs + (test_execution_time_over_limit * AVG_TEST_TIME_MULTIPLIER) +
+    return ceil(repeat_tests_secs + (test_execution_time_over_limit * multiplier) +
                 AVG_TEST_SETUP_SEC)
 
 
 def _generate_timeouts(repeat_config: RepeatConfig, test: str,
-                       task_avg_test_runtime_stats: [TestStats]) -> TimeoutInfo:
+                       task_avg_test_runtime_stats: [TestStats],
+                       multiplier: float = AVG_TEST_TIME_MULTIPLIER) -> TimeoutInfo:
     """
     Add timeout.update command to list of commands for a burn in execution task.
 
     :param repeat_config: Information on how the test will repeat.
     :param test: Test name.
     :param task_avg_test_runtime_stats: Teststat data.
+    :param multiplier: Multiple of the test runtime to allow for each execution.
     :return: TimeoutInfo to use.
     """
     if task_avg_test_runtime_stats:
@@ -500,8 +516,8 @@ def _generate_timeouts(repeat_config: RepeatConfig, test: str,
         if avg_test_runtime:
             LOGGER.debug("Avg test runtime", test=test, runtime=avg_test_runtime)
 
-            timeout = _calculate_timeout(avg_test_runtime)
-            exec_timeout = _calculate_exec_timeout(repeat_config, avg_test_runtime)
+            timeout = _calculate_timeout(avg_test_runtime, multiplier)
+            exec_timeout = _calculate_exec_timeout(repeat_config, avg_test_runtime, multiplier)
             LOGGER.debug("Using timeout overrides", exec_timeout=exec_timeout, timeout=timeout)
             timeout_info = TimeoutInfo.overridden(exec_timeout, timeout)
 
@@ -512,7 +528,7 @@ def _generate_timeouts(repeat_config: RepeatConfig, test: str,
 
 
 def _get_task_runtime_history(evg_api: Optional[EvergreenApi], project: str, task: str,
-                              variant: str):
+                              variant: str, percentile: Optional[float] = None):
     """
     Fetch historical average runtime for all tests in a task from Evergreen API.
 
@@ -520,6 +536,7 @@ def _get_task_runtime_history(evg_api: Optional[EvergreenApi], project: str, tas
     :param project: Project name.
     :param task: Task name.
     :param variant: Variant name.
+    :param percentile: Percentile of the runtimes to fetch instead of the average, if any.
     :return: Test historical runtimes, parsed into teststat objects.
     """
     if not evg_api:
@@ -528,11 +545,14 @@ def _get_task_runtime_history(evg_api: Optional[EvergreenApi], project: str, tas
     try:
         end_date = datetime.datetime.utcnow().replace(microsecond=0)
         start_date = end_date - datetime.timedelta(days=AVG_TEST_RUNTIME_ANALYSIS_DAYS)
+        # The percentiles are estimated from the daily average runtimes.
+        group_num_days = 1 if percentile else AVG_TEST_RUNTIME_ANALYSIS_DAYS
         data = evg_api.test_stats_by_project(project, after_date=start_date.strftime("%Y-%m-%d"),
                                              before_date=end_date.strftime("%Y-%m-%d"),
                                              tasks=[task], variants=[variant], group_by="test",
-                                             group_num_days=AVG_TEST_RUNTIME_ANALYSIS_DAYS)
-        test_runtimes = TestStats(data).get_tests_runtimes()
+                                             group_num_days=group_num_days)
+        test_runtimes = TestStats(data, percentiles=percentile is not None).get_tests_runtimes(
+            percentile)
         return test_runtimes
     except requests.HTTPError as err:
         if err.response.status_code == requests.codes.SERVICE_UNAVAILABLE:
@@ -574,7 +594,9 @@ def _create_task(index: int, test_count: int, test: str, task_data: Dict,
     }
     if multiversion_path:
         run_tests_vars["task_path_suffix"] = multiversion_path
-    timeout = _generate_timeouts(repeat_config, test, task_runtime_stats)
+    multiplier = TAIL_TEST_TIME_MULTIPLIER if generate_config.timeout_percentile \
+        else AVG_TEST_TIME_MULTIPLIER
+    timeout = _generate_timeouts(repeat_config, test, task_runtime_stats, multiplier)
     commands = resmoke_commands("run tests", run_tests_vars, timeout, multiversion_path)
     dependencies = {TaskDependency("compile")}
 
@@ -599,7 +621,8 @@ def create_generated_tasks(tests_by_task: Dict, task_prefix: str, generate_confi
         test_list = task_info["tests"]
         task_runtime_stats = _get_task_runtime_history(evg_api, generate_config.project,
                                                        task_info["display_task_name"],
-                                                       generate_config.build_variant)
+                                                       generate_config.build_variant,
+                                                       generate_config.timeout_percentile)
         test_count = len(test_list)
         for index, test in enumerate(test_list):
             tasks.add(
@@ -658,20 +681,36 @@ def create_task_list_for_tests(
     return create_task_list(evg_conf, build_variant, tests_by_executor, exclude_tasks)
 
 
+def set_resmoke_run_options(test_membership_index_file: Optional[str] = None) -> None:
+    """
+    Populate the config values in order to use the helpers from resmokelib.suitesconfig.
+
+    :param test_membership_index_file: File to save the suites each test belongs to in, and to
+        reuse them from on later invocations, if any.
+    """
+    argstr = ""
+    if test_membership_index_file:
+        argstr = "--testMembershipIndexFile=" + shlex.quote(test_membership_index_file)
+    buildscripts.resmokelib.parser.set_run_options(argstr)
+
+
 def create_tests_by_task(build_variant: str, evg_conf: EvergreenProjectConfig,
-                         changed_tests: Set[str]) -> Dict:
+                         changed_tests: Set[str],
+                         test_membership_index_file: Optional[str] = None) -> Dict:
     """
     Create a list of tests by task.
 
     :param build_variant: Build variant to collect tasks from.
     :param evg_conf: Evergreen configuration.
     :param changed_tests: Set of changed test files.
+    :param test_membership_index_file: File to save the suites each test belongs to in, and to
+        reuse them from on later invocations, if any.
     :return: Tests by task.
     """
     exclude_suites, exclude_tasks, exclude_tests = find_excludes(SELECTOR_FILE)
     changed_tests = filter_tests(changed_tests, exclude_tests)
 
-    buildscripts.resmokelib.parser.set_run_options()
+    set_resmoke_run_options(test_membership_index_file)
     if changed_tests:
         return create_task_list_for_tests(changed_tests, build_variant, evg_conf, exclude_suites,
                                           exclude_tasks)
@@ -747,22 +786,26 @@ def _configure_logging(verbose: bool):
         logging.getLogger(log_name).setLevel(logging.WARNING)
 
 
-def _get_evg_api(evg_api_config: str, local_mode: bool) -> Optional[EvergreenApi]:
+def _get_evg_api(evg_api_config: str, local_mode: bool,
+                 test_history_file: Optional[str] = None) -> Optional[EvergreenApi]:
     """
     Get an instance of the Evergreen Api.
 
     :param evg_api_config: Config file with evg auth information.
     :param local_mode: If true, do not connect to Evergreen API.
+    :param test_history_file: Local store to read test runtimes from, if any.
     :return: Evergreen Api instance.
     """
     if not local_mode:
-        return RetryingEvergreenApi.get_api(config_file=evg_api_config)
+        return wrap_evergreen_api(RetryingEvergreenApi.get_api(config_file=evg_api_config),
+                                  test_history_file)
     return None
 
 
 def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmoke_args: str,
             generate_tasks_file: str, no_exec: bool, evg_conf: EvergreenProjectConfig,
-            repos: List[Repo], evg_api: EvergreenApi, origin_rev: Optional[str]) -> None:
+            repos: List[Repo], evg_api: EvergreenApi, origin_rev: Optional[str],
+            test_membership_index_file: Optional[str] = None) -> None:
     """
     Run burn_in_tests with the given configuration.
 
@@ -776,6 +819,7 @@ def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmok
     :param evg_api: Evergreen API client.
     :param project: Evergreen project to query.
     :param origin_rev: The revision that local changes will be compared against.
+    :param test_membership_index_file: File to save the suites each test belongs to in, if any.
     """
     changed_tests = find_changed_tests(repos, origin_rev, evg_api, generate_config.task_id)
     LOGGER.info("Found changed tests", files=changed_tests)
@@ -783,7 +827,8 @@ def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmok
     # Populate the config values in order to use the helpers from resmokelib.suitesconfig.
     resmoke_cmd = _set_resmoke_cmd(repeat_config, list(resmoke_args))
 
-    tests_by_task = create_tests_by_task(generate_config.build_variant, evg_conf, changed_tests)
+    tests_by_task = create_tests_by_task(generate_config.build_variant, evg_conf, changed_tests,
+                                         test_membership_index_file)
     LOGGER.debug("tests and tasks found", tests_by_task=tests_by_task)
 
     if generate_tasks_file:
@@ -821,6 +866,13 @@ def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmok
               help="Configuration file with connection info for Evergreen API.")
 @click.option("--local", "local_mode", default=False, is_flag=True,
               help="Local mode. Do not call out to evergreen api.")
+@click.option("--test-history-file", "test_history_file", default=None, metavar="FILE",
+              help="Local store of test runtimes to query before the Evergreen API.")
+@click.option("--timeout-percentile", "timeout_percentile", default=None, type=float,
+              help="Base timeouts on this percentile of the test runtimes rather than the average.")
+@click.option("--test-membership-index-file", "test_membership_index_file", default=None,
+              metavar="FILE", help="Save the suites each test belongs to in this file and reuse"
+              " them on later invocations as long as the suites and tests are unchanged.")
 @click.option("--verbose", "verbose", default=False, is_flag=True, help="Enable extra logging.")
 @click.option("--task_id", "task_id", default=None, metavar='TASK_ID',
               help="The evergreen task id.")
@@ -831,7 +883,8 @@ def burn_in(repeat_config: RepeatConfig, generate_config: GenerateConfig, resmok
 # pylint: disable=too-many-arguments,too-many-locals
 def main(build_variant, run_build_variant, distro, project, generate_tasks_file, no_exec,
          repeat_tests_num, repeat_tests_min, repeat_tests_max, repeat_tests_secs, resmoke_args,
-         local_mode, evg_api_config, verbose, task_id, origin_rev):
+         local_mode, evg_api_config, test_history_file, timeout_percentile,
+         test_membership_index_file, verbose, task_id, origin_rev):
     """
     Run new or changed tests in repeated mode to validate their stability.
 
@@ -877,6 +930,9 @@ def main(build_variant, run_build_variant, distro, project, generate_tasks_file,
     :param resmoke_args: Arguments to pass through to resmoke.
     :param local_mode: Don't call out to the evergreen API (used for testing).
     :param evg_api_config: Location of configuration file to connect to evergreen.
+    :param test_history_file: Local store of test runtimes to query before the Evergreen API.
+    :param timeout_percentile: Percentile of the test runtimes to base timeouts on.
+    :param test_membership_index_file: File to save the suites each test belongs to in.
     :param verbose: Log extra debug information.
     :param task_id: Id of evergreen task being run in.
     :param origin_rev: The revision that local changes will be compared against.
@@ -892,16 +948,17 @@ def main(build_variant, run_build_variant, distro, project, generate_tasks_file,
                                      run_build_variant=run_build_variant,
                                      distro=distro,
                                      project=project,
-                                     task_id=task_id)  # yapf: disable
+                                     task_id=task_id,
+                                     timeout_percentile=timeout_percentile)  # yapf: disable
     if generate_tasks_file:
         generate_config.validate(evg_conf)
 
-    evg_api = _get_evg_api(evg_api_config, local_mode)
+    evg_api = _get_evg_api(evg_api_config, local_mode, test_history_file)
 
     repos = [Repo(x) for x in DEFAULT_REPO_LOCATIONS if os.path.isdir(x)]
 
     burn_in(repeat_config, generate_config, resmoke_args, generate_tasks_file, no_exec, evg_conf,
-            repos, evg_api, origin_rev)
+            repos, evg_api, origin_rev, test_membership_index_file)
 
 
 if __name__ == "__main__":
@@ -100,13 +100,15 @@ def create_multiversion_generate_tasks_config(tests_by_task: Dict, evg_api: Ever
               help="The evergreen project the tasks will execute on.")
 @click.option("--evg-api-config", "evg_api_config", default=CONFIG_FILE, metavar="FILE",
               help="Configuration file with connection info for Evergreen API.")
+@click.option("--test-history-file", "test_history_file", default=None, metavar="FILE",
+              help="Local store of test runtimes to query before the Evergreen API.")
 @click.option("--verbose", "verbose", default=False, is_flag=True, help="Enable extra logging.")
 @click.option("--task_id", "task_id", default=None, metavar='TASK_ID',
               help="The evergreen task id.")
 @click.argument("resmoke_args", nargs=-1, type=click.UNPROCESSED)
 # pylint: disable=too-many-arguments,too-many-locals
 def main(build_variant, run_build_variant, distro, project, generate_tasks_file, no_exec,
-         resmoke_args, evg_api_config, verbose, task_id):
+         resmoke_args, evg_api_config, test_history_file, verbose, task_id):
     """
     Run new or changed tests in repeated mode to validate their stability.
 
@@ -140,6 +142,7 @@ def main(build_variant, run_build_variant, distro, project, generate_tasks_file,
     :param no_exec: Just perform test discover, do not execute the tests.
     :param resmoke_args: Arguments to pass through to resmoke.
     :param evg_api_config: Location of configuration file to connect to evergreen.
+    :param test_history_file: Local store of test runtimes to query before the Evergreen API.
     :param verbose: Log extra debug information.
     """
     _configure_logging(verbose)
@@ -154,7 +157,7 @@ def main(build_variant, run_build_variant, distro, project, generate_tasks_file,
     if generate_tasks_file:
         generate_config.validate(evg_conf)
 
-    evg_api = _get_evg_api(evg_api_config, False)
+    evg_api = _get_evg_api(evg_api_config, False, test_history_file)
 
     repos = [Repo(x) for x in DEFAULT_REPO_LOCATIONS if os.path.isdir(x)]
 
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
-"""Combine JSON report files used in Evergreen."""
+"""Combine JSON report files used in Evergreen.
+
+The report files are either report.json files or files written by resmoke.py with
+--reportFormat=jsonl. They are merged one test result at a time, so the combined report is never
+held in memory.
+"""
 
 import errno
-import json
 import os
 import sys
 from optparse import OptionParser
@@ -11,17 +15,11 @@ from optparse import OptionParser
 if __name__ == "__main__" and __package__ is None:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from buildscripts.resmokelib.testing import report  # pylint: disable=wrong-import-position
+from buildscripts.resmokelib import reportfile  # pylint: disable=wrong-import-position
 from buildscripts.resmokelib import utils  # pylint: disable=wrong-import-position
 
 
-def read_json_file(json_file):
-    """Read JSON file."""
-    with open(json_file) as json_data:
-        return json.load(json_data)
-
-
-def report_exit(combined_test_report):
+def report_exit(num_failures):
     """Return report exit code.
 
     The exit code of this script is based on the following:
@@ -30,11 +28,7 @@ def report_exit(combined_test_report):
     Note: A test can be considered dynamic if its name contains a ":" character.
     """
 
-    ret = 0
-    for test in combined_test_report.test_infos:
-        if test.status in ["fail", "timeout"]:
-            return 31
-    return ret
+    return 31 if num_failures > 0 else 0
 
 
 def check_error(input_count, output_count):
@@ -64,37 +58,31 @@ def main():
     if not args:
         sys.exit("No report files were specified")
 
-    report_files = args
-    report_files_count = len(report_files)
-    test_reports = []
-
-    for report_file in report_files:
+    report_files = []
+    for report_file in args:
         try:
-            report_file_json = read_json_file(report_file)
-            test_reports.append(report.TestReport.from_dict(report_file_json))
-        except IOError as err:
+            os.stat(report_file)
+        except OSError as err:
             # errno.ENOENT is the error code for "No such file or directory".
             if err.errno == errno.ENOENT:
-                report_files_count -= 1
                 continue
             raise
-
-    combined_test_report = report.TestReport.combine(*test_reports)
-    combined_report = combined_test_report.as_dict()
+        report_files.append(report_file)
 
     if options.outfile == "-":
         outfile_exists = False  # Nothing will be overridden when writing to stdout.
     else:
         outfile_exists = os.path.exists(options.outfile)
 
-    check_error(report_files_count, outfile_exists)
+    check_error(len(report_files), outfile_exists)
 
+    num_failures = 0
     if not outfile_exists:
         with utils.open_or_use_stdout(options.outfile) as fh:
-            json.dump(combined_report, fh)
+            num_failures = reportfile.write_results(reportfile.merge_results(report_files), fh)
 
     if options.report_exit:
-        sys.exit(report_exit(combined_test_report))
+        sys.exit(report_exit(num_failures))
     else:
         sys.exit(0)
 
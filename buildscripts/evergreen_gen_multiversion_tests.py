@@ -23,6 +23,7 @@ from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib.multiversionconstants import (LAST_LTS_MONGO_BINARY, REQUIRES_FCV_TAG)
 import buildscripts.resmokelib.parser
 import buildscripts.util.taskname as taskname
+import buildscripts.util.testhistory as testhistory
 from buildscripts.util.fileops import write_file_to_dir
 import buildscripts.evergreen_generate_resmoke_tasks as generate_resmoke
 from buildscripts.evergreen_generate_resmoke_tasks import Suite, ConfigOptions
@@ -369,9 +370,11 @@ def run_generate_tasks(expansion_file: str, evergreen_config: Optional[str] = No
     :param expansion_file: Configuration file.
     :param evergreen_config: Evergreen configuration file.
     """
-    evg_api = RetryingEvergreenApi.get_api(config_file=evergreen_config)
     config_options = generate_resmoke.ConfigOptions.from_file(
         expansion_file, REQUIRED_CONFIG_KEYS, DEFAULT_CONFIG_VALUES, CONFIG_FORMAT_FN)
+    evg_api = testhistory.wrap_evergreen_api(
+        RetryingEvergreenApi.get_api(config_file=evergreen_config),
+        config_options.test_history_file)
     config_generator = EvergreenMultiversionConfigGenerator(evg_api, config_options)
     config_generator.run()
 
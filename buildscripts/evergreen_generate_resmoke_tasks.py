@@ -5,6 +5,7 @@ Resmoke Test Suite Generator.
 Analyze the evergreen history for tests run under the given task and create new evergreen tasks
 to attempt to keep the task runtime under a specified amount.
 """
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 import datetime
 from datetime import timedelta
@@ -15,7 +16,7 @@ import os
 import re
 import sys
 from distutils.util import strtobool  # pylint: disable=no-name-in-module
-from typing import Dict, List, Set, Sequence, Optional, Any, Match
+from typing import Dict, List, Set, Sequence, Optional, Any, Match, Tuple
 
 import click
 import requests
@@ -33,9 +34,13 @@ if __name__ == "__main__" and __package__ is None:
 
 # pylint: disable=wrong-import-position
 import buildscripts.resmokelib.parser as _parser
+import buildscripts.resmokelib.selector as _selector
 import buildscripts.resmokelib.suitesconfig as suitesconfig
 from buildscripts.util.fileops import write_file_to_dir
+from buildscripts.util.testcatalog import TestCatalog
+import buildscripts.util.binpacking as binpacking
 import buildscripts.util.read_config as read_config
+import buildscripts.util.testhistory as testhistory
 import buildscripts.util.taskname as taskname
 import buildscripts.util.teststats as teststats
 from buildscripts.patch_builds.task_generation import TimeoutInfo, resmoke_commands
@@ -48,6 +53,9 @@ DEFAULT_TEST_SUITE_DIR = os.path.join("buildscripts", "resmokeconfig", "suites")
 CONFIG_FILE = "./.evergreen.yml"
 MIN_TIMEOUT_SECONDS = int(timedelta(minutes=5).total_seconds())
 MAX_EXPECTED_TIMEOUT = int(timedelta(hours=48).total_seconds())
+# The timeout of a test is this multiple of the runtime of the slowest test when the runtime is
+# estimated from a high percentile rather than from the average.
+TAIL_TIMEOUT_SCALING_FACTOR = 2
 LOOKBACK_DURATION_DAYS = 14
 GEN_SUFFIX = "_gen"
 
@@ -65,12 +73,15 @@ REQUIRED_CONFIG_KEYS = {
 }
 
 DEFAULT_CONFIG_VALUES = {
+    "fixture_setup_secs": 0,
     "generated_config_dir": "generated_resmoke_config",
     "max_tests_per_suite": 100,
     "max_sub_suites": 3,
+    "per_test_overhead_secs": 0,
     "resmoke_args": "",
     "resmoke_repeat_suites": 1,
     "run_multiple_jobs": "true",
+    "split_strategy": "greedy",
     "target_resmoke_time": 60,
     "test_suites_dir": DEFAULT_TEST_SUITE_DIR,
     "use_default_timeouts": False,
@@ -79,9 +90,13 @@ DEFAULT_CONFIG_VALUES = {
 
 CONFIG_FORMAT_FN = {
     "fallback_num_sub_suites": int,
+    "fixture_setup_secs": float,
     "max_sub_suites": int,
     "max_tests_per_suite": int,
+    "per_test_overhead_secs": float,
+    "split_percentile": float,
     "target_resmoke_time": int,
+    "timeout_percentile": float,
 }
 
 
@@ -297,7 +312,7 @@ def _new_suite_needed(current_suite, test_runtime, max_suite_runtime, max_tests_
 
 
 def divide_tests_into_suites(suite_name, tests_runtimes, max_time_seconds, max_suites=None,
-                             max_tests_per_suite=None):
+                             max_tests_per_suite=None, counter=None):
     """
     Divide the given tests into suites.
 
@@ -315,11 +330,14 @@ def divide_tests_into_suites(suite_name, tests_runtimes, max_time_seconds, max_s
     :param max_time_seconds: Maximum runtime to add to a single bucket.
     :param max_suites: Maximum number of suites to create.
     :param max_tests_per_suite: Maximum number of tests to add to a single suite.
+    :param counter: Counter numbering the suites, or None to reset and use the one shared by every
+        Suite.
     :return: List of Suite objects representing grouping of tests.
     """
     suites = []
-    Suite.reset_current_index()
-    current_suite = Suite(suite_name)
+    if counter is None:
+        Suite.reset_current_index()
+    current_suite = Suite(suite_name, counter)
     last_test_processed = len(tests_runtimes)
     LOGGER.debug("Determines suites for runtime", max_runtime_seconds=max_time_seconds,
                  max_suites=max_suites, max_tests_per_suite=max_tests_per_suite)
@@ -330,7 +348,7 @@ def divide_tests_into_suites(suite_name, tests_runtimes, max_time_seconds, max_s
                          test_runtime=runtime, max_time=max_time_seconds)
             if current_suite.get_test_count() > 0:
                 suites.append(current_suite)
-                current_suite = Suite(suite_name)
+                current_suite = Suite(suite_name, counter)
                 if max_suites and len(suites) >= max_suites:
                     last_test_processed = idx
                     break
@@ -347,6 +365,67 @@ def divide_tests_into_suites(suite_name, tests_runtimes, max_time_seconds, max_s
     return suites
 
 
+def divide_tests_into_balanced_suites(  # pylint: disable=too-many-arguments
+        suite_name, tests_runtimes, max_time_seconds, max_suites=None, max_tests_per_suite=None,
+        per_test_overhead_secs=0, fixture_setup_secs=0, counter=None):
+    """
+    Divide the given tests into suites whose runtimes are as even as possible.
+
+    The fewest suites that can each execute in less than `max_time_seconds` are created, up to
+    `max_suites`, and the tests are split among them to minimize the runtime of the slowest suite.
+    The estimated runtime of a suite is `fixture_setup_secs` plus the runtime of each of its tests
+    and `per_test_overhead_secs` for each of its tests.
+
+    Note: If `max_suites` is hit, suites may have more tests than `max_tests_per_suite` and may have
+    runtimes longer than `max_time_seconds`.
+
+    :param suite_name: Name of suite being split.
+    :param tests_runtimes: List of tuples containing test names and test runtimes.
+    :param max_time_seconds: Maximum runtime of a single suite.
+    :param max_suites: Maximum number of suites to create.
+    :param max_tests_per_suite: Maximum number of tests to add to a single suite.
+    :param per_test_overhead_secs: Time spent on each test which isn't part of its runtime.
+    :param fixture_setup_secs: Time spent setting up the fixture of each suite.
+    :param counter: Counter numbering the suites, or None to reset and use the one shared by every
+        Suite.
+    :return: List of Suite objects representing grouping of tests.
+    """
+    if counter is None:
+        Suite.reset_current_index()
+    if not tests_runtimes:
+        return []
+
+    costs = [runtime + per_test_overhead_secs for (_, runtime) in tests_runtimes]
+    max_test_time = max_time_seconds - fixture_setup_secs
+    max_num_suites = min(max_suites or len(costs), len(costs))
+
+    num_suites = len(costs)
+    if max_test_time > 0:
+        num_suites = math.ceil(sum(costs) / max_test_time)
+    if max_tests_per_suite:
+        num_suites = max(num_suites, math.ceil(len(costs) / max_tests_per_suite))
+    num_suites = max(1, min(num_suites, max_num_suites))
+
+    while True:
+        bins = binpacking.split(costs, num_suites, max_tests_per_suite)
+        slowest = binpacking.makespan(bins, costs)
+        # The lower bound on the number of suites doesn't account for how the tests fit together.
+        if slowest <= max_test_time or num_suites >= max_num_suites:
+            break
+        num_suites += 1
+
+    LOGGER.debug("Balanced suites", num_suites=len(bins), max_suite_runtime=slowest,
+                 max_runtime_seconds=max_test_time)
+    suites = []
+    for items in bins:
+        suite = Suite(suite_name, counter)
+        for idx in sorted(items):
+            (test_file, runtime) = tests_runtimes[idx]
+            suite.add_test(test_file, runtime)
+        suites.append(suite)
+    return suites
+
+
 def update_suite_config(suite_config, roots=None, excludes=None):
     """
     Update suite config based on the roots and excludes passed in.
@@ -459,16 +538,32 @@ def should_tasks_be_generated(evg_api, task_id):
     return True
 
 
+class SuiteCounter(object):
+    """Number the suites a task is split into."""
+
+    def __init__(self) -> None:
+        """Initialize the object."""
+        self.num_suites = 0
+
+    def next_index(self) -> int:
+        """Return the index of a new suite."""
+        index = self.num_suites
+        self.num_suites += 1
+        return index
+
+
 class Suite(object):
     """A suite of tests that can be run by evergreen."""
 
     _current_index = 0
 
-    def __init__(self, source_name: str) -> None:
+    def __init__(self, source_name: str, counter: Optional[SuiteCounter] = None) -> None:
         """
         Initialize the object.
 
         :param source_name: Base name of suite.
+        :param counter: Counter numbering the suites of the task, or None to use the one shared by
+            every Suite.
         """
         self.tests = []
         self.total_runtime = 0
@@ -476,8 +571,12 @@ class Suite(object):
         self.tests_with_runtime_info = 0
         self.source_name = source_name
 
-        self.index = Suite._current_index
-        Suite._current_index += 1
+        self._counter = counter
+        if counter is not None:
+            self.index = counter.next_index()
+        else:
+            self.index = Suite._current_index
+            Suite._current_index += 1
 
     @classmethod
     def reset_current_index(cls):
@@ -496,6 +595,14 @@ class Suite(object):
         if runtime > self.max_runtime:
             self.max_runtime = runtime
 
+    def use_tail_runtimes(self, tail_runtimes: Dict[str, float]):
+        """
+        Estimate the runtime of the slowest test from a high percentile of the test runtimes.
+
+        :param tail_runtimes: Dictionary mapping test names to their runtime at the percentile.
+        """
+        self.max_runtime = max((tail_runtimes.get(test, 0) for test in self.tests), default=0)
+
     def should_overwrite_timeout(self):
         """
         Whether the timeout for this suite should be overwritten.
@@ -517,7 +624,8 @@ class Suite(object):
     @property
     def name(self) -> str:
         """Get the name of this suite."""
-        return taskname.name_generated_task(self.source_name, self.index, Suite._current_index)
+        num_suites = Suite._current_index if self._counter is None else self._counter.num_suites
+        return taskname.name_generated_task(self.source_name, self.index, num_suites)
 
     def generate_resmoke_config(self, source_config: Dict) -> str:
         """
@@ -609,7 +717,9 @@ class EvergreenConfigGenerator(object):
             timeout = None
             exec_timeout = None
             if max_test_runtime:
-                timeout = calculate_timeout(max_test_runtime, 3) * repeat_factor
+                scaling_factor = TAIL_TIMEOUT_SCALING_FACTOR if self.options.timeout_percentile \
+                    else 3
+                timeout = calculate_timeout(max_test_runtime, scaling_factor) * repeat_factor
                 LOGGER.debug("Setting timeout", timeout=timeout, max_runtime=max_test_runtime,
                              factor=repeat_factor)
             if expected_suite_runtime:
@@ -748,16 +858,22 @@ class EvergreenConfigGenerator(object):
 class GenerateSubSuites(object):
     """Orchestrate the execution of generate_resmoke_suites."""
 
-    def __init__(self, evergreen_api: EvergreenApi, config_options: ConfigOptions):
+    def __init__(self, evergreen_api: EvergreenApi, config_options: ConfigOptions,
+                 test_catalogs: Optional[Dict[str, TestCatalog]] = None):
         """
         Initialize the object.
 
         :param evergreen_api: Evergreen API client.
         :param config_options: Generation configuration options.
+        :param test_catalogs: Catalogs of the suites which were already listed, by suite name. It
+            is shared by the GenerateSubSuites of a batch so that each suite is only listed once.
         """
         self.evergreen_api = evergreen_api
         self.config_options = config_options
         self.test_list = []
+        self._test_catalogs = test_catalogs if test_catalogs is not None else {}
+        # Each task numbers its own suites so that many tasks can be split concurrently.
+        self._suite_counter = SuiteCounter()
 
         # Populate config values for methods like list_tests()
         _parser.set_run_options()
@@ -770,26 +886,48 @@ class GenerateSubSuites(object):
         :param end_date: Time to end historical analysis.
         :return: List of sub suites to be generated.
         """
+        return self.calculate_suites_from_history(self.get_history(start_date, end_date))
+
+    def get_history(self, start_date: datetime, end_date: datetime) -> Optional[List[TestStats]]:
+        """
+        Collect the test statistics of the task for the provided period.
+
+        :param start_date: Time to start historical analysis.
+        :param end_date: Time to end historical analysis.
+        :return: List of test stats, or None if Evergreen is degraded.
+        """
         try:
-            evg_stats = self.get_evg_stats(self.config_options.project, start_date, end_date,
-                                           self.config_options.task, self.config_options.variant)
-            if not evg_stats:
-                LOGGER.debug("No test history, using fallback suites")
-                # This is probably a new suite, since there is no test history, just use the
-                # fallback values.
-                return self.calculate_fallback_suites()
-            target_execution_time_secs = self.config_options.target_resmoke_time * 60
-            return self.calculate_suites_from_evg_stats(evg_stats, target_execution_time_secs)
+            return self.get_evg_stats(self.config_options.project, start_date, end_date,
+                                      self.config_options.task, self.config_options.variant)
         except requests.HTTPError as err:
             if err.response.status_code == requests.codes.SERVICE_UNAVAILABLE:
                 # Evergreen may return a 503 when the service is degraded.
                 # We fall back to splitting the tests into a fixed number of suites.
                 LOGGER.warning("Received 503 from Evergreen, "
                                "dividing the tests evenly among suites")
-                return self.calculate_fallback_suites()
+                return None
             else:
                 raise
 
+    def calculate_suites_from_history(self, evg_stats: Optional[List[TestStats]]) -> List[Suite]:
+        """
+        Divide tests into suites based on the statistics returned by get_history().
+
+        :param evg_stats: Historical test results for task being split, or None if they could not
+            be retrieved.
+        :return: List of sub suites to be generated.
+        """
+        self._suite_counter = SuiteCounter()
+        if evg_stats is None:
+            return self.calculate_fallback_suites()
+        if not evg_stats:
+            LOGGER.debug("No test history, using fallback suites")
+            # This is probably a new suite, since there is no test history, just use the
+            # fallback values.
+            return self.calculate_fallback_suites()
+        target_execution_time_secs = self.config_options.target_resmoke_time * 60
+        return self.calculate_suites_from_evg_stats(evg_stats, target_execution_time_secs)
+
     def get_evg_stats(self, project: str, start_date: datetime, end_date: datetime, task: str,
                       variant: str) -> List[TestStats]:
         """
@@ -805,6 +943,9 @@ class GenerateSubSuites(object):
         # pylint: disable=too-many-arguments
 
         days = (end_date - start_date).days
+        if self.config_options.split_percentile or self.config_options.timeout_percentile:
+            # The percentiles are estimated from the daily average runtimes.
+            days = 1
         return self.evergreen_api.test_stats_by_project(
             project, after_date=start_date.strftime("%Y-%m-%d"),
             before_date=end_date.strftime("%Y-%m-%d"), tasks=[task], variants=[variant],
@@ -819,15 +960,34 @@ class GenerateSubSuites(object):
         :param execution_time_secs: Target execution time of each suite (in seconds).
         :return: List of sub suites calculated.
         """
-        test_stats = teststats.TestStats(data)
-        tests_runtimes = self.filter_tests(test_stats.get_tests_runtimes())
+        test_stats = teststats.TestStats(
+            data, percentiles=bool(self.config_options.split_percentile
+                                   or self.config_options.timeout_percentile))
+        tests_runtimes = self.filter_tests(
+            test_stats.get_tests_runtimes(self.config_options.split_percentile))
         if not tests_runtimes:
             LOGGER.debug("No test runtimes after filter, using fallback")
             return self.calculate_fallback_suites()
         self.test_list = [info.test_name for info in tests_runtimes]
-        return divide_tests_into_suites(self.config_options.suite, tests_runtimes,
-                                        execution_time_secs, self.config_options.max_sub_suites,
-                                        self.config_options.max_tests_per_suite)
+        if self.config_options.split_strategy == "balanced":
+            suites = divide_tests_into_balanced_suites(
+                self.config_options.suite, tests_runtimes, execution_time_secs,
+                self.config_options.max_sub_suites, self.config_options.max_tests_per_suite,
+                self.config_options.per_test_overhead_secs, self.config_options.fixture_setup_secs,
+                self._suite_counter)
+        else:
+            suites = divide_tests_into_suites(self.config_options.suite, tests_runtimes,
+                                              execution_time_secs,
+                                              self.config_options.max_sub_suites,
+                                              self.config_options.max_tests_per_suite,
+                                              self._suite_counter)
+
+        if self.config_options.timeout_percentile:
+            tail_runtimes = dict(
+                test_stats.get_tests_runtimes(self.config_options.timeout_percentile))
+            for suite in suites:
+                suite.use_tail_runtimes(tail_runtimes)
+        return suites
 
     def filter_tests(self,
                      tests_runtimes: List[teststats.TestRuntime]) -> List[teststats.TestRuntime]:
@@ -845,21 +1005,20 @@ class GenerateSubSuites(object):
 
     def filter_existing_tests(self, tests_runtimes: List[teststats.TestRuntime]) \
             -> List[teststats.TestRuntime]:
-        """Filter out tests that do not exist in the filesystem."""
-        all_tests = [teststats.normalize_test_name(test) for test in self.list_tests()]
+        """Filter out tests that are not part of the suite or do not exist in the filesystem."""
         return [
             info for info in tests_runtimes
-            if os.path.exists(info.test_name) and info.test_name in all_tests
+            if info.test_name in self.test_catalog and os.path.exists(info.test_name)
         ]
 
     def calculate_fallback_suites(self) -> List[Suite]:
         """Divide tests into a fixed number of suites."""
         LOGGER.debug("Splitting tasks based on fallback",
                      fallback=self.config_options.fallback_num_sub_suites)
-        self.test_list = self.list_tests()
+        self.test_list = self.test_catalog.tests
         num_suites = min(self.config_options.fallback_num_sub_suites, len(self.test_list),
                          self.config_options.max_sub_suites)
-        suites = [Suite(self.config_options.suite) for _ in range(num_suites)]
+        suites = [Suite(self.config_options.suite, self._suite_counter) for _ in range(num_suites)]
         for idx, test_file in enumerate(self.test_list):
             suites[idx % num_suites].add_test(test_file, 0)
         return suites
@@ -868,6 +1027,14 @@ class GenerateSubSuites(object):
         """List the test files that are part of the suite being split."""
         return suitesconfig.get_suite(self.config_options.suite).tests
 
+    @property
+    def test_catalog(self) -> TestCatalog:
+        """Index of the test files that are part of the suite being split, listed once."""
+        suite = self.config_options.suite
+        if suite not in self._test_catalogs:
+            self._test_catalogs[suite] = TestCatalog(self.list_tests())
+        return self._test_catalogs[suite]
+
     def add_suites_to_build_variant(self, suites: List[Suite], build_variant: BuildVariant) -> None:
         """
         Add the given suites to the build variant specified.
@@ -904,16 +1071,19 @@ class GenerateSubSuites(object):
 
         :return: The suites files and evergreen configuration for the generated task.
         """
-        end_date = datetime.datetime.utcnow().replace(microsecond=0)
-        start_date = end_date - datetime.timedelta(days=LOOKBACK_DURATION_DAYS)
-        return self.calculate_suites(start_date, end_date)
+        return self.calculate_suites(*get_lookback_period())
 
-    def run(self):
-        """Generate resmoke suites that run within a target execution time and write to disk."""
+    def generate(self) -> Optional[Dict[str, str]]:
+        """
+        Generate resmoke suites that run within a target execution time.
+
+        :return: The contents of the suite files and of the Evergreen configuration by filename, or
+            None if the task was already generated.
+        """
         LOGGER.debug("config options", config_options=self.config_options)
         if not should_tasks_be_generated(self.evergreen_api, self.config_options.task_id):
             LOGGER.info("Not generating configuration due to previous successful generation.")
-            return
+            return None
 
         suites = self.get_suites()
         LOGGER.debug("Creating suites", num_suites=len(suites), task=self.config_options.task,
@@ -925,7 +1095,62 @@ class GenerateSubSuites(object):
         shrub_config.add_build_variant(self.generate_task_config(suites))
 
         config_dict_of_suites[self.config_options.task + ".json"] = shrub_config.json()
-        write_file_dict(self.config_options.generated_config_dir, config_dict_of_suites)
+        return config_dict_of_suites
+
+    def run(self):
+        """Generate resmoke suites that run within a target execution time and write to disk."""
+        config_dict_of_suites = self.generate()
+        if config_dict_of_suites is not None:
+            write_file_dict(self.config_options.generated_config_dir, config_dict_of_suites)
+
+
+def get_lookback_period() -> Tuple[datetime.datetime, datetime.datetime]:
+    """Return the start and end of the period of test history used to split suites."""
+    end_date = datetime.datetime.utcnow().replace(microsecond=0)
+    start_date = end_date - datetime.timedelta(days=LOOKBACK_DURATION_DAYS)
+    return start_date, end_date
+
+
+def generate_batch(evergreen_api: EvergreenApi, config_options_list: List[ConfigOptions],
+                   max_workers: Optional[int] = None) -> None:
+    """
+    Generate the sub-suites of many tasks concurrently and write all of their files at the end.
+
+    The tasks share the Evergreen API client and its HTTP session, and each suite is listed once.
+    Each task numbers its own suites, so the tasks are split concurrently too. No files are written
+    if generating any of the tasks fails.
+
+    :param evergreen_api: Evergreen API client.
+    :param config_options_list: Generation configuration options of each task.
+    :param max_workers: Maximum number of tasks to generate at once, or None for the default of
+        ThreadPoolExecutor.
+    """
+    # The test history of each file is opened once and shared by the tasks using it.
+    history_apis = {}
+    for config_options in config_options_list:
+        history_file = config_options.test_history_file
+        if history_file not in history_apis:
+            history_apis[history_file] = testhistory.wrap_evergreen_api(
+                evergreen_api, history_file)
+
+    test_catalogs = {}
+    generators = [
+        GenerateSubSuites(history_apis[config_options.test_history_file], config_options,
+                          test_catalogs) for config_options in config_options_list
+    ]
+    # The suites are listed before the generators run since the resmoke selector isn't thread-safe.
+    # Most suites share their roots, so the file system lookups are shared between them.
+    with _selector.memoize_file_system():
+        for generator in generators:
+            LOGGER.debug("Listed suite", suite=generator.config_options.suite,
+                         num_tests=len(generator.test_catalog))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(GenerateSubSuites.generate, generators))
+
+    for (generator, config_dict_of_suites) in zip(generators, results):
+        if config_dict_of_suites is not None:
+            write_file_dict(generator.config_options.generated_config_dir, config_dict_of_suites)
 
 
 def filter_specified_tests(specified_tests: Set[str], tests_runtimes: List[teststats.TestRuntime]):
@@ -936,31 +1161,46 @@ def filter_specified_tests(specified_tests: Set[str], tests_runtimes: List[tests
     :param tests_runtimes: List of tuples containing test names and test runtimes.
     :return: List of TestRuntime tuples that match specified_tests.
     """
-    return [info for info in tests_runtimes if info.test_name in specified_tests]
+    specified_catalog = TestCatalog(specified_tests)
+    return [info for info in tests_runtimes if info.test_name in specified_catalog]
 
 
 @click.command()
-@click.option("--expansion-file", type=str, required=True,
-              help="Location of expansions file generated by evergreen.")
+@click.option("--expansion-file", "expansion_files", type=str, required=True, multiple=True,
+              help="Location of expansions file generated by evergreen. Can be specified multiple"
+              " times to generate many tasks concurrently.")
 @click.option("--evergreen-config", type=str, default=CONFIG_FILE,
               help="Location of evergreen configuration file.")
+@click.option("--max-workers", type=int, default=None,
+              help="Maximum number of tasks to generate at once when there are many expansion"
+              " files.")
 @click.option("--verbose", is_flag=True, default=False, help="Enable verbose logging.")
-def main(expansion_file, evergreen_config, verbose):
+def main(expansion_files, evergreen_config, max_workers, verbose):
     """
     Create a configuration for generate tasks to create sub suites for the specified resmoke suite.
 
-    The `--expansion-file` should contain all the configuration needed to generate the tasks.
+    The `--expansion-file` should contain all the configuration needed to generate the tasks. When
+    several are given, their tasks are generated concurrently and the files of all of the tasks
+    are written once every task was generated.
     \f
-    :param expansion_file: Configuration file.
+    :param expansion_files: Configuration files.
     :param evergreen_config: Evergreen configuration file.
+    :param max_workers: Maximum number of tasks to generate at once.
     :param verbose: Use verbose logging.
     """
     enable_logging(verbose)
+    config_options_list = [
+        ConfigOptions.from_file(expansion_file, REQUIRED_CONFIG_KEYS, DEFAULT_CONFIG_VALUES,
+                                CONFIG_FORMAT_FN) for expansion_file in expansion_files
+    ]
     evg_api = RetryingEvergreenApi.get_api(config_file=evergreen_config)
-    config_options = ConfigOptions.from_file(expansion_file, REQUIRED_CONFIG_KEYS,
-                                             DEFAULT_CONFIG_VALUES, CONFIG_FORMAT_FN)
 
-    GenerateSubSuites(evg_api, config_options).run()
+    if len(config_options_list) == 1:
+        config_options = config_options_list[0]
+        evg_api = testhistory.wrap_evergreen_api(evg_api, config_options.test_history_file)
+        GenerateSubSuites(evg_api, config_options).run()
+    else:
+        generate_batch(evg_api, config_options_list, max_workers)
 
 
 if __name__ == "__main__":
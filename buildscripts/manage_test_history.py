@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Manage the local store of historical test runtimes read by the task generators.
+
+Test results can be added to the store from resmoke.py report.json files, and the runtimes of the
+tests of a task can be queried from it.
+"""
+
+import datetime
+import os
+import sys
+
+import click
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from buildscripts.util.testhistory import TestHistory, ingest_reports
+
+DEFAULT_PROJECT = "mongodb-mongo-master"
+DEFAULT_HISTORY_DAYS = 14
+
+
+@click.group()
+@click.option("--history-file", "history_file", required=True, metavar="FILE",
+              help="SQLite database of test runtimes.")
+@click.option("--project", "project", default=DEFAULT_PROJECT, metavar="PROJECT",
+              help="The evergreen project the tests ran on.")
+@click.pass_context
+def main(ctx, history_file, project):
+    """Manage the local store of historical test runtimes read by the task generators."""
+    ctx.obj = {"history": TestHistory(history_file), "project": project}
+
+
+@main.command()
+@click.option("--build-variant", "build_variant", required=True, metavar="BUILD_VARIANT",
+              help="The build variant the tests ran on.")
+@click.option("--task-name", "task_name", required=True, metavar="TASK_NAME",
+              help="The task the tests ran as part of.")
+@click.argument("report_files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.pass_context
+def ingest(ctx, build_variant, task_name, report_files):
+    """Add the test results of report.json files which haven't already been added."""
+    num_added = ingest_reports(ctx.obj["history"], ctx.obj["project"], build_variant, task_name,
+                               report_files)
+    click.echo(f"Added {num_added} of {len(report_files)} reports")
+
+
+@main.command()
+@click.option("--build-variant", "build_variant", required=True, metavar="BUILD_VARIANT",
+              help="The build variant to query.")
+@click.option("--task-name", "task_name", required=True, metavar="TASK_NAME",
+              help="The task to query.")
+@click.option("--days", "days", default=DEFAULT_HISTORY_DAYS, type=int,
+              help="The number of days of history to query.")
+@click.option("--percentile", "percentile", default=None, type=float,
+              help="Report this percentile of the runtimes rather than their average.")
+@click.pass_context
+def query(ctx, build_variant, task_name, days, percentile):
+    """Print the runtime of each test of a task, slowest first."""
+    end_date = datetime.datetime.utcnow().date()
+    start_date = end_date - datetime.timedelta(days=days)
+    history = ctx.obj["history"]
+    if percentile is None:
+        runtimes = {
+            stats.test_file: stats.avg_duration_pass
+            for stats in history.get_test_stats(ctx.obj["project"], start_date, end_date,
+                                                tasks=[task_name], variants=[build_variant])
+        }
+    else:
+        runtimes = history.get_runtime_percentiles(ctx.obj["project"], start_date, end_date,
+                                                   percentile, tasks=[task_name],
+                                                   variants=[build_variant])
+
+    for test_file, runtime in sorted(runtimes.items(), key=lambda item: item[1], reverse=True):
+        click.echo(f"{runtime:10.2f} {test_file}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
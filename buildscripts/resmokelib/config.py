@@ -39,17 +39,30 @@ DEFAULT_DBPATH_PREFIX = os.path.normpath("/data/db")
 # added to the PATH when calling programs.make_process().
 DEFAULT_MULTIVERSION_DIR = os.path.normpath("/data/multiversion")
 
+# Default location of the database of historical test runtimes used when
+# --scheduleMode=longest_first is specified without --testRuntimesFile.
+DEFAULT_TEST_RUNTIMES_FILE = os.path.normpath("build/resmoke_test_runtimes.json")
+
 # Default location for the genny executable. Override this in the YAML suite configuration if
 # desired.
 DEFAULT_GENNY_EXECUTABLE = os.path.normpath("genny/build/src/driver/genny")
 
 # Names below correspond to how they are specified via the command line or in the options YAML file.
 DEFAULTS = {
+    "adaptive_jobs": False,
+    "allow_ephemeral_ports": False,
     "always_use_log_files": False,
+    "archive_compression_threads": 4,
+    "archive_format": "tgz",
     "archive_limit_mb": 5000,
     "archive_limit_tests": 10,
+    "archive_local_dir": None,
+    "archive_upload_workers": 2,
+    "async_logging": False,
     "base_port": 20000,
     "backup_on_restart_dir": None,
+    "buildlogger_gzip": False,
+    "buildlogger_upload_workers": 0,
     "buildlogger_url": "https://logkeeper.mongodb.org",
     "continue_on_failure": False,
     "dbpath_prefix": None,
@@ -60,8 +73,10 @@ DEFAULTS = {
     "flow_control_tickets": None,
     "genny_executable": None,
     "include_with_any_tags": None,
+    "incremental_dbhash": None,
     "install_dir": None,
     "jobs": 1,
+    "jstest_tags_cache_file": None,
     "logger_file": None,
     "mongo_executable": None,
     "mongod_executable": None,
@@ -71,7 +86,11 @@ DEFAULTS = {
     "mrlog": None,
     "no_journal": False,
     "num_clients_per_fixture": 1,
+    "parallel_fixture_setup": None,
     "perf_report_file": None,
+    "port_allocation": "deterministic",
+    "process_launcher": "locked",
+    "python_consistency_checks": False,
     "repeat_suites": 1,
     "repeat_tests": 1,
     "repeat_tests_max": None,
@@ -80,6 +99,9 @@ DEFAULTS = {
     "replay_file": None,
     "report_failure_status": "fail",
     "report_file": None,
+    "report_format": "json",
+    "reuse_fixtures": False,
+    "schedule_mode": "fifo",
     "seed": int(time.time() * 256),  # Taken from random.py code in Python 2.7.
     "service_executor": None,
     "shell_conn_string": None,
@@ -95,6 +117,8 @@ DEFAULTS = {
     "suite_files": "with_server",
     "tag_file": None,
     "test_files": [],
+    "test_membership_index_file": None,
+    "test_runtimes_file": None,
     "transport_layer": None,
     "user_friendly_output": None,
     "mixed_bin_versions": None,
@@ -231,19 +255,50 @@ SuiteOptions.ALL_INHERITED = SuiteOptions(  # type: ignore
 # Variables that are set by the user at the command line or with --options.
 ##
 
+# If true, then the number of Job instances running tests is adjusted based on the load of the host,
+# with --jobs as the upper bound.
+ADAPTIVE_JOBS = False
+
+# If true, then ports in the range the kernel assigns to outgoing sockets are leased with
+# PORT_ALLOCATION="dynamic" once there aren't enough free ports below it.
+ALLOW_EPHEMERAL_PORTS = False
+
 # Log to files located in the db path and don't clean dbpaths after tests.
 ALWAYS_USE_LOG_FILES = False
 
+# The number of threads gzipping each archive file.
+ARCHIVE_COMPRESSION_THREADS = None
+
+# Whether data files are archived as a tar/gzip ("tgz") or as deduplicated chunks ("dedup").
+ARCHIVE_FORMAT = None
+
 # The limit size of all archive files for an Evergreen task.
 ARCHIVE_LIMIT_MB = None
 
 # The limit number of tests to archive for an Evergreen task.
 ARCHIVE_LIMIT_TESTS = None
 
+# If set, then archives are written to this directory instead of being uploaded to S3.
+ARCHIVE_LOCAL_DIR = None
+
+# The number of archive files uploaded to S3 at once.
+ARCHIVE_UPLOAD_WORKERS = None
+
+# If true, then the records of the root loggers are formatted and written by a background thread
+# instead of by the threads logging them.
+ASYNC_LOGGING = None
+
 # The starting port number to use for mongod and mongos processes spawned by resmoke.py and the
 # mongo shell.
 BASE_PORT = None
 
+# If true, then log output is sent to the buildlogger server with gzip content-encoding.
+BUILDLOGGER_GZIP = None
+
+# The number of threads sending log output to the buildlogger server. If 0, then the log output is
+# sent by the flush thread.
+BUILDLOGGER_UPLOAD_WORKERS = None
+
 # The root url of the buildlogger server.
 BUILDLOGGER_URL = None
 
@@ -310,6 +365,10 @@ GENNY_EXECUTABLE = None
 # jstest portion of the suite(s).
 INCLUDE_WITH_ANY_TAGS = None
 
+# If set, then the Python implementation of the CheckReplDBHash hook only rehashes the collections
+# written since its previous check, and rehashes every collection on every Nth check.
+INCREMENTAL_DBHASH = None
+
 # Params that can be set to change internal resmoke behavior. Used to test resmoke and should
 # not be set by the user.
 INTERNAL_PARAMS = []
@@ -317,6 +376,10 @@ INTERNAL_PARAMS = []
 # If set, then resmoke.py starts the specified number of Job instances to run tests.
 JOBS = None
 
+# If set, then the tags of JS test files are cached in the specified file so that only the test
+# files modified since a previous invocation are parsed again.
+JSTEST_TAGS_CACHE_FILE = None
+
 # Yaml file that specified logging configuration.
 LOGGER_FILE = None
 
@@ -345,9 +408,32 @@ NO_JOURNAL = None
 # If set, then each fixture runs tests with the specified number of clients.
 NUM_CLIENTS_PER_FIXTURE = None
 
+# If true, then the processes of multi-node fixtures are started and waited on concurrently.
+PARALLEL_FIXTURE_SETUP = None
+
 # Report file for the Evergreen performance plugin.
 PERF_REPORT_FILE = None
 
+# Controls how ports are allocated. If "deterministic", each job uses a fixed range of ports
+# starting at BASE_PORT. If "dynamic", free ports are leased from a pool shared by all of the jobs.
+PORT_ALLOCATION = None
+
+# Controls how processes are spawned. If "locked", spawns are serialized by a lock. If "concurrent",
+# spawns from different threads run concurrently. If "posix_spawn", spawns also run concurrently and
+# use os.posix_spawn() instead of fork() and exec() where the platform supports it.
+PROCESS_LAUNCHER = None
+
+# If true, then the CheckReplDBHash, CheckReplOplogs, and ValidateCollections hooks run their checks
+# with pymongo rather than by spawning a mongo shell when their configuration allows it.
+PYTHON_CONSISTENCY_CHECKS = None
+
+# Controls the order in which tests are dispatched to the Job threads. If "fifo", tests are run in
+# suite order. If "longest_first", tests with the longest historical runtime are run first.
+SCHEDULE_MODE = None
+
+# If set, then the runtime of each test is recorded to and read from the specified JSON file.
+TEST_RUNTIMES_FILE = None
+
 # If set, then the RNG is seeded with the specified value. Otherwise uses a seed based on the time
 # this module was loaded.
 RANDOM_SEED = None
@@ -375,6 +461,14 @@ REPORT_FAILURE_STATUS = None
 # If set, then resmoke.py will write out a report file with the status of each test that ran.
 REPORT_FILE = None
 
+# Controls whether the report file is written as one JSON object after all of the suites finish
+# ("json"), or as the results of the tests are appended to it as JSON lines as they finish ("jsonl").
+REPORT_FORMAT = None
+
+# If true, then fixtures are kept running after a suite finishes and are reused by later suites
+# with the same fixture configuration.
+REUSE_FIXTURES = None
+
 # IF set, then mongod/mongos's started by resmoke.py will use the specified service executor
 SERVICE_EXECUTOR = None
 
@@ -438,6 +532,10 @@ TAG_FILE = None
 # The test files to execute.
 TEST_FILES = None
 
+# If set, then the suites each test belongs to are saved to the specified JSON file and reused for
+# as long as none of the suite configurations or test files they were computed from change.
+TEST_MEMBERSHIP_INDEX_FILE = None
+
 # If set, then mongod/mongos's started by resmoke.py will use the specified transport layer.
 TRANSPORT_LAYER = None
 
@@ -91,6 +91,25 @@ def _validate_config(parser):  # pylint: disable=too-many-branches
     if _config.REPEAT_TESTS > 1 and _config.REPEAT_TESTS_SECS:
         parser.error("Cannot specify --repeatTests and --repeatTestsSecs")
 
+    if _config.INCREMENTAL_DBHASH is not None:
+        if _config.INCREMENTAL_DBHASH < 1:
+            parser.error("--incrementalDBHash must be at least 1")
+
+        if not _config.PYTHON_CONSISTENCY_CHECKS:
+            parser.error("Must specify --pythonConsistencyChecks with --incrementalDBHash")
+
+    if _config.ALLOW_EPHEMERAL_PORTS and _config.PORT_ALLOCATION != "dynamic":
+        parser.error("Must specify --portAllocation=dynamic with --allowEphemeralPorts")
+
+    if _config.ARCHIVE_COMPRESSION_THREADS < 1:
+        parser.error("--archiveCompressionThreads must be at least 1")
+
+    if _config.ARCHIVE_UPLOAD_WORKERS < 1:
+        parser.error("--archiveUploadWorkers must be at least 1")
+
+    if _config.BUILDLOGGER_UPLOAD_WORKERS < 0:
+        parser.error("--buildloggerUploadWorkers must not be negative")
+
     if _config.MIXED_BIN_VERSIONS is not None:
         for version in _config.MIXED_BIN_VERSIONS:
             if version not in set(['old', 'new']):
@@ -136,9 +155,13 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
             user_config = dict(config_parser["resmoke"])
             config.update(user_config)
 
+    _config.ADAPTIVE_JOBS = config.pop("adaptive_jobs")
+    _config.ALLOW_EPHEMERAL_PORTS = config.pop("allow_ephemeral_ports")
     _config.ALWAYS_USE_LOG_FILES = config.pop("always_use_log_files")
     _config.BASE_PORT = int(config.pop("base_port"))
     _config.BACKUP_ON_RESTART_DIR = config.pop("backup_on_restart_dir")
+    _config.BUILDLOGGER_GZIP = config.pop("buildlogger_gzip")
+    _config.BUILDLOGGER_UPLOAD_WORKERS = int(config.pop("buildlogger_upload_workers"))
     _config.BUILDLOGGER_URL = config.pop("buildlogger_url")
     _config.DBPATH_PREFIX = _expand_user(config.pop("dbpath_prefix"))
     _config.DRY_RUN = config.pop("dry_run")
@@ -151,7 +174,9 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.FLOW_CONTROL_TICKETS = config.pop("flow_control_tickets")
     _config.INCLUDE_WITH_ANY_TAGS = _tags_from_list(config.pop("include_with_any_tags"))
     _config.GENNY_EXECUTABLE = _expand_user(config.pop("genny_executable"))
+    _config.INCREMENTAL_DBHASH = config.pop("incremental_dbhash")
     _config.JOBS = config.pop("jobs")
+    _config.JSTEST_TAGS_CACHE_FILE = _expand_user(config.pop("jstest_tags_cache_file"))
     _config.LINEAR_CHAIN = config.pop("linear_chain") == "on"
     _config.MAJORITY_READ_CONCERN = config.pop("majority_read_concern") == "on"
     _config.MIXED_BIN_VERSIONS = config.pop("mixed_bin_versions")
@@ -189,7 +214,11 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.NUM_CLIENTS_PER_FIXTURE = config.pop("num_clients_per_fixture")
     _config.NUM_REPLSET_NODES = config.pop("num_replset_nodes")
     _config.NUM_SHARDS = config.pop("num_shards")
+    _config.PARALLEL_FIXTURE_SETUP = config.pop("parallel_fixture_setup") == "on"
     _config.PERF_REPORT_FILE = config.pop("perf_report_file")
+    _config.PORT_ALLOCATION = config.pop("port_allocation")
+    _config.PROCESS_LAUNCHER = config.pop("process_launcher")
+    _config.PYTHON_CONSISTENCY_CHECKS = config.pop("python_consistency_checks")
     _config.RANDOM_SEED = config.pop("seed")
     _config.REPEAT_SUITES = config.pop("repeat_suites")
     _config.REPEAT_TESTS = config.pop("repeat_tests")
@@ -198,6 +227,9 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.REPEAT_TESTS_SECS = config.pop("repeat_tests_secs")
     _config.REPORT_FAILURE_STATUS = config.pop("report_failure_status")
     _config.REPORT_FILE = config.pop("report_file")
+    _config.REPORT_FORMAT = config.pop("report_format")
+    _config.REUSE_FIXTURES = config.pop("reuse_fixtures")
+    _config.SCHEDULE_MODE = config.pop("schedule_mode")
     _config.SERVICE_EXECUTOR = config.pop("service_executor")
     _config.SHELL_READ_MODE = config.pop("shell_read_mode")
     _config.SHELL_WRITE_MODE = config.pop("shell_write_mode")
@@ -209,6 +241,10 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     if _config.SUITE_FILES is not None:
         _config.SUITE_FILES = _config.SUITE_FILES.split(",")
     _config.TAG_FILE = config.pop("tag_file")
+    _config.TEST_RUNTIMES_FILE = _expand_user(config.pop("test_runtimes_file"))
+    if _config.TEST_RUNTIMES_FILE is None and _config.SCHEDULE_MODE == "longest_first":
+        _config.TEST_RUNTIMES_FILE = _config.DEFAULT_TEST_RUNTIMES_FILE
+    _config.TEST_MEMBERSHIP_INDEX_FILE = _expand_user(config.pop("test_membership_index_file"))
     _config.TRANSPORT_LAYER = config.pop("transport_layer")
     _config.USER_FRIENDLY_OUTPUT = config.pop("user_friendly_output")
 
@@ -228,11 +264,19 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.EVERGREEN_VARIANT_NAME = config.pop("variant_name")
     _config.EVERGREEN_VERSION_ID = config.pop("version_id")
 
-    # Archival options. Archival is enabled only when running on evergreen.
-    if not _config.EVERGREEN_TASK_ID:
+    # Archival options. Archival is enabled only when running on evergreen or when archiving to a
+    # local directory.
+    _config.ARCHIVE_LOCAL_DIR = config.pop("archive_local_dir")
+    if not _config.EVERGREEN_TASK_ID and not _config.ARCHIVE_LOCAL_DIR:
         _config.ARCHIVE_FILE = None
+    _config.ARCHIVE_COMPRESSION_THREADS = int(config.pop("archive_compression_threads"))
+    _config.ARCHIVE_FORMAT = config.pop("archive_format")
     _config.ARCHIVE_LIMIT_MB = config.pop("archive_limit_mb")
     _config.ARCHIVE_LIMIT_TESTS = config.pop("archive_limit_tests")
+    _config.ARCHIVE_UPLOAD_WORKERS = int(config.pop("archive_upload_workers"))
+
+    # Logging options.
+    _config.ASYNC_LOGGING = config.pop("async_logging")
 
     # Wiredtiger options.
     _config.WT_COLL_CONFIG = config.pop("wt_coll_config")
@@ -2,6 +2,8 @@
 
 import collections
 import functools
+import socket
+import sys
 import threading
 
 from buildscripts.resmokelib import config
@@ -31,13 +33,48 @@ def _check_port(func):
     return wrapper
 
 
+def _is_port_free(port):
+    """Return true if nothing is listening on 'port', by binding to it."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        if sys.platform != "win32":
+            # mongod and mongos set SO_REUSEADDR too, so a port with connections in TIME_WAIT can
+            # still be used.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", port))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _max_dynamic_port():
+    """Return the highest port which isn't in the range the kernel assigns to outgoing sockets."""
+    try:
+        with open("/proc/sys/net/ipv4/ip_local_port_range") as fileh:
+            return int(fileh.read().split()[0]) - 1
+    except (IOError, OSError, ValueError, IndexError):
+        return PortAllocator.MAX_PORT
+
+
 class PortAllocator(object):
     """Class responsible for allocating ranges of ports.
 
-    It reserves a range of ports for each job with the first part of
-    that range used for the fixture started by that job, and the second
-    part of the range used for mongod and mongos processes started by
-    tests run by that job.
+    With --portAllocation=deterministic, it reserves a range of ports
+    for each job with the first part of that range used for the fixture
+    started by that job, and the second part of the range used for
+    mongod and mongos processes started by tests run by that job.
+
+    With --portAllocation=dynamic, ports are leased from a single pool
+    shared by every job instead, so the number of jobs isn't limited by
+    the size of the per-job ranges. A port is only leased if binding to
+    it succeeds. Only the ports below the range the kernel assigns to
+    outgoing sockets are leased, unless --allowEphemeralPorts is
+    specified. The tests of a job lease a smaller range of ports which
+    is released once each test finishes, and the ports of a job's
+    fixture are released once the fixture is torn down. Any remaining
+    leases are reclaimed by reset().
     """
 
     # A PortAllocator will not return any port greater than this number.
@@ -51,11 +88,22 @@ class PortAllocator(object):
     # of the port range is used by tests.
     _PORTS_PER_FIXTURE = 20
 
+    # The number of ports leased to the test a job is running with --portAllocation=dynamic.
+    _DYNAMIC_PORTS_PER_TEST = 100
+
     _NUM_USED_PORTS_LOCK = threading.Lock()
 
     # Used to keep track of how many ports a fixture has allocated.
     _NUM_USED_PORTS = collections.defaultdict(int)  # type: ignore
 
+    # The ports leased with --portAllocation=dynamic, the ports leased to the fixture of each job,
+    # and the (min, max) range of ports leased to the test each job is running.
+    _LEASED_PORTS = set()  # type: ignore
+    _FIXTURE_PORTS = collections.defaultdict(set)  # type: ignore
+    _TEST_PORT_RANGES = {}  # type: ignore
+    # The port the search for a free port starts from with --portAllocation=dynamic.
+    _NEXT_DYNAMIC_PORT = None
+
     @classmethod
     @_check_port
     def next_fixture_port(cls, job_num):
@@ -66,6 +114,10 @@ class PortAllocator(object):
         valid port number.
         """
         with cls._NUM_USED_PORTS_LOCK:
+            if config.PORT_ALLOCATION == "dynamic":
+                port = cls._lease_ports(1)
+                cls._FIXTURE_PORTS[job_num].add(port)
+                return port
             start_port = config.BASE_PORT + (job_num * cls._PORTS_PER_JOB)
             num_used_ports = cls._NUM_USED_PORTS[job_num]
             next_port = start_port + num_used_ports
@@ -87,6 +139,8 @@ class PortAllocator(object):
         Raises a PortAllocationError if that port is higher than the
         maximum port.
         """
+        if config.PORT_ALLOCATION == "dynamic":
+            return cls._test_port_range(job_num)[0]
         return config.BASE_PORT + (job_num * cls._PORTS_PER_JOB) + cls._PORTS_PER_FIXTURE
 
     @classmethod
@@ -97,16 +151,86 @@ class PortAllocator(object):
         Raises a PortAllocationError if that port is higher than the
         maximum port.
         """
+        if config.PORT_ALLOCATION == "dynamic":
+            return cls._test_port_range(job_num)[1]
         next_range_start = config.BASE_PORT + ((job_num + 1) * cls._PORTS_PER_JOB)
         return next_range_start - 1
 
+    @classmethod
+    def _test_port_range(cls, job_num):
+        """Return the (min, max) range of ports leased to the tests of the specified job."""
+        with cls._NUM_USED_PORTS_LOCK:
+            if job_num not in cls._TEST_PORT_RANGES:
+                num_ports = cls._DYNAMIC_PORTS_PER_TEST
+                min_port = cls._lease_ports(num_ports)
+                cls._TEST_PORT_RANGES[job_num] = (min_port, min_port + num_ports - 1)
+            return cls._TEST_PORT_RANGES[job_num]
+
+    @classmethod
+    def release_test_ports(cls, job_num):
+        """Release the ports leased to the test the specified job just finished running.
+
+        The next test run by the job leases a new range of ports.
+        """
+        with cls._NUM_USED_PORTS_LOCK:
+            port_range = cls._TEST_PORT_RANGES.pop(job_num, None)
+            if port_range is not None:
+                cls._LEASED_PORTS.difference_update(range(port_range[0], port_range[1] + 1))
+
+    @classmethod
+    def release_fixture_ports(cls, job_num):
+        """Release the ports leased to the fixture of the specified job once it is torn down."""
+        with cls._NUM_USED_PORTS_LOCK:
+            cls._LEASED_PORTS.difference_update(cls._FIXTURE_PORTS.pop(job_num, set()))
+
+    @classmethod
+    def _lease_ports(cls, num_ports):
+        """Lease 'num_ports' contiguous free ports and return the first one.
+
+        The search continues from after the previously leased ports so
+        that recently released ports aren't reused right away, and then
+        wraps around to BASE_PORT. Ports in the range the kernel assigns
+        to outgoing sockets are only leased with --allowEphemeralPorts,
+        and only when there aren't enough free ports below it. Must be
+        called with _NUM_USED_PORTS_LOCK held.
+        """
+        if cls._NEXT_DYNAMIC_PORT is None:
+            cls._NEXT_DYNAMIC_PORT = config.BASE_PORT
+
+        max_ports = [_max_dynamic_port()]
+        if config.ALLOW_EPHEMERAL_PORTS:
+            max_ports.append(cls.MAX_PORT)
+
+        for max_port in sorted(set(max_ports)):
+            for first_port in sorted({cls._NEXT_DYNAMIC_PORT, config.BASE_PORT}, reverse=True):
+                port = first_port
+                while port + num_ports - 1 <= max_port:
+                    # Skip past the first port which is either leased or in use.
+                    unavailable = next((candidate for candidate in range(port, port + num_ports)
+                                        if candidate in cls._LEASED_PORTS
+                                        or not _is_port_free(candidate)), None)
+                    if unavailable is None:
+                        cls._LEASED_PORTS.update(range(port, port + num_ports))
+                        cls._NEXT_DYNAMIC_PORT = port + num_ports
+                        return port
+                    port = unavailable + 1
+
+        raise errors.PortAllocationError(
+            "Exhausted all available ports. Could not find %d free ports between %d and %d" %
+            (num_ports, config.BASE_PORT, max(max_ports)))
+
     @classmethod
     def reset(cls):
         """Reset the internal state of the PortAllocator.
 
         This method is intended to be called each time resmoke.py starts
-        a new test suite.
+        a new test suite. It releases the ports leased with
+        --portAllocation=dynamic. The ports of a fixture kept running for
+        the next test suite aren't leased again since binding to them fails.
         """
 
         with cls._NUM_USED_PORTS_LOCK:
             cls._NUM_USED_PORTS = collections.defaultdict(int)
+            cls._LEASED_PORTS = set()
+            cls._FIXTURE_PORTS = collections.defaultdict(set)
+            cls._TEST_PORT_RANGES = {}
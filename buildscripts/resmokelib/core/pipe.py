@@ -1,11 +1,41 @@
 """
-Helper class to read output of a subprocess.
+Helpers to read the output of subprocesses.
 
 Used to avoid deadlocks from the pipe buffer filling up and blocking the subprocess while it's
 being waited on.
 """
 
+import os
+import selectors
+import sys
 import threading
+import traceback
+
+
+def new_logger_pipe(logger, level, pipe_out):
+    """
+    Start sending the output of 'pipe_out' to 'logger' and return an object to wait on it.
+
+    The returned object supports the wait_until_started() and wait_until_finished() methods of
+    LoggerPipe. The pipes of all subprocesses are read by a single OutputPump thread on platforms
+    where pipes can be polled, and by a dedicated LoggerPipe thread per pipe otherwise.
+    """
+    if sys.platform == "win32":
+        return LoggerPipe(logger, level, pipe_out)
+    return OutputPump.get_instance().add_pipe(logger, level, pipe_out)
+
+
+def _decode_output(output):
+    """Convert a bytestring of output from a subprocess to a string suitable for logging."""
+
+    # Replace null bytes in the output of the subprocess with a literal backslash ('\') followed
+    # by a literal zero ('0') so tools like grep don't treat resmoke.py's output as binary data.
+    output = output.replace(b"\0", b"\\0")
+
+    # Convert the output of the process from a bytestring to a UTF-8 string, and replace any
+    # characters that cannot be decoded with the official Unicode replacement character, U+FFFD.
+    # The log messages of MongoDB processes are not always valid UTF-8 sequences. See SERVER-7506.
+    return output.decode("utf-8", "replace")
 
 
 class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attributes
@@ -50,17 +80,7 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
         with self.__pipe_out:
             # Avoid buffering the output from the pipe.
             for line in iter(self.__pipe_out.readline, b""):
-                # Replace null bytes in the output of the subprocess with a literal backslash ('\')
-                # followed by a literal zero ('0') so tools like grep don't treat resmoke.py's
-                # output as binary data.
-                line = line.replace(b"\0", b"\\0")
-
-                # Convert the output of the process from a bytestring to a UTF-8 string, and replace
-                # any characters that cannot be decoded with the official Unicode replacement
-                # character, U+FFFD. The log messages of MongoDB processes are not always valid
-                # UTF-8 sequences. See SERVER-7506.
-                line = line.decode("utf-8", "replace")
-                self.__logger.log(self.__level, line.rstrip())
+                self.__logger.log(self.__level, _decode_output(line).rstrip())
 
         with self.__lock:
             self.__finished = True
@@ -85,3 +105,153 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
         # No need to pass a timeout to join() because the thread should already be done after
         # notifying us it has finished reading output from the pipe.
         LoggerPipe.__join(self)  # Tidy up the started thread.
+
+
+class _PumpedPipe(object):
+    """A pipe read by the OutputPump along with the partial line read from it so far."""
+
+    def __init__(self, logger, level, pipe_out):
+        """Initialize the _PumpedPipe."""
+        self.logger = logger
+        self.level = level
+        self.pipe_out = pipe_out
+        self.partial_line = b""
+
+        self._started = threading.Event()
+        self._finished = threading.Event()
+
+    def log_output(self, output):
+        """Log each of the complete lines in 'output' and keep the trailing partial line."""
+        (complete, newline, partial_line) = (self.partial_line + output).rpartition(b"\n")
+        self.partial_line = partial_line
+        if not newline:
+            return
+
+        # Decode all of the complete lines at once rather than one line at a time.
+        for line in _decode_output(complete).split("\n"):
+            self.logger.log(self.level, line.rstrip())
+
+    def finish(self):
+        """Log the last line if it didn't end with a newline and close the pipe."""
+        try:
+            if self.partial_line:
+                (partial_line, self.partial_line) = (self.partial_line, b"")
+                self.logger.log(self.level, _decode_output(partial_line).rstrip())
+        finally:
+            self.pipe_out.close()
+            self._finished.set()
+
+    def mark_started(self):
+        """Notify the waiters of wait_until_started()."""
+        self._started.set()
+
+    def wait_until_started(self):
+        """Wait until the OutputPump is reading from the pipe."""
+        self._started.wait()
+
+    def wait_until_finished(self):
+        """Wait until all of the output has been read from the pipe and logged."""
+        self._finished.wait()
+
+
+class OutputPump(threading.Thread):
+    """Reads the output of all subprocesses on a single thread and sends it to their loggers."""
+
+    # The number of bytes to read from a pipe each time it becomes readable.
+    _READ_SIZE = 64 * 1024
+
+    _INSTANCE = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    def __init__(self):
+        """Initialize the OutputPump and start its thread."""
+
+        threading.Thread.__init__(self, name="OutputPump")
+        # Main thread should not call join() when exiting
+        self.daemon = True
+
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending = []
+
+        # Writing to the wakeup pipe interrupts the select() call so pipes added by other threads
+        # are registered with the selector.
+        (self._wakeup_read_fd, self._wakeup_write_fd) = os.pipe()
+        os.set_blocking(self._wakeup_read_fd, False)
+        os.set_blocking(self._wakeup_write_fd, False)
+        self._selector.register(self._wakeup_read_fd, selectors.EVENT_READ, None)
+
+        self.start()
+
+    @classmethod
+    def get_instance(cls):
+        """Return the OutputPump shared by all subprocesses, starting it if needed."""
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is None:
+                cls._INSTANCE = cls()
+            return cls._INSTANCE
+
+    def add_pipe(self, logger, level, pipe_out):
+        """Start reading the output of 'pipe_out' and logging it to 'logger' at 'level'."""
+        pumped_pipe = _PumpedPipe(logger, level, pipe_out)
+        with self._lock:
+            self._pending.append(pumped_pipe)
+
+        try:
+            os.write(self._wakeup_write_fd, b"\0")
+        except BlockingIOError:
+            # The wakeup pipe is full, so the OutputPump thread is already going to wake up.
+            pass
+
+        return pumped_pipe
+
+    def run(self):
+        """Read from the pipes as they become readable and log their output."""
+        while True:
+            for (key, _) in self._selector.select():
+                if key.data is None:
+                    self._register_pending()
+                    continue
+
+                try:
+                    self._read(key.fileobj, key.data)
+                except Exception:  # pylint: disable=broad-except
+                    # Stop reading from a pipe whose output cannot be logged rather than letting
+                    # the exception stop the output of every other subprocess from being read.
+                    traceback.print_exc()
+                    if key.fileobj in self._selector.get_map():
+                        self._selector.unregister(key.fileobj)
+                    key.data.finish()
+
+    def _register_pending(self):
+        """Register the pipes added since the last time the OutputPump woke up."""
+        try:
+            while os.read(self._wakeup_read_fd, self._READ_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+
+        with self._lock:
+            (pending, self._pending) = (self._pending, [])
+
+        for pumped_pipe in pending:
+            fd = pumped_pipe.pipe_out.fileno()
+            os.set_blocking(fd, False)
+            self._selector.register(fd, selectors.EVENT_READ, pumped_pipe)
+            pumped_pipe.mark_started()
+
+    def _read(self, fd, pumped_pipe):
+        """Log the output available on 'fd' and stop polling it once the other end is closed."""
+        try:
+            output = os.read(fd, self._READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            output = b""
+
+        if output:
+            pumped_pipe.log_output(output)
+            return
+
+        self._selector.unregister(fd)
+        pumped_pipe.finish()
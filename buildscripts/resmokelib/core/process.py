@@ -5,9 +5,11 @@ processes are terminated.
 """
 
 import atexit
+import contextlib
 import logging
 import os
 import os.path
+import shutil
 import subprocess
 import sys
 import threading
@@ -31,6 +33,12 @@ from buildscripts.resmokelib.testing.fixtures import interface as fixture_interf
 #   (b) the pipe2() syscall isn't available, but the GIL isn't released during the
 #       _posixsubprocess.fork_exec() call or the _posixsubprocess.cloexec_pipe() call.
 # See https://bugs.python.org/issue7213 for more details.
+#
+# The lock is skipped when --processLauncher=concurrent or --processLauncher=posix_spawn is
+# specified.
+# Python creates file descriptors as non-inheritable (PEP 446) and subprocess.Popen() creates its
+# pipes atomically with the close-on-exec flag set, so concurrent spawns don't leak pipes into each
+# other.
 _POPEN_LOCK = threading.Lock()
 
 # Job objects are the only reliable way to ensure that processes are terminated on Windows.
@@ -68,6 +76,27 @@ if sys.platform == "win32":
         atexit.register(win32api.CloseHandle, _JOB_OBJECT)
 
 
+def _get_popen_lock():
+    """Return the context manager to hold while spawning a process."""
+
+    if _config.PROCESS_LAUNCHER in ("concurrent", "posix_spawn"):
+        return contextlib.nullcontext()
+    return _POPEN_LOCK
+
+
+def _find_executable(program, env):
+    """Return the path of 'program', searching the PATH of 'env' if 'program' isn't a path.
+
+    Return None if 'program' cannot be found so that subprocess.Popen() reports the error.
+    """
+
+    if os.path.dirname(program):
+        return program
+
+    path = shutil.which(program, path=env.get("PATH", os.defpath))
+    return os.path.abspath(path) if path is not None else None
+
+
 class Process(object):
     """Wrapper around subprocess.Popen class."""
 
@@ -115,10 +144,20 @@ class Process(object):
         # isn't supported on Windows when stdout and stderr are redirected.
         close_fds = (sys.platform != "win32")
 
-        with _POPEN_LOCK:
+        executable = None
+        if _config.PROCESS_LAUNCHER == "posix_spawn" and sys.platform != "win32":
+            # subprocess.Popen() only uses os.posix_spawn() when file descriptors aren't closed and
+            # the executable is given as a path. Otherwise, or when the working directory is
+            # changed, it falls back to fork() and exec(). Since Python creates file descriptors as
+            # non-inheritable, not closing them doesn't leak anything into the child process.
+            close_fds = False
+            executable = _find_executable(self.args[0], self.env)
+
+        with _get_popen_lock():
             self._process = subprocess.Popen(
                 self.args, bufsize=buffer_size, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                close_fds=close_fds, env=self.env, creationflags=creation_flags, cwd=self._cwd)
+                close_fds=close_fds, env=self.env, creationflags=creation_flags, cwd=self._cwd,
+                executable=executable)
             self.pid = self._process.pid
 
             if _config.UNDO_RECORDER_PATH is not None and ("mongod" in self.args[0]
@@ -134,8 +173,8 @@ class Process(object):
                 self._recorder = subprocess.Popen(recorder_args, bufsize=buffer_size, env=self.env,
                                                   creationflags=creation_flags)
 
-        self._stdout_pipe = pipe.LoggerPipe(self.logger, logging.INFO, self._process.stdout)
-        self._stderr_pipe = pipe.LoggerPipe(self.logger, logging.ERROR, self._process.stderr)
+        self._stdout_pipe = pipe.new_logger_pipe(self.logger, logging.INFO, self._process.stdout)
+        self._stderr_pipe = pipe.new_logger_pipe(self.logger, logging.ERROR, self._process.stderr)
 
         self._stdout_pipe.wait_until_started()
         self._stderr_pipe.wait_until_started()
@@ -7,3 +7,4 @@ from logging import Logger
 from buildscripts.resmokelib.logging import buildlogger
 from buildscripts.resmokelib.logging import flush
 from buildscripts.resmokelib.logging import loggers
+from buildscripts.resmokelib.logging import writer
@@ -1,11 +1,14 @@
 """Define handlers for communicating with a buildlogger server."""
 
+import collections
+import concurrent.futures
 import functools
 import json
 import os
 import threading
 
 import requests
+import requests.adapters
 
 from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib.logging import handlers
@@ -20,6 +23,10 @@ _BUILDLOGGER_CONFIG = os.getenv("BUILDLOGGER_CREDENTIALS", "mci.buildlogger")
 _SEND_AFTER_LINES = 2000
 _SEND_AFTER_SECS = 10
 
+# The number of batches of log lines a handler may have waiting to be sent before logging to it
+# blocks.
+_MAX_QUEUED_BATCHES = 4
+
 # Initialized by resmokelib.logging.loggers.configure_loggers()
 BUILDLOGGER_FALLBACK = None
 
@@ -38,6 +45,35 @@ def set_log_output_incomplete():
     _INCOMPLETE_LOG_OUTPUT.set()
 
 
+_UPLOADER_LOCK = threading.Lock()
+_UPLOADER = None
+
+_Uploader = collections.namedtuple("_Uploader", ["executor", "session"])
+
+
+def _get_uploader():
+    """Return the thread pool and HTTP session shared by the handlers for sending log lines.
+
+    Return None if the log lines are sent by the flush thread.
+    """
+    global _UPLOADER  # pylint: disable=global-statement
+    if not _config.BUILDLOGGER_UPLOAD_WORKERS:
+        return None
+
+    with _UPLOADER_LOCK:
+        if _UPLOADER is None:
+            num_workers = _config.BUILDLOGGER_UPLOAD_WORKERS
+            session = requests.Session()
+            # Allow a pooled connection to the server for each worker thread.
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=num_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_workers, thread_name_prefix="buildlogger_upload")
+            _UPLOADER = _Uploader(executor, session)
+        return _UPLOADER
+
+
 def _log_on_error(func):
     """Provide decorator that causes exceptions to be logged by the "buildlogger" Logger instance.
 
@@ -74,34 +110,55 @@ class _LogsSplitter(object):
             A list of list of log lines. Each item is a list is a list of log lines
             satisfying the size requirement.
         """
-        if not max_size:
-            return [log_lines]
+        return [lines for lines, _ in _LogsSplitter.split_and_encode_logs(log_lines, max_size)]
+
+    @staticmethod
+    def split_and_encode_logs(log_lines, max_size):  # noqa: D406,D407,D411,D413
+        """Split the log lines into batches like split_logs() and encode each batch as JSON.
 
-        def line_size(line):
-            """Compute the encoded JSON size of a log line as part of an array.
+        Each log line is only encoded once, both to measure its size and to build the JSON array.
 
-            2 is added to each string size to account for the array representation of the logs,
-            as each line is preceded by a '[' or a space and followed by a ',' or a ']'.
-            """
-            return len(json.dumps(line)) + 2
+        Args:
+            log_lines: A list of log lines.
+            max_size: The maximum size in bytes a batch of log lines can have in JSON.
+        Returns:
+            A list of tuples of a batch of log lines and its JSON encoding.
+        """
+        encoded_lines = [json.dumps(line) for line in log_lines]
+        if not max_size:
+            return [(log_lines, _LogsSplitter._encode_batch(encoded_lines))]
 
-        curr_logs = []
+        batches = []
+        start = 0
         curr_logs_size = 0
-        split_logs = []
-        for line in log_lines:
-            size = line_size(line)
+        for i, encoded_line in enumerate(encoded_lines):
+            # 2 is added to each string size to account for the array representation of the logs,
+            # as each line is preceded by a '[' or a space and followed by a ',' or a ']'.
+            size = len(encoded_line) + 2
             if curr_logs_size + size > max_size:
-                split_logs.append(curr_logs)
-                curr_logs = []
+                batches.append((log_lines[start:i],
+                                _LogsSplitter._encode_batch(encoded_lines[start:i])))
+                start = i
                 curr_logs_size = 0
-            curr_logs.append(line)
             curr_logs_size += size
-        split_logs.append(curr_logs)
-        return split_logs
+        batches.append((log_lines[start:], _LogsSplitter._encode_batch(encoded_lines[start:])))
+        return batches
+
+    @staticmethod
+    def _encode_batch(encoded_lines):
+        """Return the JSON array of the already encoded log lines."""
+        return "[" + ", ".join(encoded_lines) + "]"
 
 
 class _BaseBuildloggerHandler(handlers.BufferedHandler):
-    """Base class of the buildlogger handler for global logs and handler for test logs."""
+    """Base class of the buildlogger handler for global logs and handler for test logs.
+
+    When --buildloggerUploadWorkers is specified, flushing the handler queues the batches of log
+    lines to be sent by a thread pool shared with the other handlers rather than sending them from
+    the flush thread. A handler still sends its batches one at a time, in order.
+    """
+
+    # pylint: disable=too-many-instance-attributes
 
     def __init__(self, build_config, endpoint, capacity=_SEND_AFTER_LINES,
                  interval_secs=_SEND_AFTER_SECS):
@@ -109,9 +166,13 @@ class _BaseBuildloggerHandler(handlers.BufferedHandler):
 
         handlers.BufferedHandler.__init__(self, capacity, interval_secs)
 
+        self._uploader = _get_uploader()
+
         username = build_config["username"]
         password = build_config["password"]
-        self.http_handler = handlers.HTTPHandler(_config.BUILDLOGGER_URL, username, password)
+        self.http_handler = handlers.HTTPHandler(
+            _config.BUILDLOGGER_URL, username, password,
+            session=self._uploader.session if self._uploader is not None else None)
 
         self.endpoint = endpoint
         self.retry_buffer = []
@@ -121,6 +182,25 @@ class _BaseBuildloggerHandler(handlers.BufferedHandler):
         # side effects.
         self.max_size = 33 * 1024 * 1024
 
+        # self.__send_cond prohibits concurrent access to 'self.__send_queue' and
+        # 'self.__sending'. 'self.__sending' is true while a thread of the uploader is sending the
+        # batches in 'self.__send_queue'.
+        self.__send_cond = threading.Condition()
+        self.__send_queue = collections.deque()
+        self.__sending = False
+
+    def emit(self, record):
+        """Emit a record, first waiting while too many batches are queued to be sent.
+
+        The wait happens on the thread logging the record rather than on the flush thread shared by
+        every handler, so that a handler whose output is sent slowly doesn't delay the others.
+        """
+        if self._uploader is not None:
+            with self.__send_cond:
+                while self.__sending and len(self.__send_queue) >= _MAX_QUEUED_BATCHES:
+                    self.__send_cond.wait()
+        handlers.BufferedHandler.emit(self, record)
+
     def process_record(self, record):
         """Return a tuple of the time the log record was created, and the message.
 
@@ -145,22 +225,23 @@ class _BaseBuildloggerHandler(handlers.BufferedHandler):
             The number of log lines that have been successfully sent.
         """
         lines_sent = 0
-        for chunk in _LogsSplitter.split_logs(log_lines, self.max_size):
-            chunk_lines_sent = self.__append_logs_chunk(chunk)
+        for chunk, json_data in _LogsSplitter.split_and_encode_logs(log_lines, self.max_size):
+            chunk_lines_sent = self.__append_logs_chunk(chunk, json_data)
             lines_sent += chunk_lines_sent
             if chunk_lines_sent < len(chunk):
                 # Not all lines have been sent. We stop here.
                 break
         return lines_sent
 
-    def __append_logs_chunk(self, log_lines_chunk):  # noqa: D406,D407,D413
+    def __append_logs_chunk(self, log_lines_chunk, json_data):  # noqa: D406,D407,D413
         """Send log lines chunk, handle 413 Request Entity Too Large errors & retry, if necessary.
 
         Returns:
             The number of log lines that have been successfully sent.
         """
         try:
-            self.post(self.endpoint, data=log_lines_chunk)
+            self.http_handler.post_json(self.endpoint, json_data,
+                                        compress=_config.BUILDLOGGER_GZIP)
             return len(log_lines_chunk)
         except requests.HTTPError as err:
             # Handle the "Request Entity Too Large" error, set the max size and retry.
@@ -192,24 +273,96 @@ class _BaseBuildloggerHandler(handlers.BufferedHandler):
         called.
         """
 
+        if self._uploader is not None:
+            self.__queue_batches(_LogsSplitter.split_and_encode_logs(buf, self.max_size))
+            return
+
         self.retry_buffer.extend(buf)
 
         nb_sent = self._append_logs(self.retry_buffer)
         if nb_sent:
             self.retry_buffer = self.retry_buffer[nb_sent:]
         if close_called and self.retry_buffer:
-            # The request to the logkeeper returned an error. We discard the log output rather than
-            # writing the messages to the fallback logkeeper to avoid putting additional pressure on
-            # the Evergreen database.
-            BUILDLOGGER_FALLBACK.warning(
-                "Failed to flush all log output (%d messages) to logkeeper.",
-                len(self.retry_buffer))
+            self.__discard_unsent_logs(len(self.retry_buffer))
+            self.retry_buffer = []
 
-            # We set a flag to indicate that we failed to flush all log output to logkeeper so
-            # resmoke.py can exit with a special return code.
-            set_log_output_incomplete()
+    def __queue_batches(self, batches):
+        """Queue 'batches' to be sent by the uploader.
 
-            self.retry_buffer = []
+        This never blocks the flush thread. emit() blocks instead while too many batches are queued,
+        so that the log output doesn't accumulate in memory when the server is slower than the
+        tests.
+        """
+        with self.__send_cond:
+            self.__send_queue.extend(batches)
+            # Batches left in the queue after an error are retried along with the new batches.
+            self.__start_sending()
+
+    def __start_sending(self):
+        """Start sending the queued batches if they aren't being sent already."""
+        if self.__sending or not self.__send_queue:
+            return
+        self.__sending = True
+        self._uploader.executor.submit(self.__send_queued_batches)
+
+    def __send_queued_batches(self):
+        """Send the queued batches in order until they are all sent or one fails to be sent."""
+        while True:
+            with self.__send_cond:
+                if not self.__send_queue:
+                    self.__sending = False
+                    self.__send_cond.notify_all()
+                    return
+                # Only this thread removes batches from the queue while it is sending.
+                chunk, json_data = self.__send_queue[0]
+                if self.max_size and len(json_data) > self.max_size and len(chunk) > 1:
+                    # The batch was queued before the server lowered the max size.
+                    self.__send_queue.popleft()
+                    self.__send_queue.extendleft(
+                        reversed(_LogsSplitter.split_and_encode_logs(chunk, self.max_size)))
+                    continue
+
+            nb_sent = self.__append_logs_chunk(chunk, json_data)
+
+            with self.__send_cond:
+                self.__send_queue.popleft()
+                if nb_sent < len(chunk):
+                    self.__send_queue.extendleft(
+                        reversed(_LogsSplitter.split_and_encode_logs(chunk[nb_sent:],
+                                                                     self.max_size)))
+                    self.__sending = False
+                    self.__send_cond.notify_all()
+                    return
+                self.__send_cond.notify_all()
+
+    def __discard_unsent_logs(self, num_lines):
+        """Log and record that 'num_lines' log lines couldn't be sent."""
+        # The request to the logkeeper returned an error. We discard the log output rather than
+        # writing the messages to the fallback logkeeper to avoid putting additional pressure on
+        # the Evergreen database.
+        BUILDLOGGER_FALLBACK.warning("Failed to flush all log output (%d messages) to logkeeper.",
+                                     num_lines)
+
+        # We set a flag to indicate that we failed to flush all log output to logkeeper so
+        # resmoke.py can exit with a special return code.
+        set_log_output_incomplete()
+
+    def close(self):
+        """Flush the buffer and wait for the uploader to send every queued batch."""
+
+        handlers.BufferedHandler.close(self)
+
+        if self._uploader is None:
+            return
+
+        with self.__send_cond:
+            # Retry the batches left in the queue after an error one last time.
+            self.__start_sending()
+            while self.__sending:
+                self.__send_cond.wait()
+            if self.__send_queue:
+                self.__discard_unsent_logs(sum(len(chunk) for chunk, _ in self.__send_queue))
+                self.__send_queue.clear()
 
 
 class BuildloggerTestHandler(_BaseBuildloggerHandler):
@@ -1,5 +1,6 @@
 """Additional handlers that are used as the base classes of the buildlogger handler."""
 
+import gzip
 import json
 import logging
 import threading
@@ -22,6 +23,10 @@ from buildscripts.resmokelib import utils
 
 _TIMEOUT_SECS = 65
 
+# The gzip level used for request bodies. Higher levels are much slower for little gain on log
+# output.
+_GZIP_COMPRESS_LEVEL = 6
+
 
 class BufferedHandler(logging.Handler):
     """A handler class that buffers logging records in memory.
@@ -164,12 +169,16 @@ class BufferedHandler(logging.Handler):
 class HTTPHandler(object):
     """A class which sends data to a web server using POST requests."""
 
-    def __init__(self, url_root, username, password, should_retry=False):
-        """Initialize the handler with the necessary authentication credentials."""
+    def __init__(  # pylint: disable=too-many-arguments
+            self, url_root, username, password, should_retry=False, session=None):
+        """Initialize the handler with the necessary authentication credentials.
+
+        If 'session' is specified, then its connection pool is used to send the requests.
+        """
 
         self.auth_handler = requests.auth.HTTPBasicAuth(username, password)
 
-        self.session = requests.Session()
+        self.session = session if session is not None else requests.Session()
 
         if should_retry:
             retry_status = [500, 502, 503, 504]  # Retry for these statuses.
@@ -195,10 +204,26 @@ class HTTPHandler(object):
         """
 
         data = utils.default_if_none(data, [])
-        data = json.dumps(data)
+        return self.post_json(endpoint, json.dumps(data), headers=headers,
+                              timeout_secs=timeout_secs)
+
+    def post_json(  # pylint: disable=too-many-arguments
+            self, endpoint, json_data, headers=None, timeout_secs=_TIMEOUT_SECS, compress=False):
+        """Send a POST request to the specified endpoint with the already encoded 'json_data'.
+
+        If 'compress' is true, then the request body is sent with gzip content-encoding.
+
+        Return the response, either as a string or a JSON object based
+        on the content type.
+        """
+
+        data = json_data.encode("utf-8")
 
         headers = utils.default_if_none(headers, {})
         headers["Content-Type"] = "application/json; charset=utf-8"
+        if compress:
+            data = gzip.compress(data, compresslevel=_GZIP_COMPRESS_LEVEL)
+            headers["Content-Encoding"] = "gzip"
 
         url = self._make_url(endpoint)
 
@@ -10,6 +10,7 @@ from buildscripts.resmokelib import errors
 from buildscripts.resmokelib.core import redirect as redirect_lib
 from buildscripts.resmokelib.logging import buildlogger
 from buildscripts.resmokelib.logging import formatters
+from buildscripts.resmokelib.logging import writer
 
 _DEFAULT_FORMAT = "[%(name)s] %(message)s"
 
@@ -93,6 +94,11 @@ def configure_loggers():
     global ROOT_EXECUTOR_LOGGER  # pylint: disable=global-statement
     ROOT_EXECUTOR_LOGGER = new_root_logger(EXECUTOR_LOGGER_NAME)
 
+    if config.ASYNC_LOGGING:
+        # All of the root loggers share the writer thread so that their output to stdout is still
+        # written in the order it was logged.
+        writer.start_thread([ROOT_TESTS_LOGGER, ROOT_FIXTURE_LOGGER, ROOT_EXECUTOR_LOGGER])
+
 
 def new_root_logger(name):
     """
@@ -165,6 +171,11 @@ def new_fixture_logger(fixture_class, job_num):
     return logger
 
 
+def register_fixture_logger(job_num, logger):
+    """Make an existing fixture logger the parent of loggers subsequently created for the job."""
+    _FIXTURE_LOGGER_REGISTRY[job_num] = logger
+
+
 def new_fixture_node_logger(fixture_class, job_num, node_name):
     """Create a logger for a particular element in a multi-process fixture."""
     name = "%s:job%d:%s" % (fixture_class, job_num, node_name)
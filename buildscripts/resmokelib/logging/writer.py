@@ -0,0 +1,279 @@
+"""Manage a thread responsible for formatting and writing the records of the root loggers.
+
+When the thread is running, the handlers of the root loggers are replaced by a handler that only
+enqueues the records. The records are then formatted and written in batches by the writer thread so
+that slow writes to stdout or to log files don't hold up the threads reading the output of the
+subprocesses.
+"""
+
+import copy
+import logging
+import queue
+import threading
+import traceback
+
+_WRITER_THREAD_LOCK = threading.Lock()
+_WRITER_THREAD = None
+
+# Formats the exceptions of the records before they are queued.
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+def start_thread(root_loggers, max_queued_records=100000):
+    """Start the writer thread and have it write the records of 'root_loggers'."""
+
+    global _WRITER_THREAD  # pylint: disable=global-statement
+    with _WRITER_THREAD_LOCK:
+        if _WRITER_THREAD is not None:
+            raise ValueError("WriterThread has already been started")
+
+        _WRITER_THREAD = _WriterThread(root_loggers, max_queued_records)
+        _WRITER_THREAD.start()
+
+
+def stop_thread():
+    """Write the queued records, restore the handlers of the root loggers, and stop the thread.
+
+    Return the number of records which had to wait for space in the queue because the writer thread
+    had fallen behind.
+    """
+
+    global _WRITER_THREAD  # pylint: disable=global-statement
+    with _WRITER_THREAD_LOCK:
+        if _WRITER_THREAD is None:
+            raise ValueError("WriterThread hasn't been started")
+        writer_thread = _WRITER_THREAD
+        _WRITER_THREAD = None
+
+    writer_thread.signal_shutdown()
+    writer_thread.join()
+    return writer_thread.num_backlogged_records
+
+
+def is_running():
+    """Return true if the writer thread has been started and not stopped."""
+
+    with _WRITER_THREAD_LOCK:
+        return _WRITER_THREAD is not None
+
+
+class _QueueHandler(logging.Handler):
+    """A handler that passes records to the writer thread along with the handlers to write them."""
+
+    def __init__(self, writer_thread, handlers):
+        """Initialize the handler."""
+
+        logging.Handler.__init__(self)
+        self.writer_thread = writer_thread
+        self.handlers = tuple(handlers)
+
+    # We override createLock(), acquire(), and release() to be no-ops since the queue serializes
+    # accesses from concurrent callers of emit().
+    def createLock(self):
+        """Create lock."""
+        pass
+
+    def acquire(self):
+        """Acquire."""
+        pass
+
+    def release(self):
+        """Release."""
+        pass
+
+    def emit(self, record):
+        """Add the record to the queue of the writer thread."""
+
+        try:
+            prepared_record = self.prepare(record)
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+            return
+        self.writer_thread.enqueue(self.handlers, prepared_record)
+
+    @staticmethod
+    def prepare(record):
+        """Return a copy of 'record' with its message and exception already formatted.
+
+        As with logging.handlers.QueueHandler.prepare(), this is done on the logging thread since
+        the arguments of the record may have changed by the time the writer thread formats it.
+        """
+
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _WriterThread(threading.Thread):
+    """Asynchronously format and write logging records."""
+
+    # The maximum number of records to write at once.
+    _BATCH_SIZE = 1000
+
+    # Queued in place of a record to signal the writer thread to exit.
+    _SHUTDOWN = object()
+
+    # The number of seconds to wait for the logging threads that were enqueuing a record when
+    # shutdown started.
+    _POLL_SECS = 0.1
+
+    def __init__(self, root_loggers, max_queued_records):
+        """Initialize the writer thread."""
+
+        threading.Thread.__init__(self, name="WriterThread")
+        # Do not wait to write the logs if interrupted by the user.
+        self.daemon = True
+
+        self.__queue = queue.Queue(maxsize=max_queued_records)
+        self.__lock = threading.Lock()
+        self.__num_backlogged_records = 0
+        # Records are written directly by the logging threads once shutdown has started. The
+        # writer thread keeps draining the queue until the records of the threads that were already
+        # enqueuing at the time have been written.
+        self.__shutting_down = False
+        self.__num_enqueuing = 0
+
+        self.__root_loggers = []
+        for logger in root_loggers:
+            handlers = list(logger.handlers)
+            for handler in handlers:
+                logger.removeHandler(handler)
+            queue_handler = _QueueHandler(self, handlers)
+            logger.addHandler(queue_handler)
+            self.__root_loggers.append((logger, queue_handler))
+
+    @property
+    def num_backlogged_records(self):
+        """Return the number of records that had to wait for space in the queue."""
+
+        with self.__lock:
+            return self.__num_backlogged_records
+
+    def enqueue(self, handlers, record):
+        """Add 'record' to the queue, waiting for space if the writer thread has fallen behind.
+
+        The record is written on the calling thread instead once shutdown has started.
+        """
+
+        with self.__lock:
+            if self.__shutting_down:
+                write_directly = True
+            else:
+                write_directly = False
+                self.__num_enqueuing += 1
+
+        if write_directly:
+            self._write([(handlers, record)])
+            return
+
+        try:
+            try:
+                self.__queue.put_nowait((handlers, record))
+            except queue.Full:
+                with self.__lock:
+                    self.__num_backlogged_records += 1
+                self.__queue.put((handlers, record))
+        finally:
+            with self.__lock:
+                self.__num_enqueuing -= 1
+
+    def signal_shutdown(self):
+        """Indicate to the writer thread that it should exit once it has written the queue.
+
+        The handlers of the root loggers are restored first so that the records logged from then on
+        are written directly.
+        """
+
+        self._restore_handlers()
+        with self.__lock:
+            self.__shutting_down = True
+        self.__queue.put(_WriterThread._SHUTDOWN)
+
+    def run(self):
+        """Continuously write batches of records until signaled to shut down."""
+
+        try:
+            while True:
+                batch = self._get_batch(block=True)
+                if _WriterThread._SHUTDOWN in batch:
+                    batch.remove(_WriterThread._SHUTDOWN)
+                    self._write(batch)
+                    break
+
+                self._write(batch)
+
+            # Write the records of the threads that were enqueuing when shutdown started, including
+            # any that were waiting for space in the queue.
+            while True:
+                with self.__lock:
+                    done = self.__num_enqueuing == 0
+                batch = self._get_batch(block=not done)
+                if not batch and done:
+                    break
+                self._write(batch)
+        finally:
+            self._restore_handlers()
+
+    def _get_batch(self, block):
+        """Return up to _BATCH_SIZE items from the queue.
+
+        If 'block' is true, then wait for the first item for up to _POLL_SECS, or indefinitely
+        before shutdown has started.
+        """
+
+        batch = []
+        try:
+            if block:
+                with self.__lock:
+                    timeout = _WriterThread._POLL_SECS if self.__shutting_down else None
+                batch.append(self.__queue.get(timeout=timeout))
+            while len(batch) < _WriterThread._BATCH_SIZE:
+                batch.append(self.__queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _restore_handlers(self):
+        """Have the root loggers write their records directly again."""
+
+        for (logger, queue_handler) in self.__root_loggers:
+            logger.removeHandler(queue_handler)
+            for handler in queue_handler.handlers:
+                logger.addHandler(handler)
+
+    @staticmethod
+    def _write(batch):
+        """Format the records in 'batch' and write them with one write() call per stream."""
+
+        # Records are grouped by the stream they are written to rather than by their handler so
+        # that the records of different root loggers sharing a stream stay in order.
+        stream_output = {}
+        for (handlers, record) in batch:
+            for handler in handlers:
+                if record.levelno < handler.level or not handler.filter(record):
+                    continue
+
+                if not isinstance(handler, logging.StreamHandler):
+                    handler.handle(record)
+                    continue
+
+                try:
+                    text = handler.format(record) + handler.terminator
+                except Exception:  # pylint: disable=broad-except
+                    handler.handleError(record)
+                    continue
+                stream_output.setdefault(handler.stream, []).append(text)
+
+        for (stream, output) in stream_output.items():
+            try:
+                stream.write("".join(output))
+                stream.flush()
+            except Exception:  # pylint: disable=broad-except
+                # Mirror logging.Handler.handleError() and report the error without raising so
+                # the remaining streams are still written.
+                traceback.print_exc()
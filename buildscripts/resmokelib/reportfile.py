@@ -1,5 +1,6 @@
 """Manage interactions with the report.json file."""
 
+import heapq
 import json
 
 from buildscripts.resmokelib import config
@@ -12,6 +13,10 @@ def write(suites):
     if config.REPORT_FILE is None:
         return
 
+    if config.REPORT_FORMAT == "jsonl":
+        # The results were already appended to the report file as the tests finished.
+        return
+
     reports = []
     for suite in suites:
         reports.extend(suite.get_reports())
@@ -19,3 +24,120 @@ def write(suites):
     combined_report_dict = _report.TestReport.combine(*reports).as_dict()
     with open(config.REPORT_FILE, "w") as fp:
         json.dump(combined_report_dict, fp)
+
+
+def _start_time(result):
+    return result["start"]
+
+
+def _read_report_json(pathname):
+    """Return the results of the report.json file 'pathname'.
+
+    None is returned if 'pathname' was written with --reportFormat=jsonl instead.
+    """
+
+    with open(pathname) as fp:
+        first_line = fp.readline()
+        if not first_line.strip():
+            return []
+
+        try:
+            first_result = json.loads(first_line)
+        except ValueError:
+            if not first_line.endswith("\n"):
+                # resmoke.py may have been killed partway through appending the first result.
+                return []
+            # The report.json file may have been written over multiple lines.
+            fp.seek(0)
+            first_result = json.load(fp)
+
+    if "results" in first_result:
+        return first_result["results"]
+    return None
+
+
+def _read_json_lines(pathname):
+    """Yield a (job number, result) pair for each line of a --reportFormat=jsonl file."""
+
+    with open(pathname) as fp:
+        for line in fp:
+            if not line.endswith("\n"):
+                # resmoke.py may have been killed partway through appending a result.
+                break
+            if line.strip():
+                result = json.loads(line)
+                yield (result.pop("job", None), result)
+
+
+def _read_job_results(pathname, job_num):
+    """Yield the results of the tests run by the job 'job_num' in the file 'pathname'."""
+
+    for (result_job_num, result) in _read_json_lines(pathname):
+        if result_job_num == job_num:
+            yield result
+
+
+def read_results(pathname):
+    """Return an iterator over the test results in the report file 'pathname'.
+
+    The file is either a report.json file, whose results are sorted by their start time, or a file
+    written with --reportFormat=jsonl, whose results are read one line at a time in the order they
+    were written.
+    """
+
+    results = _read_report_json(pathname)
+    if results is not None:
+        return iter(sorted(results, key=_start_time))
+    return (result for (_, result) in _read_json_lines(pathname))
+
+
+def _read_sorted_runs(pathname):
+    """Return a list of iterators over the test results in 'pathname', each sorted by start time.
+
+    A job runs one test at a time and its results are written in the order its tests started, so a
+    file written with --reportFormat=jsonl is read as one run per job, without sorting it. A
+    report.json file is a single JSON document and is sorted in memory.
+    """
+
+    results = _read_report_json(pathname)
+    if results is not None:
+        return [iter(sorted(results, key=_start_time))]
+
+    job_nums = []
+    for (job_num, _) in _read_json_lines(pathname):
+        if job_num not in job_nums:
+            job_nums.append(job_num)
+    return [_read_job_results(pathname, job_num) for job_num in job_nums]
+
+
+def merge_results(pathnames):
+    """Yield the test results of every report file in 'pathnames', merged by their start time.
+
+    The files written with --reportFormat=jsonl are read lazily, so only one result of each job is
+    held in memory at a time.
+    """
+
+    runs = []
+    for pathname in pathnames:
+        runs.extend(_read_sorted_runs(pathname))
+    return heapq.merge(*runs, key=_start_time)
+
+
+def write_results(results, fp):
+    """Write 'results' to 'fp' as a report.json file and return the number of failed tests.
+
+    Failed tests are counted with report.is_failure(), as resmoke.py counts them.
+
+    The results are written one at a time rather than being collected into a dictionary first.
+    """
+
+    num_failures = 0
+    fp.write('{"results": [')
+    for (i, result) in enumerate(results):
+        if i > 0:
+            fp.write(", ")
+        json.dump(result, fp)
+        if _report.is_failure(result):
+            num_failures += 1
+    fp.write('], "failures": {:d}}}'.format(num_failures))
+    return num_failures
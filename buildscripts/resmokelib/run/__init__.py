@@ -51,6 +51,8 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         self._exec_logger = None
         self._resmoke_logger = None
         self._archive = None
+        self._fixture_pool = None
+        self._report_stream_writer = None
         self._jasper_server = None
         self._interrupted = False
         self._exit_code = 0
@@ -62,6 +64,13 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         self._resmoke_logger = logging.loggers.new_resmoke_logger()
 
     def _exit_logging(self):
+        if logging.writer.is_running():
+            num_backlogged_records = logging.writer.stop_thread()
+            if num_backlogged_records:
+                self._resmoke_logger.info(
+                    "%d log records waited for the background log writer to catch up.",
+                    num_backlogged_records)
+
         if self._interrupted:
             # We want to exit as quickly as possible when interrupted by a user and therefore don't
             # bother waiting for all log output to be flushed to logkeeper.
@@ -177,6 +186,8 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         try:
             suites = self._get_suites()
             self._setup_archival()
+            self._setup_fixture_pool()
+            self._setup_report_stream()
             if config.SPAWN_USING == "jasper":
                 self._setup_jasper()
             self._setup_signal_handler(suites)
@@ -193,9 +204,11 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
             exit_code = max(suite.return_code for suite in suites)
             self.exit(exit_code)
         finally:
+            self._exit_fixture_pool()
             if config.SPAWN_USING == "jasper":
                 self._exit_jasper()
             self._exit_archival()
+            self._exit_report_stream()
             if suites:
                 reportfile.write(suites)
 
@@ -230,7 +243,9 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         executor_config = suite.get_executor_config()
         try:
             executor = testing.executor.TestSuiteExecutor(
-                self._exec_logger, suite, archive_instance=self._archive, **executor_config)
+                self._exec_logger, suite, archive_instance=self._archive,
+                fixture_pool=self._fixture_pool, report_stream_writer=self._report_stream_writer,
+                **executor_config)
             executor.run()
         except (errors.UserInterrupt, errors.LoggerRuntimeConfigError) as err:
             self._exec_logger.error("Encountered an error when running %ss of suite %s: %s",
@@ -289,15 +304,47 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
     def _setup_archival(self):
         """Set up the archival feature if enabled in the cli options."""
         if config.ARCHIVE_FILE:
-            self._archive = utils.archival.Archival(
+            archival_class = utils.archival.Archival
+            if config.ARCHIVE_FORMAT == "dedup":
+                archival_class = utils.dedup_archival.DedupArchival
+            s3_client = None
+            if config.ARCHIVE_LOCAL_DIR:
+                s3_client = utils.archival.LocalDirectoryClient(config.ARCHIVE_LOCAL_DIR)
+            self._archive = archival_class(
                 archival_json_file=config.ARCHIVE_FILE, limit_size_mb=config.ARCHIVE_LIMIT_MB,
-                limit_files=config.ARCHIVE_LIMIT_TESTS, logger=self._exec_logger)
+                limit_files=config.ARCHIVE_LIMIT_TESTS, logger=self._exec_logger,
+                s3_client=s3_client, compression_threads=config.ARCHIVE_COMPRESSION_THREADS,
+                upload_workers=config.ARCHIVE_UPLOAD_WORKERS)
 
     def _exit_archival(self):
         """Finish up archival tasks before exit if enabled in the cli options."""
         if self._archive and not self._interrupted:
             self._archive.exit()
 
+    def _setup_fixture_pool(self):
+        """Set up the pool of warm fixtures if enabled in the cli options."""
+        if config.REUSE_FIXTURES:
+            self._fixture_pool = testing.fixture_pool.FixturePool(self._exec_logger)
+
+    def _exit_fixture_pool(self):
+        """Tear down any fixtures still kept warm by the fixture pool."""
+        if self._fixture_pool and not self._fixture_pool.teardown_all():
+            self._exec_logger.error("Failed to tear down all of the warm fixtures")
+
+    def _setup_report_stream(self):
+        """Open the report file for appending the results of tests as they finish if enabled."""
+        if config.REPORT_FILE is not None and config.REPORT_FORMAT == "jsonl":
+            self._report_stream_writer = testing.report.ReportStreamWriter(config.REPORT_FILE)
+
+    def _exit_report_stream(self):
+        """Close the report file the results of tests were appended to."""
+        if self._report_stream_writer is not None:
+            self._report_stream_writer.close()
+            self._exec_logger.info("Wrote %d test results with %d failures to %s",
+                                   self._report_stream_writer.num_results,
+                                   self._report_stream_writer.num_failures,
+                                   self._report_stream_writer.pathname)
+
     # pylint: disable=too-many-instance-attributes,too-many-statements,too-many-locals
     def _get_jasper_reqs(self):
         """Ensure that we have all requirements for running jasper."""
@@ -612,6 +659,32 @@ class RunPlugin(PluginInterface):
                   " spawned by resmoke.py or the tests themselves. Each fixture and Job"
                   " allocates a contiguous range of ports."))
 
+        parser.add_argument(
+            "--portAllocation", dest="port_allocation", choices=("deterministic", "dynamic"),
+            metavar="MODE",
+            help=("Controls how ports are allocated. 'deterministic' gives each Job a fixed range"
+                  " of ports starting at --basePort, which limits the number of Jobs. 'dynamic'"
+                  " leases ports that are not in use from --basePort up to the ports the kernel"
+                  " assigns to outgoing connections to whichever Job needs them, and releases"
+                  " them once the test or fixture using them finishes. Defaults to"
+                  " 'deterministic'."))
+
+        parser.add_argument(
+            "--allowEphemeralPorts", dest="allow_ephemeral_ports", action="store_true",
+            help=("With --portAllocation=dynamic, leases the ports the kernel assigns to outgoing"
+                  " connections once there aren't enough free ports below them. A mongod or"
+                  " mongos may then fail to start if the kernel hands out its port to a"
+                  " connection first."))
+
+        parser.add_argument(
+            "--reuseFixtures", dest="reuse_fixtures", action="store_true",
+            help=("Keeps each job's fixture running after a suite finishes and reuses it for"
+                  " later suites or repetitions with the same fixture configuration. Only"
+                  " applies to suites that set 'reuse_fixture' in their executor"
+                  " configuration. The data of a reused fixture is wiped by dropping all"
+                  " non-internal databases; users, roles, failpoints, server parameters and"
+                  " config.settings are left as the previous suite left them."))
+
         parser.add_argument("--continueOnFailure", action="store_true", dest="continue_on_failure",
                             help="Executes all tests in all suites, even if some of them fail.")
 
@@ -664,6 +737,12 @@ class RunPlugin(PluginInterface):
             help=("The number of Job instances to use. Each instance will receive its"
                   " own MongoDB deployment to dispatch tests to."))
 
+        parser.add_argument(
+            "--adaptiveJobs", action="store_true", dest="adaptive_jobs",
+            help=("Adjusts the number of Job instances running tests while the suite runs based on"
+                  " the CPU, memory, and load average of the host and on the memory used by the"
+                  " fixtures. The number of Job instances never exceeds --jobs."))
+
         parser.set_defaults(logger_file="console")
 
         parser.add_argument("--mongo", dest="mongo_executable", metavar="PATH",
@@ -765,6 +844,32 @@ class RunPlugin(PluginInterface):
                   " Defaults to auto when not supplied. auto enables randomization in"
                   " all cases except when the number of jobs requested is 1."))
 
+        parser.add_argument(
+            "--scheduleMode", action="store", dest="schedule_mode",
+            choices=("fifo", "longest_first"), metavar="MODE",
+            help=("Controls the order in which tests are dispatched to the Job instances."
+                  " 'fifo' runs the tests in suite order. 'longest_first' runs the tests with"
+                  " the longest historical runtime first to balance the work across Job"
+                  " instances. Defaults to 'fifo'."))
+
+        parser.add_argument(
+            "--jstestTagsCacheFile", dest="jstest_tags_cache_file", metavar="PATH",
+            help=("A JSON file where the tags of JS test files are cached, keyed by their path,"
+                  " size, and modification time. Only the test files that changed since the file"
+                  " was last written are parsed again."))
+
+        parser.add_argument(
+            "--testMembershipIndexFile", dest="test_membership_index_file", metavar="PATH",
+            help=("A JSON file where the suites that run each test are saved. The saved suites are"
+                  " reused by later invocations for as long as none of the suite configurations"
+                  " or test files change."))
+
+        parser.add_argument(
+            "--testRuntimesFile", dest="test_runtimes_file", metavar="PATH",
+            help=("A JSON file where the runtime of each test is recorded and read from"
+                  " when --scheduleMode=longest_first is specified. Defaults to"
+                  " '{}'.".format(config.DEFAULT_TEST_RUNTIMES_FILE)))
+
         parser.add_argument(
             "--majorityReadConcern", action="store", dest="majority_read_concern", choices=("on",
                                                                                             "off"),
@@ -826,6 +931,36 @@ class RunPlugin(PluginInterface):
             metavar="ON|OFF", help="Enable or disable linear chaining for tests using "
             "ReplicaSetFixture.")
 
+        parser.add_argument(
+            "--parallelFixtureSetup", action="store", dest="parallel_fixture_setup",
+            choices=("on", "off"), metavar="ON|OFF",
+            help=("Start the processes of ReplicaSetFixture and ShardedClusterFixture"
+                  " concurrently and wait for them to be ready in parallel. Defaults to off."))
+
+        parser.add_argument(
+            "--processLauncher", action="store", dest="process_launcher",
+            choices=("locked", "concurrent", "posix_spawn"), metavar="MODE",
+            help=("Controls how the mongod, mongos, and mongo shell processes are spawned. 'locked'"
+                  " spawns one process at a time. 'concurrent' lets the Job instances spawn"
+                  " processes at the same time. 'posix_spawn' is like 'concurrent' but uses"
+                  " os.posix_spawn() where the platform supports it rather than copying the"
+                  " resmoke.py process with fork(). Defaults to 'locked'."))
+
+        parser.add_argument(
+            "--pythonConsistencyChecks", action="store_true", dest="python_consistency_checks",
+            help=("Runs the CheckReplDBHash, CheckReplOplogs, and ValidateCollections hooks with"
+                  " pymongo connections that are kept open across tests rather than by spawning a"
+                  " mongo shell after every test. The mongo shell is still used when the hook sets"
+                  " shell options that the Python checks don't support or the fixture requires"
+                  " authentication."))
+
+        parser.add_argument(
+            "--incrementalDBHash", type=int, dest="incremental_dbhash", metavar="N",
+            help=("With --pythonConsistencyChecks, makes the CheckReplDBHash hook rehash only the"
+                  " collections written since its previous check, as recorded in the oplog of the"
+                  " primary. Every collection is still rehashed on every Nth check, after a"
+                  " failover, and when the oplog has rolled over."))
+
         parser.add_argument(
             "--backupOnRestartDir", action="store", type=str, dest="backup_on_restart_dir",
             metavar="DIRECTORY", help=
@@ -848,6 +983,12 @@ class RunPlugin(PluginInterface):
             "Have resmoke redirect all output to FILE. Additionally, stdout will contain lines that typically indicate that the test is making progress, or an error has happened. If `mrlog` is in the path it will be used. `tee` and `egrep` must be in the path."
         )
 
+        parser.add_argument(
+            "--asyncLogging", action="store_true", dest="async_logging",
+            help=("Formats and writes the log output of resmoke.py, the fixtures, and the tests on"
+                  " a background thread rather than on the threads reading the output of the"
+                  " processes. The log output is batched into larger writes."))
+
         internal_options = parser.add_argument_group(
             title=_INTERNAL_OPTIONS_TITLE,
             description=("Internal options for advanced users and resmoke developers."
@@ -892,6 +1033,14 @@ class RunPlugin(PluginInterface):
             "--reportFile", dest="report_file", metavar="REPORT",
             help="Writes a JSON file with test status and timing information.")
 
+        internal_options.add_argument(
+            "--reportFormat", dest="report_format", choices=("json", "jsonl"), metavar="FORMAT",
+            help=("Controls how the --reportFile is written. If 'json', then the report of every"
+                  " test is written once all of the suites have finished. If 'jsonl', then the"
+                  " results of the tests are appended to it as JSON lines as they finish, and"
+                  " buildscripts/combine_reports.py converts it into a JSON report. Defaults to"
+                  " 'json'."))
+
         internal_options.add_argument(
             "--staggerJobs", action="store", dest="stagger_jobs", choices=("on", "off"),
             metavar="ON|OFF", help=("Enables or disables the stagger of launching resmoke jobs."
@@ -902,6 +1051,19 @@ class RunPlugin(PluginInterface):
                 "Options used to propagate information about the Evergreen task running this"
                 " script."))
 
+        evergreen_options.add_argument(
+            "--archiveCompressionThreads", type=int, dest="archive_compression_threads",
+            metavar="N", help=("Sets the number of threads gzipping each archive of data files"
+                               " while it is created. Defaults to 4."))
+
+        evergreen_options.add_argument(
+            "--archiveFormat", dest="archive_format", choices=("tgz", "dedup"),
+            metavar="FORMAT",
+            help=("Sets how data files are archived. 'tgz' uploads a tar/gzip of the data files of"
+                  " each failure. 'dedup' splits the data files into chunks, uploads only the"
+                  " chunks which haven't been uploaded already, and uploads a manifest of the"
+                  " chunks for each failure. Defaults to 'tgz'."))
+
         evergreen_options.add_argument(
             "--archiveLimitMb", type=int, dest="archive_limit_mb", metavar="ARCHIVE_LIMIT_MB",
             help=("Sets the limit (in MB) for archived files to S3. A value of 0"
@@ -913,9 +1075,29 @@ class RunPlugin(PluginInterface):
             help=("Sets the maximum number of tests to archive to S3. A value"
                   " of 0 indicates there is no limit."))
 
+        evergreen_options.add_argument(
+            "--archiveLocalDir", dest="archive_local_dir", metavar="DIR",
+            help=("Writes archives of data files to DIR instead of uploading them to S3. Enables"
+                  " archival when not running in Evergreen."))
+
+        evergreen_options.add_argument(
+            "--archiveUploadWorkers", type=int, dest="archive_upload_workers", metavar="N",
+            help="Sets the number of archives uploaded to S3 at once. Defaults to 2.")
+
         evergreen_options.add_argument("--buildId", dest="build_id", metavar="BUILD_ID",
                                        help="Sets the build ID of the task.")
 
+        evergreen_options.add_argument(
+            "--buildloggerGzip", action="store_true", dest="buildlogger_gzip",
+            help="Sends log output to the buildlogger server with gzip content-encoding.")
+
+        evergreen_options.add_argument(
+            "--buildloggerUploadWorkers", type=int, dest="buildlogger_upload_workers",
+            metavar="N",
+            help=("Sends log output to the buildlogger server from N threads shared by all of the"
+                  " tests, rather than from the thread flushing the log output. The log output of"
+                  " each test is still sent in order. Defaults to 0."))
+
         evergreen_options.add_argument("--buildloggerUrl", action="store", dest="buildlogger_url",
                                        metavar="URL",
                                        help="The root url of the buildlogger server.")
@@ -1030,6 +1212,18 @@ class RunPlugin(PluginInterface):
         # though it is not used.
         parser.set_defaults(logger_file="console")
 
+        parser.add_argument(
+            "--jstestTagsCacheFile", dest="jstest_tags_cache_file", metavar="PATH",
+            help=("A JSON file where the tags of JS test files are cached, keyed by their path,"
+                  " size, and modification time. Only the test files that changed since the file"
+                  " was last written are parsed again."))
+
+        parser.add_argument(
+            "--testMembershipIndexFile", dest="test_membership_index_file", metavar="PATH",
+            help=("A JSON file where the suites that run each test are saved. The saved suites are"
+                  " reused by later invocations for as long as none of the suite configurations"
+                  " or test files change."))
+
         parser.add_argument("test_files", metavar="TEST_FILES", nargs="*",
                             help="Explicit test files to run")
 
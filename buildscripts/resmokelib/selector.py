@@ -5,10 +5,12 @@ on whether they apply to C++ unit tests, dbtests, or JS tests.
 """
 
 import collections
+import contextlib
 import errno
 import fnmatch
 import os.path
 import random
+import re
 import subprocess
 import sys
 
@@ -24,12 +26,135 @@ from buildscripts.resmokelib.utils import jscomment
 ########################
 
 
+class FileSystemMemo(object):
+    """The results of the file system lookups made by a TestFileExplorer while memoizing.
+
+    The results can be saved along with anything computed from them, e.g. the suites each test
+    belongs to, and checked against the file system later with is_current() to decide whether the
+    saved computation can be reused.
+    """
+
+    def __init__(self, dirs=None, isfile=None, files=None):
+        """Initialize the FileSystemMemo.
+
+        Args:
+            dirs: a dict mapping the directories listed to expand glob patterns to their mtime_ns,
+                or to None if they didn't exist.
+            isfile: a dict mapping paths to whether they were an existing file.
+            files: a dict mapping the paths of the files read to their [mtime_ns, size], or to None
+                if they didn't exist.
+        """
+        self.dirs = utils.default_if_none(dirs, {})
+        self.isfile = utils.default_if_none(isfile, {})
+        self.files = utils.default_if_none(files, {})
+        # The expanded glob patterns and the tags aren't saved. The patterns expand to the same
+        # paths as long as the directories in 'self.dirs' are unchanged, and the tags come from
+        # the test files in 'self.files'.
+        self.globs = {}
+        self.tags = {}
+
+    @staticmethod
+    def _stat(pathname):
+        try:
+            stat = os.stat(pathname)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _mtime(pathname):
+        try:
+            return os.stat(pathname).st_mtime_ns
+        except OSError:
+            return None
+
+    def record_file(self, pathname):
+        """Record the modification time and size of a file that was read."""
+        if pathname not in self.files:
+            self.files[pathname] = self._stat(pathname)
+
+    def record_dir(self, pathname):
+        """Record the modification time of a directory that was listed."""
+        if pathname not in self.dirs:
+            self.dirs[pathname] = self._mtime(pathname)
+
+    def snapshot(self, directory_snapshot):
+        """Return a view of 'directory_snapshot' recording the directories listed through it."""
+        return _RecordingSnapshot(directory_snapshot, self)
+
+    def is_current(self):
+        """Return true if the file system lookups would still return the same results.
+
+        A directory's modification time changes whenever an entry is added to it or removed from
+        it, so the glob patterns aren't expanded again.
+        """
+        for (pathname, mtime_ns) in self.dirs.items():
+            if self._mtime(pathname) != mtime_ns:
+                return False
+        for (pathname, isfile) in self.isfile.items():
+            if os.path.isfile(pathname) != isfile:
+                return False
+        return all(self._stat(pathname) == stat for (pathname, stat) in self.files.items())
+
+    def to_dict(self):
+        """Return the results as a dict suitable for serializing to JSON."""
+        return {"dirs": self.dirs, "isfile": self.isfile, "files": self.files}
+
+    @classmethod
+    def from_dict(cls, memo_dict):
+        """Return a FileSystemMemo from the results returned by to_dict()."""
+        return cls(dirs=memo_dict["dirs"], isfile=memo_dict["isfile"], files=memo_dict["files"])
+
+
+class _RecordingSnapshot(object):
+    """A globstar.DirectorySnapshot which records the directories listed in a FileSystemMemo."""
+
+    def __init__(self, directory_snapshot, memo):
+        """Initialize the _RecordingSnapshot."""
+        self._directory_snapshot = directory_snapshot
+        self._memo = memo
+
+    def list_dir(self, pathname):
+        """Return the listing of 'pathname' after recording its modification time."""
+        # The modification time is read before the listing so a concurrent change makes the
+        # recorded time older than the listing rather than newer.
+        self._memo.record_dir(pathname)
+        return self._directory_snapshot.list_dir(pathname)
+
+
 class TestFileExplorer(object):
     """A component that can perform file system related operations.
 
     The file related code has been confined to this class for testability.
     """
 
+    def __init__(self):
+        """Initialize the TestFileExplorer."""
+        self._tags_cache = None
+        self._tags_cache_file = None
+        self._memo = None
+        # The directory listings are shared by all of the glob patterns that are expanded.
+        self._directory_snapshot = globstar.DirectorySnapshot()
+
+    @contextlib.contextmanager
+    def memoize(self):
+        """Reuse the results of the file system lookups until the context exits.
+
+        This is meant for when the tests of many suites are selected at once and the suites share
+        the same roots. The FileSystemMemo recording the lookups is returned by the context.
+        """
+        memo = FileSystemMemo()
+        self._memo = memo
+        try:
+            yield memo
+        finally:
+            self._memo = None
+
+    def record_file(self, pathname):
+        """Record that 'pathname' was read if the file system lookups are being memoized."""
+        if self._memo is not None:
+            self._memo.record_file(pathname)
+
     @staticmethod
     def is_glob_pattern(path):
         """Indicate if the provided path is a glob pattern.
@@ -38,28 +163,54 @@ class TestFileExplorer(object):
         """
         return globstar.is_glob_pattern(path)
 
-    @staticmethod
-    def iglob(pattern):  # noqa: D406,D407,D411,D413
+    def iglob(self, pattern):  # noqa: D406,D407,D411,D413
         """Expand the given glob pattern with regard to the current working directory.
 
         See buildscripts.resmokelib.utils.globstar.iglob().
         Returns:
             A list of paths as a list(str).
         """
-        return globstar.iglob(pattern)
+        if self._memo is None:
+            return globstar.iglob(pattern, snapshot=self._directory_snapshot)
 
-    @staticmethod
-    def jstest_tags(file_path):  # noqa: D406,D407,D411,D413
+        if pattern not in self._memo.globs:
+            self._memo.globs[pattern] = list(
+                globstar.iglob(pattern, snapshot=self._memo.snapshot(self._directory_snapshot)))
+        return list(self._memo.globs[pattern])
+
+    def jstest_tags(self, file_path):  # noqa: D406,D407,D411,D413
         """Extract the tags from a JavaScript test file.
 
-        See buildscripts.resmokelib.utils.jscomment.get_tags().
+        See buildscripts.resmokelib.utils.jscomment.get_tags(). The tags are only parsed again if
+        the file was modified since they were last extracted, including by earlier invocations
+        when --jstestTagsCacheFile is specified.
         Returns:
             A list of tags.
         """
-        return jscomment.get_tags(file_path)
+        if self._memo is None:
+            return self._get_tags_cache().get_tags(file_path)
+
+        if file_path not in self._memo.tags:
+            self._memo.record_file(file_path)
+            self._memo.tags[file_path] = self._get_tags_cache().get_tags(file_path)
+        return list(self._memo.tags[file_path])
+
+    def _get_tags_cache(self):
+        """Return the TagsCache, loading it from --jstestTagsCacheFile if needed."""
+        if self._tags_cache is None or self._tags_cache_file != config.JSTEST_TAGS_CACHE_FILE:
+            self._tags_cache_file = config.JSTEST_TAGS_CACHE_FILE
+            if self._tags_cache_file is not None:
+                self._tags_cache = jscomment.TagsCache.load(self._tags_cache_file)
+            else:
+                self._tags_cache = jscomment.TagsCache()
+        return self._tags_cache
 
-    @staticmethod
-    def read_root_file(root_file_path):  # noqa: D406,D407,D411,D413
+    def save_jstest_tags(self):
+        """Write the tags extracted so far to the file specified by --jstestTagsCacheFile."""
+        if self._tags_cache is not None and self._tags_cache_file is not None:
+            self._tags_cache.save(self._tags_cache_file)
+
+    def read_root_file(self, root_file_path):  # noqa: D406,D407,D411,D413
         """Read a file containing the list of root test files.
 
         Args:
@@ -67,6 +218,7 @@ class TestFileExplorer(object):
         Returns:
             A list of paths as a list(str).
         """
+        self.record_file(root_file_path)
         tests = []
         with open(root_file_path, "r") as filep:
             for test_path in filep:
@@ -82,13 +234,18 @@ class TestFileExplorer(object):
         """
         return fnmatch.fnmatchcase(name, pattern)
 
-    @staticmethod
-    def isfile(path):
+    def isfile(self, path):
         """Indicate if the given path corresponds to an existing file."""
-        return os.path.isfile(path)
+        if self._memo is None:
+            return os.path.isfile(path)
+
+        if path not in self._memo.isfile:
+            self._memo.isfile[path] = os.path.isfile(path)
+        return self._memo.isfile[path]
 
     def list_dbtests(self, dbtest_binary):
         """List the available dbtests suites."""
+        self.record_file(dbtest_binary)
         returncode, stdout, stderr = self._run_program(dbtest_binary, ["--list"])
 
         if returncode != 0:
@@ -113,8 +270,7 @@ class TestFileExplorer(object):
         stdout, stderr = program.communicate()
         return program.returncode, stdout.decode("utf-8"), stderr.decode("utf-8")
 
-    @staticmethod
-    def parse_tag_file(test_kind, tag_file=None, tagged_tests=None):
+    def parse_tag_file(self, test_kind, tag_file=None, tagged_tests=None):
         """Parse the tag file and return a dict of tagged tests.
 
         The resulting dict will have as a key the filename and the
@@ -122,12 +278,14 @@ class TestFileExplorer(object):
         """
         if tagged_tests is None:
             tagged_tests = collections.defaultdict(list)
+        if tag_file:
+            self.record_file(tag_file)
         if tag_file and os.path.exists(tag_file):
             tags_conf = _tags.TagsConfig.from_file(tag_file)
             tagged_roots = tags_conf.get_test_patterns(test_kind)
             for tagged_root in tagged_roots:
                 # Multiple tests could be returned for a set of tags.
-                tests = globstar.iglob(tagged_root)
+                tests = self.iglob(tagged_root)
                 test_tags = tags_conf.get_tags(test_kind, tagged_root)
                 for test in tests:
                     # A test could have a tag in more than one place, due to wildcards in the
@@ -225,13 +383,7 @@ class _TestList(object):
     def include_any_pattern(self, patterns):
         """Filter the test list to only include tests that match any provided glob patterns."""
 
-        def match(test):
-            """Return True if 'test' matches a pattern."""
-            for pattern in patterns:
-                if test == pattern or fnmatch.fnmatchcase(test, pattern):
-                    return True
-            return False
-
+        match = _compile_patterns(patterns)
         self._filtered = {test for test in self._filtered if match(test)}
 
     def get_tests(self):
@@ -251,6 +403,22 @@ class _TestList(object):
         return tests, excluded
 
 
+def _compile_patterns(patterns):
+    """Return a function indicating if a name is equal to or fnmatchcase() matches any pattern.
+
+    The patterns are combined into a single regular expression so each name is only scanned once
+    rather than once per pattern.
+    """
+
+    pattern_set = set(patterns)
+    if not pattern_set:
+        return lambda name: False
+
+    regex = re.compile("|".join(
+        "(?:{})".format(fnmatch.translate(pattern)) for pattern in pattern_set))
+    return lambda name: name in pattern_set or regex.match(name) is not None
+
+
 ##############################
 #  Tag matching expressions  #
 ##############################
@@ -721,6 +889,14 @@ _SELECTOR_REGISTRY = {
 }
 
 
+def memoize_file_system():
+    """Reuse the file system lookups made while filtering tests until the context exits.
+
+    See TestFileExplorer.memoize().
+    """
+    return _DEFAULT_TEST_FILE_EXPLORER.memoize()
+
+
 def filter_tests(test_kind, selector_config, test_file_explorer=_DEFAULT_TEST_FILE_EXPLORER):
     """Filter the tests according to a specified configuration.
 
@@ -735,4 +911,6 @@ def filter_tests(test_kind, selector_config, test_file_explorer=_DEFAULT_TEST_FI
     selector_config_class, selector_class = _SELECTOR_REGISTRY[test_kind]
     selector = selector_class(test_file_explorer)
     selector_config = selector_config_class(**selector_config)
-    return selector.select(selector_config)
+    selected = selector.select(selector_config)
+    test_file_explorer.save_jstest_tags()
+    return selected
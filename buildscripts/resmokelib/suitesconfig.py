@@ -6,8 +6,10 @@ import os
 
 from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib import errors
+from buildscripts.resmokelib import selector as _selector
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.testing import suite as _suite
+from buildscripts.resmokelib.utils import atomicfile
 
 
 def get_named_suites():
@@ -46,31 +48,82 @@ def create_test_membership_map(fail_on_missing_selector=False, test_kind=None):
 
         test_kind = frozenset(test_kind)
 
-    test_membership = collections.defaultdict(list)
     suite_names = get_named_suites()
-    for suite_name in suite_names:
-        try:
-            suite_config = _get_suite_config(suite_name)
-            if test_kind and suite_config.get("test_kind") not in test_kind:
-                continue
-            suite = _suite.Suite(suite_name, suite_config)
-        except IOError as err:
-            # We ignore errors from missing files referenced in the test suite's "selector"
-            # section. Certain test suites (e.g. unittests.yml) have a dedicated text file to
-            # capture the list of tests they run; the text file may not be available if the
-            # associated SCons target hasn't been built yet.
-            if err.filename in _config.EXTERNAL_SUITE_SELECTORS:
-                if not fail_on_missing_selector:
+    index_key = {
+        "suite_names": suite_names,
+        "test_kind": sorted(test_kind) if test_kind else None,
+        "fail_on_missing_selector": fail_on_missing_selector,
+        "include_with_any_tags": _config.INCLUDE_WITH_ANY_TAGS,
+        "exclude_with_any_tags": _config.EXCLUDE_WITH_ANY_TAGS,
+        "tag_file": _config.TAG_FILE,
+    }
+    if _config.TEST_MEMBERSHIP_INDEX_FILE is not None:
+        test_membership = _load_membership_index(_config.TEST_MEMBERSHIP_INDEX_FILE, index_key)
+        if test_membership is not None:
+            return test_membership
+
+    test_membership = collections.defaultdict(list)
+    # Most suites share their roots with other suites, so the roots are only expanded and the tags
+    # of each test are only read once.
+    with _selector.memoize_file_system() as memo:
+        for suite_name in suite_names:
+            memo.record_file(_config.NAMED_SUITES[suite_name])
+            try:
+                suite_config = _get_suite_config(suite_name)
+                if test_kind and suite_config.get("test_kind") not in test_kind:
+                    continue
+                suite = _suite.Suite(suite_name, suite_config)
+            except IOError as err:
+                # We ignore errors from missing files referenced in the test suite's "selector"
+                # section. Certain test suites (e.g. unittests.yml) have a dedicated text file to
+                # capture the list of tests they run; the text file may not be available if the
+                # associated SCons target hasn't been built yet.
+                if err.filename in _config.EXTERNAL_SUITE_SELECTORS:
+                    if not fail_on_missing_selector:
+                        continue
+                raise
+
+            for testfile in suite.tests:
+                if isinstance(testfile, (dict, list)):
                     continue
-            raise
+                test_membership[testfile].append(suite_name)
 
-        for testfile in suite.tests:
-            if isinstance(testfile, (dict, list)):
-                continue
-            test_membership[testfile].append(suite_name)
+    if _config.TEST_MEMBERSHIP_INDEX_FILE is not None:
+        _save_membership_index(_config.TEST_MEMBERSHIP_INDEX_FILE, index_key, memo,
+                               test_membership)
     return test_membership
 
 
+def _load_membership_index(pathname, index_key):
+    """Return the test membership saved in 'pathname' if it is still current, and None otherwise.
+
+    The saved test membership is only reused when it was created with the same options and none of
+    the suite configurations, root files, globbed directories, or tagged test files changed since.
+    """
+    index = atomicfile.read_json(pathname)
+    try:
+        if index["key"] != index_key:
+            return None
+        memo = _selector.FileSystemMemo.from_dict(index["file_system"])
+        test_membership = index["test_membership"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    if not memo.is_current():
+        return None
+    return collections.defaultdict(list, test_membership)
+
+
+def _save_membership_index(pathname, index_key, memo, test_membership):
+    """Write the test membership along with the file system lookups used to compute it."""
+    index = {
+        "key": index_key,
+        "file_system": memo.to_dict(),
+        "test_membership": test_membership,
+    }
+    atomicfile.write_json(pathname, index)
+
+
 def get_suites(suite_files, test_files):
     """Retrieve the Suite instances based on suite configuration files and override parameters.
 
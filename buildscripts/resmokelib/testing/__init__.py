@@ -1,4 +1,6 @@
 """Extension to the unittest package to support buildlogger and parallel test execution."""
 
 from buildscripts.resmokelib.testing import executor
+from buildscripts.resmokelib.testing import fixture_pool
+from buildscripts.resmokelib.testing import report
 from buildscripts.resmokelib.testing import suite
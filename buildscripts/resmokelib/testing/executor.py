@@ -9,10 +9,13 @@ from buildscripts.resmokelib import logging
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.core import network
 from buildscripts.resmokelib.testing import fixtures
+from buildscripts.resmokelib.testing import fixture_pool as _fixture_pool
 from buildscripts.resmokelib.testing import hook_test_archival as archival
 from buildscripts.resmokelib.testing import hooks as _hooks
 from buildscripts.resmokelib.testing import job as _job
+from buildscripts.resmokelib.testing import job_controller as _job_controller
 from buildscripts.resmokelib.testing import report as _report
+from buildscripts.resmokelib.testing import runtime_history as _runtime_history
 from buildscripts.resmokelib.testing import testcases
 from buildscripts.resmokelib.testing.queue_element import queue_elem_factory
 from buildscripts.resmokelib.utils.queue import Queue
@@ -29,9 +32,10 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, exec_logger, suite, config=None, fixture=None, hooks=None, archive_instance=None,
-            archive=None):
+            archive=None, fixture_pool=None, report_stream_writer=None, reuse_fixture=False):
         """Initialize the TestSuiteExecutor with the test suite to run."""
         self.logger = exec_logger
+        self._report_stream_writer = report_stream_writer
 
         if _config.SHELL_CONN_STRING is not None:
             # Specifying the shellConnString command line option should override the fixture
@@ -55,6 +59,23 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         self.num_tests = len(suite.tests) * suite.options.num_repeat_tests
         self.test_queue_logger = logging.loggers.new_testqueue_logger(suite.test_kind)
 
+        self._runtime_history = None
+        if _config.TEST_RUNTIMES_FILE is not None:
+            self._runtime_history = _runtime_history.TestRuntimeHistory.load(
+                _config.TEST_RUNTIMES_FILE)
+
+        # Only the databases of a warm fixture are wiped, so a suite must set 'reuse_fixture' in its
+        # executor configuration to declare that its tests leave no other state behind. The
+        # NoOpFixture and ExternalFixture don't start any processes so there is nothing to gain from
+        # keeping them warm.
+        self._fixture_pool = fixture_pool
+        self._fixture_key = None
+        self._warm_job_nums = set()
+        if (fixture_pool is not None and reuse_fixture and self.fixture_config is not None
+                and self.fixture_config["class"] not in (fixtures.NOOP_FIXTURE_CLASS,
+                                                         fixtures.EXTERNAL_FIXTURE_CLASS)):
+            self._fixture_key = _fixture_pool.FixturePool.make_key(self.fixture_config)
+
         # Must be done after getting buildlogger configuration.
         self._jobs = self._create_jobs(self.num_tests)
 
@@ -98,7 +119,9 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         self.logger.info("Starting execution of %ss...", self._suite.test_kind)
 
         return_code = 0
-        # The first run of the job will set up the fixture.
+        completed = False
+        # The first run of a job will set up its fixture. A job that was parked by the JobController
+        # until the queue was drained doesn't set up its fixture until a later repetition instead.
         setup_flag = threading.Event()
         # We reset the internal state of the PortAllocator so that ports used by the fixture during
         # a test suite run earlier can be reused during this current test suite.
@@ -115,18 +138,20 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 # Have the Job threads destroy their fixture during the final repetition after they
                 # finish running their last test. This avoids having a large number of processes
                 # still running if an Evergreen task were to time out from a hang/deadlock being
-                # triggered.
-                teardown_flag = threading.Event() if num_repeat_suites == 1 else None
+                # triggered. Fixtures that are kept warm for later test suites are instead handed
+                # back to the fixture pool once all of the Job threads have finished.
+                teardown_flag = None
+                if num_repeat_suites == 1 and self._fixture_key is None:
+                    teardown_flag = threading.Event()
                 (report, interrupted) = self._run_tests(test_queue, setup_flag, teardown_flag)
 
                 self._suite.record_test_end(report)
+                self._record_runtimes(report)
 
                 if setup_flag and setup_flag.is_set():
                     self.logger.error("Setup of one of the job fixtures failed")
                     return_code = 2
                     return
-                # Remove the setup flag once the first suite ran.
-                setup_flag = None
 
                 # If the user triggered a KeyboardInterrupt, then we should stop.
                 if interrupted:
@@ -144,8 +169,7 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                     if self._suite.options.fail_fast:
                         break
 
-                test_report = report.as_dict()
-                test_results_num = len(test_report["results"])
+                test_results_num = report.num_results()
                 # There should be at least as many tests results as expected number of tests.
                 if test_results_num < self.num_tests:
                     raise errors.ResmokeError(
@@ -156,9 +180,12 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 for job in self._jobs:
                     job.report.reset()
                 num_repeat_suites -= 1
+            completed = True
         finally:
             if not teardown_flag:
-                if not self._teardown_fixtures():
+                # A fixture the tests failed against may be left in an unexpected state, so it isn't
+                # handed to a later test suite.
+                if not self._teardown_fixtures(keep_warm=completed and return_code == 0):
                     return_code = 2
             self._suite.return_code = return_code
 
@@ -173,12 +200,26 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         threads = []
         interrupt_flag = threading.Event()
         user_interrupted = False
+
+        job_controller = None
+        if _config.ADAPTIVE_JOBS and len(self._jobs) > 1:
+            job_controller = _job_controller.JobController(self.logger,
+                                                           [job.fixture for job in self._jobs])
+            job_controller.start()
+
         try:
             # Run each Job instance in its own thread.
             for job in self._jobs:
+                # Fixtures taken from the fixture pool or set up by an earlier repetition are still
+                # running.
+                job_setup_flag = setup_flag
+                if job.manager.fixture_started:
+                    job_setup_flag = None
+
                 thr = threading.Thread(
                     target=job, args=(test_queue, interrupt_flag), kwargs=dict(
-                        setup_flag=setup_flag, teardown_flag=teardown_flag))
+                        setup_flag=job_setup_flag, teardown_flag=teardown_flag,
+                        job_controller=job_controller))
                 # Do not wait for tests to finish executing if interrupted by the user.
                 thr.daemon = True
                 thr.start()
@@ -189,30 +230,36 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 if _config.STAGGER_JOBS and len(threads) >= 5:
                     time.sleep(10)
 
-            joined = False
-            while not joined:
-                # Need to pass a timeout to join() so that KeyboardInterrupt exceptions
-                # are propagated.
-                joined = test_queue.join(TestSuiteExecutor._TIMEOUT)
-        except (KeyboardInterrupt, SystemExit):
-            interrupt_flag.set()
-            user_interrupted = True
-
-        wait_secs = 2.0
-        self.logger.debug("Waiting for threads to complete")
-
-        timer = threading.Timer(wait_secs, self._log_timeout_warning, args=[wait_secs])
-        timer.daemon = True
-        timer.start()
-        try:
-            for thr in threads:
-                thr.join()
+            try:
+                joined = False
+                while not joined:
+                    # Need to pass a timeout to join() so that KeyboardInterrupt exceptions
+                    # are propagated.
+                    joined = test_queue.join(TestSuiteExecutor._TIMEOUT)
+            except (KeyboardInterrupt, SystemExit):
+                interrupt_flag.set()
+                user_interrupted = True
+
+            wait_secs = 2.0
+            self.logger.debug("Waiting for threads to complete")
+
+            timer = threading.Timer(wait_secs, self._log_timeout_warning, args=[wait_secs])
+            timer.daemon = True
+            timer.start()
+            try:
+                for thr in threads:
+                    thr.join()
+            finally:
+                timer.cancel()
         finally:
-            timer.cancel()
+            if job_controller is not None:
+                job_controller.stop()
 
         self.logger.debug("Threads are completed!")
 
         reports = [job.report for job in self._jobs]
+        for report in reports:
+            report.flush_stream()
         combined_report = _report.TestReport.combine(*reports)
 
         # We cannot return 'interrupt_flag.is_set()' because the interrupt flag can be set by a Job
@@ -220,17 +267,44 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         # StopExecution exception in TestSuiteExecutor.run() if the user triggered the interrupt.
         return (combined_report, user_interrupted)
 
-    def _teardown_fixtures(self):
+    def _record_runtimes(self, report):
+        """Save the runtimes of the tests in 'report' to the runtime history if enabled."""
+
+        if self._runtime_history is None:
+            return
+
+        # The runtimes of the tests whose results were streamed were recorded as they finished.
+        if self._report_stream_writer is None:
+            self._runtime_history.record_report(report)
+        try:
+            self._runtime_history.save(_config.TEST_RUNTIMES_FILE)
+        except (IOError, OSError) as err:
+            self.logger.warning("Failed to save the test runtimes to %s: %s",
+                                _config.TEST_RUNTIMES_FILE, err)
+
+    def _teardown_fixtures(self, keep_warm=False):
         """Tear down all of the fixtures.
 
+        If 'keep_warm' is true and a fixture pool is in use, then the
+        fixtures are handed back to the pool instead where possible.
+
         Returns true if all fixtures were torn down successfully, and
         false otherwise.
         """
         success = True
         for job in self._jobs:
+            # A job that was parked by the JobController for the whole suite never set up its
+            # fixture.
+            if not job.manager.fixture_started:
+                continue
+
+            if (keep_warm and self._fixture_key is not None and self._fixture_pool.release(
+                    job.manager.job_num, self._fixture_key, job.fixture)):
+                continue
+
             if not job.manager.teardown_fixture(self.logger):
                 self.logger.warning("Teardown of %s of job %s was not successful", job.fixture,
-                                    job.job_num)
+                                    job.manager.job_num)
                 success = False
         return success
 
@@ -243,6 +317,14 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
             fixture_config = self.fixture_config.copy()
             fixture_class = fixture_config.pop("class")
 
+        if self._fixture_key is not None:
+            fixture = self._fixture_pool.acquire(job_num, self._fixture_key)
+            if fixture is not None:
+                # Hooks log through the fixture logger registered for the job.
+                logging.loggers.register_fixture_logger(job_num, fixture.logger)
+                self._warm_job_nums.add(job_num)
+                return fixture
+
         fixture_logger = logging.loggers.new_fixture_logger(fixture_class, job_num)
 
         return fixtures.make_fixture(fixture_class, fixture_logger, job_num, **fixture_config)
@@ -274,10 +356,18 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         fixture = self._make_fixture(job_num)
         hooks = self._make_hooks(fixture, job_num)
 
-        report = _report.TestReport(job_logger, self._suite.options, job_num)
+        runtime_history = None
+        if self._report_stream_writer is not None:
+            runtime_history = self._runtime_history
+        report = _report.TestReport(job_logger, self._suite.options, job_num,
+                                    stream_writer=self._report_stream_writer,
+                                    runtime_history=runtime_history)
 
-        return _job.Job(job_num, job_logger, fixture, hooks, report, self.archival,
-                        self._suite.options, self.test_queue_logger)
+        job = _job.Job(job_num, job_logger, fixture, hooks, report, self.archival,
+                       self._suite.options, self.test_queue_logger)
+        # Fixtures taken from the fixture pool are already set up.
+        job.manager.fixture_started = job_num in self._warm_job_nums
+        return job
 
     def _num_times_to_repeat_tests(self):
         """
@@ -316,15 +406,34 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         :return: Queue of testcases to run.
         """
         queue = Queue()
+        test_names = self._order_tests()
 
         # Put all the test cases in a queue.
         for _ in range(self._num_times_to_repeat_tests()):
-            for test_name in self._suite.tests:
+            for test_name in test_names:
                 queue_elem = self._create_queue_elem_for_test_name(test_name)
                 queue.put(queue_elem)
 
         return queue
 
+    def _order_tests(self):
+        """
+        Determine the order in which the tests are dispatched to the jobs.
+
+        When --scheduleMode=longest_first is specified, the tests with the longest historical
+        runtime are dispatched first. Since each job pulls the next test from the shared queue as
+        soon as it becomes idle, this avoids a long test being started last while the other jobs
+        sit idle.
+
+        :return: List of test names.
+        """
+        if _config.SCHEDULE_MODE != "longest_first" or not self._runtime_history:
+            return self._suite.tests
+
+        self.logger.info("Scheduling the longest running %ss first based on %d recorded runtimes.",
+                         self._suite.test_kind, len(self._runtime_history))
+        return self._runtime_history.sort_longest_first(self._suite.tests)
+
     def _log_timeout_warning(self, seconds):
         """Log a message if any thread fails to terminate after `seconds`."""
         self.logger.warning(
@@ -0,0 +1,127 @@
+"""Pool of warm fixtures that are reused across test suites.
+
+A fixture is kept running after a test suite finishes and is handed to the same job of a later test
+suite if that suite uses an identical fixture configuration. Between test suites, the fixture is
+reset by dropping the databases created by the tests rather than by restarting its processes.
+
+Any other state the tests leave behind is carried over to the next test suite, e.g. users and roles,
+enabled failpoints, setParameter values, and documents in config.settings. The server offers no way
+to restore all of it, so only test suites which set 'reuse_fixture' in their executor configuration
+have their fixtures pooled.
+"""
+
+import hashlib
+import json
+import threading
+
+import pymongo.errors
+
+from buildscripts.resmokelib import errors
+
+
+class FixturePool(object):
+    """Hold at most one warm fixture per job number."""
+
+    # Databases that are internal to the server and are never dropped when wiping a fixture.
+    _INTERNAL_DATABASES = ("admin", "config", "local")
+
+    def __init__(self, logger):
+        """Initialize the FixturePool."""
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        # Maps job numbers to a (fixture config key, fixture) pair.
+        self._fixtures = {}
+
+    @staticmethod
+    def make_key(fixture_config):
+        """Return a hash identifying fixtures created from the same configuration."""
+        serialized = json.dumps(fixture_config, sort_keys=True, default=repr)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def acquire(self, job_num, key):
+        """
+        Return the warm fixture for 'job_num' if it was created with the configuration 'key'.
+
+        A warm fixture with a different configuration is torn down so its ports and dbpaths can be
+        used by the fixture the caller creates instead.
+
+        :param job_num: The job the fixture is requested for.
+        :param key: The key returned by make_key() for the requested fixture configuration.
+        :return: A running fixture, or None if there isn't one that can be reused.
+        """
+        with self._lock:
+            entry = self._fixtures.pop(job_num, None)
+
+        if entry is None:
+            return None
+
+        (pooled_key, fixture) = entry
+        if pooled_key == key and fixture.is_running():
+            self.logger.info("Reusing the warm %s.", fixture)
+            return fixture
+
+        self.logger.info("Discarding the warm %s since it cannot be reused.", fixture)
+        self._teardown(fixture)
+        return None
+
+    def release(self, job_num, key, fixture):
+        """
+        Wipe the data of 'fixture' and keep it running for a later test suite.
+
+        :param job_num: The job the fixture belongs to.
+        :param key: The key returned by make_key() for the fixture's configuration.
+        :param fixture: The fixture to keep.
+        :return: True if the fixture was added to the pool, and False if the caller is still
+            responsible for tearing it down.
+        """
+        if not fixture.is_running():
+            self.logger.info("Not keeping %s warm since it is no longer running.", fixture)
+            return False
+
+        try:
+            self._wipe(fixture)
+        except (errors.ServerFailure, pymongo.errors.PyMongoError) as err:
+            self.logger.warning("Not keeping %s warm since wiping its data failed: %s", fixture,
+                                err)
+            return False
+
+        with self._lock:
+            self._fixtures[job_num] = (key, fixture)
+
+        self.logger.info("Keeping %s warm for later test suites.", fixture)
+        return True
+
+    def teardown_all(self):
+        """
+        Tear down all of the fixtures in the pool.
+
+        :return: True if all of the fixtures were torn down successfully, and False otherwise.
+        """
+        with self._lock:
+            fixtures = [fixture for (_, fixture) in self._fixtures.values()]
+            self._fixtures = {}
+
+        success = True
+        for fixture in fixtures:
+            success = self._teardown(fixture) and success
+        return success
+
+    def _wipe(self, fixture):
+        """Drop all of the non-internal databases of 'fixture'."""
+        client = fixture.mongo_client()
+        for db_name in client.list_database_names():
+            if db_name in self._INTERNAL_DATABASES:
+                continue
+            self.logger.debug("Dropping database %s of %s.", db_name, fixture)
+            client[db_name].command("dropDatabase", writeConcern={"w": "majority"})
+
+    def _teardown(self, fixture):
+        """Tear down 'fixture' and log instead of raising if the teardown fails."""
+        try:
+            self.logger.info("Tearing down the warm %s.", fixture)
+            fixture.teardown(finished=True)
+            return True
+        except errors.ServerFailure as err:
+            self.logger.error("An error occurred during the teardown of %s: %s", fixture, err)
+            return False
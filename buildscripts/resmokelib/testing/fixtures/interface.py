@@ -1,5 +1,6 @@
 """Interface of the different fixtures for executing JSTests against."""
 
+import concurrent.futures
 import os.path
 import time
 from enum import Enum
@@ -40,6 +41,22 @@ def make_fixture(class_name, *args, **kwargs):
     return _FIXTURES[class_name](*args, **kwargs)
 
 
+def call_in_parallel(functions):
+    """Call each of 'functions' on its own thread and return their results in order.
+
+    If any of the functions raise an exception, then the exception raised by the earliest of them
+    in 'functions' is re-raised once all of the functions have returned.
+    """
+
+    if len(functions) <= 1:
+        return [function() for function in functions]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(functions)) as executor:
+        futures = [executor.submit(function) for function in functions]
+
+    return [future.result() for future in futures]
+
+
 class Fixture(object, metaclass=registry.make_registry_metaclass(_FIXTURES)):
     """Base class for all fixtures."""
 
@@ -114,11 +114,11 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
 
     def setup(self):  # pylint: disable=too-many-branches,too-many-statements,too-many-locals
         """Set up the replica set."""
-        self.replset_name = self.mongod_options.get("replSet", "rs")
-        if not self.nodes:
-            for i in range(self.num_nodes):
-                node = self._new_mongod(i, self.replset_name)
-                self.nodes.append(node)
+        self._create_nodes()
+
+        # Each member of a linearly chained replica set needs the address of the previous member
+        # when it is started, so we only start the members concurrently otherwise.
+        start_in_parallel = config.PARALLEL_FIXTURE_SETUP and not self.linear_chain
 
         for i in range(self.num_nodes):
             steady_state_constraint_param = "oplogApplicationEnforcesSteadyStateConstraints"
@@ -133,13 +133,12 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
                         "mode": "alwaysOn",
                         "data": {"hostAndPort": self.nodes[i - 1].get_internal_connection_string()}
                     }
-            self.nodes[i].setup()
+            if not start_in_parallel:
+                self.nodes[i].setup()
 
-        if self.start_initial_sync_node:
-            if not self.initial_sync_node:
-                self.initial_sync_node_idx = len(self.nodes)
-                self.initial_sync_node = self._new_mongod(self.initial_sync_node_idx,
-                                                          self.replset_name)
+        if start_in_parallel:
+            self._start_nodes_in_parallel()
+        elif self.initial_sync_node:
             self.initial_sync_node.setup()
             self.initial_sync_node.await_ready()
 
@@ -234,14 +233,51 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
             # command.
             for node in self.nodes[1:]:
                 node.await_ready()
-            # Add in the members one at a time, since non force reconfigs can only add/remove a
-            # single voting member at a time.
-            for ind in range(2, len(members) + 1):
+            # Non force reconfigs can only add/remove a single voting member at a time, but any
+            # number of non-voting members can be added alongside it.
+            for ind in self._get_reconfig_boundaries(members):
                 self._add_node_to_repl_set(client, repl_config, ind, members)
 
         self._await_secondaries()
         self._await_newly_added_removals()
 
+    def _create_nodes(self):
+        """Create the members of the replica set if they weren't created already."""
+        self.replset_name = self.mongod_options.get("replSet", "rs")
+        if not self.nodes:
+            for i in range(self.num_nodes):
+                node = self._new_mongod(i, self.replset_name)
+                self.nodes.append(node)
+
+        if self.start_initial_sync_node and not self.initial_sync_node:
+            self.initial_sync_node_idx = len(self.nodes)
+            self.initial_sync_node = self._new_mongod(self.initial_sync_node_idx,
+                                                      self.replset_name)
+
+    def reserve_ports(self):
+        """Assign the ports of the members without starting them.
+
+        The ports are assigned in the order the members are started one after another, so they are
+        the same whether or not the members are started concurrently.
+        """
+        self._create_nodes()
+        for node in self.nodes:
+            node.reserve_ports()
+        if self.initial_sync_node:
+            self.initial_sync_node.reserve_ports()
+
+    def _start_nodes_in_parallel(self):
+        """Start all of the members at once and wait for them to accept connections."""
+        nodes = list(self.nodes)
+        if self.initial_sync_node:
+            nodes.append(self.initial_sync_node)
+
+        self.reserve_ports()
+
+        self.logger.info("Starting all %d members of the replica set concurrently.", len(nodes))
+        interface.call_in_parallel([node.setup for node in nodes])
+        interface.call_in_parallel([node.await_ready for node in nodes])
+
     def pids(self):
         """:return: all pids owned by this fixture if any."""
         pids = []
@@ -251,8 +287,27 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
             self.logger.debug('No members running when gathering replicaset fixture pids.')
         return pids
 
+    @staticmethod
+    def _get_reconfig_boundaries(members):
+        """Return the number of members to include in each replSetReconfig after the initiate.
+
+        The members are added in order. A new reconfig is only started when the next member is a
+        voting member and the current reconfig already adds a voting member.
+        """
+        boundaries = []
+        adds_voting_member = False
+        for (i, member) in enumerate(members[1:], start=1):
+            is_voting = member.get("votes", 1) != 0
+            if is_voting and adds_voting_member:
+                boundaries.append(i)
+                adds_voting_member = False
+            adds_voting_member = adds_voting_member or is_voting
+        if len(members) > 1:
+            boundaries.append(len(members))
+        return boundaries
+
     def _add_node_to_repl_set(self, client, repl_config, member_index, members):
-        self.logger.info("Adding in node %d: %s", member_index, members[member_index - 1])
+        self.logger.info("Adding in nodes up to %d: %s", member_index, members[member_index - 1])
         while True:
             try:
                 # 'newlyAdded' removal reconfigs could bump the version.
@@ -70,6 +70,21 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
         self.mongos = []
         self.shards = []
 
+    def _await_ready_in_parallel(self):
+        """Wait for the config server and shards at once, then start all of the mongos routers."""
+        servers = [self.configsvr] if self.configsvr is not None else []
+        servers.extend(self.shards)
+        interface.call_in_parallel([server.await_ready for server in servers])
+
+        if not self.mongos:
+            for i in range(self.num_mongos):
+                mongos = self._new_mongos(i, self.num_mongos)
+                self.mongos.append(mongos)
+
+        for mongos in self.mongos:
+            mongos.setup()
+        interface.call_in_parallel([mongos.await_ready for mongos in self.mongos])
+
     def pids(self):
         """:return: pids owned by this fixture if any."""
         out = []
@@ -90,7 +105,8 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
         if self.configsvr is None:
             self.configsvr = self._new_configsvr()
 
-        self.configsvr.setup()
+        if not config.PARALLEL_FIXTURE_SETUP:
+            self.configsvr.setup()
 
         if not self.shards:
             for i in range(self.num_shards):
@@ -104,33 +120,47 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
                     raise TypeError("num_rs_nodes_per_shard must be an integer or None")
                 self.shards.append(shard)
 
+        if config.PARALLEL_FIXTURE_SETUP:
+            # The config server and the shards don't depend on each other until the mongos routers
+            # are started, so they can all be started at once. Their ports are reserved first, in
+            # the order they are started one after another, so that they don't depend on which
+            # thread runs first.
+            for fixture in [self.configsvr] + self.shards:
+                fixture.reserve_ports()
+            interface.call_in_parallel([self.configsvr.setup] +
+                                       [shard.setup for shard in self.shards])
+            return
+
         # Start up each of the shards
         for shard in self.shards:
             shard.setup()
 
     def await_ready(self):
         """Block until the fixture can be used for testing."""
-        # Wait for the config server
-        if self.configsvr is not None:
-            self.configsvr.await_ready()
+        if config.PARALLEL_FIXTURE_SETUP:
+            self._await_ready_in_parallel()
+        else:
+            # Wait for the config server
+            if self.configsvr is not None:
+                self.configsvr.await_ready()
 
-        # Wait for each of the shards
-        for shard in self.shards:
-            shard.await_ready()
+            # Wait for each of the shards
+            for shard in self.shards:
+                shard.await_ready()
 
-        # We call self._new_mongos() and mongos.setup() in self.await_ready() function
-        # instead of self.setup() because mongos routers have to connect to a running cluster.
-        if not self.mongos:
-            for i in range(self.num_mongos):
-                mongos = self._new_mongos(i, self.num_mongos)
-                self.mongos.append(mongos)
+            # We call self._new_mongos() and mongos.setup() in self.await_ready() function
+            # instead of self.setup() because mongos routers have to connect to a running cluster.
+            if not self.mongos:
+                for i in range(self.num_mongos):
+                    mongos = self._new_mongos(i, self.num_mongos)
+                    self.mongos.append(mongos)
 
-        for mongos in self.mongos:
-            # Start up the mongos.
-            mongos.setup()
+            for mongos in self.mongos:
+                # Start up the mongos.
+                mongos.setup()
 
-            # Wait for the mongos.
-            mongos.await_ready()
+                # Wait for the mongos.
+                mongos.await_ready()
 
         client = self.mongo_client()
         self._auth_to_db(client)
@@ -51,6 +51,11 @@ class MongoDFixture(interface.Fixture):
         self.mongod = None
         self.port = None
 
+    def reserve_ports(self):
+        """Assign the port of the mongod if it wasn't given one, without starting it."""
+        if "port" not in self.mongod_options:
+            self.mongod_options["port"] = core.network.PortAllocator.next_fixture_port(self.job_num)
+
     def setup(self):
         """Set up the mongod."""
         if not self.preserve_dbpath and os.path.lexists(self._dbpath):
@@ -62,8 +67,7 @@ class MongoDFixture(interface.Fixture):
             # Directory already exists.
             pass
 
-        if "port" not in self.mongod_options:
-            self.mongod_options["port"] = core.network.PortAllocator.next_fixture_port(self.job_num)
+        self.reserve_ports()
         self.port = self.mongod_options["port"]
 
         mongod = core.programs.mongod_program(self.logger, executable=self.mongod_executable,
@@ -114,9 +114,9 @@ class HookTestArchival(object):
         # Normalize test path from a test or hook name.
         test_path = \
             test_name.replace("/", "_").replace("\\", "_").replace(".", "_").replace(":", "_")
-        file_name = "mongo-data-{}-{}-{}-{}.tgz".format(config.EVERGREEN_TASK_ID, test_path,
-                                                        config.EVERGREEN_EXECUTION,
-                                                        self._tests_repeat[test_name])
+        file_name = "mongo-data-{}-{}-{}-{}{}".format(
+            config.EVERGREEN_TASK_ID, test_path, config.EVERGREEN_EXECUTION,
+            self._tests_repeat[test_name], self.archive_instance.FILE_EXTENSION)
         # Retrieve root directory for all dbPaths from fixture.
         input_files = test.fixture.get_dbpath_prefix()
         s3_bucket = config.ARCHIVE_BUCKET
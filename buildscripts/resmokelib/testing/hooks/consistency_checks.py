@@ -0,0 +1,791 @@
+"""Data consistency checks run from resmoke.py with pymongo rather than from a mongo shell.
+
+These are Python implementations of the checks done by run_check_repl_dbhash.js,
+run_check_repl_oplogs.js, and run_validate_collections.js. They are used in place of the JavaScript
+files when --pythonConsistencyChecks is specified and the hook's configuration doesn't require the
+mongo shell. The connections to the nodes are kept open from one test to the next, and the nodes,
+replica sets, and collections are checked concurrently.
+"""
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+import bson
+import pymongo
+import pymongo.errors
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo.read_concern import ReadConcern
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.fixtures import interface as fixture_interface
+from buildscripts.resmokelib.testing.fixtures import replicaset
+from buildscripts.resmokelib.testing.fixtures import shardedcluster
+from buildscripts.resmokelib.testing.fixtures import standalone
+from buildscripts.resmokelib.testing.hooks import interface
+
+# Member states reported by the replSetGetStatus command.
+_PRIMARY_STATE = 1
+_SECONDARY_STATE = 2
+
+# Error codes from the server.
+_CAPPED_POSITION_LOST = 136
+_BACKGROUND_OPERATION_IN_PROGRESS_CODES = (12586, 12587)
+_NAMESPACE_NOT_FOUND = 26
+
+# The number of seconds to wait for the secondaries to catch up to the primary. This matches
+# ReplSetTest.kDefaultTimeoutMS.
+_AWAIT_REPLICATION_TIMEOUT_SECS = 10 * 60
+
+# Secondaries are frozen for as long as ReplSetTest.kForeverSecs while the primary is locked.
+_FREEZE_SECS = 24 * 60 * 60
+
+# The number of collections validated at once on each node, unless the hook specifies otherwise.
+DEFAULT_MAX_CONCURRENT_VALIDATIONS_PER_NODE = 4
+
+# The number of the slowest collections to validate reported for each node.
+_NUM_SLOWEST_VALIDATIONS_REPORTED = 10
+
+# The number of documents and oplog entries logged when a check fails.
+_DUMP_LIMIT = 100
+
+_RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# Collections the server updates on secondaries as a side effect of other oplog entries rather than
+# from oplog entries of their own. They are rehashed whenever anything was written.
+_DERIVED_NAMESPACES = {"config": {"transactions", "image_collection"}}
+
+
+class NodeClients(object):
+    """A MongoClient per node, reused by every check run against the fixture."""
+
+    def __init__(self):
+        """Initialize NodeClients."""
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def get(self, host):
+        """Return a MongoClient connected directly to 'host'."""
+        with self._lock:
+            client = self._clients.get(host)
+            if client is None:
+                client = pymongo.MongoClient(
+                    host=host, read_preference=pymongo.ReadPreference.PRIMARY_PREFERRED)
+                self._clients[host] = client
+            return client
+
+    def close(self):
+        """Close the connections to every node."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+class PythonCheckTestCase(interface.DynamicTestCase):
+    """A dynamic TestCase that runs a consistency check implemented in Python."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, logger, test_name, description, base_test_name, hook, check):
+        """Initialize PythonCheckTestCase."""
+        interface.DynamicTestCase.__init__(self, logger, test_name, description, base_test_name,
+                                           hook)
+        self._check = check
+
+    def run_test(self):
+        """Execute the check."""
+        start_time = time.time()
+        self._check(self.logger)
+        self.logger.info("Finished %s in %d ms.", self._hook.description,
+                         (time.time() - start_time) * 1000)
+
+
+def get_test_data(shell_options, supported_test_data):
+    """Return the TestData of 'shell_options' if the Python checks can honor all of it.
+
+    Return None if 'shell_options' sets anything other than the TestData fields in
+    'supported_test_data', in which case the check must be run by the mongo shell.
+    """
+
+    shell_options = dict(shell_options or {})
+    global_vars = dict(shell_options.pop("global_vars", {}))
+    test_data = global_vars.pop("TestData", {})
+    if shell_options or global_vars or not set(test_data).issubset(supported_test_data):
+        return None
+    return test_data
+
+
+def get_replica_sets(fixture):
+    """Return the ReplicaSetFixtures and MongoDFixtures that make up 'fixture'.
+
+    Return None if the fixture isn't one the Python checks know how to inspect, or if it requires
+    authentication.
+    """
+
+    if isinstance(fixture, shardedcluster.ShardedClusterFixture):
+        members = [fixture.configsvr] + list(fixture.shards)
+        if fixture.auth_options is not None:
+            return None
+    elif isinstance(fixture, (replicaset.ReplicaSetFixture, standalone.MongoDFixture)):
+        members = [fixture]
+    else:
+        return None
+
+    if any(getattr(member, "auth_options", None) is not None for member in members):
+        return None
+    return members
+
+
+def _get_self_optime(client):
+    """Return the last applied optime of the node 'client' is connected to."""
+    status = client.admin.command("replSetGetStatus")
+    for member in status["members"]:
+        if member.get("self"):
+            return member["optime"]
+    raise errors.ServerFailure("replSetGetStatus did not include the node itself")
+
+
+def _is_arbiter(client):
+    return client.admin.command("isMaster").get("arbiterOnly", False)
+
+
+def _list_database_names(client):
+    return [database["name"] for database in client.admin.command("listDatabases")["databases"]]
+
+
+class _ReplicaSetChecker(object):
+    """Run a check against a write-locked replica set, as ReplSetTest.checkReplicaSet() does."""
+
+    def __init__(self, logger, clients, replica_set):
+        """Initialize the _ReplicaSetChecker."""
+        self.logger = logger
+        self._clients = clients
+        self._replica_set = replica_set
+        self.primary = None
+        self.secondaries = []
+
+    def discover(self):
+        """Find the primary and the live secondaries. Return false if there are no secondaries."""
+        node = self._replica_set.get_primary()
+        status = self._clients.get(node.get_internal_connection_string()).admin.command(
+            "replSetGetStatus")
+        for member in status["members"]:
+            if member["state"] == _PRIMARY_STATE:
+                self.primary = member["name"]
+            elif member["state"] == _SECONDARY_STATE:
+                self.secondaries.append(member["name"])
+        if self.primary is None:
+            raise errors.ServerFailure("No primary found for replica set {}".format(
+                self._replica_set.replset_name))
+        return bool(self.secondaries)
+
+    @property
+    def replset_name(self):
+        """Return the name of the replica set."""
+        return self._replica_set.replset_name
+
+    def client(self, host):
+        """Return the MongoClient for 'host'."""
+        return self._clients.get(host)
+
+    def run_locked(self, check):
+        """Freeze the secondaries, lock the primary, await replication, and then call 'check'."""
+
+        self.logger.info("Freezing nodes %s and locking the primary %s.", self.secondaries,
+                         self.primary)
+        for host in self.secondaries:
+            try:
+                self.client(host).admin.command("replSetFreeze", _FREEZE_SECS)
+            except pymongo.errors.OperationFailure as err:
+                self.logger.info("Continuing after replSetFreeze error on %s: %s", host, err)
+
+        primary_client = self.client(self.primary)
+        primary_client.admin.command("fsync", lock=True, allowFsyncFailure=True)
+        try:
+            self._await_replication()
+            check()
+        finally:
+            try:
+                primary_client.admin.command("fsyncUnlock")
+            except pymongo.errors.PyMongoError as err:
+                self.logger.info("Continuing after fsyncUnlock error: %s", err)
+            for host in self.secondaries:
+                try:
+                    self.client(host).admin.command("replSetFreeze", 0)
+                except pymongo.errors.PyMongoError as err:
+                    self.logger.info("Continuing after replSetFreeze error on %s: %s", host, err)
+
+    def _await_replication(self):
+        """Wait for every secondary to have applied the last write of the locked primary."""
+
+        primary_optime = _get_self_optime(self.client(self.primary))
+        deadline = time.time() + _AWAIT_REPLICATION_TIMEOUT_SECS
+        lagging = list(self.secondaries)
+        while True:
+            lagging = [
+                host for host in lagging if _get_self_optime(self.client(host)) != primary_optime
+            ]
+            if not lagging:
+                return
+            if time.time() > deadline:
+                raise errors.ServerFailure(
+                    "Timed out waiting for secondaries {} to replicate up to {}".format(
+                        lagging, primary_optime))
+            time.sleep(0.1)
+
+    def dump_oplogs(self, query=None):
+        """Log the latest oplog entries of every node."""
+        for host in [self.primary] + self.secondaries:
+            oplog = self.client(host).local["oplog.rs"]
+            entries = oplog.find(query or {}).sort("$natural",
+                                                   pymongo.DESCENDING).limit(_DUMP_LIMIT)
+            self.logger.info("Dumping the latest %d oplog entries matching %s of %s:\n%s",
+                             _DUMP_LIMIT, query or {}, host,
+                             "\n".join(str(entry) for entry in entries))
+
+
+def check_repl_dbhash(logger, clients, fixture, excluded_dbs=None, history=None):
+    """Check that the dbhashes match across the members of each replica set in 'fixture'.
+
+    If 'history' is a DBHashHistory, then only the collections written since the previous check are
+    rehashed when possible.
+    """
+
+    check = _check_dbhashes if history is None else history.check
+    excluded_dbs = ["local"] + list(excluded_dbs or [])
+    checks = []
+    for replica_set in get_replica_sets(fixture):
+        if not isinstance(replica_set, replicaset.ReplicaSetFixture):
+            logger.info("Skipping data consistency checks for stand-alone %s.", replica_set)
+            continue
+
+        checker = _ReplicaSetChecker(logger, clients, replica_set)
+        if not checker.discover():
+            logger.info("Skipping data consistency checks for 1-node replica set %s.",
+                        replica_set.replset_name)
+            continue
+        checks.append(lambda checker=checker: checker.run_locked(
+            lambda: check(checker, excluded_dbs)))
+
+    fixture_interface.call_in_parallel(checks)
+
+
+def _run_dbhash(client, db_name, coll_names=None):
+    """Run the dbHash command, retrying while a background operation is in progress.
+
+    If 'coll_names' is not None, then only those collections are hashed.
+    """
+
+    kwargs = {} if coll_names is None else {"collections": sorted(coll_names)}
+    while True:
+        try:
+            return client[db_name].command("dbHash", **kwargs)
+        except pymongo.errors.OperationFailure as err:
+            if err.code not in _BACKGROUND_OPERATION_IN_PROGRESS_CODES:
+                raise
+        time.sleep(0.1)
+
+
+def _get_coll_infos(client, db_name, coll_names):
+    """Return the listCollections entries of 'coll_names', keyed by collection name."""
+
+    coll_filter = {"$or": [{"type": "collection"}, {"type": {"$exists": False}}]}
+    return {
+        info["name"]: info
+        for info in client[db_name].list_collections(filter=coll_filter)
+        if info["name"] in coll_names
+    }
+
+
+def _get_coll_stats(client, db_name, coll_name):
+    try:
+        return client[db_name].command("collStats", coll_name)
+    except pymongo.errors.OperationFailure as err:
+        return err.details
+
+
+def _check_dbhashes(  # pylint: disable=too-many-locals,too-many-branches
+        checker, excluded_dbs, written=None):
+    """Compare the secondaries' dbhashes to the primary's, as checkDBHashesForReplSet() does.
+
+    If 'written' is not None, then only the databases it contains are checked. They are restricted
+    to the collections it maps them to, unless it maps them to None.
+    """
+
+    logger = checker.logger
+    primary_client = checker.client(checker.primary)
+    secondaries = checker.secondaries
+    config = primary_client.admin.command("replSetGetConfig")["config"]
+    build_indexes = {
+        member["host"]: member.get("buildIndexes", True)
+        for member in config["members"]
+    }
+
+    db_names = set()
+    for db_names_of_node in fixture_interface.call_in_parallel(
+        [lambda host=host: _list_database_names(checker.client(host))
+         for host in [checker.primary] + secondaries]):
+        db_names.update(db_names_of_node)
+
+    success = True
+    for db_name in sorted(db_names):
+        if db_name in excluded_dbs or (written is not None and db_name not in written):
+            continue
+
+        coll_names = None if written is None else written[db_name]
+        hosts = [checker.primary] + secondaries
+        hashes = fixture_interface.call_in_parallel([
+            lambda host=host: _run_dbhash(checker.client(host), db_name, coll_names)
+            for host in hosts
+        ])
+        coll_infos = fixture_interface.call_in_parallel([
+            lambda host=host, res=res: _get_coll_infos(checker.client(host), db_name,
+                                                       set(res["collections"]))
+            for (host, res) in zip(hosts, hashes)
+        ])
+
+        primary_hash = hashes[0]
+        primary_infos = coll_infos[0]
+        primary_collections = list(primary_hash["collections"])
+        non_capped = [
+            name for (name, info) in primary_infos.items()
+            if not info.get("options", {}).get("capped")
+        ]
+
+        for (host, secondary_hash, secondary_infos) in zip(secondaries, hashes[1:], coll_infos[1:]):
+            mismatched = set()
+
+            secondary_collections = list(secondary_hash["collections"])
+            if len(primary_collections) != len(secondary_collections):
+                logger.error(
+                    "The primary %s and secondary %s have a different number of collections in"
+                    " %s: %s vs. %s", checker.primary, host, db_name, primary_hash,
+                    secondary_hash)
+                mismatched.update(set(primary_collections) ^ set(secondary_collections))
+
+            for coll_name in non_capped:
+                if primary_hash["collections"][coll_name] != secondary_hash["collections"].get(
+                        coll_name):
+                    logger.error(
+                        "The primary %s and secondary %s have a different hash for the collection"
+                        " %s.%s", checker.primary, host, db_name, coll_name)
+                    mismatched.add(coll_name)
+
+            for (coll_name, secondary_info) in secondary_infos.items():
+                primary_info = primary_infos.get(coll_name)
+                if primary_info is None or primary_info.get("type") != secondary_info.get("type"):
+                    continue
+                if _normalize_coll_info(primary_info) != _normalize_coll_info(secondary_info):
+                    logger.error(
+                        "The primary %s and secondary %s have different attributes for the"
+                        " collection or view %s.%s: %s vs. %s", checker.primary, host, db_name,
+                        coll_name, primary_info, secondary_info)
+                    mismatched.add(coll_name)
+
+            has_secondary_indexes = build_indexes.get(host, True) is not False
+            for coll_name in primary_collections:
+                reasons = _compare_coll_stats(
+                    _get_coll_stats(primary_client, db_name, coll_name),
+                    _get_coll_stats(checker.client(host), db_name, coll_name),
+                    has_secondary_indexes)
+                if reasons:
+                    logger.error(
+                        "The primary %s and secondary %s have different stats for the collection"
+                        " %s.%s: %s", checker.primary, host, db_name, coll_name,
+                        ", ".join(reasons))
+                    mismatched.add(coll_name)
+
+            # If there aren't any capped collections, then the hashes of the whole database
+            # should match too.
+            if (len(non_capped) == len(primary_collections)
+                    and primary_hash["md5"] != secondary_hash["md5"]):
+                logger.error(
+                    "The primary %s and secondary %s have a different hash for the %s database",
+                    checker.primary, host, db_name)
+                success = False
+
+            for coll_name in sorted(mismatched):
+                _log_collection_diff(logger, primary_client, checker.client(host), db_name,
+                                     coll_name)
+            success = success and not mismatched
+
+    if not success:
+        checker.dump_oplogs()
+        raise errors.TestFailure("dbhash mismatch between primary and secondary")
+
+
+_HashedPosition = collections.namedtuple("_HashedPosition", ["primary", "ts", "num_incremental"])
+
+
+class DBHashHistory(object):
+    """Remember how far into the oplog each replica set has been hashed.
+
+    Only the collections written by the oplog entries after that point need to be rehashed, since
+    the rest of the data was already found to match. Every collection is rehashed on every
+    'full_check_interval'th check, after the primary changes, and when the entries after that point
+    may have been truncated from the oplog, in case the nodes diverged without writing to the oplog.
+    """
+
+    def __init__(self, full_check_interval):
+        """Initialize the DBHashHistory."""
+        self._full_check_interval = full_check_interval
+        self._lock = threading.Lock()
+        self._positions = {}
+
+    def check(self, checker, excluded_dbs):
+        """Compare the dbhashes of the replica set of 'checker' while it is locked."""
+
+        primary_client = checker.client(checker.primary)
+        last_ts = _get_last_oplog_ts(primary_client)
+        with self._lock:
+            position = self._positions.get(checker.replset_name)
+
+        written = None
+        if (position is not None and position.primary == checker.primary
+                and position.num_incremental + 1 < self._full_check_interval):
+            written = _get_written_namespaces(primary_client, position.ts)
+
+        if written is None:
+            checker.logger.info("Hashing every collection of replica set %s.",
+                                checker.replset_name)
+        else:
+            checker.logger.info("Hashing the collections of replica set %s written since %s: %s",
+                                checker.replset_name, position.ts, written)
+        _check_dbhashes(checker, excluded_dbs, written)
+
+        num_incremental = 0 if written is None else position.num_incremental + 1
+        with self._lock:
+            self._positions[checker.replset_name] = _HashedPosition(checker.primary, last_ts,
+                                                                    num_incremental)
+
+
+def _get_last_oplog_ts(client):
+    """Return the timestamp of the newest oplog entry, or None if the oplog is empty."""
+    entry = client.local["oplog.rs"].find_one(sort=[("$natural", pymongo.DESCENDING)])
+    return None if entry is None else entry["ts"]
+
+
+def _get_written_namespaces(client, since_ts):
+    """Return the collections written by the oplog entries after 'since_ts', keyed by database.
+
+    A database maps to None when a command may have changed any of its collections. Return None if
+    the oplog no longer contains the entry at 'since_ts'.
+    """
+
+    if since_ts is None:
+        return None
+
+    oplog = client.local["oplog.rs"]
+    first_entry = oplog.find_one(sort=[("$natural", pymongo.ASCENDING)])
+    if first_entry is None or first_entry["ts"] > since_ts:
+        return None
+
+    written = {}
+    projection = {"op": 1, "ns": 1, "o.applyOps": 1, "o.renameCollection": 1, "o.to": 1}
+    for entry in oplog.find({"ts": {"$gt": since_ts}}, projection):
+        _add_written_namespaces(written, entry)
+
+    if written:
+        for (db_name, coll_names) in _DERIVED_NAMESPACES.items():
+            if written.setdefault(db_name, set()) is not None:
+                written[db_name].update(coll_names)
+    return written
+
+
+def _add_written_namespaces(written, entry):
+    """Add the collections written by the oplog entry 'entry' to 'written'."""
+
+    (db_name, _, coll_name) = entry.get("ns", "").partition(".")
+    if entry.get("op") == "n" or not db_name:
+        return
+
+    if entry.get("op") != "c":
+        if written.setdefault(db_name, set()) is not None:
+            written[db_name].add(coll_name)
+        return
+
+    command = entry.get("o", {})
+    if "applyOps" in command:
+        # Transactions and applyOps commands nest the oplog entries of their operations.
+        for nested_entry in command["applyOps"]:
+            _add_written_namespaces(written, nested_entry)
+        return
+
+    written[db_name] = None
+    if "renameCollection" in command:
+        for namespace in (command["renameCollection"], command.get("to", "")):
+            written[namespace.partition(".")[0]] = None
+
+
+def _normalize_coll_info(info):
+    """Return the BSON of a listCollections entry without the fields that may legitimately differ.
+
+    The 'flags' collection option was removed in 4.2 and the 'ns' field of the _id index spec was
+    removed in 4.4.
+    """
+
+    info = dict(info)
+    info["options"] = dict(info.get("options", {}), flags=None)
+    if "idIndex" in info:
+        info["idIndex"] = {key: value for (key, value) in info["idIndex"].items() if key != "ns"}
+    return bson.BSON.encode(info)
+
+
+def _compare_coll_stats(primary_stats, secondary_stats, has_secondary_indexes):
+    """Return the reasons why the collStats of the primary and secondary don't match."""
+
+    if primary_stats.get("ok") != 1 or secondary_stats.get("ok") != 1:
+        return ["collStats failed"]
+
+    reasons = []
+    if primary_stats.get("capped") != secondary_stats.get("capped"):
+        reasons.append("capped")
+    if primary_stats.get("ns") != secondary_stats.get("ns"):
+        reasons.append("ns")
+    if has_secondary_indexes and primary_stats.get("nindexes") != secondary_stats.get("nindexes"):
+        reasons.append("indexes")
+
+    primary_builds = primary_stats.get("indexBuilds")
+    secondary_builds = secondary_stats.get("indexBuilds")
+    builds_match = (primary_builds is None) == (secondary_builds is None) and (
+        primary_builds is None or set(primary_builds) == set(secondary_builds))
+    if has_secondary_indexes and not builds_match:
+        reasons.append("indexBuilds")
+    return reasons
+
+
+def _log_collection_diff(  # pylint: disable=too-many-arguments
+        logger, primary_client, secondary_client, db_name, coll_name):
+    """Log the documents that are missing from or differ between the primary and secondary."""
+
+    def documents_by_id(client):
+        coll = client[db_name].get_collection(coll_name, codec_options=_RAW_CODEC_OPTIONS)
+        return {bson.BSON.encode({"_id": doc["_id"]}): doc for doc in coll.find()}
+
+    try:
+        primary_docs = documents_by_id(primary_client)
+        secondary_docs = documents_by_id(secondary_client)
+    except pymongo.errors.PyMongoError as err:
+        logger.error("Failed to diff the collection %s.%s: %s", db_name, coll_name, err)
+        return
+
+    diff = []
+    for (doc_id, primary_doc) in primary_docs.items():
+        secondary_doc = secondary_docs.get(doc_id)
+        if secondary_doc is None:
+            diff.append("missing on secondary: {}".format(dict(primary_doc.items())))
+        elif secondary_doc.raw != primary_doc.raw:
+            diff.append("different contents: {} vs. {}".format(
+                dict(primary_doc.items()), dict(secondary_doc.items())))
+    for (doc_id, secondary_doc) in secondary_docs.items():
+        if doc_id not in primary_docs:
+            diff.append("missing on primary: {}".format(dict(secondary_doc.items())))
+
+    logger.error("Differences in the collection %s.%s:\n%s", db_name, coll_name,
+                 "\n".join(diff[:_DUMP_LIMIT]))
+
+
+def check_repl_oplogs(logger, clients, fixture):
+    """Check that the oplogs match across the members of each replica set in 'fixture'."""
+
+    checks = []
+    for replica_set in get_replica_sets(fixture):
+        if not isinstance(replica_set, replicaset.ReplicaSetFixture):
+            continue
+
+        checker = _ReplicaSetChecker(logger, clients, replica_set)
+        if checker.discover():
+            checks.append(lambda checker=checker: checker.run_locked(
+                lambda: _check_oplogs(checker)))
+
+    fixture_interface.call_in_parallel(checks)
+
+
+class _OplogReader(object):
+    """Read the oplog of a node from the newest entry to the oldest, as checkOplogs() does."""
+
+    def __init__(self, host, client):
+        """Initialize the _OplogReader."""
+        self.host = host
+        self._oplog = client.local.get_collection(
+            "oplog.rs", codec_options=_RAW_CODEC_OPTIONS, read_concern=ReadConcern("local"))
+        self._cursor = None
+
+    def get_first_ts(self):
+        """Return the timestamp of the oldest oplog entry."""
+        entry = next(iter(self._oplog.find().sort("$natural", pymongo.ASCENDING).limit(-1)))
+        return entry["ts"]
+
+    def query(self):
+        """Start reading from the newest entry."""
+        self._cursor = self._oplog.find({"ts": {"$gte": bson.Timestamp(0, 0)}},
+                                        no_cursor_timeout=True).sort("$natural", pymongo.DESCENDING)
+
+    def next(self):
+        """Return the next older entry, or None if the oplog has been read or truncated."""
+        if self._cursor is None:
+            return None
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            pass
+        except pymongo.errors.OperationFailure as err:
+            if err.code != _CAPPED_POSITION_LOST:
+                raise
+        self.close()
+        return None
+
+    def close(self):
+        """Close the cursor."""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+
+def _check_oplogs(checker):
+    """Compare the oplog entries of every node against the node with the longest oplog."""
+
+    hosts = [checker.primary] + checker.secondaries
+    readers = [_OplogReader(host, checker.client(host)) for host in hosts]
+    first_ts = fixture_interface.call_in_parallel([reader.get_first_ts for reader in readers])
+    # The reader whose oldest entry is the oldest has the most entries.
+    first_reader = readers[min(range(len(readers)), key=lambda i: first_ts[i])]
+    other_readers = [reader for reader in readers if reader is not first_reader]
+
+    for reader in readers:
+        reader.query()
+    try:
+        entry = first_reader.next()
+        if entry is None:
+            raise errors.TestFailure("oplog is empty while checkOplogs is called")
+
+        prev_entry = None
+        while entry is not None:
+            for reader in other_readers:
+                other_entry = reader.next()
+                if other_entry is not None and other_entry.raw != entry.raw:
+                    checker.dump_oplogs(
+                        {"ts": {"$lte": prev_entry["ts"]}} if prev_entry is not None else None)
+                    raise errors.TestFailure(
+                        "checkOplogs, non-matching oplog entries for the following nodes:\n"
+                        "{}: {}\n{}: {}".format(first_reader.host, dict(entry.items()),
+                                                reader.host, dict(other_entry.items())))
+            prev_entry = entry
+            entry = first_reader.next()
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def validate_collections(logger, clients, fixture, test_data,
+                         max_concurrent_validations_per_node=None):
+    """Validate every collection on every node of 'fixture'.
+
+    Full validation is run unless TestData.validateBackground is set. The nodes are validated
+    concurrently, and up to 'max_concurrent_validations_per_node' collections are validated at once
+    on each node.
+    """
+
+    hosts = []
+    for replica_set in get_replica_sets(fixture):
+        if isinstance(replica_set, replicaset.ReplicaSetFixture):
+            # Like DiscoverTopology.findConnectedNodes(), hidden members and arbiters are omitted.
+            primary = replica_set.get_primary().get_internal_connection_string()
+            res = clients.get(primary).admin.command("isMaster")
+            hosts.extend(res["hosts"] + res.get("passives", []))
+        else:
+            hosts.append(replica_set.get_internal_connection_string())
+
+    failures = [
+        failure for failures_of_node in fixture_interface.call_in_parallel([
+            lambda host=host: _validate_node(logger, clients.get(host), host, test_data,
+                                             max_concurrent_validations_per_node)
+            for host in hosts
+        ]) for failure in failures_of_node
+    ]
+    if failures:
+        raise errors.TestFailure("Collection validation failed: {}".format(failures))
+
+
+def _validate_node(  # pylint: disable=too-many-locals
+        logger, client, host, test_data, max_concurrent_validations=None):
+    """Validate the collections of every database on 'host' and return the failed responses."""
+
+    if _is_arbiter(client):
+        logger.info("Skipping collection validation on arbiter %s", host)
+        return []
+
+    coll_filter = {"type": "collection"}
+    if test_data.get("skipValidationOnInvalidViewDefinitions"):
+        coll_filter = {"$or": [coll_filter, {"type": {"$exists": False}}]}
+
+    namespaces = []
+    for db_name in _list_database_names(client):
+        db_filter = coll_filter
+        skipped = [{
+            "name": {"$ne": ns[len(db_name) + 1:]}
+        } for ns in test_data.get("skipValidationNamespaces", []) if ns.startswith(db_name + ".")]
+        if skipped:
+            db_filter = {"$and": [coll_filter] + skipped}
+        namespaces.extend((db_name, info["name"])
+                          for info in client[db_name].list_collections(filter=db_filter))
+
+    if not namespaces:
+        return []
+
+    start_time = time.time()
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrent_validations
+            or DEFAULT_MAX_CONCURRENT_VALIDATIONS_PER_NODE) as executor:
+        results = list(
+            executor.map(lambda ns: _validate_collection(logger, client, host, ns, test_data),
+                         namespaces))
+
+    durations = sorted(((duration_secs, namespace)
+                        for (namespace, (duration_secs, _)) in zip(namespaces, results)),
+                       reverse=True)
+    logger.info(
+        "Validated %d collections on %s in %d ms. The slowest were: %s", len(namespaces), host,
+        (time.time() - start_time) * 1000, ", ".join(
+            "{}.{} ({:d} ms)".format(db_name, coll_name, int(duration_secs * 1000))
+            for (duration_secs, (db_name, coll_name)) in
+            durations[:_NUM_SLOWEST_VALIDATIONS_REPORTED]))
+    return [failure for (_, failure) in results if failure is not None]
+
+
+def _validate_collection(logger, client, host, namespace, test_data):
+    """Validate a collection.
+
+    Return the number of seconds validation took and, if the collection failed validation, the
+    response.
+    """
+
+    (db_name, coll_name) = namespace
+    # Background validation can't be combined with full validation.
+    options = {"background": True} if test_data.get("validateBackground") else {"full": True}
+    start_time = time.time()
+    try:
+        res = client[db_name].command("validate", coll_name, **options)
+    except pymongo.errors.OperationFailure as err:
+        res = err.details
+        # jsTestOptions() defaults skipValidationOnNamespaceNotFound to true.
+        if (test_data.get("skipValidationOnNamespaceNotFound", True)
+                and err.code == _NAMESPACE_NOT_FOUND):
+            logger.info("Skipping collection validation for %s.%s since collection was not found",
+                        db_name, coll_name)
+            return (time.time() - start_time, None)
+    duration_secs = time.time() - start_time
+
+    if res.get("ok") == 1 and res.get("valid"):
+        return (duration_secs, None)
+
+    coll = client[db_name][coll_name]
+    logger.error(
+        "Collection validation failed on host %s with response: %s\nIndexes of %s.%s: %s\n"
+        "The first %d documents:\n%s", host, res, db_name, coll_name,
+        list(coll.list_indexes()), _DUMP_LIMIT,
+        "\n".join(str(doc) for doc in coll.find().limit(_DUMP_LIMIT)))
+    return (duration_secs, {"host": host, "ns": "{}.{}".format(db_name, coll_name), "res": res})
@@ -2,6 +2,8 @@
 
 import os.path
 
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib.testing.hooks import consistency_checks
 from buildscripts.resmokelib.testing.hooks import jsfile
 
 
@@ -19,3 +21,20 @@ class CheckReplDBHash(jsfile.DataConsistencyHook):
         js_filename = os.path.join("jstests", "hooks", "run_check_repl_dbhash.js")
         jsfile.JSHook.__init__(  # pylint: disable=non-parent-init-called
             self, hook_logger, fixture, js_filename, description, shell_options=shell_options)
+
+        self._history = None
+        if config.INCREMENTAL_DBHASH is not None:
+            self._history = consistency_checks.DBHashHistory(config.INCREMENTAL_DBHASH)
+
+    def _make_python_check(self):
+        """Return a function comparing the dbhashes with pymongo, if supported by the fixture."""
+        # TestData.checkCollectionCounts isn't supported by the Python check, so the suites that
+        # set it keep running run_check_repl_dbhash.js.
+        test_data = consistency_checks.get_test_data(self._shell_options,
+                                                     {"excludedDBsFromDBHash"})
+        if test_data is None or consistency_checks.get_replica_sets(self.fixture) is None:
+            return None
+
+        clients = self._get_node_clients()
+        return lambda logger: consistency_checks.check_repl_dbhash(
+            logger, clients, self.fixture, test_data.get("excludedDBsFromDBHash"), self._history)
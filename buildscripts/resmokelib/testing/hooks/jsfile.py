@@ -1,6 +1,8 @@
 """Interface for customizing the behavior of a test fixture by executing a JavaScript file."""
 
+from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.hooks import consistency_checks
 from buildscripts.resmokelib.testing.hooks import interface
 from buildscripts.resmokelib.testing.testcases import jstest
 from buildscripts.resmokelib.utils import registry
@@ -43,14 +45,50 @@ class DataConsistencyHook(JSHook):
 
     If the mongo shell process running the JavaScript file exits with a non-zero return code, then
     an errors.ServerFailure exception is raised to cause resmoke.py's test execution to stop.
+
+    When --pythonConsistencyChecks is specified, subclasses that implement _make_python_check() run
+    the check with pymongo instead of spawning a mongo shell.
     """
 
     REGISTERED_NAME = registry.LEAVE_UNREGISTERED
 
+    # Subclasses call JSHook.__init__() directly, so the connections used by the Python checks are
+    # created on first use.
+    _node_clients = None
+
+    def _make_python_check(self):  # pylint: disable=no-self-use
+        """Return a function of a logger that runs the check, or None to use the JavaScript file.
+
+        Callback that can be overridden by subclasses with a Python implementation of the check.
+        """
+        return None
+
+    def _get_node_clients(self):
+        """Return the connections to the nodes, which are kept open for the rest of the suite."""
+        if self._node_clients is None:
+            self._node_clients = consistency_checks.NodeClients()
+        return self._node_clients
+
+    def after_suite(self, test_report):
+        """After suite execution."""
+        if self._node_clients is not None:
+            self._node_clients.close()
+            self._node_clients = None
+
     def after_test(self, test, test_report):
         """After test execution."""
+        check = None
+        if config.PYTHON_CONSISTENCY_CHECKS and self._should_run_after_test():
+            check = self._make_python_check()
+
         try:
-            JSHook.after_test(self, test, test_report)
+            if check is None:
+                JSHook.after_test(self, test, test_report)
+            else:
+                hook_test_case = consistency_checks.PythonCheckTestCase.create_after_test(
+                    self.logger, test, self, check)
+                hook_test_case.configure(self.fixture)
+                hook_test_case.run_dynamic_test(test_report)
         except errors.TestFailure as err:
             raise errors.ServerFailure(err.args[0])
 
@@ -2,6 +2,7 @@
 
 import os.path
 
+from buildscripts.resmokelib.testing.hooks import consistency_checks
 from buildscripts.resmokelib.testing.hooks import jsfile
 
 
@@ -15,3 +16,12 @@ class CheckReplOplogs(jsfile.DataConsistencyHook):  # pylint: disable=non-parent
         js_filename = os.path.join("jstests", "hooks", "run_check_repl_oplogs.js")
         jsfile.JSHook.__init__(  # pylint: disable=non-parent-init-called
             self, hook_logger, fixture, js_filename, description, shell_options=shell_options)
+
+    def _make_python_check(self):
+        """Return a function comparing the oplogs with pymongo, if supported by the fixture."""
+        if (consistency_checks.get_test_data(self._shell_options, set()) is None
+                or consistency_checks.get_replica_sets(self.fixture) is None):
+            return None
+
+        clients = self._get_node_clients()
+        return lambda logger: consistency_checks.check_repl_oplogs(logger, clients, self.fixture)
@@ -1,21 +1,54 @@
 """Test hook for verifying the consistency and integrity of collection and index data."""
 
+import copy
 import os.path
 
+from buildscripts.resmokelib.testing.hooks import consistency_checks
 from buildscripts.resmokelib.testing.hooks import jsfile
 
 
 class ValidateCollections(jsfile.DataConsistencyHook):
-    """Run full validation.
+    """Run full or background validation.
 
     This will run on all collections in all databases on every stand-alone
     node, primary replica-set node, or primary shard node.
     """
 
-    def __init__(  # pylint: disable=super-init-not-called
-            self, hook_logger, fixture, shell_options=None):
-        """Initialize ValidateCollections."""
+    def __init__(  # pylint: disable=super-init-not-called,too-many-arguments
+            self, hook_logger, fixture, shell_options=None, background=False,
+            max_concurrent_validations_per_node=None):
+        """Initialize ValidateCollections.
+
+        :param background: Whether to run background validation rather than full validation.
+        :param max_concurrent_validations_per_node: The number of collections validated at once on
+            each node when --pythonConsistencyChecks is specified.
+        """
         description = "Full collection validation"
+        if background:
+            description = "Background collection validation"
+            shell_options = copy.deepcopy(shell_options) if shell_options is not None else {}
+            test_data = shell_options.setdefault("global_vars", {}).setdefault("TestData", {})
+            test_data["validateBackground"] = True
+
         js_filename = os.path.join("jstests", "hooks", "run_validate_collections.js")
         jsfile.JSHook.__init__(  # pylint: disable=non-parent-init-called
             self, hook_logger, fixture, js_filename, description, shell_options=shell_options)
+
+        self._max_concurrent_validations_per_node = max_concurrent_validations_per_node
+
+    def _make_python_check(self):
+        """Return a function validating the collections with pymongo, if supported."""
+        # The Python check doesn't change the featureCompatibilityVersion, so the suites that set
+        # TestData.forceValidationWithFeatureCompatibilityVersion keep running
+        # run_validate_collections.js.
+        test_data = consistency_checks.get_test_data(
+            self._shell_options, {
+                "skipValidationNamespaces", "skipValidationOnInvalidViewDefinitions",
+                "skipValidationOnNamespaceNotFound", "validateBackground"
+            })
+        if test_data is None or consistency_checks.get_replica_sets(self.fixture) is None:
+            return None
+
+        clients = self._get_node_clients()
+        return lambda logger: consistency_checks.validate_collections(
+            logger, clients, self.fixture, test_data, self._max_concurrent_validations_per_node)
@@ -7,6 +7,7 @@ from collections import defaultdict
 
 from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.core import network
 from buildscripts.resmokelib.testing import testcases
 from buildscripts.resmokelib.testing.hooks import stepdown
 from buildscripts.resmokelib.testing.testcases import fixture as _fixture
@@ -44,7 +45,8 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         # Drain the queue to unblock the main thread.
         Job._drain_queue(queue)
 
-    def __call__(self, queue, interrupt_flag, setup_flag=None, teardown_flag=None):
+    def __call__(  # pylint: disable=too-many-arguments
+            self, queue, interrupt_flag, setup_flag=None, teardown_flag=None, job_controller=None):
         """Continuously execute tests from 'queue' and records their details in 'report'.
 
         If 'setup_flag' is not None, then a test to set up the fixture will be run
@@ -53,9 +55,15 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         If 'teardown_flag' is not None, then a test to tear down the fixture
         will be run before this method returns. If an error occurs
         while destroying the fixture, then the 'teardown_flag' will be set.
+        If 'job_controller' is not None, then a test is only taken from 'queue' while the
+        JobController permits this job to run tests. The fixture isn't set up until the job is
+        first permitted to run tests so that a parked job doesn't hold on to the memory of a
+        running fixture, and it isn't set up at all if the queue is drained before then.
         """
         setup_succeeded = True
-        if setup_flag is not None:
+        permitted = job_controller is None or job_controller.wait_until_permitted(
+            self.manager.job_num, queue, interrupt_flag)
+        if permitted and setup_flag is not None:
             try:
                 setup_succeeded = self.manager.setup_fixture(self.logger)
             except errors.StopExecution as err:
@@ -75,9 +83,9 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
                 setup_flag.set()
                 self._interrupt_all_jobs(queue, interrupt_flag)
 
-        if setup_succeeded:
+        if permitted and setup_succeeded:
             try:
-                self._run(queue, interrupt_flag)
+                self._run(queue, interrupt_flag, job_controller)
             except errors.StopExecution as err:
                 # Stop running tests immediately.
                 self.logger.error("Received a StopExecution exception: %s.", err)
@@ -87,7 +95,9 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
                 self.logger.exception("Encountered an error during test execution.")
                 self._interrupt_all_jobs(queue, interrupt_flag)
 
-        if teardown_flag is not None:
+        # A job that was never permitted to run tests only has a fixture to tear down if it was set
+        # up during an earlier repetition of the suite.
+        if teardown_flag is not None and (permitted or self.manager.fixture_started):
             try:
                 teardown_succeeded = self.manager.teardown_fixture(self.logger)
             except errors.StopExecution as err:
@@ -113,19 +123,24 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         """Get current time to aid in the unit testing of the _run method."""
         return time.time()
 
-    def _run(self, queue, interrupt_flag):
+    def _run(self, queue, interrupt_flag, job_controller=None):
         """Call the before/after suite hooks and continuously execute tests from 'queue'."""
 
         for hook in self.hooks:
             hook.before_suite(self.report)
 
         while not queue.empty() and not interrupt_flag.is_set():
+            if job_controller is not None and not job_controller.wait_until_permitted(
+                    self.manager.job_num, queue, interrupt_flag):
+                break
             queue_elem = queue.get_nowait()
             test_time_start = self._get_time()
             try:
                 test = queue_elem.testcase
                 self._execute_test(test)
             finally:
+                # The hooks run after the test are done with the ports leased to it too.
+                network.PortAllocator.release_test_ports(self.manager.job_num)
                 queue_elem.job_completed(self._get_time() - test_time_start)
                 queue.task_done()
 
@@ -321,6 +336,9 @@ class FixtureTestCaseManager:
         self.job_num = job_num
         self.report = report
         self.times_set_up = 0  # Setups and kills may run multiple times.
+        # Whether the fixture may have processes running, i.e. it was set up (successfully or not)
+        # since it was last torn down.
+        self.fixture_started = False
 
     def setup_fixture(self, logger):
         """
@@ -328,6 +346,7 @@ class FixtureTestCaseManager:
 
         Return True if the setup was successful, False otherwise.
         """
+        self.fixture_started = True
         test_case = _fixture.FixtureSetupTestCase(self.test_queue_logger, self.fixture,
                                                   "job{}".format(self.job_num), self.times_set_up)
         test_case(self.report)
@@ -357,4 +376,7 @@ class FixtureTestCaseManager:
             logger.error("The teardown of %s failed.", self.fixture)
             return False
 
+        if not abort:
+            self.fixture_started = False
+            network.PortAllocator.release_fixture_ports(self.job_num)
         return True
@@ -0,0 +1,187 @@
+"""Adjust the number of Job instances running tests based on the load of the host.
+
+All of the Job instances are started, but only the ones with a job number below the current limit
+take tests from the queue. The others are parked between tests until the limit is raised again. The
+limit is raised while the host has spare CPU and memory and lowered as soon as it is overloaded, so
+that shared hosts are neither left idle nor pushed into swapping and timeouts.
+"""
+
+import collections
+import os
+import threading
+
+import psutil
+
+HostSample = collections.namedtuple(
+    "HostSample",
+    ["cpu_percent", "available_memory", "total_memory", "load_per_cpu", "fixture_rss"])
+
+
+def sample_host(fixtures):
+    """Return a HostSample of the CPU, memory, and load average of the host.
+
+    The 'fixture_rss' field is the combined resident memory of the processes of 'fixtures'.
+    """
+
+    memory = psutil.virtual_memory()
+    try:
+        load_per_cpu = os.getloadavg()[0] / (psutil.cpu_count() or 1)
+    except (AttributeError, OSError):
+        # os.getloadavg() isn't available on Windows.
+        load_per_cpu = None
+
+    return HostSample(
+        cpu_percent=psutil.cpu_percent(interval=None), available_memory=memory.available,
+        total_memory=memory.total, load_per_cpu=load_per_cpu,
+        fixture_rss=sum(_get_fixture_rss(fixture) for fixture in fixtures))
+
+
+def _get_fixture_rss(fixture):
+    """Return the combined resident memory of the processes of 'fixture'."""
+
+    try:
+        pids = fixture.pids()
+    except NotImplementedError:
+        return 0
+
+    rss = 0
+    for pid in pids:
+        try:
+            rss += psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            # The process may have exited since the fixture reported its pid.
+            pass
+    return rss
+
+
+class JobController(threading.Thread):
+    """Periodically sample the host and decide how many Job instances may run tests."""
+
+    # The number of seconds between samples of the host.
+    _INTERVAL_SECS = 5.0
+
+    # The number of seconds a parked Job instance waits before checking whether the queue was
+    # drained or the suite interrupted.
+    _POLL_SECS = 1.0
+
+    # The limit is lowered when any of these is exceeded.
+    _MAX_CPU_PERCENT = 90.0
+    _MAX_LOAD_PER_CPU = 1.5
+    _MIN_AVAILABLE_MEMORY_FRACTION = 0.1
+
+    # The limit is raised when the host is below all of these.
+    _TARGET_CPU_PERCENT = 75.0
+    _TARGET_LOAD_PER_CPU = 1.0
+
+    # The memory that must be available before another Job instance is allowed to run tests, as a
+    # multiple of the average resident memory of a fixture.
+    _MEMORY_HEADROOM_FACTOR = 2.0
+
+    def __init__(self, logger, fixtures, initial_limit=None):
+        """Initialize the JobController.
+
+        :param logger: The logger to report changes to the limit to.
+        :param fixtures: The fixtures of the Job instances, indexed by job number.
+        :param initial_limit: The number of Job instances allowed to run tests at first. Defaults to
+            half of the Job instances.
+        """
+
+        threading.Thread.__init__(self, name="JobController")
+        self.daemon = True
+        self.logger = logger
+
+        self._fixtures = list(fixtures)
+        self._max_limit = len(self._fixtures)
+        if initial_limit is None:
+            initial_limit = (self._max_limit + 1) // 2
+        self._limit = min(max(1, initial_limit), self._max_limit)
+
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+
+    @property
+    def limit(self):
+        """Return the number of Job instances currently allowed to run tests."""
+
+        with self._condition:
+            return self._limit
+
+    def decide(self, limit, sample):
+        """Return the limit that should follow 'limit' given the HostSample 'sample'.
+
+        The limit changes by at most one Job instance per sample so the effect of each change is
+        observed before the next one.
+        """
+
+        min_available_memory = sample.total_memory * JobController._MIN_AVAILABLE_MEMORY_FRACTION
+        overloaded = (sample.available_memory < min_available_memory
+                      or sample.cpu_percent > JobController._MAX_CPU_PERCENT
+                      or (sample.load_per_cpu is not None
+                          and sample.load_per_cpu > JobController._MAX_LOAD_PER_CPU))
+        if overloaded:
+            return max(1, limit - 1)
+
+        if limit >= self._max_limit:
+            return limit
+
+        underused = (sample.cpu_percent < JobController._TARGET_CPU_PERCENT
+                     and (sample.load_per_cpu is None
+                          or sample.load_per_cpu < JobController._TARGET_LOAD_PER_CPU))
+        rss_per_fixture = sample.fixture_rss / max(1, len(self._fixtures))
+        memory_headroom = rss_per_fixture * JobController._MEMORY_HEADROOM_FACTOR
+        if underused and sample.available_memory - memory_headroom >= min_available_memory:
+            return limit + 1
+
+        return limit
+
+    def wait_until_permitted(self, job_num, queue, interrupt_flag):
+        """Block while the Job instance 'job_num' is parked.
+
+        Return true if the Job instance may take another test from 'queue', and false if it should
+        stop instead because the queue was drained or 'interrupt_flag' was set.
+        """
+
+        with self._condition:
+            while job_num >= self._limit:
+                if queue.empty() or interrupt_flag.is_set():
+                    return False
+                self._condition.wait(JobController._POLL_SECS)
+        return True
+
+    def run(self):
+        """Sample the host and adjust the limit until stop() is called."""
+
+        # The first call to psutil.cpu_percent() only records the CPU times to compare against.
+        psutil.cpu_percent(interval=None)
+        while not self._stop_event.wait(JobController._INTERVAL_SECS):
+            try:
+                sample = sample_host(self._fixtures)
+            except psutil.Error:
+                self.logger.exception("Failed to sample the load of the host.")
+                continue
+            self._set_limit(self.decide(self.limit, sample), sample)
+
+    def stop(self):
+        """Stop sampling the host and let every parked Job instance run again."""
+
+        self._stop_event.set()
+        self._set_limit(self._max_limit)
+        if self.is_alive():
+            self.join()
+
+    def _set_limit(self, limit, sample=None):
+        """Change the limit and wake up the parked Job instances."""
+
+        with self._condition:
+            if limit == self._limit:
+                return
+            self._limit = limit
+            self._condition.notify_all()
+
+        if sample is not None:
+            self.logger.info(
+                "Allowing %d of %d jobs to run tests: CPU %.1f%%, load per CPU %s, %d MB of"
+                " memory available, fixtures using %d MB.", limit, self._max_limit,
+                sample.cpu_percent, "n/a" if sample.load_per_cpu is None else "{:.2f}".format(
+                    sample.load_per_cpu), sample.available_memory // 2**20,
+                sample.fixture_rss // 2**20)
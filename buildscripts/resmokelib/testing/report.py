@@ -4,6 +4,7 @@ This is used to support additional test status and timing information for the re
 """
 
 import copy
+import json
 import threading
 import time
 import unittest
@@ -11,18 +12,32 @@ import unittest
 from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib import logging
 
+# The counter of the TestReport for each test status.
+_STATUS_COUNTERS = {
+    "pass": "num_succeeded",
+    "fail": "num_failed",
+    "error": "num_errored",
+    "timeout": "num_interrupted",
+}
+
 
 # pylint: disable=attribute-defined-outside-init
 class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attributes
     """Record test status and timing information."""
 
-    def __init__(self, job_logger, suite_options, job_num=None):
+    def __init__(  # pylint: disable=too-many-arguments
+            self, job_logger, suite_options, job_num=None, stream_writer=None,
+            runtime_history=None):
         """
         Initialize the TestReport with the buildlogger configuration.
 
         :param job_logger: The higher-level logger that will be used to print metadata about the test.
         :param suite_options: Options for the suite being executed.
         :param job_num: The number corresponding to the job this test runs in.
+        :param stream_writer: The ReportStreamWriter the results of finished tests are appended to.
+            Only the tests that didn't pass are kept once their results are streamed.
+        :param runtime_history: The TestRuntimeHistory the runtimes of streamed tests are recorded
+            in, since they are no longer in the report afterwards.
         """
 
         unittest.TestResult.__init__(self)
@@ -33,6 +48,8 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         self.logging_prefix = None
 
         self._lock = threading.Lock()
+        self._stream_writer = stream_writer
+        self._runtime_history = runtime_history
 
         self.reset()
 
@@ -57,46 +74,18 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
                 raise TypeError("reports must be a list of TestReport instances")
 
             with report._lock:  # pylint: disable=protected-access
-                for test_info in report.test_infos:
-                    # If the user triggers a KeyboardInterrupt exception while a test is running,
-                    # then it is possible for 'test_info' to be modified by a job thread later on.
-                    # We make a shallow copy in order to ensure 'num_interrupted' is consistent with
-                    # the actual number of tests that have status equal to "timeout".
-                    test_info = copy.copy(test_info)
-
-                    # TestReport.addXX() may not have been called.
-                    if test_info.status is None or test_info.return_code is None:
-                        # Mark the test as having timed out if it was interrupted. It might have
-                        # passed if the suite ran to completion, but we wouldn't know for sure.
-                        #
-                        # Until EVG-1536 is completed, we shouldn't distinguish between failures and
-                        # interrupted tests in the report.json file. In Evergreen, the behavior to
-                        # sort tests with the "timeout" test status after tests with the "pass" test
-                        # status effectively hides interrupted tests from the test results sidebar
-                        # unless sorting by the time taken.
-                        test_info.status = "timeout"
-                        test_info.evergreen_status = "fail"
-                        test_info.return_code = -2
-
-                    # TestReport.stopTest() may not have been called.
-                    if test_info.end_time is None:
-                        # Use the current time as the time that the test finished running.
-                        test_info.end_time = combining_time
-
-                    # If we receive a SIGUSR1 then we may start combining reports before
-                    # their start time has been set.
-                    if test_info.start_time is None:
-                        test_info.start_time = combining_time
-
-                    combined_report.test_infos.append(test_info)
-
+                # The counters also account for the tests whose results were already streamed.
+                for counter in _STATUS_COUNTERS.values():
+                    setattr(combined_report, counter,
+                            getattr(combined_report, counter) + getattr(report, counter))
                 combined_report.num_dynamic += report.num_dynamic
 
-        # Recompute number of success, failures, and errors.
-        combined_report.num_succeeded = len(combined_report.get_successful())
-        combined_report.num_failed = len(combined_report.get_failed())
-        combined_report.num_errored = len(combined_report.get_errored())
-        combined_report.num_interrupted = len(combined_report.get_interrupted())
+                for test_info in report.test_infos:
+                    finalized_test_info = _finalize(test_info, combining_time)
+                    if finalized_test_info.status != test_info.status:
+                        combined_report._count(test_info.status, -1)
+                        combined_report._count(finalized_test_info.status, 1)
+                    combined_report.test_infos.append(finalized_test_info)
 
         return combined_report
 
@@ -105,6 +94,11 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
 
         unittest.TestResult.startTest(self, test)
 
+        # The outcome of a test can be changed by the hooks run after it, so its results are only
+        # streamed once the Job instance moves on to the next test.
+        if not test.dynamic:
+            self._stream_finished()
+
         test_info = _TestInfo(test.id(), test.test_name, test.dynamic)
 
         basename = test.basename()
@@ -159,11 +153,9 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         unittest.TestResult.addError(self, test, err)
 
         with self._lock:
-            self.num_errored += 1
-
             # We don't distinguish between test failures and Python errors in Evergreen.
             test_info = self.find_test_info(test)
-            test_info.status = "error"
+            self._set_status(test_info, "error")
             test_info.evergreen_status = "fail"
             test_info.return_code = test.return_code
 
@@ -177,26 +169,18 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
                 raise ValueError("stopTest was not called on %s" % (test.basename()))
 
             # We don't distinguish between test failures and Python errors in Evergreen.
-            test_info.status = "error"
+            self._set_status(test_info, "error")
             test_info.evergreen_status = "fail"
             test_info.return_code = 2
 
-        # Recompute number of success, failures, and errors.
-        self.num_succeeded = len(self.get_successful())
-        self.num_failed = len(self.get_failed())
-        self.num_errored = len(self.get_errored())
-        self.num_interrupted = len(self.get_interrupted())
-
     def addFailure(self, test, err):  # pylint: disable=invalid-name
         """Call when a failureException was raised during the execution of 'test'."""
 
         unittest.TestResult.addFailure(self, test, err)
 
         with self._lock:
-            self.num_failed += 1
-
             test_info = self.find_test_info(test)
-            test_info.status = "fail"
+            self._set_status(test_info, "fail")
             if test_info.dynamic:
                 # Dynamic tests are used for data consistency checks, so the failures are never
                 # silenced.
@@ -213,7 +197,7 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
             if test_info.end_time is None:
                 raise ValueError("stopTest was not called on %s" % (test.basename()))
 
-            test_info.status = "fail"
+            self._set_status(test_info, "fail")
             if test_info.dynamic:
                 # Dynamic tests are used for data consistency checks, so the failures are never
                 # silenced.
@@ -222,25 +206,37 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
                 test_info.evergreen_status = self.suite_options.report_failure_status
             test_info.return_code = return_code
 
-        # Recompute number of success, failures, and errors.
-        self.num_succeeded = len(self.get_successful())
-        self.num_failed = len(self.get_failed())
-        self.num_errored = len(self.get_errored())
-        self.num_interrupted = len(self.get_interrupted())
-
     def addSuccess(self, test):  # pylint: disable=invalid-name
         """Call when 'test' executed successfully."""
 
         unittest.TestResult.addSuccess(self, test)
 
         with self._lock:
-            self.num_succeeded += 1
-
             test_info = self.find_test_info(test)
-            test_info.status = "pass"
+            self._set_status(test_info, "pass")
             test_info.evergreen_status = "pass"
             test_info.return_code = test.return_code
 
+    def _count(self, status, delta):
+        """Add 'delta' to the counter of tests with the status 'status'."""
+
+        if status is not None:
+            counter = _STATUS_COUNTERS[status]
+            setattr(self, counter, getattr(self, counter) + delta)
+
+    def _set_status(self, test_info, status):
+        """Change the status of 'test_info' to 'status' and update the counters accordingly."""
+
+        self._count(test_info.status, -1)
+        self._count(status, 1)
+        test_info.status = status
+
+    def num_results(self):
+        """Return the number of tests with a status, including those whose results were streamed."""
+
+        with self._lock:
+            return sum(getattr(self, counter) for counter in _STATUS_COUNTERS.values())
+
     def wasSuccessful(self):  # pylint: disable=invalid-name
         """Return true if all tests executed successfully."""
 
@@ -277,26 +273,9 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         Used to create the report.json file.
         """
 
-        results = []
         with self._lock:
-            for test_info in self.test_infos:
-                result = {
-                    "test_file": test_info.test_file,
-                    "status": test_info.evergreen_status,
-                    "exit_code": test_info.return_code,
-                    "start": test_info.start_time,
-                    "end": test_info.end_time,
-                    "elapsed": test_info.end_time - test_info.start_time,
-                }
-
-                if test_info.url_endpoint is not None:
-                    result["url"] = test_info.url_endpoint
-                    result["url_raw"] = test_info.url_endpoint + "?raw=1"
-
-                results.append(result)
-
             return {
-                "results": results,
+                "results": [_as_result(test_info) for test_info in self.test_infos],
                 "failures": self.num_failed + self.num_errored + self.num_interrupted,
             }
 
@@ -334,11 +313,57 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
 
         return report
 
+    def flush_stream(self):
+        """Append the results of every test not streamed yet, including the unfinished ones."""
+
+        if self._stream_writer is None:
+            return
+
+        flushing_time = time.time()
+        with self._lock:
+            test_infos = self.test_infos[self._num_streamed:]
+            self._forget_streamed(test_infos)
+        self._write_stream([_finalize(test_info, flushing_time) for test_info in test_infos])
+
+    def _stream_finished(self):
+        """Append the results of the tests that finished since the last ones were streamed."""
+
+        if self._stream_writer is None:
+            return
+
+        with self._lock:
+            test_infos = []
+            for test_info in self.test_infos[self._num_streamed:]:
+                if test_info.status is None or test_info.end_time is None:
+                    break
+                test_infos.append(test_info)
+            self._forget_streamed(test_infos)
+        self._write_stream(test_infos)
+
+    def _forget_streamed(self, test_infos):
+        """Drop the tests that passed among the 'test_infos' about to be streamed.
+
+        The counters still account for them, and only the tests that didn't pass are listed in the
+        summary of the suite.
+        """
+
+        kept_test_infos = [test_info for test_info in test_infos if test_info.status != "pass"]
+        self.test_infos[self._num_streamed:self._num_streamed + len(test_infos)] = kept_test_infos
+        self._num_streamed += len(kept_test_infos)
+
+    def _write_stream(self, test_infos):
+        """Append the results of 'test_infos' and record their runtimes."""
+
+        self._stream_writer.write(test_infos, self.job_num)
+        if self._runtime_history is not None:
+            self._runtime_history.record_test_infos(test_infos)
+
     def reset(self):
         """Reset the test report back to its initial state."""
 
         with self._lock:
             self.test_infos = []
+            self._num_streamed = 0
 
             self.num_dynamic = 0
             self.num_succeeded = 0
@@ -360,6 +385,112 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         raise ValueError("Details for %s not found in the report" % (test.basename()))
 
 
+class ReportStreamWriter(object):
+    """Append the results of tests to a file as they finish, one JSON object per line.
+
+    Each line is an element of the "results" list of the report.json file, along with the number of
+    the job that ran the test. This avoids combining every TestReport and serializing all of their
+    results at once after the suites finish, and the results written so far survive resmoke.py
+    being killed. combine_reports.py merges these files into a report.json file.
+    """
+
+    def __init__(self, pathname):
+        """Initialize the ReportStreamWriter, truncating 'pathname'."""
+
+        self.pathname = pathname
+        self.num_results = 0
+        self.num_failures = 0
+
+        self._lock = threading.Lock()
+        self._fp = open(pathname, "w")
+
+    def write(self, test_infos, job_num=None):
+        """Append the results of 'test_infos', which were run by the job 'job_num'.
+
+        The results are tagged with 'job_num' since the results of each job are in the order their
+        tests started, and combine_reports.py merges them in that order.
+        """
+
+        if not test_infos:
+            return
+
+        results = [_as_result(test_info) for test_info in test_infos]
+        lines = [json.dumps(dict(result, job=job_num)) + "\n" for result in results]
+        with self._lock:
+            self._fp.writelines(lines)
+            self._fp.flush()
+            self.num_results += len(lines)
+            self.num_failures += sum(1 for result in results if is_failure(result))
+
+    def close(self):
+        """Close the file."""
+
+        with self._lock:
+            self._fp.close()
+
+
+def _finalize(test_info, now):
+    """Return a copy of 'test_info' with the outcome of a test that didn't finish filled in."""
+
+    # If the user triggers a KeyboardInterrupt exception while a test is running, then it is
+    # possible for 'test_info' to be modified by a job thread later on. We make a shallow copy in
+    # order to ensure 'num_interrupted' is consistent with the actual number of tests that have
+    # status equal to "timeout".
+    test_info = copy.copy(test_info)
+
+    # TestReport.addXX() may not have been called.
+    if test_info.status is None or test_info.return_code is None:
+        # Mark the test as having timed out if it was interrupted. It might have passed if the
+        # suite ran to completion, but we wouldn't know for sure.
+        #
+        # Until EVG-1536 is completed, we shouldn't distinguish between failures and interrupted
+        # tests in the report.json file. In Evergreen, the behavior to sort tests with the "timeout"
+        # test status after tests with the "pass" test status effectively hides interrupted tests
+        # from the test results sidebar unless sorting by the time taken.
+        test_info.status = "timeout"
+        test_info.evergreen_status = "fail"
+        test_info.return_code = -2
+
+    # TestReport.stopTest() may not have been called.
+    if test_info.end_time is None:
+        # Use the current time as the time that the test finished running.
+        test_info.end_time = now
+
+    # If we receive a SIGUSR1 then we may start combining reports before their start time has been
+    # set.
+    if test_info.start_time is None:
+        test_info.start_time = now
+
+    return test_info
+
+
+def _as_result(test_info):
+    """Return the entry of the "results" list of the report.json file for 'test_info'."""
+
+    result = {
+        "test_file": test_info.test_file,
+        "status": test_info.evergreen_status,
+        "exit_code": test_info.return_code,
+        "start": test_info.start_time,
+        "end": test_info.end_time,
+        "elapsed": test_info.end_time - test_info.start_time,
+    }
+
+    if test_info.url_endpoint is not None:
+        result["url"] = test_info.url_endpoint
+        result["url_raw"] = test_info.url_endpoint + "?raw=1"
+
+    return result
+
+
+def is_failure(result):
+    """Return whether an entry of the "results" list of the report.json file is a failed test.
+
+    Tests whose failures are reported with the "silentfail" status aren't counted.
+    """
+    return result["status"] in ("fail", "error", "timeout")
+
+
 class _TestInfo(object):  # pylint: disable=too-many-instance-attributes
     """Holder for the test status and timing information."""
 
@@ -0,0 +1,120 @@
+"""Local database of historical test runtimes.
+
+The runtimes are recorded from the TestReport of previous executions and are used to schedule the
+longest running tests first so that the work is balanced across the Job threads.
+"""
+
+import threading
+
+from buildscripts.resmokelib.utils import atomicfile
+
+
+class TestRuntimeHistory(object):
+    """Exponentially weighted average runtime of each test, persisted as a JSON file."""
+
+    # The weight given to the most recent runtime of a test when updating its average.
+    _RECENT_WEIGHT = 0.5
+
+    def __init__(self, runtimes=None):
+        """
+        Initialize the TestRuntimeHistory.
+
+        :param runtimes: Dictionary mapping test names to their average runtime in seconds.
+        """
+        self._runtimes = dict(runtimes) if runtimes is not None else {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, pathname):
+        """
+        Read the runtime history from 'pathname'.
+
+        The history is only a hint for scheduling, so a missing or unreadable file is treated as
+        an empty history.
+
+        :param pathname: Path to the JSON file written by save().
+        :return: TestRuntimeHistory instance.
+        """
+        history = atomicfile.read_json(pathname, default={})
+        runtimes = history.get("runtimes", {}) if isinstance(history, dict) else {}
+        return cls({
+            test_name: float(runtime)
+            for test_name, runtime in runtimes.items() if isinstance(runtime, (int, float))
+        })
+
+    def save(self, pathname):
+        """
+        Write the runtime history to 'pathname'.
+
+        The file is replaced atomically since it may be shared by concurrent resmoke.py
+        invocations.
+
+        :param pathname: Path to the JSON file to write.
+        """
+        with self._lock:
+            history = {"runtimes": dict(self._runtimes)}
+        atomicfile.write_json(pathname, history, sort_keys=True)
+
+    def __len__(self):
+        """Return the number of tests with a known runtime."""
+        with self._lock:
+            return len(self._runtimes)
+
+    def get_runtime(self, test_name):
+        """Return the average runtime of 'test_name' in seconds, or None if it is unknown."""
+        with self._lock:
+            return self._runtimes.get(test_name)
+
+    def record(self, test_name, elapsed):
+        """Update the average runtime of 'test_name' with a new 'elapsed' time in seconds."""
+        with self._lock:
+            previous = self._runtimes.get(test_name)
+            if previous is None:
+                self._runtimes[test_name] = elapsed
+            else:
+                self._runtimes[test_name] = (self._RECENT_WEIGHT * elapsed +
+                                             (1 - self._RECENT_WEIGHT) * previous)
+
+    def record_report(self, report):
+        """
+        Update the history with the tests that ran as part of 'report'.
+
+        Dynamic test cases, e.g. those run by hooks, are skipped since they aren't scheduled.
+        Interrupted tests are skipped since their runtime isn't representative of a full execution.
+
+        :param report: TestReport instance.
+        """
+        self.record_test_infos(report.get_successful() + report.get_failed() +
+                               report.get_errored())
+
+    def record_test_infos(self, test_infos):
+        """
+        Update the history with the tests in 'test_infos' that ran to completion.
+
+        :param test_infos: List of _TestInfo instances.
+        """
+        for test_info in test_infos:
+            if test_info.status not in ("pass", "fail", "error"):
+                continue
+            if test_info.dynamic or test_info.start_time is None or test_info.end_time is None:
+                continue
+            self.record(test_info.test_file, test_info.end_time - test_info.start_time)
+
+    def sort_longest_first(self, test_names):
+        """
+        Return a copy of 'test_names' ordered by decreasing historical runtime.
+
+        Tests without a recorded runtime are assumed to take the average runtime of the known
+        tests. The sort is stable so tests with the same runtime keep their relative order.
+
+        :param test_names: List of test names.
+        :return: List of test names.
+        """
+        with self._lock:
+            runtimes = dict(self._runtimes)
+
+        known = [runtimes[test_name] for test_name in test_names if test_name in runtimes]
+        default_runtime = sum(known) / len(known) if known else 0
+
+        return sorted(test_names, key=lambda test_name: runtimes.get(test_name, default_runtime),
+                      reverse=True)
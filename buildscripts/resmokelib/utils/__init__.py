@@ -9,6 +9,7 @@ import sys
 import yaml
 
 from buildscripts.resmokelib.utils import archival
+from buildscripts.resmokelib.utils import dedup_archival
 
 
 @contextlib.contextmanager
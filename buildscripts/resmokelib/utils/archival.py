@@ -1,18 +1,23 @@
 """Archival utility."""
 
 import collections
+import concurrent.futures
+import io
 import json
 import os
 import queue
+import shutil
 import sys
 import tarfile
 import tempfile
 import threading
 import time
+import zlib
 
 import math
 
 from buildscripts.resmokelib import config
+from buildscripts.resmokelib.utils import atomicfile
 
 _IS_WINDOWS = sys.platform == "win32" or sys.platform == "cygwin"
 
@@ -69,6 +74,96 @@ def free_space(path):
     return stat.f_bavail * stat.f_bsize
 
 
+class ParallelGzipWriter(object):
+    """A write-only file object that gzips what is written to it on multiple threads.
+
+    Like pigz, the input is split into blocks that are compressed independently and written to
+    'fileobj' in order, each as its own gzip member. The concatenation of gzip members is itself a
+    valid gzip file. zlib releases the GIL while compressing, so the blocks are compressed in
+    parallel while tarfile reads the next files.
+    """
+
+    # The number of bytes compressed at a time by each thread.
+    _BLOCK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, fileobj, num_threads, compresslevel=9):
+        """Initialize the ParallelGzipWriter."""
+        self._fileobj = fileobj
+        self._compresslevel = compresslevel
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_threads)
+        # At most this many compressed blocks are kept in memory waiting to be written out.
+        self._max_pending = 2 * num_threads
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self._num_blocks = 0
+
+    def write(self, data):
+        """Compress 'data', blocking while too many blocks are waiting to be written out."""
+        self._buffer += data
+        while len(self._buffer) >= ParallelGzipWriter._BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:ParallelGzipWriter._BLOCK_SIZE]))
+            del self._buffer[:ParallelGzipWriter._BLOCK_SIZE]
+        return len(data)
+
+    def close(self):
+        """Compress the rest of the input and wait for every block to be written out."""
+        try:
+            if self._buffer or not self._num_blocks:
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+            while self._pending:
+                self._write_next()
+        finally:
+            self._executor.shutdown()
+
+    def _submit(self, block):
+        self._pending.append(self._executor.submit(self._compress, block))
+        self._num_blocks += 1
+        while len(self._pending) > self._max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        self._fileobj.write(self._pending.popleft().result())
+
+    def _compress(self, block):
+        compressor = zlib.compressobj(self._compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(block) + compressor.flush()
+
+
+class LocalDirectoryClient(object):
+    """A stand-in for the boto3 S3 client which stores objects in a local directory.
+
+    The object 'key' in 'bucket' is stored as the file '<directory>/<bucket>/<key>'.
+    """
+
+    def __init__(self, directory):
+        """Initialize the LocalDirectoryClient."""
+        self.directory = directory
+
+    def get_path(self, bucket, key):
+        """Return the path of the file storing the object 'key' in 'bucket'."""
+        return os.path.join(self.directory, bucket, *key.split("/"))
+
+    def upload_file(self, local_file, bucket, key, ExtraArgs=None):  # pylint: disable=invalid-name,unused-argument
+        """Copy 'local_file' to the object 'key' in 'bucket'."""
+        path = self.get_path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(local_file, path)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):  # pylint: disable=invalid-name,unused-argument
+        """Write the bytes 'Body' to the object 'Key' in 'Bucket'."""
+        atomicfile.write(self.get_path(Bucket, Key), Body)
+
+    def get_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        """Return the object 'Key' in 'Bucket' in the same form as boto3."""
+        with open(self.get_path(Bucket, Key), "rb") as fileh:
+            return {"Body": io.BytesIO(fileh.read())}
+
+    def delete_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        """Remove the object 'Key' in 'Bucket'."""
+        os.remove(self.get_path(Bucket, Key))
+
+
 def remove_file(file_name):
     """Attempt to remove file. Return status and message."""
     try:
@@ -87,10 +182,17 @@ def remove_file(file_name):
 class Archival(object):  # pylint: disable=too-many-instance-attributes
     """Class to support file archival to S3."""
 
+    # The file extension of the archives uploaded to S3.
+    FILE_EXTENSION = ".tgz"
+
     def __init__(  # pylint: disable=too-many-arguments
             self, logger, archival_json_file="archive.json", limit_size_mb=0, limit_files=0,
-            s3_client=None):
-        """Initialize Archival."""
+            s3_client=None, compression_threads=1, upload_workers=1):
+        """Initialize Archival.
+
+        :param compression_threads: The number of threads gzipping each archive.
+        :param upload_workers: The number of archives uploaded to S3 at once.
+        """
 
         self.archival_json_file = archival_json_file
         self.limit_size_mb = limit_size_mb
@@ -99,9 +201,12 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         self.num_files = 0
         self.archive_time = 0
         self.logger = logger
+        self.compression_threads = max(1, compression_threads)
 
-        # Lock to control access from multiple threads.
+        # Lock to control access from multiple threads. It isn't held while the files are archived,
+        # so jobs can archive files at the same time.
         self._lock = threading.Lock()
+        self._num_archiving = 0
 
         # Start the worker thread to update the 'archival_json_file'.
         self._archive_file_queue = queue.Queue()
@@ -115,13 +220,17 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         else:
             self.s3_client = s3_client
 
-        # Start the worker thread which uploads the archive.
+        # Start the worker threads which upload the archives.
         self._upload_queue = queue.Queue()
-        self._upload_worker = threading.Thread(
-            target=self._upload_to_s3_wkr, args=(self._upload_queue, self._archive_file_queue,
-                                                 logger, self.s3_client), name="upload_worker")
-        self._upload_worker.setDaemon(True)
-        self._upload_worker.start()
+        self._upload_workers = []
+        for i in range(max(1, upload_workers)):
+            upload_worker = threading.Thread(
+                target=self._upload_to_s3_wkr,
+                args=(self._upload_queue, self._archive_file_queue, logger, self.s3_client),
+                name="upload_worker" if i == 0 else "upload_worker{}".format(i))
+            upload_worker.setDaemon(True)
+            upload_worker.start()
+            self._upload_workers.append(upload_worker)
 
     @staticmethod
     def _get_s3_client():
@@ -142,18 +251,22 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         start_time = time.time()
         with self._lock:
             if not input_files:
-                status = 1
-                message = "No input_files specified"
-            elif self.limit_size_mb and self.size_mb >= self.limit_size_mb:
-                status = 1
-                message = "Files not archived, {}MB size limit reached".format(self.limit_size_mb)
-            elif self.limit_files and self.num_files >= self.limit_files:
-                status = 1
-                message = "Files not archived, {} file limit reached".format(self.limit_files)
-            else:
-                status, message, file_size_mb = self._archive_files(display_name, input_files,
-                                                                    s3_bucket, s3_path)
-
+                return 1, "No input_files specified"
+            if self.limit_size_mb and self.size_mb >= self.limit_size_mb:
+                return 1, "Files not archived, {}MB size limit reached".format(self.limit_size_mb)
+            # Archives still being created count towards the limit so that concurrent callers can't
+            # exceed it.
+            if self.limit_files and self.num_files + self._num_archiving >= self.limit_files:
+                return 1, "Files not archived, {} file limit reached".format(self.limit_files)
+            self._num_archiving += 1
+
+        status, file_size_mb = 1, 0
+        try:
+            status, message, file_size_mb = self._archive_files(display_name, input_files,
+                                                                s3_bucket, s3_path)
+        finally:
+            with self._lock:
+                self._num_archiving -= 1
                 if status == 0:
                     self.num_files += 1
                 self.size_mb += file_size_mb
@@ -190,7 +303,6 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
             # Exit worker thread when sentinel is received.
             if upload_args is None:
                 work_queue.task_done()
-                archive_file_work_queue.put(None)
                 break
             extra_args = {"ContentType": upload_args.content_type, "ACL": "public-read"}
             logger.debug("Uploading to S3 %s to bucket %s path %s", upload_args.local_file,
@@ -210,8 +322,11 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
                 if status:
                     logger.error("Upload to S3 delete file error %s", message)
 
-            remote_file = "https://s3.amazonaws.com/{}/{}".format(upload_args.s3_bucket,
-                                                                  upload_args.s3_path)
+            if isinstance(s3_client, LocalDirectoryClient):
+                remote_file = s3_client.get_path(upload_args.s3_bucket, upload_args.s3_path)
+            else:
+                remote_file = "https://s3.amazonaws.com/{}/{}".format(
+                    upload_args.s3_bucket, upload_args.s3_path)
             if upload_completed:
                 archive_file_work_queue.put(
                     ArchiveArgs(upload_args.archival_file, upload_args.display_name, remote_file))
@@ -222,8 +337,9 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         """
         Gather 'input_files' into a single tar/gzip and archive to 's3_path'.
 
-        The caller waits until the list of files has been tar/gzipped to a temporary file.
-        The S3 upload and subsequent update to 'archival_json_file' will be done asynchronosly.
+        The caller waits until the list of files has been tar/gzipped to a temporary file. The tar
+        stream is gzipped on 'compression_threads' threads while it is written. The S3 upload and
+        subsequent update to 'archival_json_file' will be done asynchronosly.
 
         Returns status, message and size_mb of archive.
         """
@@ -236,20 +352,8 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         size_mb = 0
 
         if 'test_archival' in config.INTERNAL_PARAMS:
-            message = "'test_archival' specified. Skipping tar/gzip."
-            with open(os.path.join(config.DBPATH_PREFIX, "test_archival.txt"), "a") as test_file:
-                for input_file in input_files:
-                    # If a resmoke fixture is used, the input_file will be the source of the data
-                    # files. If mongorunner is used, input_file/mongorunner will be the source
-                    # of the data files.
-                    if os.path.isdir(os.path.join(input_file, config.MONGO_RUNNER_SUBDIR)):
-                        input_file = os.path.join(input_file, config.MONGO_RUNNER_SUBDIR)
-
-                    # Each node contains one directory for its data files. Here we write out
-                    # the names of those directories. In the unit test for archival, we will
-                    # check that the directories are those we expect.
-                    test_file.write("\n".join(os.listdir(input_file)) + "\n")
-            return status, message, size_mb
+            self._write_test_archival_file(input_files)
+            return status, "'test_archival' specified. Skipping tar/gzip.", size_mb
 
         message = "Tar/gzip {} files: {}".format(display_name, input_files)
 
@@ -264,13 +368,18 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
             return 1, "Insufficient space for {}".format(message), 0
 
         try:
-            with tarfile.open(temp_file, "w:gz") as tar_handle:
-                for input_file in input_files:
-                    try:
-                        tar_handle.add(input_file)
-                    except (IOError, OSError, tarfile.TarError) as err:
-                        message = "{}; Unable to add {} to archive file: {}".format(
-                            message, input_file, err)
+            with open(temp_file, "wb") as temp_fh:
+                gzip_writer = ParallelGzipWriter(temp_fh, self.compression_threads)
+                try:
+                    with tarfile.open(fileobj=gzip_writer, mode="w|") as tar_handle:
+                        for input_file in input_files:
+                            try:
+                                tar_handle.add(input_file)
+                            except (IOError, OSError, tarfile.TarError) as err:
+                                message = "{}; Unable to add {} to archive file: {}".format(
+                                    message, input_file, err)
+                finally:
+                    gzip_writer.close()
         except (IOError, OSError, tarfile.TarError) as err:
             status, message = remove_file(temp_file)
             if status:
@@ -285,27 +394,49 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
 
         return status, message, size_mb
 
+    @staticmethod
+    def _write_test_archival_file(input_files):
+        """Record the data file directories of 'input_files' instead of archiving them."""
+        with open(os.path.join(config.DBPATH_PREFIX, "test_archival.txt"), "a") as test_file:
+            for input_file in input_files:
+                # If a resmoke fixture is used, the input_file will be the source of the data
+                # files. If mongorunner is used, input_file/mongorunner will be the source
+                # of the data files.
+                if os.path.isdir(os.path.join(input_file, config.MONGO_RUNNER_SUBDIR)):
+                    input_file = os.path.join(input_file, config.MONGO_RUNNER_SUBDIR)
+
+                # Each node contains one directory for its data files. Here we write out
+                # the names of those directories. In the unit test for archival, we will
+                # check that the directories are those we expect.
+                test_file.write("\n".join(os.listdir(input_file)) + "\n")
+
     def check_thread(self, thread, expected_alive):
         """Check if the thread is still active."""
-        if thread.isAlive() and not expected_alive:
+        if thread.is_alive() and not expected_alive:
             self.logger.warning(
                 "The %s thread did not complete, some files might not have been uploaded"
                 " to S3 or archived to %s.", thread.name, self.archival_json_file)
-        elif not thread.isAlive() and expected_alive:
+        elif not thread.is_alive() and expected_alive:
             self.logger.warning(
                 "The %s thread is no longer running, some files might not have been uploaded"
                 " to S3 or archived to %s.", thread.name, self.archival_json_file)
 
     def exit(self, timeout=30):
         """Wait for worker threads to finish."""
-        # Put sentinel on upload queue to trigger worker thread exit.
-        self._upload_queue.put(None)
-        self.check_thread(self._upload_worker, True)
+        # Put a sentinel on the upload queue for each worker thread to trigger its exit.
+        for upload_worker in self._upload_workers:
+            self._upload_queue.put(None)
+            self.check_thread(upload_worker, True)
         self.check_thread(self._archive_file_worker, True)
-        self._upload_worker.join(timeout=timeout)
-        self.check_thread(self._upload_worker, False)
-
-        # Archive file worker thread exit should be triggered by upload thread worker.
+        deadline = time.time() + timeout
+        for upload_worker in self._upload_workers:
+            upload_worker.join(timeout=max(0, deadline - time.time()))
+            self.check_thread(upload_worker, False)
+
+        # Archive file worker thread exit is triggered once every upload worker thread has exited,
+        # so that it records every upload.
+        if not any(upload_worker.is_alive() for upload_worker in self._upload_workers):
+            self._archive_file_queue.put(None)
         self._archive_file_worker.join(timeout=timeout)
         self.check_thread(self._archive_file_worker, False)
 
@@ -0,0 +1,44 @@
+"""Files which are replaced atomically so that concurrent readers never see a partial write."""
+
+import json
+import os
+import os.path
+import tempfile
+
+
+def write(pathname, contents):
+    """Replace 'pathname' with 'contents', which is either a str or bytes.
+
+    The contents are written to a temporary file in the same directory, which is then renamed over
+    'pathname'. The directory is created if it doesn't exist.
+    """
+
+    dirname = os.path.dirname(os.path.abspath(pathname))
+    os.makedirs(dirname, exist_ok=True)
+
+    (fd, tmp_pathname) = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(contents, bytes) else "w") as fp:
+            fp.write(contents)
+        os.replace(tmp_pathname, pathname)
+    except:  # pylint: disable=bare-except
+        os.remove(tmp_pathname)
+        raise
+
+
+def write_json(pathname, obj, **kwargs):
+    """Replace 'pathname' with 'obj' serialized as JSON. 'kwargs' are passed to json.dumps()."""
+    write(pathname, json.dumps(obj, **kwargs))
+
+
+def read_json(pathname, default=None):
+    """Return the deserialized contents of the JSON file 'pathname'.
+
+    Return 'default' if the file is missing or isn't valid JSON.
+    """
+
+    try:
+        with open(pathname, "r") as fp:
+            return json.load(fp)
+    except (IOError, ValueError):
+        return default
@@ -0,0 +1,224 @@
+"""Content-addressed archival of data files.
+
+Rather than a tar/gzip of the data files, each file is split into chunks which are stored in S3
+under the SHA-256 hash of their contents. A chunk is only uploaded the first time it is seen, so the
+data files which are unchanged between failures, or are identical on every node, are only stored
+once. Each archive is a JSON manifest listing the chunks of every file.
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import json
+import math
+import os
+import posixpath
+import stat
+import tempfile
+import threading
+import zlib
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib.utils import archival
+
+# The version of the manifest format written by DedupArchival.
+MANIFEST_VERSION = 1
+
+# The number of bytes in a chunk. WiredTiger allocates the space in its files in multiples of 4KB,
+# so a page which is unchanged between failures stays within a single chunk.
+CHUNK_SIZE = 1024 * 1024
+
+
+def chunk_key(chunks_prefix, digest):
+    """Return the S3 key of the chunk with the hash 'digest'."""
+    return posixpath.join(chunks_prefix, digest[:2], digest)
+
+
+def _archive_name(path):
+    """Return the name of 'path' in a manifest, in the same form as tarfile uses."""
+    return os.path.splitdrive(path)[1].replace(os.sep, "/").lstrip("/")
+
+
+def _list_files(input_file):
+    """Return the regular files in 'input_file', which is either a file or a directory."""
+    if not os.path.isdir(input_file):
+        return [input_file]
+
+    files = []
+    for root_dir, dirs, file_names in os.walk(input_file, onerror=_raise):
+        dirs.sort()
+        for name in sorted(file_names):
+            path = os.path.join(root_dir, name)
+            if os.path.isfile(path):
+                files.append(path)
+    return files
+
+
+def _raise(err):
+    raise err
+
+
+def restore(s3_client, s3_bucket, manifest, dest_dir):
+    """Recreate the files listed in 'manifest' under 'dest_dir'."""
+    for entry in manifest["files"]:
+        path = os.path.join(dest_dir, *entry["path"].split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fileh:
+            for digest in entry["chunks"]:
+                response = s3_client.get_object(
+                    Bucket=s3_bucket, Key=chunk_key(manifest["chunks_prefix"], digest))
+                fileh.write(zlib.decompress(response["Body"].read()))
+        os.chmod(path, entry["mode"])
+
+
+class DedupArchival(archival.Archival):
+    """Class to support deduplicated file archival to S3.
+
+    The chunks are stored alongside the manifests, in the "chunks" directory of the S3 path, so
+    archives of different failures in the same task share their chunks. Only chunks uploaded by
+    this resmoke invocation are known to exist already, so a chunk uploaded by an earlier task is
+    uploaded again.
+    """
+
+    FILE_EXTENSION = ".json"
+
+    def __init__(self, *args, **kwargs):
+        """Initialize DedupArchival."""
+        archival.Archival.__init__(self, *args, **kwargs)
+
+        # The future of each chunk upload, by its bucket and key. An archive which includes a chunk
+        # already being uploaded waits for the upload rather than repeating it.
+        self._chunk_uploads = {}
+        self._chunk_uploads_lock = threading.Lock()
+
+    def _archive_files(self, display_name, input_files, s3_bucket, s3_path):  # pylint: disable=too-many-locals
+        """
+        Upload the chunks of 'input_files' which haven't already been uploaded.
+
+        The caller waits until every new chunk has been uploaded. The chunks are hashed, compressed,
+        and uploaded on 'compression_threads' threads. The upload of the manifest to 's3_path' and
+        subsequent update to 'archival_json_file' will be done asynchronously.
+
+        Returns status, message and the size_mb of the uploaded chunks and manifest.
+        """
+
+        # Parameter 'input_files' can either be a string or list of strings.
+        if isinstance(input_files, str):
+            input_files = [input_files]
+
+        if 'test_archival' in config.INTERNAL_PARAMS:
+            self._write_test_archival_file(input_files)
+            return 0, "'test_archival' specified. Skipping deduplicated archival.", 0
+
+        message = "Deduplicate {} files: {}".format(display_name, input_files)
+        chunks_prefix = posixpath.join(posixpath.dirname(s3_path), "chunks")
+        manifest = {
+            "version": MANIFEST_VERSION, "chunk_size": CHUNK_SIZE, "chunks_prefix": chunks_prefix,
+            "files": []
+        }
+
+        num_chunks = 0
+        uploaded_bytes = 0
+        shared_uploads = []
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.compression_threads) as executor:
+            # At most this many chunks are kept in memory waiting to be uploaded.
+            max_pending = 2 * self.compression_threads
+            pending = collections.deque()
+
+            def wait_for_next():
+                nonlocal uploaded_bytes
+                entry, future = pending.popleft()
+                digest, num_bytes, shared_upload = future.result()
+                entry["chunks"].append(digest)
+                uploaded_bytes += num_bytes
+                if shared_upload is not None:
+                    shared_uploads.append(shared_upload)
+
+            try:
+                for input_file in input_files:
+                    try:
+                        paths = _list_files(input_file)
+                    except OSError as err:
+                        message = "{}; Unable to add {} to archive: {}".format(
+                            message, input_file, err)
+                        continue
+
+                    for path in paths:
+                        try:
+                            with open(path, "rb") as fileh:
+                                entry = {
+                                    "path": _archive_name(path),
+                                    "mode": stat.S_IMODE(os.fstat(fileh.fileno()).st_mode),
+                                    "chunks": []
+                                }
+                                manifest["files"].append(entry)
+                                for chunk in iter(lambda fh=fileh: fh.read(CHUNK_SIZE), b""):
+                                    pending.append((entry, executor.submit(
+                                        self._upload_chunk, s3_bucket, chunks_prefix, chunk)))
+                                    num_chunks += 1
+                                    while len(pending) > max_pending:
+                                        wait_for_next()
+                        except (IOError, OSError) as err:
+                            message = "{}; Unable to add {} to archive: {}".format(
+                                message, path, err)
+
+                while pending:
+                    wait_for_next()
+                for shared_upload in shared_uploads:
+                    shared_upload.result()
+            except Exception as err:  # pylint: disable=broad-except
+                for _, future in pending:
+                    future.cancel()
+                return 1, "Unable to upload chunks: {}".format(err), self._to_mb(uploaded_bytes)
+
+        _, temp_file = tempfile.mkstemp(suffix=self.FILE_EXTENSION)
+        try:
+            with open(temp_file, "w") as temp_fh:
+                json.dump(manifest, temp_fh)
+        except (IOError, OSError) as err:
+            status, remove_message = archival.remove_file(temp_file)
+            if status:
+                self.logger.warning("Removing manifest due to creation failure - %s",
+                                    remove_message)
+            return 1, str(err), self._to_mb(uploaded_bytes)
+
+        self.logger.info("Uploaded %d of the %d chunks of %s", num_chunks - len(shared_uploads),
+                         num_chunks, display_name)
+        size_mb = self._to_mb(uploaded_bytes + os.path.getsize(temp_file))
+        self._upload_queue.put(
+            archival.UploadArgs(self.archival_json_file, display_name, temp_file,
+                                "application/json", s3_bucket, s3_path, True))
+
+        return 0, message, size_mb
+
+    @staticmethod
+    def _to_mb(num_bytes):
+        """Return 'num_bytes' rounded up to MB."""
+        return int(math.ceil(float(num_bytes) / (1024 * 1024)))
+
+    def _upload_chunk(self, s3_bucket, chunks_prefix, chunk):
+        """Upload 'chunk' if it hasn't been uploaded already.
+
+        Returns the hash of the chunk, the number of bytes uploaded, and the future of the upload
+        of the chunk by another archive, if any.
+        """
+        digest = hashlib.sha256(chunk).hexdigest()
+        key = chunk_key(chunks_prefix, digest)
+        with self._chunk_uploads_lock:
+            upload = self._chunk_uploads.get((s3_bucket, key))
+            # A chunk whose upload failed is uploaded again.
+            if upload is not None and not (upload.done() and upload.exception() is not None):
+                return digest, 0, upload
+            upload = concurrent.futures.Future()
+            self._chunk_uploads[(s3_bucket, key)] = upload
+
+        try:
+            body = zlib.compress(chunk)
+            self.s3_client.put_object(Bucket=s3_bucket, Key=key, Body=body,
+                                      ContentType="application/octet-stream", ACL="public-read")
+        except Exception as err:
+            upload.set_exception(err)
+            raise
+        upload.set_result(None)
+        return digest, len(body), None
@@ -1,5 +1,6 @@
 """Filename globbing utility."""
 
+import fnmatch
 import glob as _glob
 import os
 import os.path
@@ -16,7 +17,7 @@ def is_glob_pattern(string):
     return _CONTAINS_GLOB_PATTERN.search(string) is not None
 
 
-def glob(globbed_pathname):
+def glob(globbed_pathname, snapshot=None):
     """Return a list of pathnames matching the 'globbed_pathname' pattern.
 
     In addition to containing simple shell-style wildcards a la fnmatch,
@@ -24,15 +25,18 @@ def glob(globbed_pathname):
     expanded to match zero or more subdirectories.
     """
 
-    return list(iglob(globbed_pathname))
+    return list(iglob(globbed_pathname, snapshot=snapshot))
 
 
-def iglob(globbed_pathname):
+def iglob(globbed_pathname, snapshot=None):
     """Emit a list of pathnames matching the 'globbed_pathname' pattern.
 
     In addition to containing simple shell-style wildcards a la fnmatch,
     the pattern may also contain globstars ("**"), which is recursively
     expanded to match zero or more subdirectories.
+
+    If 'snapshot' is a DirectorySnapshot, then the directory listings are read from it instead of
+    from the file system each time.
     """
 
     parts = _split_path(globbed_pathname)
@@ -40,11 +44,13 @@ def iglob(globbed_pathname):
 
     index = _find_globstar(parts)
     if index == -1:
-        for pathname in _glob.iglob(globbed_pathname):
+        for pathname in _iglob_without_globstar(globbed_pathname, snapshot):
             # Normalize 'pathname' so exact string comparison can be used later.
             yield os.path.normpath(pathname)
         return
 
+    list_dir = snapshot.list_dir if snapshot is not None else _list_dir
+
     # **, **/, or **/a
     if index == 0:
         expand = _expand_curdir
@@ -59,17 +65,95 @@ def iglob(globbed_pathname):
     prefix = os.path.join(*prefix_parts) if prefix_parts else os.curdir
     suffix = os.path.join(*suffix_parts) if suffix_parts else ""
 
-    for (kind, path) in expand(prefix):
+    # The files are only needed when nothing follows the "**".
+    for (kind, path) in expand(prefix, list_dir, not suffix_parts):
         if not suffix_parts:
             yield path
 
         # Avoid following symlinks to avoid an infinite loop
         elif suffix_parts and kind == "dir" and not os.path.islink(path):
             path = os.path.join(path, suffix)
-            for pathname in iglob(path):
+            for pathname in iglob(path, snapshot=snapshot):
                 yield pathname
 
 
+class DirectorySnapshot(object):
+    """Directory listings shared by many glob expansions.
+
+    Each directory is read with os.scandir() the first time it is listed. It is only read again
+    once its modification time changes, i.e. once entries were added to it or removed from it.
+    """
+
+    def __init__(self):
+        """Initialize the DirectorySnapshot."""
+        # Maps directory paths to a (mtime_ns, dirs, files) tuple.
+        self._listings = {}
+
+    def list_dir(self, pathname):
+        """Return a pair of subdirectory names and filenames contained within 'pathname'.
+
+        If 'pathname' does not exist, then None is returned.
+        """
+
+        try:
+            mtime_ns = os.stat(pathname).st_mtime_ns
+        except OSError:
+            self._listings.pop(pathname, None)
+            return None
+
+        listing = self._listings.get(pathname)
+        if listing is not None and listing[0] == mtime_ns:
+            return (listing[1], listing[2])
+
+        res = _scan_dir(pathname)
+        if res is None:
+            self._listings.pop(pathname, None)
+            return None
+
+        self._listings[pathname] = (mtime_ns, res[0], res[1])
+        return res
+
+
+def _iglob_without_globstar(globbed_pathname, snapshot):
+    """Emit the pathnames matching a pattern without "**", as glob.iglob() does.
+
+    If 'snapshot' is given, then every directory whose entries the result depends on is listed
+    through it, even when the basename has no wildcards, so that the snapshot can tell whether the
+    result may have changed since.
+    """
+
+    (dirname, basename) = os.path.split(globbed_pathname)
+    if snapshot is None or not basename or basename in (os.curdir, os.pardir):
+        for pathname in _glob.iglob(globbed_pathname):
+            yield pathname
+        return
+
+    dirnames = [dirname]
+    if is_glob_pattern(dirname):
+        dirnames = [path for path in iglob(dirname, snapshot=snapshot) if os.path.isdir(path)]
+
+    for dirname in dirnames:
+        res = snapshot.list_dir(dirname or os.curdir)
+        if res is None:
+            continue
+
+        if not is_glob_pattern(basename):
+            # os.path.lexists() is used, as glob.glob() does, so that file systems which ignore
+            # case match the same paths.
+            pathname = os.path.join(dirname, basename)
+            if os.path.lexists(pathname):
+                yield pathname
+            continue
+
+        (dirs, files) = res
+        names = dirs + files
+        # Like glob.glob(), hidden files are only matched by patterns that start with a ".".
+        if not basename.startswith("."):
+            names = [name for name in names if not name.startswith(".")]
+        for name in fnmatch.filter(names, basename):
+            yield os.path.join(dirname, name)
+
+
 def _split_path(pathname):
     """Return 'pathname' as a list of path components."""
 
@@ -131,20 +215,42 @@ def _list_dir(pathname):
     If 'pathname' does not exist, then None is returned.
     """
 
+    return _scan_dir(pathname)
+
+
+def _scan_dir(pathname):
+    """Read the subdirectory names and filenames contained within 'pathname' with os.scandir().
+
+    Like os.walk(), symbolic links to directories are considered to be directories. If 'pathname'
+    does not exist, then None is returned.
+    """
+
+    dirs = []
+    files = []
     try:
-        (_root, dirs, files) = next(os.walk(pathname))
-        return (dirs, files)
-    except StopIteration:
+        with os.scandir(pathname) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirs.append(entry.name)
+                else:
+                    files.append(entry.name)
+    except OSError:
         return None  # 'pathname' directory does not exist
+    return (dirs, files)
 
 
-def _expand(pathname):
+def _expand(pathname, list_dir=_list_dir, with_files=True):
     """Emit tuples of the form ("dir", dirname) and ("file", filename).
 
-    The result is for all directories and files contained within the 'pathname' directory.
+    The result is for all directories and files contained within the 'pathname' directory. The
+    ("file", filename) tuples are omitted if 'with_files' is false.
     """
 
-    res = _list_dir(pathname)
+    res = list_dir(pathname)
     if res is None:
         return
 
@@ -154,25 +260,27 @@ def _expand(pathname):
     if os.path.basename(pathname):
         yield ("dir", os.path.join(pathname, ""))
 
-    for fname in files:
-        path = os.path.join(pathname, fname)
-        yield ("file", path)
+    if with_files:
+        for fname in files:
+            path = os.path.join(pathname, fname)
+            yield ("file", path)
 
     for dname in dirs:
         path = os.path.join(pathname, dname)
-        for xpath in _expand(path):
+        for xpath in _expand(path, list_dir, with_files):
             yield xpath
 
 
-def _expand_curdir(pathname):
+def _expand_curdir(pathname, list_dir=_list_dir, with_files=True):
     """Emit tuples of the form ("dir", dirname) and ("file", filename).
 
-    The result is for all directories and files contained within the 'pathname' directory.
+    The result is for all directories and files contained within the 'pathname' directory. The
+    ("file", filename) tuples are omitted if 'with_files' is false.
 
     The returned pathnames omit a "./" prefix.
     """
 
-    res = _list_dir(pathname)
+    res = list_dir(pathname)
     if res is None:
         return
 
@@ -181,9 +289,10 @@ def _expand_curdir(pathname):
     # Zero expansion
     yield ("dir", "")
 
-    for fname in files:
-        yield ("file", fname)
+    if with_files:
+        for fname in files:
+            yield ("file", fname)
 
     for dname in dirs:
-        for xdir in _expand(dname):
+        for xdir in _expand(dname, list_dir, with_files):
             yield xdir
@@ -1,11 +1,18 @@
 """Utility for parsing JS comments."""
 
+import os
+import os.path
 import re
+import threading
 
 import yaml
 
+from buildscripts.resmokelib.utils import atomicfile
+
+_JSTEST_TAGS_MARKER = "@tags"
+
 # TODO: use a more robust regular expression for matching tags
-_JSTEST_TAGS_RE = re.compile(r".*@tags\s*:\s*(\[[^\]]*\])", re.DOTALL)
+_JSTEST_TAGS_RE = re.compile(r"@tags\s*:\s*(\[[^\]]*\])")
 
 
 def get_tags(pathname):
@@ -28,7 +35,7 @@ def get_tags(pathname):
     """
 
     with open(pathname, 'r', encoding='utf-8') as fp:
-        match = _JSTEST_TAGS_RE.match(fp.read())
+        match = _find_last_tags(fp.read())
         if match:
             try:
                 # TODO: it might be worth supporting the block (indented) style of YAML lists in
@@ -44,6 +51,87 @@ def get_tags(pathname):
     return []
 
 
+def _find_last_tags(contents):
+    """Return the match for the last well-formed @tags definition in 'contents', or None.
+
+    This searches backwards for the @tags marker rather than matching a greedy pattern against the
+    entire file, which would require the regex engine to backtrack over every character of it.
+    """
+
+    pos = contents.rfind(_JSTEST_TAGS_MARKER)
+    while pos != -1:
+        match = _JSTEST_TAGS_RE.match(contents, pos)
+        if match:
+            return match
+        pos = contents.rfind(_JSTEST_TAGS_MARKER, 0, pos)
+    return None
+
+
+class TagsCache(object):
+    """Tags of JS test files, keyed by their path and invalidated when their mtime or size changes.
+
+    The cache can be persisted as a JSON file so that later invocations only parse the test files
+    that were modified in the meantime.
+    """
+
+    def __init__(self, entries=None):
+        """
+        Initialize the TagsCache.
+
+        :param entries: Dictionary mapping paths to a [mtime_ns, size, tags] list.
+        """
+        self._entries = dict(entries) if entries is not None else {}
+        self._lock = threading.Lock()
+        self._modified = False
+
+    @classmethod
+    def load(cls, pathname):
+        """
+        Read the cache from 'pathname'.
+
+        The tags can always be parsed from the test files again, so a missing or unreadable file is
+        treated as an empty cache.
+
+        :param pathname: Path to the JSON file written by save().
+        :return: TagsCache instance.
+        """
+        contents = atomicfile.read_json(pathname, default={})
+        entries = contents.get("tags", {}) if isinstance(contents, dict) else {}
+        return cls({
+            test_path: entry
+            for test_path, entry in entries.items() if isinstance(entry, list) and len(entry) == 3
+        })
+
+    def save(self, pathname):
+        """
+        Write the cache to 'pathname' if any entries were added or replaced since it was loaded.
+
+        See atomicfile.write() for how the file is replaced.
+
+        :param pathname: Path to the JSON file to write.
+        """
+        with self._lock:
+            if not self._modified:
+                return
+            contents = {"tags": dict(self._entries)}
+            self._modified = False
+        atomicfile.write_json(pathname, contents, sort_keys=True)
+
+    def get_tags(self, pathname):
+        """Return the tags of 'pathname', only parsing it if it changed since it was cached."""
+        stat = os.stat(pathname)
+        with self._lock:
+            entry = self._entries.get(pathname)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return list(entry[2])
+
+        tags = get_tags(pathname)
+        with self._lock:
+            self._entries[pathname] = [stat.st_mtime_ns, stat.st_size, list(tags)]
+            self._modified = True
+        return tags
+
+
 def _strip_jscomments(string):
     """Strip JS comments from a 'string'.
 
@@ -1,30 +1,132 @@
-"""Version of sched.scheduler with a fixed cancel() method."""
+"""Event scheduler with the interface of sched.scheduler and a constant time cancel() method."""
 
 import heapq
-import sched
+import itertools
+import threading
+import time as _time
 
 
-class Scheduler(sched.scheduler):
-    """A thread-safe, general purpose event scheduler."""
+class Event(object):
+    """An event which has been scheduled to run at 'time'.
+
+    Events are ordered by their time, then by their priority, then by the order they were scheduled.
+    """
+
+    __slots__ = ("time", "priority", "sequence", "action", "argument", "kwargs", "queued")
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, time, priority, sequence, action, argument, kwargs):
+        """Initialize the Event."""
+        self.time = time
+        self.priority = priority
+        self.sequence = sequence
+        self.action = action
+        self.argument = argument
+        self.kwargs = kwargs
+        # Set to false when the event is canceled or has started to run.
+        self.queued = True
+
+    def __lt__(self, other):
+        return (self.time, self.priority, self.sequence) < (other.time, other.priority,
+                                                              other.sequence)
+
+    def __repr__(self):
+        return "Event(time={}, priority={}, action={})".format(self.time, self.priority,
+                                                              self.action)
+
+
+class Scheduler(object):
+    """A thread-safe, general purpose event scheduler.
+
+    Canceled events are only marked as such and are skipped when they reach the front of the queue,
+    rather than being searched for and removed. This makes cancel() constant time, which matters for
+    logging handlers whose flush events are canceled and rescheduled every time their buffer fills.
+    The queue is rebuilt without the canceled events once they make up most of it.
+    """
+
+    # The queue isn't rebuilt when it has fewer events than this.
+    _MIN_COMPACT_SIZE = 64
+
+    def __init__(self, timefunc=_time.monotonic, delayfunc=_time.sleep):
+        """Initialize the Scheduler with the same functions as sched.scheduler."""
+        self.timefunc = timefunc
+        self.delayfunc = delayfunc
+        self._lock = threading.RLock()
+        self._queue = []
+        self._num_canceled = 0
+        self._sequence = itertools.count()
+
+    def enterabs(  # pylint: disable=too-many-arguments
+            self, time, priority, action, argument=(), kwargs=None):
+        """Schedule 'action' to be called at 'time'. Return the event for cancel()."""
+        event = Event(time, priority, next(self._sequence), action, argument,
+                      kwargs if kwargs is not None else {})
+        with self._lock:
+            heapq.heappush(self._queue, event)
+        return event
+
+    def enter(  # pylint: disable=too-many-arguments
+            self, delay, priority, action, argument=(), kwargs=None):
+        """Schedule 'action' to be called in 'delay' seconds. Return the event for cancel()."""
+        return self.enterabs(self.timefunc() + delay, priority, action, argument, kwargs)
 
     def cancel(self, event):
         """Remove an event from the queue.
 
         Raises a ValueError if the event is not in the queue.
         """
+        with self._lock:
+            if not event.queued:
+                raise ValueError("event not in list")
+            event.queued = False
+            self._num_canceled += 1
 
-        # The changes from https://hg.python.org/cpython/rev/d8802b055474 made it so sched.Event
-        # instances returned by sched.scheduler.enter() and sched.scheduler.enterabs() are treated
-        # as equal if they have the same (time, priority). It is therefore possible to remove the
-        # wrong event from the list when sched.scheduler.cancel() is called. Note that this is still
-        # true even with time.monotonic being the default timefunc, as GetTickCount64() on Windows
-        # only has a resolution of ~15ms. We therefore use the `is` operator to remove the correct
-        # event from the list.
+            if (len(self._queue) >= Scheduler._MIN_COMPACT_SIZE
+                    and 2 * self._num_canceled >= len(self._queue)):
+                self._queue = [queued for queued in self._queue if queued.queued]
+                heapq.heapify(self._queue)
+                self._num_canceled = 0
+
+    def empty(self):
+        """Return true if there are no events in the queue."""
         with self._lock:
-            for i in range(len(self._queue)):
-                if self._queue[i] is event:
-                    del self._queue[i]
-                    heapq.heapify(self._queue)
-                    return
+            return len(self._queue) == self._num_canceled
+
+    def _pop_canceled(self):
+        """Remove the canceled events from the front of the queue."""
+        while self._queue and not self._queue[0].queued:
+            heapq.heappop(self._queue)
+            self._num_canceled -= 1
 
-            raise ValueError("event not in list")
+    def run(self, blocking=True):
+        """Run the events in the queue as they become due, like sched.scheduler.run().
+
+        If 'blocking' is false, then return the number of seconds until the next event is due
+        once no more events are due.
+        """
+        while True:
+            with self._lock:
+                self._pop_canceled()
+                if not self._queue:
+                    break
+                event = self._queue[0]
+                now = self.timefunc()
+                delay = event.time > now
+                if not delay:
+                    heapq.heappop(self._queue)
+                    event.queued = False
+
+            if delay:
+                if not blocking:
+                    return event.time - now
+                self.delayfunc(event.time - now)
+            else:
+                event.action(*event.argument, **event.kwargs)
+                self.delayfunc(0)  # Let other threads run.
+        return None
+
+    @property
+    def queue(self):
+        """Return an ordered list of the events which haven't run or been canceled."""
+        with self._lock:
+            return sorted(event for event in self._queue if event.queued)
@@ -22,10 +22,10 @@ if __name__ == "__main__" and __package__ is None:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # pylint: disable=wrong-import-position
-import buildscripts.resmokelib.parser
 import buildscripts.util.read_config as read_config
+import buildscripts.util.testhistory as testhistory
 from buildscripts.burn_in_tests import DEFAULT_REPO_LOCATIONS, create_task_list_for_tests, \
-    is_file_a_test_file
+    is_file_a_test_file, set_resmoke_run_options
 from buildscripts.ciconfig.evergreen import (
     EvergreenProjectConfig,
     ResmokeArgs,
@@ -512,14 +512,15 @@ def main(
     """
     _configure_logging(verbose)
 
-    evg_api = RetryingEvergreenApi.get_api(config_file=evg_api_config)
+    task_expansions = read_config.read_config_file(expansion_file)
+    evg_api = testhistory.wrap_evergreen_api(
+        RetryingEvergreenApi.get_api(config_file=evg_api_config),
+        task_expansions.get("test_history_file"))
     evg_conf = parse_evergreen_file(EVERGREEN_FILE)
     selected_tests_service = SelectedTestsService.from_file(selected_tests_config)
     repos = [Repo(x) for x in DEFAULT_REPO_LOCATIONS if os.path.isdir(x)]
 
-    buildscripts.resmokelib.parser.set_run_options()
-
-    task_expansions = read_config.read_config_file(expansion_file)
+    set_resmoke_run_options(task_expansions.get("test_membership_index_file"))
 
     config_dict_of_suites_and_tasks = run(evg_api, evg_conf, selected_tests_service,
                                           task_expansions, repos)
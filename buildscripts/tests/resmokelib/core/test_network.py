@@ -0,0 +1,106 @@
+"""Unit tests for the resmokelib.core.network module."""
+
+import socket
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import config as _config
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.core import network
+
+# pylint: disable=missing-docstring,protected-access
+
+_BASE_PORT = 31000
+
+
+class TestPortAllocator(unittest.TestCase):
+    def setUp(self):
+        for patcher in [
+                mock.patch.object(_config, "BASE_PORT", _BASE_PORT),
+                mock.patch.object(network.PortAllocator, "_NEXT_DYNAMIC_PORT", None),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        network.PortAllocator.reset()
+        self.addCleanup(network.PortAllocator.reset)
+
+    def test_deterministic(self):
+        with mock.patch.object(_config, "PORT_ALLOCATION", "deterministic"):
+            self.assertEqual(network.PortAllocator.next_fixture_port(1), _BASE_PORT + 250)
+            self.assertEqual(network.PortAllocator.next_fixture_port(1), _BASE_PORT + 251)
+            self.assertEqual(network.PortAllocator.min_test_port(1), _BASE_PORT + 270)
+            self.assertEqual(network.PortAllocator.max_test_port(1), _BASE_PORT + 499)
+
+    def test_dynamic_skips_ports_in_use(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(sock.close)
+        sock.bind(("", _BASE_PORT + 1))
+        sock.listen(1)
+
+        with mock.patch.object(_config, "PORT_ALLOCATION", "dynamic"):
+            fixture_ports = [network.PortAllocator.next_fixture_port(job_num) for job_num in (0, 5)]
+            min_port = network.PortAllocator.min_test_port(3)
+            max_port = network.PortAllocator.max_test_port(3)
+
+        self.assertEqual(fixture_ports, [_BASE_PORT, _BASE_PORT + 2])
+        self.assertEqual((min_port, max_port), (_BASE_PORT + 3, _BASE_PORT + 102))
+
+    def test_dynamic_reset_reclaims_ports(self):
+        with mock.patch.object(_config, "PORT_ALLOCATION", "dynamic"), \
+             mock.patch.object(network, "_max_dynamic_port", return_value=_BASE_PORT + 199):
+            self.assertEqual(network.PortAllocator.min_test_port(0), _BASE_PORT)
+            self.assertEqual(network.PortAllocator.min_test_port(1), _BASE_PORT + 100)
+            with self.assertRaises(errors.PortAllocationError):
+                network.PortAllocator.min_test_port(2)
+
+            network.PortAllocator.reset()
+            self.assertEqual(network.PortAllocator.min_test_port(2), _BASE_PORT)
+            self.assertEqual(network.PortAllocator.next_fixture_port(0), _BASE_PORT + 100)
+
+    def test_dynamic_ephemeral_ports_are_opt_in(self):
+        with mock.patch.object(_config, "PORT_ALLOCATION", "dynamic"), \
+             mock.patch.object(network.PortAllocator, "MAX_PORT", _BASE_PORT + 459), \
+             mock.patch.object(network, "_max_dynamic_port", return_value=_BASE_PORT + 99):
+            self.assertEqual(network.PortAllocator.min_test_port(0), _BASE_PORT)
+            with self.assertRaises(errors.PortAllocationError):
+                network.PortAllocator.min_test_port(1)
+
+            with mock.patch.object(_config, "ALLOW_EPHEMERAL_PORTS", True):
+                self.assertEqual(network.PortAllocator.min_test_port(1), _BASE_PORT + 100)
+
+    def test_dynamic_releases_test_ports(self):
+        with mock.patch.object(_config, "PORT_ALLOCATION", "dynamic"), \
+             mock.patch.object(network, "_max_dynamic_port", return_value=_BASE_PORT + 199):
+            self.assertEqual(network.PortAllocator.min_test_port(0), _BASE_PORT)
+            self.assertEqual(network.PortAllocator.min_test_port(1), _BASE_PORT + 100)
+            # The same job keeps its range until the test finishes.
+            self.assertEqual(network.PortAllocator.max_test_port(0), _BASE_PORT + 99)
+
+            network.PortAllocator.release_test_ports(0)
+            self.assertEqual(network.PortAllocator.min_test_port(2), _BASE_PORT)
+
+    def test_dynamic_releases_fixture_ports(self):
+        with mock.patch.object(_config, "PORT_ALLOCATION", "dynamic"), \
+             mock.patch.object(network, "_max_dynamic_port", return_value=_BASE_PORT + 1):
+            self.assertEqual(network.PortAllocator.next_fixture_port(0), _BASE_PORT)
+            self.assertEqual(network.PortAllocator.next_fixture_port(0), _BASE_PORT + 1)
+            with self.assertRaises(errors.PortAllocationError):
+                network.PortAllocator.next_fixture_port(1)
+
+            network.PortAllocator.release_fixture_ports(0)
+            self.assertEqual(network.PortAllocator.next_fixture_port(1), _BASE_PORT)
+
+    def test_dynamic_supports_many_jobs(self):
+        num_jobs = 128
+        leased = []
+        with mock.patch.object(_config, "PORT_ALLOCATION", "dynamic"), \
+             mock.patch.object(network, "_max_dynamic_port", return_value=_BASE_PORT + 19999):
+            for job_num in range(num_jobs):
+                leased.extend(network.PortAllocator.next_fixture_port(job_num) for _ in range(3))
+                min_port = network.PortAllocator.min_test_port(job_num)
+                max_port = network.PortAllocator.max_test_port(job_num)
+                leased.extend(range(min_port, max_port + 1))
+
+        self.assertEqual(len(leased), len(set(leased)))
+        self.assertEqual(len(leased), num_jobs * (3 + 100))
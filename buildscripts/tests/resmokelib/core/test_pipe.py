@@ -4,6 +4,8 @@ from __future__ import absolute_import
 
 import io
 import logging
+import os
+import sys
 import unittest
 
 import mock
@@ -43,3 +45,64 @@ class TestLoggerPipe(unittest.TestCase):
     def test_escapes_null_bytes(self):
         calls = self._get_log_calls(b"a\0b")
         self.assertEqual(calls, [mock.call(self.LOG_LEVEL, u"a\\0b")])
+
+
+@unittest.skipIf(sys.platform == "win32", "The OutputPump isn't used on Windows")
+class TestOutputPump(unittest.TestCase):
+    LOG_LEVEL = logging.DEBUG
+
+    @classmethod
+    def _get_log_calls(cls, *chunks):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+
+        (read_fd, write_fd) = os.pipe()
+        pumped_pipe = _pipe.new_logger_pipe(logger=logger, level=cls.LOG_LEVEL,
+                                            pipe_out=os.fdopen(read_fd, "rb"))
+        pumped_pipe.wait_until_started()
+        with os.fdopen(write_fd, "wb", buffering=0) as pipe_in:
+            for chunk in chunks:
+                pipe_in.write(chunk)
+        pumped_pipe.wait_until_finished()
+
+        return logger.log.call_args_list
+
+    def test_logs_each_line(self):
+        calls = self._get_log_calls(b"a\nb \r\nc")
+        self.assertEqual(calls, [
+            mock.call(self.LOG_LEVEL, u"a"),
+            mock.call(self.LOG_LEVEL, u"b"),
+            mock.call(self.LOG_LEVEL, u"c"),
+        ])
+
+    def test_joins_lines_split_across_reads(self):
+        calls = self._get_log_calls(b"ab", b"c\nd", b"\xc3", b"\xa9\n")
+        self.assertEqual(calls, [
+            mock.call(self.LOG_LEVEL, u"abc"),
+            mock.call(self.LOG_LEVEL, u"d\u00e9"),
+        ])
+
+    def test_escapes_null_bytes(self):
+        calls = self._get_log_calls(b"a\0b\n")
+        self.assertEqual(calls, [mock.call(self.LOG_LEVEL, u"a\\0b")])
+
+    def test_reads_multiple_pipes(self):
+        loggers = []
+        pipes = []
+        for i in range(10):
+            logger = logging.Logger("for_testing%d" % i)
+            logger.log = mock.MagicMock()
+            (read_fd, write_fd) = os.pipe()
+            pipes.append((_pipe.new_logger_pipe(logger, self.LOG_LEVEL, os.fdopen(read_fd, "rb")),
+                          write_fd))
+            loggers.append(logger)
+
+        for (i, (pumped_pipe, write_fd)) in enumerate(pipes):
+            pumped_pipe.wait_until_started()
+            os.write(write_fd, b"line %d\n" % i)
+            os.close(write_fd)
+
+        for (i, (pumped_pipe, _)) in enumerate(pipes):
+            pumped_pipe.wait_until_finished()
+            self.assertEqual(loggers[i].log.call_args_list,
+                             [mock.call(self.LOG_LEVEL, u"line %d" % i)])
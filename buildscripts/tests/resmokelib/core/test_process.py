@@ -0,0 +1,66 @@
+"""Unit tests for buildscripts/resmokelib/core/process.py."""
+
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import config as _config
+from buildscripts.resmokelib.core import process as _process
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestGetPopenLock(unittest.TestCase):
+    def test_locked(self):
+        with mock.patch.object(_config, "PROCESS_LAUNCHER", "locked"):
+            self.assertIs(_process._get_popen_lock(), _process._POPEN_LOCK)
+
+    def test_concurrent(self):
+        for launcher in ("concurrent", "posix_spawn"):
+            with mock.patch.object(_config, "PROCESS_LAUNCHER", launcher):
+                self.assertIsInstance(_process._get_popen_lock(), contextlib.nullcontext)
+
+
+class TestFindExecutable(unittest.TestCase):
+    def test_path_is_unchanged(self):
+        self.assertEqual(_process._find_executable("./mongod", {}), "./mongod")
+
+    def test_searches_path(self):
+        dirname = os.path.dirname(sys.executable)
+        basename = os.path.basename(sys.executable)
+        self.assertEqual(
+            os.path.realpath(_process._find_executable(basename, {"PATH": dirname})),
+            os.path.realpath(sys.executable))
+
+    def test_not_found(self):
+        self.assertIsNone(_process._find_executable("no_such_program", {"PATH": ""}))
+
+
+@unittest.skipIf(sys.platform == "win32", "posix_spawn is not available on Windows")
+class TestStartWithLauncher(unittest.TestCase):
+    def _run(self, launcher, args, cwd=None):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+        with mock.patch.object(_config, "PROCESS_LAUNCHER", launcher):
+            proc = _process.Process(logger, args, cwd=cwd)
+            proc.start()
+            self.assertEqual(proc.wait(), 0)
+        return [call[0][1] for call in logger.log.call_args_list]
+
+    def test_output_is_logged(self):
+        args = [os.path.basename(sys.executable), "-c", "print('hello')"]
+        for launcher in ("locked", "concurrent", "posix_spawn"):
+            with mock.patch.dict(os.environ, {"PATH": os.path.dirname(sys.executable)}):
+                self.assertEqual(self._run(launcher, list(args)), ["hello"])
+
+    def test_cwd(self):
+        cwd = os.path.realpath(tempfile.gettempdir())
+        lines = self._run("posix_spawn",
+                          [sys.executable, "-c", "import os; print(os.path.realpath(os.getcwd()))"],
+                          cwd=cwd)
+        self.assertEqual(lines, [cwd])
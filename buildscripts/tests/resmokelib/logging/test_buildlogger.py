@@ -1,9 +1,17 @@
 """Unit tests for the buildscripts.resmokelib.logging.buildlogger module."""
 
+import gzip
+import http.server
 import json
+import logging
+import threading
 import unittest
 
+import mock
+
+from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib.logging import buildlogger
+from buildscripts.resmokelib.logging import flush
 
 # pylint: disable=missing-docstring,protected-access
 
@@ -44,6 +52,14 @@ class TestLogsSplitter(unittest.TestCase):
             logs[21:24], logs[24:27], logs[27:]
         ], buildlogger._LogsSplitter.split_logs(logs, max_size))
 
+    def test_split_and_encode(self):
+        logs = [(1.5, "x" * i) for i in range(20)]
+        batches = buildlogger._LogsSplitter.split_and_encode_logs(logs, 100)
+        self.assertEqual([lines for lines, _ in batches],
+                         buildlogger._LogsSplitter.split_logs(logs, 100))
+        for lines, json_data in batches:
+            self.assertEqual(json_data, json.dumps(lines))
+
     def check_split_sizes(self, splits, max_size):
         for split in splits:
             self.assertTrue(TestLogsSplitter.size(split) <= max_size)
@@ -64,3 +80,160 @@ class TestLogsSplitter(unittest.TestCase):
     def size(logs):
         """Returns the size of the log lines when represented in JSON."""
         return len(json.dumps(logs))
+
+
+class _StandInServer(http.server.ThreadingHTTPServer):
+    """A buildlogger server which records the log lines appended to each endpoint."""
+
+    def __init__(self):
+        http.server.ThreadingHTTPServer.__init__(self, ("localhost", 0), _StandInRequestHandler)
+        self.lock = threading.Lock()
+        self.logs = {}
+        self.content_encodings = set()
+        self.max_size = None
+        self.fail = False
+
+    @property
+    def url(self):
+        return "http://localhost:%d" % self.server_address[1]
+
+
+class _StandInRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+
+        if self.server.fail:
+            self._respond(500, {})
+            return
+        if self.server.max_size is not None and len(body) > self.server.max_size:
+            self._respond(413, {"max_size": self.server.max_size})
+            return
+
+        with self.server.lock:
+            self.server.content_encodings.add(encoding)
+            self.server.logs.setdefault(self.path, []).extend(
+                tuple(line) for line in json.loads(body))
+        self._respond(200, {})
+
+    def _respond(self, status, response):
+        data = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestBuildloggerHandler(unittest.TestCase):
+    """Unit tests for sending log lines with the buildlogger handlers."""
+
+    def setUp(self):
+        self.server = _StandInServer()
+        server_thread = threading.Thread(target=self.server.serve_forever)
+        server_thread.start()
+        self.addCleanup(server_thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.incomplete = threading.Event()
+        for patcher in [
+                mock.patch.object(_config, "BUILDLOGGER_URL", self.server.url),
+                mock.patch.object(_config, "BUILDLOGGER_GZIP", True),
+                mock.patch.object(_config, "BUILDLOGGER_UPLOAD_WORKERS", 2),
+                mock.patch.object(buildlogger, "_UPLOADER", None),
+                mock.patch.object(buildlogger, "BUILDLOGGER_FALLBACK", mock.Mock()),
+                mock.patch.object(buildlogger, "_INCOMPLETE_LOG_OUTPUT", self.incomplete),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _make_handler(self, build_id):
+        return buildlogger.BuildloggerGlobalHandler({"username": "user", "password": "pwd"},
+                                                    build_id)
+
+    @staticmethod
+    def _lines(build_id, num_lines):
+        return [(float(i), "build %d line %d" % (build_id, i)) for i in range(num_lines)]
+
+    def _send(self, handlers, num_flushes, num_lines):
+        for flush_num in range(num_flushes):
+            for build_id, handler in enumerate(handlers):
+                lines = self._lines(build_id, num_lines * num_flushes)
+                handler._flush_buffer_with_lock(
+                    lines[flush_num * num_lines:(flush_num + 1) * num_lines], False)
+        for handler in handlers:
+            handler.close()
+
+    def test_concurrent_uploads_are_in_order(self):
+        handlers = [self._make_handler(build_id) for build_id in range(3)]
+        self._send(handlers, num_flushes=10, num_lines=50)
+
+        for build_id in range(3):
+            self.assertEqual(self.server.logs["/build/%d/" % build_id],
+                             self._lines(build_id, 500))
+        self.assertEqual(self.server.content_encodings, {"gzip"})
+        self.assertFalse(self.incomplete.is_set())
+
+    def test_request_entity_too_large(self):
+        self.server.max_size = 1000
+        handler = self._make_handler(0)
+        self._send([handler], num_flushes=2, num_lines=100)
+
+        self.assertEqual(handler.max_size, 1000)
+        self.assertEqual(self.server.logs["/build/0/"], self._lines(0, 200))
+        self.assertFalse(self.incomplete.is_set())
+
+    def test_flush_thread_uploads(self):
+        with mock.patch.object(_config, "BUILDLOGGER_UPLOAD_WORKERS", 0):
+            handler = self._make_handler(0)
+        self._send([handler], num_flushes=2, num_lines=10)
+
+        self.assertEqual(self.server.logs["/build/0/"], self._lines(0, 20))
+        self.assertFalse(self.incomplete.is_set())
+
+    def test_server_error(self):
+        self.server.fail = True
+        handler = self._make_handler(0)
+        self._send([handler], num_flushes=2, num_lines=10)
+
+        self.assertNotIn("/build/0/", self.server.logs)
+        self.assertTrue(self.incomplete.is_set())
+
+    @mock.patch.object(buildlogger, "_MAX_QUEUED_BATCHES", 1)
+    @mock.patch.object(flush, "flush_after", mock.Mock(return_value=None))
+    def test_backpressure_blocks_emit_not_flush(self):
+        handler = self._make_handler(0)
+        send_allowed = threading.Event()
+
+        def send(chunk, _json_data):
+            send_allowed.wait()
+            return len(chunk)
+
+        handler._BaseBuildloggerHandler__append_logs_chunk = send
+
+        # Flushing queues the batches without waiting for earlier ones to be sent.
+        lines = self._lines(0, 30)
+        flush_thread = threading.Thread(target=lambda: [
+            handler._flush_buffer_with_lock(lines[i:i + 10], False) for i in range(0, 30, 10)
+        ])
+        flush_thread.start()
+        flush_thread.join(5)
+        self.assertFalse(flush_thread.is_alive())
+
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "message", None, None)
+        emit_thread = threading.Thread(target=handler.emit, args=(record, ))
+        emit_thread.start()
+        emit_thread.join(0.5)
+        self.assertTrue(emit_thread.is_alive())
+
+        send_allowed.set()
+        emit_thread.join(5)
+        self.assertFalse(emit_thread.is_alive())
+        handler.close()
+        self.assertFalse(self.incomplete.is_set())
@@ -0,0 +1,154 @@
+"""Unit tests for the buildscripts.resmokelib.logging.writer module."""
+
+import io
+import logging
+import threading
+import unittest
+
+from buildscripts.resmokelib.logging import writer
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _new_logger(name, stream, level=logging.DEBUG):
+    logger = logging.Logger(name)
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(level)
+    handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+    logger.addHandler(handler)
+    return (logger, handler)
+
+
+class TestWriterThread(unittest.TestCase):
+    def tearDown(self):
+        if writer.is_running():
+            writer.stop_thread()
+
+    def test_writes_records_in_order(self):
+        stream = io.StringIO()
+        (tests_logger, tests_handler) = _new_logger("tests", stream)
+        (fixture_logger, fixture_handler) = _new_logger("fixture", stream)
+
+        writer.start_thread([tests_logger, fixture_logger])
+        self.assertNotIn(tests_handler, tests_logger.handlers)
+        for i in range(5):
+            tests_logger.info("test %d", i)
+            fixture_logger.info("fixture %d", i)
+        self.assertEqual(writer.stop_thread(), 0)
+
+        expected = []
+        for i in range(5):
+            expected.append("[tests] test %d" % i)
+            expected.append("[fixture] fixture %d" % i)
+        self.assertEqual(stream.getvalue().splitlines(), expected)
+
+        # The original handlers are restored once the writer thread stops.
+        self.assertEqual(tests_logger.handlers, [tests_handler])
+        self.assertEqual(fixture_logger.handlers, [fixture_handler])
+        self.assertFalse(writer.is_running())
+
+    def test_formats_message_when_logged(self):
+        stream = io.StringIO()
+        (logger, handler) = _new_logger("executor", stream)
+        handler.setFormatter(logging.Formatter("[%(name)s] %(message)s\n%(exc_text)s"))
+        can_write = threading.Event()
+        handler.addFilter(lambda record: can_write.wait() or True)
+
+        writer.start_thread([logger])
+        state = {"nodes": 1}
+        try:
+            raise ValueError("error %d")
+        except ValueError:
+            logger.exception("state %s", state)
+        state["nodes"] = 2
+        can_write.set()
+        writer.stop_thread()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[0], "[executor] state {'nodes': 1}")
+        self.assertIn("ValueError: error %d", lines)
+
+    def test_respects_handler_level(self):
+        stream = io.StringIO()
+        (logger, _) = _new_logger("executor", stream, level=logging.INFO)
+
+        writer.start_thread([logger])
+        logger.debug("hidden")
+        logger.info("shown")
+        writer.stop_thread()
+
+        self.assertEqual(stream.getvalue(), "[executor] shown\n")
+
+    def test_counts_backlogged_records(self):
+        class _SlowStream(io.StringIO):
+            def __init__(self):
+                io.StringIO.__init__(self)
+                self.can_write = threading.Event()
+
+            def write(self, text):
+                self.can_write.wait()
+                return io.StringIO.write(self, text)
+
+        stream = _SlowStream()
+        (logger, _) = _new_logger("executor", stream)
+
+        writer.start_thread([logger], max_queued_records=1)
+        timer = threading.Timer(0.5, stream.can_write.set)
+        timer.start()
+        for i in range(10):
+            logger.info("line %d", i)
+        num_backlogged_records = writer.stop_thread()
+        timer.join()
+
+        self.assertEqual(len(stream.getvalue().splitlines()), 10)
+        self.assertGreaterEqual(num_backlogged_records, 1)
+
+    def test_writes_records_enqueued_after_shutdown(self):
+        stream = io.StringIO()
+        (logger, _) = _new_logger("executor", stream)
+
+        writer.start_thread([logger])
+        queue_handler = logger.handlers[0]
+        logger.info("before")
+        writer.stop_thread()
+        # A thread that looked up the handlers of the logger before they were restored.
+        queue_handler.handle(logger.makeRecord("executor", logging.INFO, None, 0, "after", None,
+                                               None))
+
+        self.assertEqual(stream.getvalue().splitlines(), ["[executor] before", "[executor] after"])
+
+    def test_shutdown_with_full_queue(self):
+        class _SlowStream(io.StringIO):
+            def __init__(self):
+                io.StringIO.__init__(self)
+                self.can_write = threading.Event()
+
+            def write(self, text):
+                self.can_write.wait()
+                return io.StringIO.write(self, text)
+
+        stream = _SlowStream()
+        (logger, _) = _new_logger("executor", stream)
+
+        writer.start_thread([logger], max_queued_records=1)
+        producer = threading.Thread(target=lambda: [logger.info("line %d", i) for i in range(10)])
+        producer.start()
+        timer = threading.Timer(0.5, stream.can_write.set)
+        timer.start()
+        writer.stop_thread()
+        producer.join(10)
+        timer.join()
+
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(
+            sorted(stream.getvalue().splitlines()), sorted(
+                "[executor] line %d" % i for i in range(10)))
+
+    def test_cannot_start_twice(self):
+        writer.start_thread([])
+        with self.assertRaises(ValueError):
+            writer.start_thread([])
+
+    def test_cannot_stop_before_start(self):
+        with self.assertRaises(ValueError):
+            writer.stop_thread()
@@ -0,0 +1,101 @@
+"""Unit tests for the resmokelib.reportfile module."""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from buildscripts.resmokelib import reportfile
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def make_result(test_file, start, status="pass"):
+    return {
+        "test_file": test_file, "status": status, "exit_code": 0 if status == "pass" else 1,
+        "start": start, "end": start + 1, "elapsed": 1
+    }
+
+
+class TestReadResults(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def write_file(self, contents):
+        pathname = os.path.join(self.tmpdir, "report")
+        with open(pathname, "w") as fp:
+            fp.write(contents)
+        return pathname
+
+    def test_report_json(self):
+        results = [make_result("b", 2), make_result("a", 1)]
+        pathname = self.write_file(json.dumps({"results": results, "failures": 0}))
+        self.assertEqual(list(reportfile.read_results(pathname)), [results[1], results[0]])
+
+    def test_indented_report_json(self):
+        results = [make_result("a", 1)]
+        pathname = self.write_file(json.dumps({"results": results, "failures": 0}, indent=4))
+        self.assertEqual(list(reportfile.read_results(pathname)), results)
+
+    def test_json_lines(self):
+        results = [make_result("b", 2), make_result("a", 1)]
+        pathname = self.write_file("".join(json.dumps(result) + "\n" for result in results))
+        self.assertEqual(list(reportfile.read_results(pathname)), results)
+
+    def test_truncated_json_lines(self):
+        result = make_result("a", 1)
+        pathname = self.write_file(json.dumps(result) + "\n" + json.dumps(result)[:10])
+        self.assertEqual(list(reportfile.read_results(pathname)), [result])
+        pathname = self.write_file(json.dumps(result)[:10])
+        self.assertEqual(list(reportfile.read_results(pathname)), [])
+
+    def test_empty_file(self):
+        self.assertEqual(list(reportfile.read_results(self.write_file(""))), [])
+
+
+class TestMergeResults(unittest.TestCase):
+    def test_merge_and_write(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        pathnames = [os.path.join(tmpdir, name) for name in ("report.json", "report.jsonl")]
+        with open(pathnames[0], "w") as fp:
+            json.dump({"results": [make_result("a", 1), make_result("c", 3, "fail")]}, fp)
+        with open(pathnames[1], "w") as fp:
+            # The results of different jobs are in the order the tests finished.
+            fp.write(json.dumps(dict(make_result("d", 4, "silentfail"), job=0)) + "\n")
+            fp.write(json.dumps(dict(make_result("b", 2, "timeout"), job=1)) + "\n")
+
+        output = io.StringIO()
+        num_failures = reportfile.write_results(reportfile.merge_results(pathnames), output)
+
+        combined = json.loads(output.getvalue())
+        self.assertEqual([result["test_file"] for result in combined["results"]],
+                         ["a", "b", "c", "d"])
+        self.assertEqual(combined["failures"], 2)
+        self.assertEqual(num_failures, 2)
+
+    def test_merge_jobs_lazily(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        pathname = os.path.join(tmpdir, "report.jsonl")
+        with open(pathname, "w") as fp:
+            # The results of each job are in the order their tests started, but the jobs finish
+            # their tests in any order.
+            for (job_num, test_file, start) in [(1, "b", 2), (0, "a", 1), (0, "d", 4), (1, "c", 3),
+                                                (0, "e", 5)]:
+                fp.write(json.dumps(dict(make_result(test_file, start), job=job_num)) + "\n")
+
+        runs = reportfile._read_sorted_runs(pathname)
+        self.assertEqual(len(runs), 2)
+        self.assertNotIsInstance(runs[0], list)
+        results = list(reportfile.merge_results([pathname]))
+        self.assertEqual([result["test_file"] for result in results], ["a", "b", "c", "d", "e"])
+        self.assertNotIn("job", results[0])
+
+    def test_write_no_results(self):
+        output = io.StringIO()
+        self.assertEqual(reportfile.write_results(iter([]), output), 0)
+        self.assertEqual(json.loads(output.getvalue()), {"results": [], "failures": 0})
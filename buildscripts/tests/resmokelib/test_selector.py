@@ -2,10 +2,14 @@
 
 import fnmatch
 import os.path
+import shutil
 import sys
+import tempfile
 import unittest
 import collections
 
+import mock
+
 import buildscripts.resmokelib.config
 import buildscripts.resmokelib.parser as parser
 import buildscripts.resmokelib.selector as selector
@@ -93,6 +97,79 @@ class TestExpressions(unittest.TestCase):
             selector.make_expression({"$anyOf": ["tag1", "tag2"], "invalid": "tag3"})
 
 
+class TestFileSystemMemo(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.test_file_explorer = selector.TestFileExplorer()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, basename, contents):
+        pathname = os.path.join(self.tmpdir, basename)
+        with open(pathname, "w") as fp:
+            fp.write(contents)
+        return pathname
+
+    def test_memoizes_lookups(self):
+        test_file = self._write("test.js", "// @tags: [tag1]\n")
+        pattern = os.path.join(self.tmpdir, "*.js")
+
+        with self.test_file_explorer.memoize() as memo:
+            with mock.patch.object(globstar, "iglob", wraps=globstar.iglob) as iglob:
+                self.assertEqual(list(self.test_file_explorer.iglob(pattern)), [test_file])
+                self.assertEqual(list(self.test_file_explorer.iglob(pattern)), [test_file])
+            iglob.assert_called_once_with(pattern, snapshot=mock.ANY)
+            self.assertEqual(self.test_file_explorer.jstest_tags(test_file), ["tag1"])
+
+        self.assertEqual(memo.globs, {pattern: [test_file]})
+        self.assertIn(test_file, memo.files)
+        self.assertTrue(memo.is_current())
+
+    def test_not_current_after_changes(self):
+        test_file = self._write("test.js", "// @tags: [tag1]\n")
+        pattern = os.path.join(self.tmpdir, "*.js")
+
+        with self.test_file_explorer.memoize() as memo:
+            list(self.test_file_explorer.iglob(pattern))
+            self.test_file_explorer.jstest_tags(test_file)
+            self.test_file_explorer.isfile(os.path.join(self.tmpdir, "other.js"))
+
+        memo = selector.FileSystemMemo.from_dict(memo.to_dict())
+        self.assertTrue(memo.is_current())
+
+        self._write("test.js", "// @tags: [tag1, tag2]\n")
+        self.assertFalse(memo.is_current())
+
+    def test_not_current_after_new_file(self):
+        self._write("test.js", "")
+        pattern = os.path.join(self.tmpdir, "*.js")
+
+        with self.test_file_explorer.memoize() as memo:
+            list(self.test_file_explorer.iglob(pattern))
+
+        self._write("new.js", "")
+        self.assertFalse(memo.is_current())
+
+
+    def test_is_current_checks_directories(self):
+        os.mkdir(os.path.join(self.tmpdir, "subdir"))
+        self._write("test.js", "")
+        pattern = os.path.join(self.tmpdir, "**", "*.js")
+
+        with self.test_file_explorer.memoize() as memo:
+            list(self.test_file_explorer.iglob(pattern))
+
+        memo = selector.FileSystemMemo.from_dict(memo.to_dict())
+        self.assertIn(os.path.join(self.tmpdir, "subdir"), memo.dirs)
+        with mock.patch.object(globstar, "iglob") as iglob:
+            self.assertTrue(memo.is_current())
+        iglob.assert_not_called()
+
+        self._write(os.path.join("subdir", "new.js"), "")
+        self.assertFalse(memo.is_current())
+
+
 class TestTestFileExplorer(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -161,6 +238,9 @@ class MockTestFileExplorer(object):
     def jstest_tags(self, file_path):
         return self.tags.get(file_path, [])
 
+    def save_jstest_tags(self):
+        pass
+
     def read_root_file(self, root_file_path):  # pylint: disable=no-self-use,unused-argument
         return ["build/testA", "build/testB"]
 
@@ -1,5 +1,8 @@
 """Unit tests for buildscripts/resmokelib/suitesconfig.py."""
 
+import os.path
+import shutil
+import tempfile
 import unittest
 
 import mock
@@ -51,3 +54,54 @@ class TestSuitesConfig(unittest.TestCase):
             test_kind=("fsm_workload_test", "js_test"))
         self.assertEqual(membership_map, dict(test1=all_suites, test2=all_suites))
         self.assertEqual(mock_suite_class.call_count, 2)
+
+
+class TestMembershipIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.index_file = os.path.join(self.tmpdir, "build", "membership.json")
+        patcher = mock.patch.object(suitesconfig._config, "TEST_MEMBERSHIP_INDEX_FILE",
+                                    self.index_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    @mock.patch(RESMOKELIB + ".testing.suite.Suite")
+    @mock.patch(RESMOKELIB + ".suitesconfig.get_named_suites")
+    def test_index_is_reused(self, mock_get_named_suites, mock_suite_class):
+        mock_get_named_suites.return_value = ["core"]
+        mock_suite_class.return_value.tests = ["test1", "test2"]
+
+        membership_map = suitesconfig.create_test_membership_map(test_kind="js_test")
+        self.assertTrue(os.path.exists(self.index_file))
+        self.assertEqual(mock_suite_class.call_count, 1)
+
+        reused_map = suitesconfig.create_test_membership_map(test_kind="js_test")
+        self.assertEqual(reused_map, membership_map)
+        self.assertEqual(mock_suite_class.call_count, 1)
+
+    @mock.patch(RESMOKELIB + ".testing.suite.Suite")
+    @mock.patch(RESMOKELIB + ".suitesconfig.get_named_suites")
+    def test_index_not_reused_for_other_options(self, mock_get_named_suites, mock_suite_class):
+        mock_get_named_suites.return_value = ["core"]
+        mock_suite_class.return_value.tests = ["test1"]
+
+        suitesconfig.create_test_membership_map(test_kind="js_test")
+        suitesconfig.create_test_membership_map(test_kind=("fsm_workload_test", "js_test"))
+        self.assertEqual(mock_suite_class.call_count, 2)
+
+    @mock.patch(RESMOKELIB + ".testing.suite.Suite")
+    @mock.patch(RESMOKELIB + ".suitesconfig.get_named_suites")
+    def test_invalid_index_is_ignored(self, mock_get_named_suites, mock_suite_class):
+        mock_get_named_suites.return_value = ["core"]
+        mock_suite_class.return_value.tests = ["test1"]
+
+        os.makedirs(os.path.dirname(self.index_file))
+        with open(self.index_file, "w") as fp:
+            fp.write("{not json")
+
+        membership_map = suitesconfig.create_test_membership_map(test_kind="js_test")
+        self.assertEqual(membership_map, dict(test1=["core"]))
+        self.assertEqual(mock_suite_class.call_count, 1)
@@ -1,5 +1,6 @@
 """Unit tests for the resmokelib.testing.fixtures.interface module."""
 import logging
+import threading
 import unittest
 
 from buildscripts.resmokelib import errors
@@ -19,6 +20,45 @@ class TestFixture(unittest.TestCase):
             raising_fixture.teardown()
 
 
+class TestCallInParallel(unittest.TestCase):
+    def test_calls_all_functions_concurrently(self):
+        barrier = threading.Barrier(3, timeout=10)
+        calls = []
+
+        def make_function(i):
+            def function():
+                barrier.wait()
+                calls.append(i)
+
+            return function
+
+        interface.call_in_parallel([make_function(i) for i in range(3)])
+        self.assertEqual(sorted(calls), [0, 1, 2])
+
+    def test_returns_results_in_order(self):
+        results = interface.call_in_parallel([lambda i=i: i * 10 for i in range(3)])
+        self.assertEqual(results, [0, 10, 20])
+
+    def test_reraises_earliest_exception(self):
+        calls = []
+
+        def ok():
+            calls.append("ok")
+
+        def fail(msg):
+            def function():
+                raise errors.ServerFailure(msg)
+
+            return function
+
+        with self.assertRaisesRegex(errors.ServerFailure, "first"):
+            interface.call_in_parallel([fail("first"), ok, fail("second")])
+        self.assertEqual(calls, ["ok"])
+
+    def test_no_functions(self):  # pylint: disable=no-self-use
+        interface.call_in_parallel([])
+
+
 class TestFixtureTeardownHandler(unittest.TestCase):
     def test_teardown_ok(self):
         handler = interface.FixtureTeardownHandler(logging.getLogger("handler_unittests"))
@@ -0,0 +1,41 @@
+"""Unit tests for the resmokelib.testing.fixtures.replicaset module."""
+import unittest
+
+from buildscripts.resmokelib.testing.fixtures import replicaset
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _member(i, votes=1):
+    member = {"_id": i, "host": "localhost:%d" % (20000 + i)}
+    if votes == 0:
+        member["priority"] = 0
+        member["votes"] = 0
+    return member
+
+
+class TestGetReconfigBoundaries(unittest.TestCase):
+    def _boundaries(self, members):
+        return replicaset.ReplicaSetFixture._get_reconfig_boundaries(members)
+
+    def test_single_member(self):
+        self.assertEqual(self._boundaries([_member(0)]), [])
+
+    def test_voting_members_added_one_at_a_time(self):
+        members = [_member(i) for i in range(4)]
+        self.assertEqual(self._boundaries(members), [2, 3, 4])
+
+    def test_non_voting_members_added_together(self):
+        members = [_member(0)] + [_member(i, votes=0) for i in range(1, 7)]
+        self.assertEqual(self._boundaries(members), [7])
+
+    def test_non_voting_members_added_with_voting_member(self):
+        members = [
+            _member(0),
+            _member(1),
+            _member(2, votes=0),
+            _member(3),
+            _member(4, votes=0),
+            _member(5, votes=0),
+        ]
+        self.assertEqual(self._boundaries(members), [3, 6])
@@ -0,0 +1,58 @@
+"""Unit tests for the resmokelib.testing.fixtures.shardedcluster module."""
+import itertools
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.fixtures import replicaset
+from buildscripts.resmokelib.testing.fixtures import shardedcluster
+from buildscripts.resmokelib.testing.fixtures import standalone
+
+# pylint: disable=missing-docstring,protected-access
+
+NS = "buildscripts.resmokelib.testing.fixtures.shardedcluster"
+
+
+def ns(relative_name):  # pylint: disable=invalid-name
+    """Return a full name from a name relative to the test module's name space."""
+    return NS + "." + relative_name
+
+
+@mock.patch(ns("config.NUM_SHARDS"), None)
+@mock.patch(ns("config.NUM_REPLSET_NODES"), None)
+@mock.patch(ns("config.MIXED_BIN_VERSIONS"), None)
+@mock.patch(ns("config.PARALLEL_FIXTURE_SETUP"), True)
+@mock.patch(ns("logging.loggers.new_fixture_node_logger"),
+            mock.Mock(return_value=logging.getLogger("shardedcluster_unittest")))
+@mock.patch("buildscripts.resmokelib.core.network.PortAllocator.next_fixture_port")
+class TestParallelSetup(unittest.TestCase):
+    def make_fixture(self, **kwargs):
+        return shardedcluster.ShardedClusterFixture(
+            logging.getLogger("shardedcluster_unittest"), 0, mongod_options={},
+            dbpath_prefix="/data/db", **kwargs)
+
+    def test_ports_are_reserved_in_order(self, next_fixture_port_mock):
+        next_fixture_port_mock.side_effect = itertools.count(20000)
+        fixture = self.make_fixture(num_shards=2, num_rs_nodes_per_shard=2,
+                                    configsvr_options={"num_nodes": 2})
+
+        with mock.patch.object(replicaset.ReplicaSetFixture, "setup") as setup_mock:
+            fixture.setup()
+
+        self.assertEqual(setup_mock.call_count, 3)
+        ports = [[node.mongod_options["port"] for node in rs.nodes]
+                 for rs in [fixture.configsvr] + fixture.shards]
+        self.assertEqual(ports, [[20000, 20001], [20002, 20003], [20004, 20005]])
+
+    def test_standalone_shards(self, next_fixture_port_mock):
+        next_fixture_port_mock.side_effect = itertools.count(20000)
+        fixture = self.make_fixture(num_shards=2, num_rs_nodes_per_shard=None)
+
+        with mock.patch.object(replicaset.ReplicaSetFixture, "setup"), \
+             mock.patch.object(standalone.MongoDFixture, "setup"):
+            fixture.setup()
+
+        self.assertEqual(fixture.configsvr.nodes[0].mongod_options["port"], 20000)
+        self.assertEqual([shard.mongod_options["port"] for shard in fixture.shards],
+                         [20001, 20002])
@@ -0,0 +1,481 @@
+"""Unit tests for the resmokelib.testing.hooks.consistency_checks module."""
+
+import logging
+import unittest
+
+import mock
+import pymongo.errors
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.fixtures import interface as fixture_interface
+from buildscripts.resmokelib.testing.fixtures import replicaset
+from buildscripts.resmokelib.testing.fixtures import shardedcluster
+from buildscripts.resmokelib.testing.fixtures import standalone
+from buildscripts.resmokelib.testing.hooks import consistency_checks
+from buildscripts.resmokelib.testing.hooks import dbhash
+from buildscripts.resmokelib.testing.hooks import jsfile
+from buildscripts.resmokelib.testing.hooks import validate
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def make_replica_set(auth_options=None):
+    fixture = mock.Mock(spec=replicaset.ReplicaSetFixture)
+    fixture.auth_options = auth_options
+    return fixture
+
+
+class _FakeDatabase(object):
+    def __init__(self, hashes, coll_infos, coll_stats):
+        self._hashes = hashes
+        self._coll_infos = coll_infos
+        self._coll_stats = coll_stats
+        self.dbhash_kwargs = []
+
+    def command(self, name, *args, **kwargs):
+        if name == "dbHash":
+            self.dbhash_kwargs.append(kwargs)
+            return self._hashes
+        if name == "collStats":
+            return self._coll_stats.get(args[0], {"ok": 1, "ns": "test." + args[0]})
+        raise AssertionError("unexpected command " + name)
+
+    def list_collections(self, filter=None):  # pylint: disable=redefined-builtin
+        return list(self._coll_infos)
+
+
+class _FakeClient(object):
+    def __init__(self, hashes, coll_infos, coll_stats=None):
+        self._database = _FakeDatabase(hashes, coll_infos, coll_stats or {})
+        self.admin = mock.Mock()
+        self.admin.command.side_effect = self._admin_command
+
+    @staticmethod
+    def _admin_command(name):
+        if name == "listDatabases":
+            return {"databases": [{"name": "local"}, {"name": "test"}]}
+        if name == "replSetGetConfig":
+            return {"config": {"members": [{"host": "primary"}, {"host": "secondary"}]}}
+        raise AssertionError("unexpected command " + name)
+
+    def __getitem__(self, db_name):
+        return self._database
+
+
+def make_checker(primary_client, secondary_client):
+    clients = {"primary": primary_client, "secondary": secondary_client}
+    checker = mock.Mock()
+    checker.logger = logging.getLogger("consistency_checks")
+    checker.primary = "primary"
+    checker.secondaries = ["secondary"]
+    checker.client.side_effect = clients.get
+    return checker
+
+
+class TestGetTestData(unittest.TestCase):
+    def test_no_shell_options(self):
+        self.assertEqual(consistency_checks.get_test_data(None, set()), {})
+
+    def test_supported_test_data(self):
+        shell_options = {"global_vars": {"TestData": {"excludedDBsFromDBHash": ["admin"]}}}
+        self.assertEqual(
+            consistency_checks.get_test_data(shell_options, {"excludedDBsFromDBHash"}),
+            {"excludedDBsFromDBHash": ["admin"]})
+
+    def test_unsupported_test_data(self):
+        shell_options = {"global_vars": {"TestData": {"skipValidationNamespaces": []}}}
+        self.assertIsNone(consistency_checks.get_test_data(shell_options, set()))
+
+    def test_other_shell_options(self):
+        self.assertIsNone(consistency_checks.get_test_data({"eval": "1"}, set()))
+        self.assertIsNone(
+            consistency_checks.get_test_data({"global_vars": {"other": True}}, set()))
+
+
+class TestGetReplicaSets(unittest.TestCase):
+    def test_replica_set(self):
+        fixture = make_replica_set()
+        self.assertEqual(consistency_checks.get_replica_sets(fixture), [fixture])
+
+    def test_standalone(self):
+        fixture = mock.Mock(spec=standalone.MongoDFixture)
+        self.assertEqual(consistency_checks.get_replica_sets(fixture), [fixture])
+
+    def test_sharded_cluster(self):
+        fixture = mock.Mock(spec=shardedcluster.ShardedClusterFixture)
+        fixture.auth_options = None
+        fixture.configsvr = make_replica_set()
+        fixture.shards = [make_replica_set(), make_replica_set()]
+        self.assertEqual(
+            consistency_checks.get_replica_sets(fixture), [fixture.configsvr] + fixture.shards)
+
+    def test_auth(self):
+        fixture = make_replica_set(auth_options={"authenticationMechanism": "SCRAM-SHA-1"})
+        self.assertIsNone(consistency_checks.get_replica_sets(fixture))
+
+    def test_other_fixture(self):
+        fixture = mock.Mock(spec=fixture_interface.Fixture)
+        self.assertIsNone(consistency_checks.get_replica_sets(fixture))
+
+
+class TestCompareCollStats(unittest.TestCase):
+    STATS = {"ok": 1, "ns": "test.coll", "capped": False, "nindexes": 2}
+
+    def test_match(self):
+        self.assertEqual(consistency_checks._compare_coll_stats(self.STATS, self.STATS, True), [])
+
+    def test_failed_command(self):
+        self.assertEqual(
+            consistency_checks._compare_coll_stats(self.STATS, {"ok": 0}, True),
+            ["collStats failed"])
+
+    def test_indexes(self):
+        secondary_stats = dict(self.STATS, nindexes=1)
+        self.assertEqual(
+            consistency_checks._compare_coll_stats(self.STATS, secondary_stats, True), ["indexes"])
+        # Members with buildIndexes=false only have the _id index.
+        self.assertEqual(
+            consistency_checks._compare_coll_stats(self.STATS, secondary_stats, False), [])
+
+    def test_index_builds(self):
+        primary_stats = dict(self.STATS, indexBuilds=["a_1"])
+        self.assertEqual(
+            consistency_checks._compare_coll_stats(primary_stats, self.STATS, True),
+            ["indexBuilds"])
+        secondary_stats = dict(self.STATS, indexBuilds=["a_1"])
+        self.assertEqual(
+            consistency_checks._compare_coll_stats(primary_stats, secondary_stats, True), [])
+
+
+class TestNormalizeCollInfo(unittest.TestCase):
+    def test_ignores_flags_and_id_index_ns(self):
+        old_info = {
+            "name": "coll", "options": {"flags": 1}, "idIndex": {"name": "_id_", "ns": "test.coll"}
+        }
+        new_info = {"name": "coll", "options": {}, "idIndex": {"name": "_id_"}}
+        self.assertEqual(
+            consistency_checks._normalize_coll_info(old_info),
+            consistency_checks._normalize_coll_info(new_info))
+
+    def test_detects_different_options(self):
+        self.assertNotEqual(
+            consistency_checks._normalize_coll_info({"name": "coll", "options": {}}),
+            consistency_checks._normalize_coll_info({"name": "coll", "options": {"capped": True}}))
+
+
+@mock.patch.object(consistency_checks, "_log_collection_diff")
+class TestCheckDBHashes(unittest.TestCase):
+    INFOS = [{"name": "a", "type": "collection", "options": {}}]
+
+    def test_match(self, log_diff):
+        hashes = {"collections": {"a": "hash_a"}, "md5": "md5"}
+        checker = make_checker(_FakeClient(hashes, self.INFOS), _FakeClient(hashes, self.INFOS))
+        consistency_checks._check_dbhashes(checker, ["local"])
+        checker.dump_oplogs.assert_not_called()
+        log_diff.assert_not_called()
+
+    def test_collection_mismatch(self, log_diff):
+        checker = make_checker(
+            _FakeClient({"collections": {"a": "hash_a"}, "md5": "md5"}, self.INFOS),
+            _FakeClient({"collections": {"a": "other"}, "md5": "other"}, self.INFOS))
+        with self.assertRaises(errors.TestFailure):
+            consistency_checks._check_dbhashes(checker, ["local"])
+        checker.dump_oplogs.assert_called_once_with()
+        self.assertEqual(log_diff.call_args[0][3:], ("test", "a"))
+
+    def test_capped_collections_are_not_compared(self, log_diff):
+        infos = [{"name": "a", "type": "collection", "options": {"capped": True}}]
+        checker = make_checker(
+            _FakeClient({"collections": {"a": "hash_a"}, "md5": "md5"}, infos),
+            _FakeClient({"collections": {"a": "other"}, "md5": "other"}, infos))
+        consistency_checks._check_dbhashes(checker, ["local"])
+        log_diff.assert_not_called()
+
+    def test_written_namespaces(self, log_diff):
+        hashes = {"collections": {"a": "hash_a"}, "md5": "md5"}
+        primary_client = _FakeClient(hashes, self.INFOS)
+        checker = make_checker(primary_client, _FakeClient(hashes, self.INFOS))
+        consistency_checks._check_dbhashes(checker, ["local"], {"test": {"b", "a"}})
+        self.assertEqual(primary_client["test"].dbhash_kwargs, [{"collections": ["a", "b"]}])
+        log_diff.assert_not_called()
+
+    def test_unwritten_database_is_skipped(self, log_diff):
+        checker = make_checker(
+            _FakeClient({"collections": {"a": "hash_a"}, "md5": "md5"}, self.INFOS),
+            _FakeClient({"collections": {"a": "other"}, "md5": "other"}, self.INFOS))
+        consistency_checks._check_dbhashes(checker, ["local"], {"other": None})
+        log_diff.assert_not_called()
+
+    def test_excluded_database(self, log_diff):
+        checker = make_checker(
+            _FakeClient({"collections": {"a": "hash_a"}, "md5": "md5"}, self.INFOS),
+            _FakeClient({"collections": {"a": "other"}, "md5": "other"}, self.INFOS))
+        consistency_checks._check_dbhashes(checker, ["local", "test"])
+        log_diff.assert_not_called()
+
+
+class TestGetWrittenNamespaces(unittest.TestCase):
+    def make_client(self, first_ts, entries):
+        client = mock.MagicMock()
+        oplog = client.local.__getitem__.return_value
+        oplog.find_one.return_value = {"ts": first_ts}
+        oplog.find.return_value = entries
+        return client
+
+    def test_crud_and_command_entries(self):
+        entries = [
+            {"op": "i", "ns": "test.a"},
+            {"op": "u", "ns": "test.b"},
+            {"op": "n", "ns": ""},
+            {"op": "c", "ns": "other.$cmd"},
+            {"op": "i", "ns": "other.c"},
+        ]
+        written = consistency_checks._get_written_namespaces(self.make_client(1, entries), 5)
+        self.assertEqual(written, {
+            "test": {"a", "b"}, "other": None, "config": {"transactions", "image_collection"}
+        })
+
+    def test_nested_and_rename_entries(self):
+        entries = [
+            {"op": "c", "ns": "admin.$cmd", "o": {"applyOps": [{"op": "i", "ns": "test.a"}]}},
+            {
+                "op": "c", "ns": "admin.$cmd",
+                "o": {"renameCollection": "db1.a", "to": "db2.b"}
+            },
+        ]
+        written = consistency_checks._get_written_namespaces(self.make_client(1, entries), 5)
+        self.assertEqual(written["test"], {"a"})
+        self.assertIsNone(written["admin"])
+        self.assertIsNone(written["db1"])
+        self.assertIsNone(written["db2"])
+
+    def test_nothing_written(self):
+        self.assertEqual(consistency_checks._get_written_namespaces(self.make_client(1, []), 5), {})
+
+    def test_oplog_rolled_over(self):
+        client = self.make_client(10, [{"op": "i", "ns": "test.a"}])
+        self.assertIsNone(consistency_checks._get_written_namespaces(client, 5))
+        self.assertIsNone(consistency_checks._get_written_namespaces(client, None))
+
+
+@mock.patch.object(consistency_checks, "_get_written_namespaces")
+@mock.patch.object(consistency_checks, "_get_last_oplog_ts")
+@mock.patch.object(consistency_checks, "_check_dbhashes")
+class TestDBHashHistory(unittest.TestCase):
+    def make_checker(self, primary="primary"):
+        checker = mock.Mock()
+        checker.logger = logging.getLogger("consistency_checks")
+        checker.primary = primary
+        checker.replset_name = "rs"
+        return checker
+
+    def test_incremental_checks(self, check_dbhashes, get_last_oplog_ts, get_written_namespaces):
+        history = consistency_checks.DBHashHistory(3)
+        get_last_oplog_ts.side_effect = [1, 2, 3, 4]
+        get_written_namespaces.return_value = {"test": {"a"}}
+
+        for _ in range(4):
+            history.check(self.make_checker(), ["local"])
+
+        written = [call[0][2] for call in check_dbhashes.call_args_list]
+        self.assertEqual(written, [None, {"test": {"a"}}, {"test": {"a"}}, None])
+        self.assertEqual([call[0][1] for call in get_written_namespaces.call_args_list], [1, 2])
+
+    def test_full_check_after_failover(self, check_dbhashes, get_last_oplog_ts,
+                                       get_written_namespaces):
+        history = consistency_checks.DBHashHistory(10)
+        get_last_oplog_ts.side_effect = [1, 2]
+        history.check(self.make_checker(), ["local"])
+        history.check(self.make_checker(primary="secondary"), ["local"])
+        get_written_namespaces.assert_not_called()
+        self.assertEqual([call[0][2] for call in check_dbhashes.call_args_list], [None, None])
+
+    def test_full_check_after_rollover(self, check_dbhashes, get_last_oplog_ts,
+                                       get_written_namespaces):
+        history = consistency_checks.DBHashHistory(10)
+        get_last_oplog_ts.side_effect = [1, 2]
+        get_written_namespaces.return_value = None
+        history.check(self.make_checker(), ["local"])
+        history.check(self.make_checker(), ["local"])
+        self.assertEqual([call[0][2] for call in check_dbhashes.call_args_list], [None, None])
+
+
+class TestRunDBHash(unittest.TestCase):
+    @mock.patch("time.sleep")
+    def test_retries_background_operation(self, _):
+        client = mock.MagicMock()
+        client["test"].command.side_effect = [
+            pymongo.errors.OperationFailure("in progress", code=12586), {"md5": "md5"}
+        ]
+        self.assertEqual(consistency_checks._run_dbhash(client, "test"), {"md5": "md5"})
+
+    def test_collections(self):
+        client = mock.MagicMock()
+        consistency_checks._run_dbhash(client, "test", {"b", "a"})
+        client["test"].command.assert_called_once_with("dbHash", collections=["a", "b"])
+
+    def test_other_errors_are_raised(self):
+        client = mock.MagicMock()
+        client["test"].command.side_effect = pymongo.errors.OperationFailure("failed", code=1)
+        with self.assertRaises(pymongo.errors.OperationFailure):
+            consistency_checks._run_dbhash(client, "test")
+
+
+class TestOplogReader(unittest.TestCase):
+    def test_capped_position_lost_ends_reading(self):
+        client = mock.MagicMock()
+        cursor = client.local.get_collection.return_value.find.return_value.sort.return_value
+        cursor.__next__.side_effect = pymongo.errors.OperationFailure("lost", code=136)
+        reader = consistency_checks._OplogReader("host", client)
+        reader.query()
+        self.assertIsNone(reader.next())
+        cursor.close.assert_called_once_with()
+
+
+class TestValidateCollection(unittest.TestCase):
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.command = self.client["test"].command
+        self.logger = logging.getLogger("consistency_checks")
+
+    def test_full(self):
+        self.command.return_value = {"ok": 1, "valid": True}
+        (_, failure) = consistency_checks._validate_collection(self.logger, self.client, "host",
+                                                               ("test", "coll"), {})
+        self.assertIsNone(failure)
+        self.command.assert_called_once_with("validate", "coll", full=True)
+
+    def test_background(self):
+        self.command.return_value = {"ok": 1, "valid": True}
+        consistency_checks._validate_collection(self.logger, self.client, "host", ("test", "coll"),
+                                                {"validateBackground": True})
+        self.command.assert_called_once_with("validate", "coll", background=True)
+
+    def test_invalid(self):
+        self.command.return_value = {"ok": 1, "valid": False}
+        (_, failure) = consistency_checks._validate_collection(self.logger, self.client, "host",
+                                                               ("test", "coll"), {})
+        self.assertEqual(failure["ns"], "test.coll")
+
+    def test_namespace_not_found(self):
+        self.command.side_effect = pymongo.errors.OperationFailure("not found", code=26)
+        (_, failure) = consistency_checks._validate_collection(
+            self.logger, self.client, "host", ("test", "coll"),
+            {"skipValidationOnNamespaceNotFound": True})
+        self.assertIsNone(failure)
+
+    def test_namespace_not_found_is_skipped_by_default(self):
+        self.command.side_effect = pymongo.errors.OperationFailure("not found", code=26)
+        (_, failure) = consistency_checks._validate_collection(self.logger, self.client, "host",
+                                                               ("test", "coll"), {})
+        self.assertIsNone(failure)
+
+    def test_namespace_not_found_not_skipped(self):
+        self.command.side_effect = pymongo.errors.OperationFailure(
+            "not found", code=26, details={"ok": 0, "code": 26})
+        (_, failure) = consistency_checks._validate_collection(
+            self.logger, self.client, "host", ("test", "coll"),
+            {"skipValidationOnNamespaceNotFound": False})
+        self.assertEqual(failure["ns"], "test.coll")
+
+
+class TestValidateNode(unittest.TestCase):
+    @mock.patch.object(consistency_checks, "_validate_collection")
+    @mock.patch.object(consistency_checks, "_list_database_names", return_value=["test"])
+    @mock.patch.object(consistency_checks, "_is_arbiter", return_value=False)
+    def test_validates_every_collection(self, _is_arbiter, _list_database_names,
+                                        validate_collection):
+        client = mock.MagicMock()
+        client["test"].list_collections.return_value = [{"name": "a"}, {"name": "b"}]
+        validate_collection.side_effect = [(0.1, None), (0.2, {"ns": "test.b"})]
+        logger = mock.Mock()
+
+        failures = consistency_checks._validate_node(logger, client, "host", {}, 1)
+
+        self.assertEqual(failures, [{"ns": "test.b"}])
+        self.assertIn("test.b (200 ms), test.a (100 ms)", logger.info.call_args[0][-1])
+
+
+class TestDataConsistencyHook(unittest.TestCase):
+    def make_hook(self, shell_options=None):
+        hook = dbhash.CheckReplDBHash(
+            logging.getLogger("hook"), make_replica_set(), shell_options=shell_options)
+        self.addCleanup(hook.after_suite, None)
+        return hook
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", True)
+    def test_python_check(self):
+        check = self.make_hook()._make_python_check()
+        self.assertIsNotNone(check)
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", True)
+    @mock.patch.object(config, "INCREMENTAL_DBHASH", 5)
+    @mock.patch.object(consistency_checks, "check_repl_dbhash")
+    def test_incremental(self, check_repl_dbhash):
+        hook = self.make_hook()
+        hook._make_python_check()(hook.logger)
+        history = check_repl_dbhash.call_args[0][4]
+        self.assertIsInstance(history, consistency_checks.DBHashHistory)
+        self.assertEqual(history._full_check_interval, 5)
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", True)
+    @mock.patch.object(consistency_checks, "validate_collections")
+    def test_background_validation(self, validate_collections):
+        shell_options = {"global_vars": {"TestData": {"skipValidationNamespaces": ["test.a"]}}}
+        hook = validate.ValidateCollections(
+            logging.getLogger("hook"), make_replica_set(), shell_options=shell_options,
+            background=True, max_concurrent_validations_per_node=2)
+        self.addCleanup(hook.after_suite, None)
+        hook._make_python_check()(hook.logger)
+
+        test_data = {"skipValidationNamespaces": ["test.a"], "validateBackground": True}
+        self.assertEqual(hook._shell_options["global_vars"]["TestData"], test_data)
+        self.assertEqual(validate_collections.call_args[0][3:], (test_data, 2))
+        # The caller's shell options aren't modified.
+        self.assertNotIn("validateBackground", shell_options["global_vars"]["TestData"])
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", True)
+    def test_unsupported_options_use_shell(self):
+        hook = self.make_hook({"global_vars": {"TestData": {"checkCollectionCounts": True}}})
+        self.assertIsNone(hook._make_python_check())
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", True)
+    def test_forced_fcv_validation_uses_shell(self):
+        shell_options = {
+            "global_vars": {
+                "TestData": {
+                    "skipValidationOnInvalidViewDefinitions": True,
+                    "forceValidationWithFeatureCompatibilityVersion": "4.4",
+                }
+            }
+        }
+        hook = validate.ValidateCollections(
+            logging.getLogger("hook"), make_replica_set(), shell_options=shell_options)
+        self.addCleanup(hook.after_suite, None)
+        self.assertIsNone(hook._make_python_check())
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", False)
+    @mock.patch.object(jsfile.JSHook, "after_test")
+    def test_disabled_uses_shell(self, js_after_test):
+        hook = self.make_hook()
+        hook._make_python_check = mock.Mock()
+        hook.after_test(mock.Mock(), mock.Mock())
+        js_after_test.assert_called_once()
+        hook._make_python_check.assert_not_called()
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", True)
+    @mock.patch.object(consistency_checks.PythonCheckTestCase, "create_after_test")
+    @mock.patch.object(jsfile.JSHook, "after_test")
+    def test_enabled_runs_python_check(self, js_after_test, create_after_test):
+        hook = self.make_hook()
+        hook.after_test(mock.Mock(), mock.Mock())
+        js_after_test.assert_not_called()
+        create_after_test.return_value.run_dynamic_test.assert_called_once()
+
+    @mock.patch.object(config, "PYTHON_CONSISTENCY_CHECKS", True)
+    @mock.patch.object(consistency_checks.PythonCheckTestCase, "create_after_test")
+    def test_test_failure_is_server_failure(self, create_after_test):
+        create_after_test.return_value.run_dynamic_test.side_effect = errors.TestFailure("bad")
+        with self.assertRaises(errors.ServerFailure):
+            self.make_hook().after_test(mock.Mock(), mock.Mock())
@@ -6,6 +6,7 @@ import mock
 
 from buildscripts.resmokelib.testing import executor
 from buildscripts.resmokelib.testing import queue_element
+from buildscripts.resmokelib.testing import runtime_history
 
 # pylint: disable=missing-docstring,protected-access
 
@@ -145,9 +146,160 @@ class TestMakeTestQueue(unittest.TestCase):
             self.assertIn(element, self.suite.tests)
 
 
+class TestOrderTests(unittest.TestCase):
+    def setUp(self):
+        self.suite = mock_suite(3)
+        self.ut_executor = UnitTestExecutor(self.suite, None)
+        self.ut_executor._create_queue_elem_for_test_name = lambda x: x
+        self.ut_executor._runtime_history = runtime_history.TestRuntimeHistory({
+            "jstests/core/and0.js": 1,
+            "jstests/core/and1.js": 10,
+            "jstests/core/and2.js": 5,
+        })
+
+    @mock.patch(ns("_config"))
+    def test_fifo_keeps_suite_order(self, config_mock):
+        config_mock.SCHEDULE_MODE = "fifo"
+        self.assertEqual(self.suite.tests, self.ut_executor._order_tests())
+
+    @mock.patch(ns("_config"))
+    def test_longest_first(self, config_mock):
+        config_mock.SCHEDULE_MODE = "longest_first"
+        self.assertEqual(["jstests/core/and1.js", "jstests/core/and2.js", "jstests/core/and0.js"],
+                         self.ut_executor._order_tests())
+
+    @mock.patch(ns("_config"))
+    def test_longest_first_without_history(self, config_mock):
+        config_mock.SCHEDULE_MODE = "longest_first"
+        self.ut_executor._runtime_history = runtime_history.TestRuntimeHistory()
+        self.assertEqual(self.suite.tests, self.ut_executor._order_tests())
+
+    @mock.patch(ns("_config"))
+    def test_longest_first_queue_with_repeats(self, config_mock):
+        config_mock.SCHEDULE_MODE = "longest_first"
+        self.suite.options.num_repeat_tests = 2
+        test_queue = self.ut_executor._make_test_queue()
+        elements = [test_queue.get_nowait() for _ in range(test_queue.qsize())]
+        self.assertEqual(["jstests/core/and1.js", "jstests/core/and2.js", "jstests/core/and0.js"] *
+                         2, elements)
+
+
+class TestTeardownFixtures(unittest.TestCase):
+    def setUp(self):
+        self.suite = mock_suite(1)
+        self.ut_executor = UnitTestExecutor(self.suite, None)
+        self.job = mock.Mock()
+        self.job.manager.job_num = 0
+        self.ut_executor._jobs = [self.job]
+
+    def test_teardown_without_pool(self):
+        self.assertTrue(self.ut_executor._teardown_fixtures(keep_warm=True))
+        self.job.manager.teardown_fixture.assert_called_once()
+
+    def test_keep_warm(self):
+        self.ut_executor._fixture_pool = mock.Mock()
+        self.ut_executor._fixture_key = "key"
+        self.ut_executor._fixture_pool.release.return_value = True
+        self.assertTrue(self.ut_executor._teardown_fixtures(keep_warm=True))
+        self.ut_executor._fixture_pool.release.assert_called_once_with(0, "key", self.job.fixture)
+        self.job.manager.teardown_fixture.assert_not_called()
+
+    def test_teardown_when_release_fails(self):
+        self.ut_executor._fixture_pool = mock.Mock()
+        self.ut_executor._fixture_key = "key"
+        self.ut_executor._fixture_pool.release.return_value = False
+        self.job.manager.teardown_fixture.return_value = False
+        self.assertFalse(self.ut_executor._teardown_fixtures(keep_warm=True))
+        self.job.manager.teardown_fixture.assert_called_once()
+
+    def test_teardown_when_not_completed(self):
+        self.ut_executor._fixture_pool = mock.Mock()
+        self.ut_executor._fixture_key = "key"
+        self.assertTrue(self.ut_executor._teardown_fixtures(keep_warm=False))
+        self.ut_executor._fixture_pool.release.assert_not_called()
+        self.job.manager.teardown_fixture.assert_called_once()
+
+    def test_skip_fixture_never_set_up(self):
+        self.ut_executor._fixture_pool = mock.Mock()
+        self.ut_executor._fixture_key = "key"
+        self.job.manager.fixture_started = False
+        self.assertTrue(self.ut_executor._teardown_fixtures(keep_warm=True))
+        self.ut_executor._fixture_pool.release.assert_not_called()
+        self.job.manager.teardown_fixture.assert_not_called()
+
+
+@mock.patch(ns("_config.ADAPTIVE_JOBS"), True)
+@mock.patch(ns("_job_controller.JobController"))
+class TestRunTestsStopsJobController(unittest.TestCase):
+    def setUp(self):
+        self.ut_executor = UnitTestExecutor(mock_suite(2), None)
+        self.ut_executor._jobs = [mock.Mock(), mock.Mock()]
+
+    def test_stop_when_starting_threads_fails(self, job_controller_mock):
+        with mock.patch(ns("threading.Thread.start"), side_effect=RuntimeError("no threads")):
+            with self.assertRaises(RuntimeError):
+                self.ut_executor._run_tests(mock.Mock(), None, None)
+        job_controller_mock.return_value.start.assert_called_once()
+        job_controller_mock.return_value.stop.assert_called_once()
+
+
+@mock.patch(ns("network.PortAllocator.reset"), mock.Mock())
+class TestRunKeepsFixturesWarm(unittest.TestCase):
+    def setUp(self):
+        suite = mock.Mock()
+        suite.options.num_repeat_suites = 1
+        self.ut_executor = UnitTestExecutor(suite, None)
+        self.ut_executor._fixture_key = "key"
+        self.ut_executor._jobs = []
+        self.ut_executor.num_tests = 0
+        self.ut_executor._make_test_queue = mock.Mock()
+        self.ut_executor._teardown_fixtures = mock.Mock(return_value=True)
+        self.report = mock.Mock()
+        self.report.num_results.return_value = 0
+        self.ut_executor._run_tests = mock.Mock(return_value=(self.report, False))
+
+    def test_keep_warm_when_tests_pass(self):
+        self.report.wasSuccessful.return_value = True
+        self.ut_executor.run()
+        self.ut_executor._teardown_fixtures.assert_called_once_with(keep_warm=True)
+
+    def test_teardown_when_tests_fail(self):
+        self.report.wasSuccessful.return_value = False
+        self.ut_executor.run()
+        self.ut_executor._teardown_fixtures.assert_called_once_with(keep_warm=False)
+        self.assertEqual(self.ut_executor._suite.return_code, 1)
+
+
+@mock.patch(ns("_config.SHELL_CONN_STRING"), None)
+@mock.patch(ns("_config.TEST_RUNTIMES_FILE"), None)
+@mock.patch(ns("logging.loggers.new_testqueue_logger"), mock.Mock())
+@mock.patch(ns("TestSuiteExecutor._create_jobs"), mock.Mock())
+class TestFixtureKey(unittest.TestCase):
+    def setUp(self):
+        self.suite = mock.Mock(tests=[], options=mock.Mock(num_repeat_tests=1))
+        self.fixture = {"class": "ReplicaSetFixture", "num_nodes": 2}
+
+    def make_executor(self, fixture, reuse_fixture):
+        return executor.TestSuiteExecutor(mock.Mock(), self.suite, fixture=fixture,
+                                          fixture_pool=mock.Mock(), reuse_fixture=reuse_fixture)
+
+    def test_suite_opts_in(self):
+        self.assertIsNotNone(self.make_executor(self.fixture, True)._fixture_key)
+
+    def test_suite_does_not_opt_in(self):
+        self.assertIsNone(self.make_executor(self.fixture, False)._fixture_key)
+
+    def test_noop_fixture(self):
+        self.assertIsNone(self.make_executor({"class": "NoOpFixture"}, True)._fixture_key)
+
+
 class UnitTestExecutor(executor.TestSuiteExecutor):
     def __init__(self, suite, config):  # pylint: disable=super-init-not-called
         self._suite = suite
         self.test_queue_logger = logging.getLogger("executor_unittest")
         self.test_config = config
         self.logger = mock.MagicMock()
+        self._runtime_history = None
+        self._fixture_pool = None
+        self._fixture_key = None
+        self._warm_job_nums = set()
@@ -0,0 +1,89 @@
+"""Unit tests for the resmokelib.testing.fixture_pool module."""
+import logging
+import unittest
+
+import mock
+import pymongo.errors
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing import fixture_pool
+
+# pylint: disable=missing-docstring
+
+
+def mock_fixture(running=True, databases=None):
+    fixture = mock.Mock()
+    fixture.is_running.return_value = running
+    client = mock.MagicMock()
+    client.list_database_names.return_value = databases or []
+    fixture.mongo_client.return_value = client
+    return fixture
+
+
+class TestFixturePool(unittest.TestCase):
+    def setUp(self):
+        self.pool = fixture_pool.FixturePool(logging.getLogger("fixture_pool_unittest"))
+        self.key = fixture_pool.FixturePool.make_key({"class": "ReplicaSetFixture", "num_nodes": 2})
+
+    def test_make_key_ignores_ordering(self):
+        self.assertEqual(
+            fixture_pool.FixturePool.make_key({"num_nodes": 2, "class": "ReplicaSetFixture"}),
+            self.key)
+        self.assertNotEqual(
+            fixture_pool.FixturePool.make_key({"class": "ReplicaSetFixture", "num_nodes": 3}),
+            self.key)
+
+    def test_acquire_empty_pool(self):
+        self.assertIsNone(self.pool.acquire(0, self.key))
+
+    def test_release_and_acquire(self):
+        fixture = mock_fixture(databases=["admin", "config", "local", "test"])
+        self.assertTrue(self.pool.release(0, self.key, fixture))
+        client = fixture.mongo_client.return_value
+        client.__getitem__.assert_called_once_with("test")
+
+        self.assertIs(fixture, self.pool.acquire(0, self.key))
+        fixture.teardown.assert_not_called()
+        # A fixture can only be handed out once.
+        self.assertIsNone(self.pool.acquire(0, self.key))
+
+    def test_acquire_different_job(self):
+        fixture = mock_fixture()
+        self.pool.release(0, self.key, fixture)
+        self.assertIsNone(self.pool.acquire(1, self.key))
+
+    def test_acquire_different_config(self):
+        fixture = mock_fixture()
+        self.pool.release(0, self.key, fixture)
+        self.assertIsNone(self.pool.acquire(0, "other"))
+        fixture.teardown.assert_called_once_with(finished=True)
+
+    def test_acquire_crashed_fixture(self):
+        fixture = mock_fixture()
+        self.pool.release(0, self.key, fixture)
+        fixture.is_running.return_value = False
+        self.assertIsNone(self.pool.acquire(0, self.key))
+        fixture.teardown.assert_called_once_with(finished=True)
+
+    def test_release_not_running(self):
+        fixture = mock_fixture(running=False)
+        self.assertFalse(self.pool.release(0, self.key, fixture))
+        self.assertIsNone(self.pool.acquire(0, self.key))
+
+    def test_release_wipe_fails(self):
+        fixture = mock_fixture()
+        fixture.mongo_client.return_value.list_database_names.side_effect = (
+            pymongo.errors.ConnectionFailure("down"))
+        self.assertFalse(self.pool.release(0, self.key, fixture))
+        self.assertIsNone(self.pool.acquire(0, self.key))
+
+    def test_teardown_all(self):
+        fixtures = [mock_fixture(), mock_fixture()]
+        for (job_num, fixture) in enumerate(fixtures):
+            self.pool.release(job_num, self.key, fixture)
+        fixtures[0].teardown.side_effect = errors.ServerFailure("failed")
+
+        self.assertFalse(self.pool.teardown_all())
+        for fixture in fixtures:
+            fixture.teardown.assert_called_once_with(finished=True)
+        self.assertIsNone(self.pool.acquire(1, self.key))
@@ -200,6 +200,8 @@ class UnitJob(job.Job):  # pylint: disable=too-many-instance-attributes
         self.archival = None
         self.suite_options = suite_options
         self.test_queue_logger = logging.getLogger("job_unittest")
+        self.manager = job.FixtureTestCaseManager(self.test_queue_logger, self.fixture,
+                                                  self.job_num, self.report)
         self.total_test_num = 0
         self.tests = {}
 
@@ -243,6 +245,42 @@ class TestFixtureSetupAndTeardown(unittest.TestCase):
     def test_setup_and_teardown_both_succeed(self):
         self.__assert_when_run_tests()
 
+    def test_parked_job_never_sets_up_fixture(self):
+        job_controller = mock.Mock()
+        job_controller.wait_until_permitted.return_value = False
+        setup_flag = threading.Event()
+        teardown_flag = threading.Event()
+
+        self.__job_object(_queue.Queue(), threading.Event(), setup_flag, teardown_flag,
+                          job_controller=job_controller)
+
+        self.assertFalse(setup_flag.is_set())
+        self.assertFalse(teardown_flag.is_set())
+        self.__job_object.manager.setup_fixture.assert_not_called()
+        self.__job_object.manager.teardown_fixture.assert_not_called()
+
+    def test_parked_job_tears_down_fixture_from_earlier_repetition(self):
+        job_controller = mock.Mock()
+        job_controller.wait_until_permitted.return_value = False
+        self.__job_object.manager.fixture_started = True
+
+        self.__job_object(_queue.Queue(), threading.Event(), None, threading.Event(),
+                          job_controller=job_controller)
+
+        self.__job_object.manager.setup_fixture.assert_not_called()
+        self.__job_object.manager.teardown_fixture.assert_called_once()
+
+    def test_permitted_job_sets_up_fixture(self):
+        job_controller = mock.Mock()
+        job_controller.wait_until_permitted.return_value = True
+
+        self.__job_object(_queue.Queue(), threading.Event(), threading.Event(), threading.Event(),
+                          job_controller=job_controller)
+
+        job_controller.wait_until_permitted.assert_called_once()
+        self.__job_object.manager.setup_fixture.assert_called_once()
+        self.__job_object.manager.teardown_fixture.assert_called_once()
+
     def test_setup_returns_failure(self):
         self.__job_object.manager.setup_fixture.return_value = False
         self.__assert_when_run_tests(setup_succeeded=False)
@@ -0,0 +1,112 @@
+"""Unit tests for the resmokelib.testing.job_controller module."""
+import logging
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing import job_controller
+from buildscripts.resmokelib.utils.queue import Queue
+
+# pylint: disable=missing-docstring,protected-access
+
+_GB = 2**30
+
+
+def make_sample(cpu_percent=50.0, available_memory=8 * _GB, load_per_cpu=0.5, fixture_rss=0):
+    return job_controller.HostSample(
+        cpu_percent=cpu_percent, available_memory=available_memory, total_memory=16 * _GB,
+        load_per_cpu=load_per_cpu, fixture_rss=fixture_rss)
+
+
+def make_controller(num_jobs=4, initial_limit=None):
+    fixtures = [mock.Mock() for _ in range(num_jobs)]
+    return job_controller.JobController(logging.getLogger("job_controller"), fixtures,
+                                        initial_limit=initial_limit)
+
+
+class TestDecide(unittest.TestCase):
+    def test_initial_limit(self):
+        self.assertEqual(make_controller(num_jobs=5).limit, 3)
+        self.assertEqual(make_controller(num_jobs=1).limit, 1)
+        self.assertEqual(make_controller(num_jobs=4, initial_limit=10).limit, 4)
+
+    def test_raises_limit_when_underused(self):
+        controller = make_controller()
+        self.assertEqual(controller.decide(2, make_sample()), 3)
+
+    def test_limit_does_not_exceed_jobs(self):
+        controller = make_controller()
+        self.assertEqual(controller.decide(4, make_sample()), 4)
+
+    def test_keeps_limit_when_busy(self):
+        controller = make_controller()
+        self.assertEqual(controller.decide(2, make_sample(cpu_percent=80.0)), 2)
+        self.assertEqual(controller.decide(2, make_sample(load_per_cpu=1.2)), 2)
+
+    def test_lowers_limit_when_overloaded(self):
+        controller = make_controller()
+        self.assertEqual(controller.decide(3, make_sample(cpu_percent=95.0)), 2)
+        self.assertEqual(controller.decide(3, make_sample(load_per_cpu=2.0)), 2)
+        self.assertEqual(controller.decide(3, make_sample(available_memory=_GB)), 2)
+        self.assertEqual(controller.decide(1, make_sample(cpu_percent=95.0)), 1)
+
+    def test_keeps_limit_without_memory_headroom(self):
+        controller = make_controller()
+        # Each of the 4 fixtures uses 2GB, so another job needs 4GB on top of the 1.6GB minimum.
+        sample = make_sample(available_memory=5 * _GB, fixture_rss=8 * _GB)
+        self.assertEqual(controller.decide(2, sample), 2)
+
+    def test_no_load_average(self):
+        controller = make_controller()
+        self.assertEqual(controller.decide(2, make_sample(load_per_cpu=None)), 3)
+
+
+class TestWaitUntilPermitted(unittest.TestCase):
+    def setUp(self):
+        self.queue = Queue()
+        self.queue.put("test")
+        self.interrupt_flag = threading.Event()
+
+    def test_permitted_below_limit(self):
+        controller = make_controller(initial_limit=2)
+        self.assertTrue(controller.wait_until_permitted(1, self.queue, self.interrupt_flag))
+
+    def test_parked_job_stops_when_queue_empty(self):
+        controller = make_controller(initial_limit=2)
+        self.queue.get_nowait()
+        self.assertFalse(controller.wait_until_permitted(3, self.queue, self.interrupt_flag))
+
+    def test_parked_job_stops_when_interrupted(self):
+        controller = make_controller(initial_limit=2)
+        self.interrupt_flag.set()
+        self.assertFalse(controller.wait_until_permitted(3, self.queue, self.interrupt_flag))
+
+    def test_parked_job_resumes_when_limit_raised(self):
+        controller = make_controller(initial_limit=1)
+        result = []
+        thread = threading.Thread(target=lambda: result.append(
+            controller.wait_until_permitted(2, self.queue, self.interrupt_flag)))
+        thread.start()
+        controller._set_limit(3)
+        thread.join(10)
+        self.assertEqual(result, [True])
+
+    def test_stop_unparks_jobs(self):
+        controller = make_controller(initial_limit=1)
+        controller.stop()
+        self.assertEqual(controller.limit, 4)
+
+
+class TestSampleHost(unittest.TestCase):
+    def test_fixture_without_pids(self):
+        fixture = mock.Mock()
+        fixture.pids.side_effect = NotImplementedError
+        sample = job_controller.sample_host([fixture])
+        self.assertEqual(sample.fixture_rss, 0)
+        self.assertGreater(sample.total_memory, 0)
+
+    def test_exited_process(self):
+        fixture = mock.Mock()
+        fixture.pids.return_value = [2**22 + 1]
+        self.assertEqual(job_controller._get_fixture_rss(fixture), 0)
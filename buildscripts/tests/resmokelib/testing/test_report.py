@@ -0,0 +1,135 @@
+"""Unit tests for the resmokelib.testing.report module."""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing import report
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def make_suite_options():
+    suite_options = mock.Mock()
+    suite_options.report_failure_status = "fail"
+    return suite_options
+
+
+def make_test(test_name, dynamic=False):
+    test = mock.Mock()
+    test.id.return_value = test_name
+    test.test_name = test_name
+    test.dynamic = dynamic
+    test.basename.return_value = test_name
+    test.as_command.return_value = None
+    test.return_code = 0
+    test.logger.handlers = []
+    return test
+
+
+@mock.patch("buildscripts.resmokelib.logging.loggers.new_test_logger",
+            mock.Mock(return_value=(mock.Mock(), None)))
+class TestReportStream(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.pathname = os.path.join(self.tmpdir, "report.jsonl")
+        self.writer = report.ReportStreamWriter(self.pathname)
+        self.addCleanup(self.writer.close)
+        self.report = report.TestReport(logging.getLogger("job"), make_suite_options(),
+                                        stream_writer=self.writer)
+
+    def read_lines(self):
+        with open(self.pathname) as fp:
+            return [json.loads(line) for line in fp]
+
+    def run_test(self, test):
+        self.report.startTest(test)
+        self.report.addSuccess(test)
+        self.report.stopTest(test)
+
+    def test_streams_when_next_test_starts(self):
+        first_test = make_test("first")
+        self.run_test(first_test)
+        self.run_test(make_test("first:CheckReplDBHash", dynamic=True))
+        # A hook's after_test may still change the outcome of the test.
+        self.report.setFailure(first_test)
+        self.assertEqual(self.read_lines(), [])
+
+        self.run_test(make_test("second"))
+        lines = self.read_lines()
+        self.assertEqual([(line["test_file"], line["status"]) for line in lines],
+                         [("first", "fail"), ("first:CheckReplDBHash", "pass")])
+        self.assertEqual((self.writer.num_results, self.writer.num_failures), (2, 1))
+
+    def test_silent_failures_are_not_counted(self):
+        self.report.suite_options.report_failure_status = "silentfail"
+        test = make_test("first")
+        self.run_test(test)
+        self.report.setFailure(test)
+        self.report.flush_stream()
+
+        self.assertEqual([line["status"] for line in self.read_lines()], ["silentfail"])
+        self.assertEqual((self.writer.num_results, self.writer.num_failures), (1, 0))
+
+    def test_flush_stream(self):
+        self.run_test(make_test("first"))
+        self.report.startTest(make_test("second"))
+        self.report.flush_stream()
+
+        lines = self.read_lines()
+        self.assertEqual([(line["test_file"], line["status"]) for line in lines],
+                         [("first", "pass"), ("second", "fail")])
+        self.assertEqual(lines[1]["exit_code"], -2)
+
+        # Nothing is streamed twice.
+        self.report.flush_stream()
+        self.assertEqual(len(self.read_lines()), 2)
+        # Only the test that didn't pass is kept for the summary.
+        self.assertEqual([test_info.test_file for test_info in self.report.test_infos], ["second"])
+
+    def test_streamed_tests_are_counted(self):
+        first_test = make_test("first")
+        self.run_test(first_test)
+        self.report.setFailure(first_test)
+        self.run_test(make_test("second"))
+        self.run_test(make_test("third"))
+        self.assertEqual([test_info.test_file for test_info in self.report.test_infos],
+                         ["first", "third"])
+
+        self.report.startTest(make_test("fourth"))
+        combined = report.TestReport.combine(self.report)
+        self.assertEqual((combined.num_succeeded, combined.num_failed, combined.num_interrupted),
+                         (2, 1, 1))
+        self.assertEqual(combined.num_results(), 4)
+        self.assertEqual([test_info.test_file for test_info in combined.get_failed()], ["first"])
+
+    def test_lines_are_tagged_with_job_number(self):
+        job_report = report.TestReport(logging.getLogger("job"), make_suite_options(), job_num=3,
+                                       stream_writer=self.writer)
+        job_report.startTest(make_test("first"))
+        job_report.flush_stream()
+        self.assertEqual([line["job"] for line in self.read_lines()], [3])
+
+    def test_runtimes_are_recorded_when_streamed(self):
+        runtime_history = mock.Mock()
+        job_report = report.TestReport(logging.getLogger("job"), make_suite_options(),
+                                       stream_writer=self.writer, runtime_history=runtime_history)
+        test = make_test("first")
+        job_report.startTest(test)
+        job_report.addSuccess(test)
+        job_report.stopTest(test)
+        job_report.flush_stream()
+        (test_infos, ), _ = runtime_history.record_test_infos.call_args
+        self.assertEqual([test_info.test_file for test_info in test_infos], ["first"])
+
+    def test_no_stream_writer(self):
+        test_report = report.TestReport(logging.getLogger("job"), make_suite_options())
+        test_report.startTest(make_test("first"))
+        test_report.flush_stream()
+        self.assertEqual(len(test_report.test_infos), 1)
@@ -0,0 +1,78 @@
+"""Unit tests for the resmokelib.testing.runtime_history module."""
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing import runtime_history
+
+# pylint: disable=missing-docstring
+
+
+def mock_test_info(test_file, elapsed, dynamic=False):
+    test_info = mock.Mock(test_file=test_file, dynamic=dynamic, start_time=100, status="pass")
+    test_info.end_time = test_info.start_time + elapsed
+    return test_info
+
+
+def mock_report(test_infos):
+    report = mock.Mock()
+    report.get_successful.return_value = test_infos
+    report.get_failed.return_value = []
+    report.get_errored.return_value = []
+    return report
+
+
+class TestTestRuntimeHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pathname = os.path.join(self.tmp_dir, "runtimes.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load_missing_file(self):
+        history = runtime_history.TestRuntimeHistory.load(self.pathname)
+        self.assertEqual(0, len(history))
+
+    def test_load_invalid_file(self):
+        with open(self.pathname, "w") as fp:
+            fp.write("{not json")
+        history = runtime_history.TestRuntimeHistory.load(self.pathname)
+        self.assertEqual(0, len(history))
+
+    def test_save_and_load(self):
+        history = runtime_history.TestRuntimeHistory({"a.js": 3.5})
+        history.save(os.path.join(self.tmp_dir, "build", "runtimes.json"))
+        loaded = runtime_history.TestRuntimeHistory.load(
+            os.path.join(self.tmp_dir, "build", "runtimes.json"))
+        self.assertEqual(3.5, loaded.get_runtime("a.js"))
+
+    def test_record_averages_runtimes(self):
+        history = runtime_history.TestRuntimeHistory()
+        history.record("a.js", 10)
+        self.assertEqual(10, history.get_runtime("a.js"))
+        history.record("a.js", 20)
+        self.assertEqual(15, history.get_runtime("a.js"))
+
+    def test_record_report_skips_dynamic_tests(self):
+        history = runtime_history.TestRuntimeHistory()
+        report = mock_report(
+            [mock_test_info("a.js", 4),
+             mock_test_info("a:CheckReplDBHash", 2, dynamic=True)])
+        history.record_report(report)
+        self.assertEqual(4, history.get_runtime("a.js"))
+        self.assertIsNone(history.get_runtime("a:CheckReplDBHash"))
+        self.assertEqual(1, len(history))
+
+    def test_sort_longest_first(self):
+        history = runtime_history.TestRuntimeHistory({"a.js": 1, "b.js": 30, "c.js": 20})
+        self.assertEqual(["b.js", "c.js", "a.js"],
+                         history.sort_longest_first(["a.js", "b.js", "c.js"]))
+
+    def test_sort_longest_first_unknown_tests_use_average(self):
+        history = runtime_history.TestRuntimeHistory({"a.js": 1, "b.js": 30, "c.js": 20})
+        self.assertEqual(["b.js", "c.js", "new.js", "a.js"],
+                         history.sort_longest_first(["a.js", "b.js", "c.js", "new.js"]))
@@ -1,12 +1,18 @@
 """ Unit tests for archival. """
 
+import gzip
+import io
+import json
 import logging
 import os
 import random
 import shutil
+import tarfile
 import tempfile
 import unittest
 
+import mock
+
 from buildscripts.resmokelib.utils import archival
 
 # pylint: disable=missing-docstring,protected-access
@@ -238,3 +244,61 @@ class ArchivalLimitTests(ArchivalTestCase):
         status, message = self.archive.archive_files_to_s3(display_name, temp_file, self.bucket,
                                                            s3_path)
         self.assertEqual(1, status, message)
+
+
+class ParallelGzipWriterTests(unittest.TestCase):
+    def _compress(self, data, num_threads):
+        fileobj = io.BytesIO()
+        writer = archival.ParallelGzipWriter(fileobj, num_threads)
+        for i in range(0, len(data), 1000):
+            writer.write(data[i:i + 1000])
+        writer.close()
+        return fileobj.getvalue()
+
+    def test_round_trip(self):
+        data = bytes(random.randint(0, 255) for _ in range(10000)) * 3
+        with mock.patch.object(archival.ParallelGzipWriter, "_BLOCK_SIZE", 4096):
+            for num_threads in (1, 3):
+                self.assertEqual(gzip.decompress(self._compress(data, num_threads)), data)
+
+    def test_empty(self):
+        self.assertEqual(gzip.decompress(self._compress(b"", 2)), b"")
+
+    def test_tarfile(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        with open(os.path.join(temp_dir, "data"), "wb") as fileh:
+            fileh.write(b"x" * 20000)
+
+        fileobj = io.BytesIO()
+        writer = archival.ParallelGzipWriter(fileobj, 2)
+        with mock.patch.object(archival.ParallelGzipWriter, "_BLOCK_SIZE", 4096):
+            with tarfile.open(fileobj=writer, mode="w|") as tar_handle:
+                tar_handle.add(temp_dir, arcname="dir")
+            writer.close()
+
+        fileobj.seek(0)
+        with tarfile.open(fileobj=fileobj, mode="r:gz") as tar_handle:
+            self.assertEqual(tar_handle.extractfile("dir/data").read(), b"x" * 20000)
+
+
+class ArchivalUploadWorkersTests(unittest.TestCase):
+    def test_all_uploads_recorded(self):
+        logger = logging.getLogger("for_testing")
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        json_file = os.path.join(temp_dir, "archive.json")
+        temp_file = tempfile.mkstemp(dir=temp_dir)[1]
+
+        archive = archival.Archival(logger, archival_json_file=json_file,
+                                    s3_client=MockS3Client(logger), compression_threads=2,
+                                    upload_workers=3)
+        for i in range(5):
+            status, message = archive.archive_files_to_s3("Unittest {}".format(i), temp_file,
+                                                          _BUCKET, "unittest/{}.tgz".format(i))
+            self.assertEqual(0, status, message)
+        archive.exit()
+
+        with open(json_file) as fileh:
+            names = sorted(entry["name"] for entry in json.load(fileh))
+        self.assertEqual(names, ["Unittest {}".format(i) for i in range(5)])
@@ -0,0 +1,45 @@
+"""Unit tests for buildscripts/resmokelib/utils/atomicfile.py."""
+
+import os
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.utils import atomicfile
+
+# pylint: disable=missing-docstring
+
+
+class TestAtomicFile(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+
+    def test_json_round_trip(self):
+        pathname = os.path.join(self.tmpdir, "subdir", "file.json")
+        atomicfile.write_json(pathname, {"a": [1, 2]})
+        self.assertEqual(atomicfile.read_json(pathname), {"a": [1, 2]})
+        self.assertEqual(os.listdir(os.path.dirname(pathname)), ["file.json"])
+
+    def test_bytes(self):
+        pathname = os.path.join(self.tmpdir, "file.bin")
+        atomicfile.write(pathname, b"\x00\x01")
+        with open(pathname, "rb") as fp:
+            self.assertEqual(fp.read(), b"\x00\x01")
+
+    def test_read_missing_or_invalid(self):
+        pathname = os.path.join(self.tmpdir, "file.json")
+        self.assertEqual(atomicfile.read_json(pathname, default={}), {})
+        atomicfile.write(pathname, "not json")
+        self.assertIsNone(atomicfile.read_json(pathname))
+
+    def test_failed_write_keeps_old_file(self):
+        pathname = os.path.join(self.tmpdir, "file.json")
+        atomicfile.write_json(pathname, [1])
+        with mock.patch("os.replace", side_effect=OSError("replace failed")):
+            with self.assertRaises(OSError):
+                atomicfile.write_json(pathname, [2])
+        self.assertEqual(atomicfile.read_json(pathname), [1])
+        self.assertEqual(os.listdir(self.tmpdir), ["file.json"])
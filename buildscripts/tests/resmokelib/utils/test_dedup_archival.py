@@ -0,0 +1,118 @@
+"""Unit tests for the resmokelib.utils.dedup_archival module."""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.utils import archival
+from buildscripts.resmokelib.utils import dedup_archival
+
+# pylint: disable=missing-docstring,protected-access
+
+_BUCKET = "mongodatafiles"
+_CHUNK_SIZE = 1024
+
+
+class _FailingClient(archival.LocalDirectoryClient):
+    def put_object(self, Bucket, Key, Body, **kwargs):  # pylint: disable=invalid-name
+        raise IOError("put_object failed")
+
+
+class TestDedupArchival(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.store_dir = os.path.join(self.temp_dir, "store")
+        self.data_dir = os.path.join(self.temp_dir, "data")
+        self.archive_json = os.path.join(self.temp_dir, "archive.json")
+        self.client = archival.LocalDirectoryClient(self.store_dir)
+
+        patcher = mock.patch.object(dedup_archival, "CHUNK_SIZE", _CHUNK_SIZE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_archival(self, client=None):
+        return dedup_archival.DedupArchival(
+            logging.getLogger("for_testing"), archival_json_file=self.archive_json,
+            s3_client=client or self.client, compression_threads=2)
+
+    def _write(self, relpath, data):
+        path = os.path.join(self.data_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fileh:
+            fileh.write(data)
+
+    def _num_chunks_stored(self):
+        return sum(
+            len(files) for _, _, files in os.walk(os.path.join(self.store_dir, _BUCKET, "chunks")))
+
+    def _read_manifest(self, s3_path):
+        with open(self.client.get_path(_BUCKET, s3_path)) as fileh:
+            return json.load(fileh)
+
+    def _read_tree(self, root):
+        tree = {}
+        for root_dir, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(root_dir, name)
+                with open(path, "rb") as fileh:
+                    tree[os.path.relpath(path, root)] = fileh.read()
+        return tree
+
+    def test_restore(self):
+        self._write("node0/collection.wt", os.urandom(3 * _CHUNK_SIZE + 10))
+        self._write("node0/journal/WiredTigerLog", b"")
+        self._write("node1/collection.wt", os.urandom(_CHUNK_SIZE))
+
+        archive = self._make_archival()
+        status, message = archive.archive_files_to_s3("test", self.data_dir, _BUCKET, "a.json")
+        archive.exit()
+        self.assertEqual(status, 0, message)
+
+        restore_dir = os.path.join(self.temp_dir, "restore")
+        dedup_archival.restore(self.client, _BUCKET, self._read_manifest("a.json"), restore_dir)
+        restored_data_dir = os.path.join(restore_dir,
+                                         dedup_archival._archive_name(self.data_dir))
+        self.assertEqual(self._read_tree(restored_data_dir), self._read_tree(self.data_dir))
+
+    def test_unchanged_chunks_are_uploaded_once(self):
+        unchanged = os.urandom(4 * _CHUNK_SIZE)
+        self._write("node0/collection.wt", unchanged)
+        self._write("node1/collection.wt", unchanged)
+
+        archive = self._make_archival()
+        status, message = archive.archive_files_to_s3("first", self.data_dir, _BUCKET, "a.json")
+        self.assertEqual(status, 0, message)
+        self.assertEqual(self._num_chunks_stored(), 4)
+
+        self._write("node0/collection.wt", unchanged[:_CHUNK_SIZE] + os.urandom(_CHUNK_SIZE) +
+                    unchanged[2 * _CHUNK_SIZE:])
+        status, message = archive.archive_files_to_s3("second", self.data_dir, _BUCKET, "b.json")
+        self.assertEqual(status, 0, message)
+        self.assertEqual(self._num_chunks_stored(), 5)
+        archive.exit()
+
+        manifest = self._read_manifest("b.json")
+        self.assertEqual([len(entry["chunks"]) for entry in manifest["files"]], [4, 4])
+        with open(self.archive_json) as fileh:
+            self.assertEqual([entry["name"] for entry in json.load(fileh)], ["first", "second"])
+
+    def test_upload_failure(self):
+        self._write("node0/collection.wt", os.urandom(_CHUNK_SIZE))
+
+        archive = self._make_archival(_FailingClient(self.store_dir))
+        status, _ = archive.archive_files_to_s3("first", self.data_dir, _BUCKET, "a.json")
+        self.assertEqual(status, 1)
+        self.assertEqual(archive.files_archived_num(), 0)
+
+        # A chunk whose upload failed is uploaded again by the next archive.
+        archive.s3_client = self.client
+        status, message = archive.archive_files_to_s3("second", self.data_dir, _BUCKET, "b.json")
+        archive.exit()
+        self.assertEqual(status, 0, message)
+        self.assertEqual(self._num_chunks_stored(), 1)
@@ -0,0 +1,100 @@
+"""Unit tests for the resmokelib.utils.globstar module."""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.utils import globstar
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class _TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        for dirname in ("a", os.path.join("a", "b"), os.path.join("a", ".hidden"), "c"):
+            os.mkdir(os.path.join(self.tmpdir, dirname))
+        for basename in ("x.js", os.path.join("a", "y.js"), os.path.join("a", ".z.js"),
+                         os.path.join("a", "b", "w.js"), os.path.join("a", ".hidden", "v.js"),
+                         os.path.join("c", "u.txt")):
+            with open(os.path.join(self.tmpdir, basename), "w"):
+                pass
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def path(self, *parts):
+        return os.path.join(self.tmpdir, *parts)
+
+
+class TestIglobWithSnapshot(_TempDirTestCase):
+    PATTERNS = [
+        "**/*.js",
+        "**",
+        "a/*.js",
+        "a/.*.js",
+        "a/**/*.js",
+        "a/**",
+        "*/*.js",
+        "c/*",
+        "missing/*.js",
+        "a/y.js",
+        "a/b",
+        "a/**/w.js",
+        "*/y.js",
+        "*/b/*.js",
+        "missing/y.js",
+    ]
+
+    def test_same_results_as_without_snapshot(self):
+        snapshot = globstar.DirectorySnapshot()
+        for pattern in self.PATTERNS:
+            pattern = self.path(pattern)
+            self.assertEqual(
+                sorted(globstar.iglob(pattern, snapshot=snapshot)), sorted(globstar.iglob(pattern)),
+                pattern)
+
+    def test_directories_listed_once(self):
+        snapshot = globstar.DirectorySnapshot()
+        with mock.patch.object(globstar, "_scan_dir", wraps=globstar._scan_dir) as scan_dir:
+            for _ in range(3):
+                globstar.glob(self.path("**", "*.js"), snapshot=snapshot)
+                globstar.glob(self.path("a", "*.js"), snapshot=snapshot)
+        # The temporary directory and its 4 subdirectories.
+        self.assertEqual(scan_dir.call_count, 5)
+
+    def test_sees_added_and_removed_files(self):
+        snapshot = globstar.DirectorySnapshot()
+        pattern = self.path("a", "**", "*.js")
+        self.assertEqual(
+            sorted(globstar.iglob(pattern, snapshot=snapshot)),
+            [self.path("a", ".hidden", "v.js"),
+             self.path("a", "b", "w.js"),
+             self.path("a", "y.js")])
+
+        os.remove(self.path("a", "b", "w.js"))
+        with open(self.path("a", "b", "t.js"), "w"):
+            pass
+        shutil.rmtree(self.path("a", ".hidden"))
+
+        self.assertEqual(
+            sorted(globstar.iglob(pattern, snapshot=snapshot)),
+            [self.path("a", "b", "t.js"), self.path("a", "y.js")])
+
+    def test_lists_directories_without_wildcards_in_basename(self):
+        snapshot = globstar.DirectorySnapshot()
+        with mock.patch.object(snapshot, "list_dir", wraps=snapshot.list_dir) as list_dir:
+            self.assertEqual(
+                globstar.glob(self.path("*", "y.js"), snapshot=snapshot), [self.path("a", "y.js")])
+        self.assertEqual(
+            sorted(call[0][0] for call in list_dir.call_args_list),
+            [self.tmpdir, self.path("a"), self.path("c")])
+
+    def test_missing_directory(self):
+        snapshot = globstar.DirectorySnapshot()
+        self.assertIsNone(snapshot.list_dir(self.path("missing")))
+        self.assertEqual(globstar.glob(self.path("missing", "**"), snapshot=snapshot), [])
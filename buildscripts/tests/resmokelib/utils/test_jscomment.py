@@ -0,0 +1,93 @@
+"""Unit tests for the resmokelib.utils.jscomment module."""
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.utils import jscomment
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class _TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_test(self, basename, contents):
+        pathname = os.path.join(self.tmpdir, basename)
+        with open(pathname, "w") as fp:
+            fp.write(contents)
+        return pathname
+
+
+class TestGetTags(_TempDirTestCase):
+    def test_no_tags(self):
+        pathname = self.write_test("test.js", "(function() {\n'use strict';\n})();\n")
+        self.assertEqual(jscomment.get_tags(pathname), [])
+
+    def test_block_comment(self):
+        pathname = self.write_test(
+            "test.js", "/**\n * @tags: [\n *   tag1,  # comment\n *   'tag2',\n * ]\n */\n")
+        self.assertEqual(jscomment.get_tags(pathname), ["tag1", "tag2"])
+
+    def test_tags_after_code(self):
+        pathname = self.write_test("test.js",
+                                   "'use strict';\n\n// @tags: [requires_sharding]\nvar x = 1;\n")
+        self.assertEqual(jscomment.get_tags(pathname), ["requires_sharding"])
+
+    def test_last_tags_are_used(self):
+        pathname = self.write_test("test.js", "// @tags: [tag1]\n// @tags: [tag2]\n")
+        self.assertEqual(jscomment.get_tags(pathname), ["tag2"])
+
+    def test_malformed_last_tags_are_skipped(self):
+        pathname = self.write_test("test.js", "// @tags: [tag1]\n// uses @tags in a sentence\n")
+        self.assertEqual(jscomment.get_tags(pathname), ["tag1"])
+
+
+class TestTagsCache(_TempDirTestCase):
+    def test_parses_each_file_once(self):
+        pathname = self.write_test("test.js", "// @tags: [tag1]\n")
+        cache = jscomment.TagsCache()
+        with mock.patch.object(jscomment, "get_tags", wraps=jscomment.get_tags) as get_tags:
+            self.assertEqual(cache.get_tags(pathname), ["tag1"])
+            self.assertEqual(cache.get_tags(pathname), ["tag1"])
+        get_tags.assert_called_once_with(pathname)
+
+    def test_modified_file_is_parsed_again(self):
+        pathname = self.write_test("test.js", "// @tags: [tag1]\n")
+        cache = jscomment.TagsCache()
+        self.assertEqual(cache.get_tags(pathname), ["tag1"])
+
+        self.write_test("test.js", "// @tags: [tag1, tag2]\n")
+        self.assertEqual(cache.get_tags(pathname), ["tag1", "tag2"])
+
+    def test_save_and_load(self):
+        pathname = self.write_test("test.js", "// @tags: [tag1]\n")
+        cache_file = os.path.join(self.tmpdir, "build", "tags.json")
+
+        cache = jscomment.TagsCache()
+        cache.get_tags(pathname)
+        cache.save(cache_file)
+
+        loaded = jscomment.TagsCache.load(cache_file)
+        stat = os.stat(pathname)
+        self.assertEqual(loaded._entries, {pathname: [stat.st_mtime_ns, stat.st_size, ["tag1"]]})
+        self.assertFalse(loaded._modified)
+
+    def test_save_skipped_when_unmodified(self):
+        cache_file = os.path.join(self.tmpdir, "tags.json")
+        jscomment.TagsCache().save(cache_file)
+        self.assertFalse(os.path.exists(cache_file))
+
+    def test_load_missing_or_invalid_file(self):
+        self.assertEqual(jscomment.TagsCache.load(os.path.join(self.tmpdir, "missing"))._entries,
+                         {})
+        invalid_file = self.write_test("tags.json", "{not json")
+        self.assertEqual(jscomment.TagsCache.load(invalid_file)._entries, {})
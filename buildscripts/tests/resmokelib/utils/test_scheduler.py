@@ -5,7 +5,7 @@ import unittest
 
 from buildscripts.resmokelib.utils import scheduler as _scheduler
 
-# pylint: disable=missing-docstring
+# pylint: disable=missing-docstring,protected-access
 
 
 def noop():
@@ -41,3 +41,42 @@ class TestBuiltinScheduler(TestScheduler):
     def test_cancel_with_identical_time_and_priority(self):
         with self.assertRaises(AssertionError):
             super().test_cancel_with_identical_time_and_priority()
+
+
+class TestSchedulerRun(unittest.TestCase):
+    """Unit tests for running the events of the Scheduler class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.scheduler = _scheduler.Scheduler(timefunc=lambda: self.now, delayfunc=self._sleep)
+
+    def _sleep(self, secs):
+        self.now += secs
+
+    def test_runs_in_order(self):
+        ran = []
+        for name, time in [("c", 3), ("a", 1), ("b", 2), ("a2", 1)]:
+            self.scheduler.enterabs(time, 0, ran.append, (name, ))
+        self.scheduler.run()
+        self.assertEqual(ran, ["a", "a2", "b", "c"])
+        self.assertEqual(self.now, 3)
+        self.assertTrue(self.scheduler.empty())
+
+    def test_canceled_events_do_not_run(self):
+        ran = []
+        events = [self.scheduler.enter(i, 0, ran.append, (i, )) for i in range(200)]
+        for event in events[::2]:
+            self.scheduler.cancel(event)
+        # Enough events were canceled for the queue to have been rebuilt without them.
+        self.assertLess(len(self.scheduler._queue), 200)
+        self.assertEqual(self.scheduler.queue, events[1::2])
+
+        self.scheduler.run()
+        self.assertEqual(ran, list(range(1, 200, 2)))
+        with self.assertRaises(ValueError):
+            self.scheduler.cancel(events[1])
+
+    def test_non_blocking(self):
+        self.scheduler.enter(5, 0, noop)
+        self.assertEqual(self.scheduler.run(blocking=False), 5)
+        self.assertFalse(self.scheduler.empty())
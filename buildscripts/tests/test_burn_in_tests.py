@@ -318,6 +318,16 @@ class TestGenerateTimeouts(unittest.TestCase):
         self.assertEqual(timeout_info.exec_timeout, 1771)
         self.assertEqual(timeout_info.timeout, 1366)
 
+    def test__generate_timeouts_from_tail_runtime(self):
+        repeat_config = under_test.RepeatConfig(repeat_tests_secs=600)
+        runtime_stats = [teststats_utils.TestRuntime(test_name="dir/test2.js", runtime=455.1)]
+        test_name = "dir/test2.js"
+
+        timeout_info = under_test._generate_timeouts(repeat_config, test_name, runtime_stats,
+                                                     under_test.TAIL_TEST_TIME_MULTIPLIER)
+
+        self.assertEqual(timeout_info.timeout, 911)
+
     def test__generate_timeouts_no_results(self):
         repeat_config = under_test.RepeatConfig(repeat_tests_secs=600)
         runtime_stats = []
@@ -371,6 +381,20 @@ class TestGetTaskRuntimeHistory(unittest.TestCase):
             before_date=end_date.strftime("%Y-%m-%d"), group_by="test", group_num_days=14,
             tasks=["task1"], variants=["variant1"])
 
+    def test__get_task_runtime_history_percentile(self):  # pylint: disable=invalid-name
+        evergreen_api = Mock()
+        evergreen_api.test_stats_by_project.return_value = [
+            Mock(test_file="dir/test2.js", num_pass=num_pass, avg_duration_pass=duration)
+            for (num_pass, duration) in [(9, 10), (1, 100)]
+        ]
+
+        result = under_test._get_task_runtime_history(evergreen_api, "project1", "task1",
+                                                      "variant1", percentile=99)
+
+        self.assertEqual(result[0].test_name, "dir/test2.js")
+        self.assertGreater(result[0].runtime, 19)
+        self.assertEqual(evergreen_api.test_stats_by_project.call_args[1]["group_num_days"], 1)
+
     def test__get_task_runtime_history_evg_degraded_mode_error(self):  # pylint: disable=invalid-name
         response = Mock()
         response.status_code = requests.codes.SERVICE_UNAVAILABLE
@@ -426,6 +450,20 @@ class TestSetResmokeArgs(unittest.TestCase):
         self.assertEqual(resmoke_args, under_test._set_resmoke_args(task))
 
 
+class TestSetResmokeRunOptions(unittest.TestCase):
+    def tearDown(self):
+        _parser.set_run_options()
+
+    def test_no_membership_index_by_default(self):
+        under_test.set_resmoke_run_options()
+        self.assertIsNone(_config.TEST_MEMBERSHIP_INDEX_FILE)
+
+    def test_membership_index_file(self):
+        under_test.set_resmoke_run_options(os.path.join("some dir", "index.json"))
+        self.assertEqual(_config.TEST_MEMBERSHIP_INDEX_FILE,
+                         os.path.join("some dir", "index.json"))
+
+
 class TestSetResmokeCmd(unittest.TestCase):
     def test__set_resmoke_cmd_no_opts_no_args(self):
         repeat_config = under_test.RepeatConfig()
@@ -887,3 +925,20 @@ class TestFindChangedTests(unittest.TestCase):
         self.assertIn(file_list[2], found_tests)
         self.assertNotIn(file_list[1], found_tests)
         self.assertEqual(2, len(found_tests))
+
+
+class TestFilterTests(unittest.TestCase):
+    def test_excluded_patterns_are_removed(self):
+        tests = {
+            os.path.join("jstests", "core", "a.js"),
+            os.path.join("jstests", "core", "txns", "b.js"),
+            os.path.join("jstests", "other", "c.js"),
+        }
+
+        filtered_tests = under_test.filter_tests(tests, ["jstests/core/**"])
+
+        self.assertEqual(filtered_tests, {os.path.join("jstests", "other", "c.js")})
+
+    def test_no_excludes(self):
+        tests = {"jstests/core/a.js"}
+        self.assertIs(under_test.filter_tests(tests, []), tests)
@@ -226,6 +226,71 @@ class TestAcceptance(unittest.TestCase):
                 # Is there a task in the config for all the suites we created?
                 self.assertEqual(expected_suite_count, len(shrub_config["tasks"]))
 
+    @unittest.skipIf(
+        sys.platform.startswith("win"), "Since this test is messing with directories, "
+        "windows does not handle test generation correctly")
+    @patch(ns("suitesconfig.get_suite"))
+    def test_batch_generates_every_task(self, suites_config_mock):
+        """
+        Given several tasks splitting the same suite,
+        When evergreen_generate_resmoke_tasks generates them as a batch,
+        It lists the suite once and writes the files of every task.
+        """
+        evg_api_mock = self._mock_evg_api()
+        n_tests = 4
+
+        with TemporaryDirectory() as tmpdir:
+            mock_config = self._mock_config()
+            mock_config["target_resmoke_time"] = 10
+            target_directory, source_directory = self._prep_dirs(tmpdir, mock_config)
+            suite_path = os.path.join(source_directory, "some_task")
+            mock_config["suite"] = suite_path
+            other_config = dict(mock_config, task_name="other_task_gen",
+                                generated_config_dir=os.path.join(tmpdir, "other_output"))
+            test_list = self._mock_test_files(source_directory, n_tests, 15 * 60, evg_api_mock,
+                                              suites_config_mock)
+            mock_resmoke_config_file(test_list, suite_path + ".yml")
+
+            under_test.generate_batch(
+                evg_api_mock,
+                [self._config_options(mock_config),
+                 self._config_options(other_config)], max_workers=2)
+
+            suites_config_mock.assert_called_once_with(suite_path)
+            for (directory, task) in [(target_directory, "some_task"),
+                                      (other_config["generated_config_dir"], "other_task")]:
+                generated_files = os.listdir(directory)
+                # There are files for each test's suite, the _misc suite and the evergreen config.
+                self.assertEqual(n_tests + 2, len(generated_files))
+                self.assertIn(f"{task}.json", generated_files)
+
+    @patch(ns("suitesconfig.get_suite"))
+    def test_batch_writes_nothing_if_a_task_fails(self, suites_config_mock):
+        evg_api_mock = self._mock_evg_api()
+        response = MagicMock(status_code=requests.codes.INTERNAL_SERVER_ERROR)
+
+        with TemporaryDirectory() as tmpdir:
+            mock_config = self._mock_config()
+            target_directory, source_directory = self._prep_dirs(tmpdir, mock_config)
+            suite_path = os.path.join(source_directory, "some_task")
+            mock_config["suite"] = suite_path
+            test_list = self._mock_test_files(source_directory, 4, 60, evg_api_mock,
+                                              suites_config_mock)
+            mock_resmoke_config_file(test_list, suite_path + ".yml")
+            evg_api_mock.test_stats_by_project.side_effect = [
+                evg_api_mock.test_stats_by_project.return_value,
+                requests.HTTPError(response=response),
+            ]
+            other_config = dict(mock_config, task_name="other_task_gen")
+
+            with self.assertRaises(requests.HTTPError):
+                under_test.generate_batch(
+                    evg_api_mock,
+                    [self._config_options(mock_config),
+                     self._config_options(other_config)], max_workers=1)
+
+            self.assertFalse(os.path.exists(target_directory))
+
 
 class TestHelperMethods(unittest.TestCase):
     def test_removes_gen_suffix(self):
@@ -475,6 +540,58 @@ class DivideTestsIntoSuitesByMaxtimeTest(unittest.TestCase):
         self.assertEqual(len(suites), max_suites)
 
 
+class DivideTestsIntoBalancedSuitesTest(unittest.TestCase):
+    def test_no_tests_creates_no_suites(self):
+        self.assertEqual(under_test.divide_tests_into_balanced_suites("suite_name", [], 10), [])
+
+    def test_if_less_total_than_max_only_one_suite_created(self):
+        tests_runtimes = [("test1", 5), ("test2", 4), ("test3", 3)]
+
+        suites = under_test.divide_tests_into_balanced_suites("suite_name", tests_runtimes, 20)
+
+        self.assertEqual(len(suites), 1)
+        self.assertEqual(suites[0].tests, ["test1", "test2", "test3"])
+        self.assertEqual(suites[0].get_runtime(), 12)
+
+    def test_suites_are_balanced(self):
+        tests_runtimes = [("test1", 3), ("test2", 2), ("test3", 3), ("test4", 2), ("test5", 2)]
+
+        greedy = under_test.divide_tests_into_suites("suite_name", tests_runtimes, 6)
+        balanced = under_test.divide_tests_into_balanced_suites("suite_name", tests_runtimes, 6)
+
+        self.assertEqual(len(greedy), 3)
+        self.assertEqual(len(balanced), 2)
+        self.assertEqual(sorted(suite.get_runtime() for suite in balanced), [6, 6])
+        self.assertEqual([suite.index for suite in balanced], [0, 1])
+
+    def test_overheads_are_included(self):
+        tests_runtimes = [(f"test{i}", 1) for i in range(4)]
+
+        suites = under_test.divide_tests_into_balanced_suites(
+            "suite_name", tests_runtimes, 10, per_test_overhead_secs=1, fixture_setup_secs=6)
+
+        self.assertEqual(len(suites), 2)
+        self.assertEqual([suite.get_test_count() for suite in suites], [2, 2])
+
+    def test_max_suites_overrides_max_time(self):
+        tests_runtimes = [(f"test{i}", 5) for i in range(10)]
+
+        suites = under_test.divide_tests_into_balanced_suites("suite_name", tests_runtimes, 5,
+                                                              max_suites=3)
+
+        self.assertEqual(len(suites), 3)
+        self.assertEqual(sum(suite.get_test_count() for suite in suites), 10)
+
+    def test_max_tests_per_suite(self):
+        tests_runtimes = [(f"test{i}", 1) for i in range(10)]
+
+        suites = under_test.divide_tests_into_balanced_suites("suite_name", tests_runtimes, 100,
+                                                              max_tests_per_suite=2)
+
+        self.assertEqual(len(suites), 5)
+        self.assertTrue(all(suite.get_test_count() == 2 for suite in suites))
+
+
 class SuiteTest(unittest.TestCase):
     def test_adding_tests_increases_count_and_runtime(self):
         suite = under_test.Suite("suite name")
@@ -494,6 +611,16 @@ class SuiteTest(unittest.TestCase):
 
         self.assertFalse(suite.should_overwrite_timeout())
 
+    def test_use_tail_runtimes(self):
+        suite = under_test.Suite("suite name")
+        suite.add_test("test1", 10)
+        suite.add_test("test2", 12)
+
+        suite.use_tail_runtimes({"test1": 30, "test2": 20, "test3": 100})
+
+        self.assertEqual(suite.max_runtime, 30)
+        self.assertEqual(suite.get_runtime(), 22)
+
     def test_suites_are_properly_indexed(self):
         under_test.Suite._current_index = 0
         n_suites = 5
@@ -509,6 +636,18 @@ class SuiteTest(unittest.TestCase):
 
         self.assertEqual("suite_name_003", suite.name)
 
+    def test_suites_with_own_counter(self):
+        under_test.Suite._current_index = 0
+        counter = under_test.SuiteCounter()
+        other_counter = under_test.SuiteCounter()
+        suites = [under_test.Suite("suite_name", counter) for _ in range(11)]
+        other_suite = under_test.Suite("suite_name", other_counter)
+
+        self.assertEqual([suite.index for suite in suites], list(range(11)))
+        self.assertEqual("suite_name_10", suites[10].name)
+        self.assertEqual("suite_name_0", other_suite.name)
+        self.assertEqual(under_test.Suite._current_index, 0)
+
 
 def create_suite(count=3, start=0):
     """ Create a suite with count tests."""
@@ -593,6 +732,7 @@ class EvergreenConfigGeneratorTest(unittest.TestCase):
         options.generated_config_dir = "config_dir"
         options.generate_display_task.return_value = DisplayTaskDefinition("task")
         options.create_misc_suite = True
+        options.timeout_percentile = None
 
         return options
 
@@ -724,6 +864,23 @@ class EvergreenConfigGeneratorTest(unittest.TestCase):
         expected_exec_timeout = under_test.calculate_timeout(suites[0].get_runtime(), 3) * 5
         self.assertEqual(expected_exec_timeout, timeout_cmd["params"]["exec_timeout_secs"])
 
+    def test_evg_config_has_timeouts_from_tail_runtimes(self):
+        options = self.generate_mock_options()
+        options.timeout_percentile = 99
+        suites = self.generate_mock_suites(3)
+        build_variant = BuildVariant("variant")
+
+        generator = under_test.EvergreenConfigGenerator(suites, options, MagicMock())
+        generator.generate_config(build_variant)
+
+        config = ShrubProject.empty().add_build_variant(build_variant).as_dict()
+        timeout_cmd = config["tasks"][0]["commands"][0]
+        expected_timeout = under_test.calculate_timeout(suites[0].max_runtime,
+                                                        under_test.TAIL_TIMEOUT_SCALING_FACTOR)
+        self.assertEqual(expected_timeout, timeout_cmd["params"]["timeout_secs"])
+        expected_exec_timeout = under_test.calculate_timeout(suites[0].get_runtime(), 3)
+        self.assertEqual(expected_exec_timeout, timeout_cmd["params"]["exec_timeout_secs"])
+
     def test_evg_config_has_fails_if_timeout_too_high(self):
         options = self.generate_mock_options()
         options.repeat_suites = under_test.MAX_EXPECTED_TIMEOUT
@@ -818,6 +975,8 @@ class GenerateSubSuitesTest(unittest.TestCase):
         options.fallback_num_sub_suites = n_fallback
         options.max_tests_per_suite = None
         options.max_sub_suites = max_sub_suites
+        options.split_percentile = None
+        options.timeout_percentile = None
         return options
 
     @staticmethod
@@ -971,6 +1130,32 @@ class GenerateSubSuitesTest(unittest.TestCase):
             for suite in suites:
                 self.assertEqual(2, len(suite.tests))
 
+    def test_calculate_suites_with_percentiles(self):
+        evg = MagicMock()
+        # Each test usually takes 1 minute a day, but 1 day in 10 takes 5 minutes.
+        evg.test_stats_by_project.return_value = [
+            tst_stat_mock(f"test{i}.js", duration, 1) for i in range(8)
+            for duration in [60] * 9 + [300]
+        ]
+        config_options = self.get_mock_options()
+        config_options.selected_tests_to_run = None
+        config_options.split_percentile = 50
+        config_options.timeout_percentile = 99
+
+        gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = [f"test{i}.js" for i in range(8)]
+            suites = gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+        self.assertEqual(evg.test_stats_by_project.call_args[1]["group_num_days"], 1)
+        # The median runtime of 1 minute is used to split the tests. The average runtime of 84
+        # seconds would have needed 2 suites.
+        self.assertEqual(1, len(suites))
+        self.assertEqual(480, suites[0].get_runtime())
+        self.assertGreater(suites[0].max_runtime, 250)
+
     def test_filter_missing_files(self):
         tests_runtimes = [
             TestRuntime(test_name="dir1/file1.js", runtime=20.32),
@@ -1047,6 +1232,25 @@ class GenerateSubSuitesTest(unittest.TestCase):
             self.assertIn(tests_runtimes[0], filtered_list)
             self.assertEqual(2, len(filtered_list))
 
+    @patch(ns('_parser.set_run_options'))
+    def test_suite_is_listed_once(self, set_run_options_mock):
+        tests_runtimes = [
+            TestRuntime(test_name="dir1/file1.js", runtime=20.32),
+            TestRuntime(test_name="dir2/file2.js", runtime=24.32),
+        ]
+
+        with patch("os.path.exists") as exists_mock, patch(ns("suitesconfig")) as suitesconfig_mock:
+            exists_mock.return_value = True
+            suitesconfig_mock.get_suite.return_value.tests = ["dir1/file1.js", "dir2/file2.js"]
+            config_options = MagicMock(suite="suite", selected_tests_to_run={"dir2\\file2.js"})
+
+            gen_sub_suites = under_test.GenerateSubSuites(MagicMock(), config_options)
+            filtered_list = gen_sub_suites.filter_tests(tests_runtimes)
+            gen_sub_suites.filter_tests(tests_runtimes)
+
+            self.assertEqual(filtered_list, [tests_runtimes[1]])
+            suitesconfig_mock.get_suite.assert_called_once_with("suite")
+
 
 class TestShouldTasksBeGenerated(unittest.TestCase):
     def test_during_first_execution(self):
@@ -0,0 +1,58 @@
+"""Unit tests for the util.binpacking module."""
+
+import random
+import unittest
+
+import buildscripts.util.binpacking as under_test
+
+# pylint: disable=missing-docstring
+
+
+class SplitTest(unittest.TestCase):
+    def assert_is_split(self, bins, weights):
+        items = sorted(item for items in bins for item in items)
+        self.assertEqual(items, list(range(len(weights))))
+
+    def test_no_items(self):
+        self.assertEqual(under_test.split([], 3), [])
+
+    def test_empty_bins_are_omitted(self):
+        bins = under_test.split([4, 2], 5)
+
+        self.assertEqual(sorted(bins), [[0], [1]])
+
+    def test_finds_perfect_split_greedy_misses(self):
+        # LPT alone puts 3 and 3 together and ends with a bin of 8.
+        weights = [3, 3, 2, 2, 2]
+
+        bins = under_test.split(weights, 2)
+
+        self.assert_is_split(bins, weights)
+        self.assertEqual(under_test.makespan(bins, weights), 6)
+
+    def test_max_items(self):
+        weights = [10, 1, 1, 1]
+
+        bins = under_test.split(weights, 2, max_items=2)
+
+        self.assert_is_split(bins, weights)
+        self.assertTrue(all(len(items) <= 2 for items in bins))
+        self.assertEqual(under_test.makespan(bins, weights), 11)
+
+    def test_infeasible_max_items_is_ignored(self):
+        weights = [1] * 5
+
+        bins = under_test.split(weights, 2, max_items=2)
+
+        self.assert_is_split(bins, weights)
+        self.assertEqual(len(bins), 2)
+
+    def test_close_to_lower_bound(self):
+        rng = random.Random(0)
+        weights = [rng.lognormvariate(3, 1) for _ in range(200)]
+
+        bins = under_test.split(weights, 10)
+
+        self.assert_is_split(bins, weights)
+        lower_bound = max(sum(weights) / 10, max(weights))
+        self.assertLess(under_test.makespan(bins, weights), lower_bound * 1.02)
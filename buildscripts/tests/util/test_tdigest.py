@@ -0,0 +1,56 @@
+"""Unit tests for the util.tdigest module."""
+
+import bisect
+import random
+import unittest
+
+from buildscripts.util.tdigest import TDigest
+
+# pylint: disable=missing-docstring
+
+
+class TDigestTest(unittest.TestCase):
+    def test_empty(self):
+        digest = TDigest()
+        self.assertIsNone(digest.quantile(0.5))
+        self.assertIsNone(digest.mean)
+
+    def test_single_value(self):
+        digest = TDigest()
+        digest.add(7, 3)
+        self.assertEqual(digest.quantile(0), 7)
+        self.assertEqual(digest.quantile(0.99), 7)
+        self.assertEqual(digest.mean, 7)
+
+    def test_weights(self):
+        digest = TDigest()
+        for (value, weight) in [(10, 1), (20, 8), (90, 1), (50, 0)]:
+            digest.add(value, weight)
+        self.assertEqual(digest.count, 10)
+        self.assertEqual(digest.quantile(0.5), 20)
+        self.assertEqual(digest.quantile(1), 90)
+
+    def test_accuracy(self):
+        rng = random.Random(0)
+        values = sorted(rng.lognormvariate(3, 1) for _ in range(20000))
+        digest = TDigest()
+        for value in values:
+            digest.add(value)
+
+        self.assertLess(len(digest._centroids), 100)  # pylint: disable=protected-access
+        for quantile in (0.01, 0.5, 0.9, 0.99, 0.999):
+            rank = bisect.bisect(values, digest.quantile(quantile)) / len(values)
+            self.assertAlmostEqual(rank, quantile, delta=0.002)
+
+    def test_update(self):
+        rng = random.Random(0)
+        values = [rng.uniform(0, 100) for _ in range(5000)]
+        (left, right) = (TDigest(), TDigest())
+        for (idx, value) in enumerate(values):
+            (left if idx % 2 else right).add(value)
+
+        left.update(right)
+
+        self.assertEqual(left.count, len(values))
+        self.assertEqual((left.min, left.max), (min(values), max(values)))
+        self.assertAlmostEqual(left.quantile(0.9), 90, delta=1)
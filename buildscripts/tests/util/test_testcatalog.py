@@ -0,0 +1,51 @@
+"""Unit tests for the util.testcatalog module."""
+
+import unittest
+
+import buildscripts.util.testcatalog as under_test
+
+# pylint: disable=missing-docstring
+
+_TESTS = [
+    "jstests/core/a.js",
+    "jstests/core/b.js",
+    "jstests/core/txns/c.js",
+    "jstests/core/.hidden.js",
+    "jstests/noPassthrough\\d.js",
+]
+
+
+class TestCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = under_test.TestCatalog(_TESTS)
+
+    def test_membership_ignores_path_separator(self):
+        self.assertIn("jstests/core/a.js", self.catalog)
+        self.assertIn("jstests\\core\\a.js", self.catalog)
+        self.assertIn("jstests/noPassthrough/d.js", self.catalog)
+        self.assertNotIn("jstests/core/d.js", self.catalog)
+
+    def test_tests_keep_selector_order(self):
+        self.assertEqual(list(self.catalog), _TESTS)
+        self.assertEqual(len(self.catalog), 5)
+
+    def test_glob_wildcards(self):
+        self.assertEqual(
+            self.catalog.glob("jstests/core/*.js"), {"jstests/core/a.js", "jstests/core/b.js"})
+        self.assertEqual(self.catalog.glob("./jstests/core/[b-c].js"), {"jstests/core/b.js"})
+        self.assertEqual(self.catalog.glob("jstests/core/.*.js"), {"jstests/core/.hidden.js"})
+        self.assertEqual(self.catalog.glob("jstests/core/txns/c.js"), {"jstests/core/txns/c.js"})
+        self.assertEqual(self.catalog.glob("jstests/core"), set())
+
+    def test_glob_globstar(self):
+        self.assertEqual(
+            self.catalog.glob("jstests/**/c.js"), {"jstests/core/txns/c.js"})
+        self.assertEqual(
+            self.catalog.glob("**/noPassthrough/*.js"), {"jstests/noPassthrough\\d.js"})
+        self.assertEqual(
+            self.catalog.glob("jstests/core/**"),
+            {"jstests/core/a.js", "jstests/core/b.js", "jstests/core/txns/c.js"})
+
+    def test_invalid_globstar(self):
+        with self.assertRaises(ValueError):
+            self.catalog.glob("jstests/core**/a.js")
@@ -0,0 +1,226 @@
+"""Unit tests for the util.testhistory module."""
+
+import datetime
+import unittest
+
+import requests
+from mock import MagicMock
+
+import buildscripts.util.testhistory as under_test
+import buildscripts.util.teststats as teststats
+
+# pylint: disable=missing-docstring
+
+_PROJECT = "project"
+_VARIANT = "variant"
+_TASK = "task"
+
+
+def evg_stats(test_file, date, num_pass, avg_duration_pass, num_fail=0):
+    return MagicMock(test_file=test_file, date=datetime.datetime.strptime(date, "%Y-%m-%d"),
+                     num_pass=num_pass, num_fail=num_fail, avg_duration_pass=avg_duration_pass)
+
+
+def days(start, end):
+    return under_test._date_range(  # pylint: disable=protected-access
+        datetime.date.fromisoformat(start), datetime.date.fromisoformat(end))
+
+
+def add_evg_stats(history, start, end, docs):
+    history.add_evergreen_stats(_PROJECT, _VARIANT, _TASK, days(start, end), docs)
+
+
+def report_result(test_file, start, elapsed, status="pass"):
+    return {"test_file": test_file, "status": status, "start": start, "end": start + elapsed}
+
+
+class WeightedPercentileTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertIsNone(under_test.weighted_percentile([], 50))
+
+    def test_weights(self):
+        points = [(10, 1), (20, 8), (30, 1)]
+        self.assertEqual(under_test.weighted_percentile(points, 10), 10)
+        self.assertEqual(under_test.weighted_percentile(points, 50), 20)
+        self.assertEqual(under_test.weighted_percentile(points, 100), 30)
+
+
+class TestHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.history = under_test.TestHistory()
+        self.addCleanup(self.history.close)
+
+    def test_stats_are_aggregated_over_date_range(self):
+        add_evg_stats(self.history, "2020-01-01", "2020-01-03", [
+            evg_stats("jstests/core/a.js", "2020-01-01", 1, 10),
+            evg_stats("jstests/core/a.js", "2020-01-02", 3, 30, num_fail=1),
+            evg_stats("jstests/core/a.js", "2020-01-03", 5, 100),
+        ])
+
+        stats = self.history.get_test_stats(_PROJECT, "2020-01-01", "2020-01-02", tasks=[_TASK],
+                                            variants=[_VARIANT])
+        daily_stats = self.history.get_test_stats(_PROJECT, "2020-01-01", "2020-01-02",
+                                                  daily=True)
+
+        self.assertEqual([(s.date, s.avg_duration_pass) for s in daily_stats],
+                         [("2020-01-01", 10), ("2020-01-02", 30)])
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0].test_file, "jstests/core/a.js")
+        self.assertEqual(stats[0].num_pass, 4)
+        self.assertEqual(stats[0].num_fail, 1)
+        self.assertEqual(stats[0].avg_duration_pass, 25)
+
+    def test_evergreen_stats_replace_the_days_they_cover(self):
+        add_evg_stats(self.history, "2020-01-01", "2020-01-01",
+                      [evg_stats("a.js", "2020-01-01", 1, 10)])
+        add_evg_stats(self.history, "2020-01-01", "2020-01-01",
+                      [evg_stats("a.js", "2020-01-01", 2, 20)])
+
+        stats = self.history.get_test_stats(_PROJECT, "2020-01-01", "2020-01-01")
+
+        self.assertEqual([(s.num_pass, s.avg_duration_pass) for s in stats], [(2, 20)])
+
+    def test_reports_are_added_once(self):
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+        report = {
+            "results": [
+                report_result("a.js", start, 10),
+                report_result("a.js", start + 20, 20),
+                report_result("a.js", start + 50, 1, status="fail"),
+            ]
+        }
+
+        self.assertTrue(self.history.add_report(_PROJECT, _VARIANT, _TASK, report))
+        self.assertFalse(self.history.add_report(_PROJECT, _VARIANT, _TASK, report))
+
+        stats = self.history.get_test_stats(_PROJECT, "2020-01-01", "2020-01-01")
+        self.assertEqual([(s.num_pass, s.num_fail, s.avg_duration_pass) for s in stats],
+                         [(2, 1, 15)])
+
+    def test_reports_are_only_used_for_days_without_evergreen_stats(self):
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+        report = {
+            "results": [
+                report_result("a.js", start, 10),
+                report_result("a.js", start + 86400, 40),
+            ]
+        }
+        self.history.add_report(_PROJECT, _VARIANT, _TASK, report)
+        add_evg_stats(self.history, "2020-01-01", "2020-01-01",
+                      [evg_stats("a.js", "2020-01-01", 1, 10)])
+
+        stats = self.history.get_test_stats(_PROJECT, "2020-01-01", "2020-01-02")
+        report_stats = self.history.get_test_stats(_PROJECT, "2020-01-01", "2020-01-02",
+                                                   sources=[under_test.REPORT_SOURCE])
+
+        self.assertEqual([(s.num_pass, s.avg_duration_pass) for s in stats], [(2, 25)])
+        self.assertEqual([(s.num_pass, s.avg_duration_pass) for s in report_stats], [(2, 25)])
+        self.assertEqual(
+            self.history.get_runtime_percentiles(_PROJECT, "2020-01-01", "2020-01-02", 50),
+            {"a.js": 10})
+
+    def test_runtime_percentiles(self):
+        add_evg_stats(self.history, "2020-01-01", "2020-01-03", [
+            evg_stats("a.js", "2020-01-01", 1, 10),
+            evg_stats("a.js", "2020-01-02", 8, 20),
+            evg_stats("a.js", "2020-01-03", 1, 90),
+            evg_stats("b.js", "2020-01-01", 0, 0, num_fail=1),
+        ])
+
+        self.assertEqual(
+            self.history.get_runtime_percentiles(_PROJECT, "2020-01-01", "2020-01-03", 50),
+            {"a.js": 20})
+        self.assertEqual(
+            self.history.get_runtime_percentiles(_PROJECT, "2020-01-01", "2020-01-03", 95),
+            {"a.js": 90})
+
+    def test_only_missing_days_are_fetched(self):
+        evg_api = MagicMock()
+        evg_api.test_stats_by_project.return_value = [
+            evg_stats("jstests/core/a.js", "2020-01-01", 1, 10),
+            evg_stats("a:Hook", "2020-01-01", 1, 2),
+        ]
+        self.history.mark_fetched(_PROJECT, _VARIANT, _TASK, days("2020-01-02", "2020-01-03"),
+                                  now=datetime.datetime(2020, 1, 10))
+
+        stats = self.history.test_stats_by_project(evg_api, _PROJECT, "2020-01-01", "2020-01-03",
+                                                   _TASK, _VARIANT)
+
+        evg_api.test_stats_by_project.assert_called_once_with(
+            _PROJECT, after_date="2020-01-01", before_date="2020-01-01", tasks=[_TASK],
+            variants=[_VARIANT], group_by="test", group_num_days=1)
+        runtimes = teststats.TestStats(stats).get_tests_runtimes()
+        self.assertEqual(runtimes, [teststats.TestRuntime("jstests/core/a.js", 12)])
+
+    def test_incomplete_days_are_fetched_again(self):
+        evg_api = MagicMock()
+        evg_api.test_stats_by_project.return_value = []
+        # Evergreen may not have finished computing the statistics of the day before 'now'.
+        self.history.mark_fetched(_PROJECT, _VARIANT, _TASK, days("2020-01-01", "2020-01-02"),
+                                  now=datetime.datetime(2020, 1, 3, 0, 30))
+
+        self.history.test_stats_by_project(evg_api, _PROJECT, "2020-01-01", "2020-01-02", _TASK,
+                                           _VARIANT)
+
+        evg_api.test_stats_by_project.assert_called_once()
+        self.assertEqual(evg_api.test_stats_by_project.call_args[1]["after_date"], "2020-01-02")
+
+    def test_local_history_is_used_when_evergreen_is_degraded(self):
+        add_evg_stats(self.history, "2020-01-01", "2020-01-01",
+                      [evg_stats("a.js", "2020-01-01", 1, 10)])
+        evg_api = MagicMock()
+        response = MagicMock(status_code=requests.codes.SERVICE_UNAVAILABLE)
+        evg_api.test_stats_by_project.side_effect = requests.HTTPError(response=response)
+
+        stats = self.history.test_stats_by_project(evg_api, _PROJECT, "2020-01-01", "2020-01-02",
+                                                   _TASK, _VARIANT)
+
+        self.assertEqual([s.test_file for s in stats], ["a.js"])
+        missing_days = self.history.get_missing_days(_PROJECT, _VARIANT, _TASK, "2020-01-01",
+                                                     "2020-01-02")
+        self.assertEqual(len(missing_days), 2)
+
+
+class HistoryBackedEvergreenApiTest(unittest.TestCase):
+    def test_task_queries_use_history(self):
+        history = MagicMock()
+        evg_api = MagicMock()
+        api = under_test.HistoryBackedEvergreenApi(evg_api, history)
+
+        api.test_stats_by_project(_PROJECT, after_date="2020-01-01", before_date="2020-01-15",
+                                  tasks=[_TASK], variants=[_VARIANT], group_by="test",
+                                  group_num_days=14)
+
+        history.test_stats_by_project.assert_called_once_with(
+            evg_api, _PROJECT, "2020-01-01", "2020-01-15", _TASK, _VARIANT, daily=False)
+        evg_api.test_stats_by_project.assert_not_called()
+
+    def test_daily_task_queries_use_history(self):
+        history = MagicMock()
+        evg_api = MagicMock()
+        api = under_test.HistoryBackedEvergreenApi(evg_api, history)
+
+        api.test_stats_by_project(_PROJECT, after_date="2020-01-01", before_date="2020-01-15",
+                                  tasks=[_TASK], variants=[_VARIANT], group_by="test",
+                                  group_num_days=1)
+
+        history.test_stats_by_project.assert_called_once_with(
+            evg_api, _PROJECT, "2020-01-01", "2020-01-15", _TASK, _VARIANT, daily=True)
+
+    def test_other_queries_use_evergreen(self):
+        history = MagicMock()
+        evg_api = MagicMock()
+        api = under_test.HistoryBackedEvergreenApi(evg_api, history)
+
+        api.test_stats_by_project(_PROJECT, after_date="2020-01-01", before_date="2020-01-15",
+                                  tasks=[_TASK], variants=[_VARIANT], group_by="test",
+                                  group_num_days=7)
+        api.version_by_id("version")
+
+        history.test_stats_by_project.assert_not_called()
+        evg_api.test_stats_by_project.assert_called_once()
+        evg_api.version_by_id.assert_called_once_with("version")
+
+    def test_wrap_without_history_file(self):
+        evg_api = MagicMock()
+        self.assertIs(under_test.wrap_evergreen_api(evg_api, None), evg_api)
@@ -81,6 +81,34 @@ class TestTestStats(unittest.TestCase):
         ]
         self.assertEqual(expected_runtimes, test_stats.get_tests_runtimes())
 
+    def test_percentile(self):
+        evg_results = [
+            self._make_evg_result("dir/test1.js", 1, duration) for duration in range(100)
+        ]
+        evg_results += [
+            self._make_evg_result("dir/test2.js", 1, 40),
+            self._make_evg_result("test2:CleanEveryN", 9, 1),
+            self._make_evg_result("test2:CleanEveryN", 1, 11),
+        ]
+        test_stats = teststats_utils.TestStats(evg_results, percentiles=True)
+        runtimes = dict(test_stats.get_tests_runtimes(percentile=90))
+        self.assertAlmostEqual(runtimes["dir/test1.js"], 89.5)
+        self.assertAlmostEqual(runtimes["dir/test2.js"], 50)
+        self.assertEqual(dict(test_stats.get_tests_runtimes())["dir/test2.js"], 42)
+
+    def test_percentile_zero_runs(self):
+        evg_results = [self._make_evg_result("dir/test1.js", 0, 0)]
+        test_stats = teststats_utils.TestStats(evg_results, percentiles=True)
+        expected_runtimes = [
+            teststats_utils.TestRuntime(test_name="dir/test1.js", runtime=0),
+        ]
+        self.assertEqual(expected_runtimes, test_stats.get_tests_runtimes(percentile=90))
+
+    def test_percentile_requires_percentiles(self):
+        test_stats = teststats_utils.TestStats([self._make_evg_result("dir/test1.js", 1, 10)])
+        with self.assertRaises(ValueError):
+            test_stats.get_tests_runtimes(percentile=90)
+
     @staticmethod
     def _make_evg_result(test_file="dir/test1.js", num_pass=0, duration=0):
         return Mock(
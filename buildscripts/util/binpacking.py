@@ -0,0 +1,103 @@
+"""Split weighted items into a fixed number of bins while minimizing the largest bin (makespan).
+
+Two heuristics are run and the better split is kept:
+
+* LPT (longest processing time first) places each item, largest first, into the currently lightest
+  bin. Its makespan is at most 4/3 of the optimum.
+* MULTIFIT binary searches for the smallest bin capacity for which first-fit decreasing places
+  every item. Its makespan is at most 13/11 of the optimum.
+
+Both respect a maximum number of items per bin.
+"""
+
+import heapq
+from typing import List, Optional, Sequence
+
+# The number of capacities MULTIFIT tries.
+_MULTIFIT_ITERATIONS = 12
+
+
+def makespan(bins: Sequence[Sequence[int]], weights: Sequence[float]) -> float:
+    """Return the total weight of the heaviest bin."""
+    return max((sum(weights[item] for item in items) for items in bins), default=0)
+
+
+def _lpt(order: List[int], weights: Sequence[float], num_bins: int,
+         max_items: Optional[int]) -> Optional[List[List[int]]]:
+    """Place each item, largest first, into the lightest bin which has room for it."""
+    bins = [[] for _ in range(num_bins)]
+    # Heap of (load, bin index) for the bins which have room for another item.
+    loads = [(0.0, idx) for idx in range(num_bins)]
+    for item in order:
+        if not loads:
+            return None
+        load, idx = heapq.heappop(loads)
+        bins[idx].append(item)
+        if max_items is None or len(bins[idx]) < max_items:
+            heapq.heappush(loads, (load + weights[item], idx))
+    return bins
+
+
+def _first_fit_decreasing(order: List[int], weights: Sequence[float], num_bins: int,
+                          max_items: Optional[int], capacity: float) -> Optional[List[List[int]]]:
+    """Place each item, largest first, into the first bin it fits in, or return None."""
+    bins = [[] for _ in range(num_bins)]
+    loads = [0.0] * num_bins
+    for item in order:
+        weight = weights[item]
+        for idx in range(num_bins):
+            if loads[idx] + weight <= capacity and (max_items is None
+                                                    or len(bins[idx]) < max_items):
+                bins[idx].append(item)
+                loads[idx] += weight
+                break
+        else:
+            return None
+    return bins
+
+
+def _multifit(order: List[int], weights: Sequence[float], num_bins: int,
+              max_items: Optional[int]) -> Optional[List[List[int]]]:
+    """Binary search for the smallest capacity at which first-fit decreasing succeeds."""
+    total = sum(weights)
+    largest = weights[order[0]]
+    lower = max(total / num_bins, largest)
+    upper = max(2 * total / num_bins, largest)
+
+    best = _first_fit_decreasing(order, weights, num_bins, max_items, upper)
+    for _ in range(_MULTIFIT_ITERATIONS):
+        capacity = (lower + upper) / 2
+        bins = _first_fit_decreasing(order, weights, num_bins, max_items, capacity)
+        if bins is None:
+            lower = capacity
+        else:
+            best = bins
+            upper = capacity
+    return best
+
+
+def split(weights: Sequence[float], num_bins: int,
+          max_items: Optional[int] = None) -> List[List[int]]:
+    """
+    Split the items into 'num_bins' bins so that the heaviest bin is as light as possible.
+
+    :param weights: The weight of each item.
+    :param num_bins: The number of bins to split the items into.
+    :param max_items: The maximum number of items in a bin, or None for no limit. It is ignored if
+        the items can't fit in 'num_bins' bins of this size.
+    :return: The indexes into 'weights' of the items in each bin. Empty bins are omitted.
+    """
+    if not weights:
+        return []
+    num_bins = max(1, min(num_bins, len(weights)))
+    if max_items is not None and max_items * num_bins < len(weights):
+        max_items = None
+
+    # Break ties by position so the split is deterministic.
+    order = sorted(range(len(weights)), key=lambda item: (-weights[item], item))
+    candidates = [
+        bins for bins in (_lpt(order, weights, num_bins, max_items),
+                          _multifit(order, weights, num_bins, max_items)) if bins is not None
+    ]
+    best = min(candidates, key=lambda bins: makespan(bins, weights))
+    return [items for items in best if items]
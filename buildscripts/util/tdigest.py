@@ -0,0 +1,113 @@
+"""Streaming estimate of the quantiles of a distribution with bounded memory.
+
+This is the merging t-digest described by Dunning and Ertl in "Computing Extremely Accurate
+Quantiles Using t-Digests". Values are grouped into centroids, which are kept small near the tails
+of the distribution so that the extreme quantiles are estimated most accurately.
+"""
+
+import math
+from typing import Optional
+
+
+class TDigest(object):
+    """Quantile sketch of a stream of weighted values."""
+
+    def __init__(self, compression: float = 100):
+        """
+        Initialize the TDigest.
+
+        :param compression: Bound on the number of centroids. Larger values are more accurate.
+        """
+        self.compression = compression
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._total = 0.0
+        # Sorted list of [mean, weight] pairs.
+        self._centroids = []
+        self._unmerged = []
+
+    def add(self, value: float, weight: float = 1):
+        """Add 'value' to the digest 'weight' times."""
+        if weight <= 0:
+            return
+        self._unmerged.append([value, weight])
+        self.count += weight
+        self._total += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._unmerged) > 5 * self.compression:
+            self._merge()
+
+    def update(self, other: "TDigest"):
+        """Add the values of 'other' to the digest."""
+        other._merge()  # pylint: disable=protected-access
+        for (mean, weight) in other._centroids:  # pylint: disable=protected-access
+            self.add(mean, weight)
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Return the mean of the values, or None if there are none."""
+        return self._total / self.count if self.count else None
+
+    def _scale(self, quantile):
+        """Map 'quantile' to the index of the centroid it belongs to (the k1 scale function)."""
+        return self.compression / (2 * math.pi) * math.asin(2 * min(1, max(0, quantile)) - 1)
+
+    def _merge(self):
+        """Merge the values added since the last merge into the centroids."""
+        if not self._unmerged:
+            return
+
+        points = sorted(self._centroids + self._unmerged)
+        self._unmerged = []
+        self._centroids = []
+        weight_before = 0
+        (mean, weight) = points[0]
+        scale_limit = self._scale(0) + 1
+        for (next_mean, next_weight) in points[1:]:
+            if self._scale((weight_before + weight + next_weight) / self.count) <= scale_limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                self._centroids.append([mean, weight])
+                weight_before += weight
+                scale_limit = self._scale(weight_before / self.count) + 1
+                (mean, weight) = (next_mean, next_weight)
+        self._centroids.append([mean, weight])
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """
+        Return an estimate of the value at 'quantile', or None if the digest is empty.
+
+        :param quantile: Quantile between 0 and 1.
+        :return: Estimated value, interpolated between the means of neighbouring centroids.
+        """
+        if not self.count:
+            return None
+        self._merge()
+
+        target = min(1, max(0, quantile)) * self.count
+        centroids = self._centroids
+        # The values of a centroid are assumed to be spread around its mean, so the first half of
+        # the first centroid is interpolated from the minimum and the last half of the last one from
+        # the maximum.
+        (first_mean, first_weight) = centroids[0]
+        if target < first_weight / 2:
+            return self.min + (first_mean - self.min) * target / (first_weight / 2)
+
+        (last_mean, last_weight) = centroids[-1]
+        if target > self.count - last_weight / 2:
+            remaining = self.count - target
+            return self.max - (self.max - last_mean) * remaining / (last_weight / 2)
+
+        cumulative = first_weight / 2
+        for ((mean, weight), (next_mean, next_weight)) in zip(centroids, centroids[1:]):
+            step = (weight + next_weight) / 2
+            if target <= cumulative + step:
+                return mean + (next_mean - mean) * (target - cumulative) / step
+            cumulative += step
+        return last_mean
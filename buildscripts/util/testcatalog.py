@@ -0,0 +1,108 @@
+"""Index of the test files of a suite, shared by the stages which filter tests by name.
+
+Membership checks use a set of the normalized test names. Glob patterns are matched against a trie
+of the path components of the test names, so only the directories which can match a pattern are
+visited and the file system is never listed.
+"""
+
+import fnmatch
+from typing import Iterable, Iterator, List, Set
+
+from buildscripts.util.teststats import normalize_test_name
+
+_GLOBSTAR = "**"
+_MAGIC_CHARS = ("*", "?", "[")
+
+
+class _TrieNode(object):
+    """A path component and the tests whose path ends at it."""
+
+    __slots__ = ("children", "tests")
+
+    def __init__(self):
+        """Initialize the _TrieNode."""
+        self.children = {}
+        self.tests = []
+
+
+def _split_pattern(pattern: str) -> List[str]:
+    """Return the path components of 'pattern' with consecutive globstars coalesced."""
+    parts = []
+    for part in normalize_test_name(pattern).split("/"):
+        if part in ("", "."):
+            continue
+        if part == _GLOBSTAR and parts and parts[-1] == _GLOBSTAR:
+            continue
+        if _GLOBSTAR in part and part != _GLOBSTAR:
+            raise ValueError("Can only specify glob patterns of the form a/**/b")
+        parts.append(part)
+    return parts
+
+
+class TestCatalog(object):
+    """The test files of a suite, indexed by normalized name."""
+
+    def __init__(self, test_files: Iterable[str]):
+        """
+        Initialize the TestCatalog.
+
+        :param test_files: Test files of the suite, as listed by its selector.
+        """
+        self.tests = list(test_files)
+        self._names = set()
+        self._root = _TrieNode()
+        for test in self.tests:
+            name = normalize_test_name(test)
+            self._names.add(name)
+            node = self._root
+            for part in name.split("/"):
+                if part in ("", "."):
+                    continue
+                node = node.children.setdefault(part, _TrieNode())
+            node.tests.append(test)
+
+    def __contains__(self, test_name: str) -> bool:
+        """Return whether 'test_name' is in the catalog, with either path separator."""
+        return normalize_test_name(test_name) in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the test files in the order the selector listed them."""
+        return iter(self.tests)
+
+    def __len__(self) -> int:
+        """Return the number of test files."""
+        return len(self.tests)
+
+    def glob(self, pattern: str) -> Set[str]:
+        """
+        Return the test files matching 'pattern'.
+
+        :param pattern: Shell-style pattern which, as with resmokelib.utils.globstar, may contain
+            "**" to match zero or more directories.
+        :return: Set of the matching test files, as they were given to the catalog.
+        """
+        matches = set()
+        self._match(self._root, _split_pattern(pattern), matches)
+        return matches
+
+    def _match(self, node: _TrieNode, parts: List[str], matches: Set[str]) -> None:
+        if not parts:
+            matches.update(node.tests)
+            return
+
+        (part, rest) = (parts[0], parts[1:])
+        if part == _GLOBSTAR:
+            self._match(node, rest, matches)
+            for (name, child) in node.children.items():
+                if not name.startswith("."):
+                    self._match(child, parts, matches)
+        elif any(char in part for char in _MAGIC_CHARS):
+            # Like glob.glob(), hidden files are only matched by patterns that start with a ".".
+            for (name, child) in node.children.items():
+                if (part.startswith(".") or not name.startswith(".")) and fnmatch.fnmatch(
+                        name, part):
+                    self._match(child, rest, matches)
+        else:
+            child = node.children.get(part)
+            if child is not None:
+                self._match(child, rest, matches)
@@ -0,0 +1,403 @@
+"""Local store of historical test runtimes shared by the task generators.
+
+The store is an SQLite database holding the number of passing and failing executions and the average
+passing runtime of each test, for each project, build variant, task and day. It is filled from the
+Evergreen test_stats endpoint and from resmoke.py report.json files, and answers the queries the
+generators would otherwise send to Evergreen on every run.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional
+
+import requests
+import structlog
+
+LOGGER = structlog.getLogger(__name__)
+
+_DATE_FORMAT = "%Y-%m-%d"
+
+# Statistics are recorded under the source they came from since a report.json file and the
+# Evergreen results of the same execution describe the same test runs. Unless the sources are given
+# explicitly, the statistics of a day come from Evergreen if it has any for the task on that day,
+# and from the report.json files otherwise, so that no execution is counted twice.
+EVERGREEN_SOURCE = "evergreen"
+REPORT_SOURCE = "report"
+
+# Evergreen computes the daily test statistics with a delay, so the statistics fetched for a day
+# are only considered complete once this long has passed since the day ended.
+_STATS_DELAY = datetime.timedelta(days=1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_stats (
+    project TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    task TEXT NOT NULL,
+    test_file TEXT NOT NULL,
+    date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    num_pass INTEGER NOT NULL,
+    num_fail INTEGER NOT NULL,
+    avg_duration_pass REAL NOT NULL,
+    PRIMARY KEY (project, variant, task, date, test_file, source)
+);
+CREATE TABLE IF NOT EXISTS fetched_days (
+    project TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    task TEXT NOT NULL,
+    date TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    PRIMARY KEY (project, variant, task, date)
+);
+CREATE TABLE IF NOT EXISTS ingested_reports (
+    digest TEXT PRIMARY KEY
+);
+"""
+
+HistoricalTestStats = namedtuple(
+    "HistoricalTestStats",
+    ["test_file", "task_name", "variant", "date", "num_pass", "num_fail", "avg_duration_pass"])
+
+
+def _parse_date(date):
+    """Return 'date' as a datetime.date, accepting a date, a datetime, or a YYYY-MM-DD string."""
+    if isinstance(date, datetime.datetime):
+        return date.date()
+    if isinstance(date, datetime.date):
+        return date
+    return datetime.datetime.strptime(date[:10], _DATE_FORMAT).date()
+
+
+def _date_range(start_date, end_date):
+    """Return the days from 'start_date' to 'end_date', inclusive."""
+    return [
+        start_date + datetime.timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+
+
+def weighted_percentile(values_and_weights, percentile):
+    """
+    Return the value at 'percentile' of the weighted distribution, or None if it is empty.
+
+    :param values_and_weights: Iterable of (value, weight) tuples.
+    :param percentile: Percentile between 0 and 100.
+    :return: Smallest value whose cumulative weight reaches 'percentile' of the total weight.
+    """
+    points = sorted((value, weight) for (value, weight) in values_and_weights if weight > 0)
+    total = sum(weight for (_, weight) in points)
+    if not points:
+        return None
+
+    threshold = total * percentile / 100
+    cumulative = 0
+    for (value, weight) in points:
+        cumulative += weight
+        if cumulative >= threshold:
+            return value
+    return points[-1][0]
+
+
+class TestHistory(object):
+    """SQLite database of test runtimes by project, build variant, task and day."""
+
+    def __init__(self, pathname=":memory:"):
+        """
+        Open the store at 'pathname', creating it if it doesn't exist.
+
+        :param pathname: Path to the SQLite database.
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(pathname, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def _merge_stats(self, rows, source):
+        """
+        Merge (project, variant, task, test_file, date, num_pass, num_fail, duration) rows.
+
+        The caller must hold the lock and have a transaction open.
+        """
+        self._conn.executemany(
+            """
+            INSERT INTO test_stats (project, variant, task, test_file, date, num_pass, num_fail,
+                                    avg_duration_pass, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (project, variant, task, date, test_file, source) DO UPDATE SET
+                avg_duration_pass = CASE num_pass + excluded.num_pass WHEN 0 THEN 0 ELSE
+                    (avg_duration_pass * num_pass + excluded.avg_duration_pass * excluded.num_pass)
+                    / (num_pass + excluded.num_pass) END,
+                num_pass = num_pass + excluded.num_pass,
+                num_fail = num_fail + excluded.num_fail
+            """, [tuple(row) + (source, ) for row in rows])
+
+    def add_evergreen_stats(  # pylint: disable=too-many-arguments
+            self, project, variant, task, days, evg_test_stats):
+        """
+        Replace the Evergreen statistics of 'days' with 'evg_test_stats'.
+
+        :param project: Evergreen project the statistics are for.
+        :param variant: Build variant the statistics are for.
+        :param task: Task the statistics are for.
+        :param days: The days 'evg_test_stats' covers.
+        :param evg_test_stats: Documents from the test_stats endpoint grouped by test and by day.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM test_stats WHERE project = ? AND variant = ? AND task = ? AND date = ?"
+                " AND source = ?", [(project, variant, task, date.strftime(_DATE_FORMAT),
+                                     EVERGREEN_SOURCE) for date in days])
+            self._merge_stats([(project, variant, task, doc.test_file,
+                                _parse_date(doc.date).strftime(_DATE_FORMAT), doc.num_pass,
+                                doc.num_fail, doc.avg_duration_pass) for doc in evg_test_stats],
+                              EVERGREEN_SOURCE)
+
+    def add_report(self, project, variant, task, report_dict):
+        """
+        Add the test results of a report.json file.
+
+        A report which has already been added is ignored.
+
+        :param project: Evergreen project the report is for.
+        :param variant: Build variant the report is for.
+        :param task: Task the report is for.
+        :param report_dict: Contents of the report.json file.
+        :return: True if the report was added.
+        """
+        digest = hashlib.sha256(
+            json.dumps([project, variant, task, report_dict["results"]],
+                       sort_keys=True).encode("utf-8")).hexdigest()
+        rows = []
+        for result in report_dict["results"]:
+            date = datetime.datetime.utcfromtimestamp(result["start"]).strftime(_DATE_FORMAT)
+            passed = result["status"] == "pass"
+            rows.append((project, variant, task, result["test_file"], date, int(passed),
+                         int(not passed), result["end"] - result["start"] if passed else 0))
+
+        with self._lock, self._conn:
+            if not self._conn.execute("INSERT OR IGNORE INTO ingested_reports VALUES (?)",
+                                      (digest, )).rowcount:
+                return False
+            self._merge_stats(rows, REPORT_SOURCE)
+        return True
+
+    def get_missing_days(self, project, variant, task, start_date, end_date):
+        """Return the days between the given dates which haven't been completely fetched."""
+        start_date = _parse_date(start_date)
+        end_date = _parse_date(end_date)
+        with self._lock:
+            complete = {
+                date
+                for (date, ) in self._conn.execute(
+                    "SELECT date FROM fetched_days WHERE project = ? AND variant = ? AND task = ?"
+                    " AND date BETWEEN ? AND ? AND complete", (project, variant, task,
+                                                               start_date.strftime(_DATE_FORMAT),
+                                                               end_date.strftime(_DATE_FORMAT)))
+            }
+        return [
+            date for date in _date_range(start_date, end_date)
+            if date.strftime(_DATE_FORMAT) not in complete
+        ]
+
+    def mark_fetched(self, project, variant, task, days, now=None):
+        """Record that the statistics of 'days' were fetched, at 'now' by default."""
+        last_complete_day = (now or datetime.datetime.utcnow()).date() - _STATS_DELAY
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fetched_days VALUES (?, ?, ?, ?, ?)",
+                [(project, variant, task, date.strftime(_DATE_FORMAT),
+                  int(date < last_complete_day)) for date in days])
+
+    @staticmethod
+    def _where_clause(  # pylint: disable=too-many-arguments
+            project, tasks, variants, start_date, end_date, sources):
+        """Return the WHERE clause selecting the given statistics and its parameters."""
+        conditions = ["project = ?", "date BETWEEN ? AND ?"]
+        params = [
+            project,
+            _parse_date(start_date).strftime(_DATE_FORMAT),
+            _parse_date(end_date).strftime(_DATE_FORMAT)
+        ]
+        for (column, values) in (("task", tasks), ("variant", variants), ("source", sources)):
+            if values:
+                conditions.append("{} IN ({})".format(column, ", ".join("?" * len(values))))
+                params.extend(values)
+        if not sources:
+            conditions.append(
+                "(source = ? OR NOT EXISTS (SELECT 1 FROM test_stats AS evg WHERE evg.source = ?"
+                " AND evg.project = test_stats.project AND evg.variant = test_stats.variant"
+                " AND evg.task = test_stats.task AND evg.date = test_stats.date))")
+            params.extend([EVERGREEN_SOURCE, EVERGREEN_SOURCE])
+        return " WHERE " + " AND ".join(conditions), params
+
+    def get_test_stats(self, project: str, start_date, end_date,
+                       tasks: Optional[List[str]] = None, variants: Optional[List[str]] = None,
+                       sources: Optional[List[str]] = None,
+                       daily: bool = False) -> List[HistoricalTestStats]:
+        """
+        Return the statistics of each test, aggregated over the days between the given dates.
+
+        The results can be passed to teststats.TestStats like those of the test_stats endpoint.
+
+        :param project: Evergreen project to query.
+        :param start_date: First day to aggregate.
+        :param end_date: Last day to aggregate.
+        :param tasks: Tasks to aggregate, or None for all of them.
+        :param variants: Build variants to aggregate, or None for all of them.
+        :param sources: Sources of the statistics to aggregate, or None for the Evergreen
+            statistics of each day, falling back to those of the report.json files.
+        :param daily: If true, aggregate the statistics of each day separately.
+        :return: List of statistics, one per test, task and variant, and day if 'daily' is true.
+        """
+        # pylint: disable=too-many-arguments
+        (where, params) = self._where_clause(project, tasks, variants, start_date, end_date,
+                                             sources)
+        group_by = "test_file, task, variant" + (", date" if daily else "")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT test_file, task, variant, MIN(date), SUM(num_pass), SUM(num_fail),"
+                " COALESCE(SUM(avg_duration_pass * num_pass) / NULLIF(SUM(num_pass), 0), 0)"
+                " FROM test_stats" + where + " GROUP BY " + group_by + " ORDER BY " + group_by,
+                params).fetchall()
+        return [HistoricalTestStats(*row) for row in rows]
+
+    def get_runtime_percentiles(self, project: str, start_date, end_date, percentile: float,
+                                tasks: Optional[List[str]] = None,
+                                variants: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Return the given percentile of the passing runtime of each test.
+
+        Each day's average runtime is weighted by the number of passing executions that day.
+
+        :param project: Evergreen project to query.
+        :param start_date: First day to aggregate.
+        :param end_date: Last day to aggregate.
+        :param percentile: Percentile between 0 and 100.
+        :param tasks: Tasks to aggregate, or None for all of them.
+        :param variants: Build variants to aggregate, or None for all of them.
+        :return: Dictionary mapping test files to their runtime at the percentile.
+        """
+        # pylint: disable=too-many-arguments
+        (where, params) = self._where_clause(project, tasks, variants, start_date, end_date, None)
+        samples = {}
+        with self._lock:
+            for (test_file, duration, num_pass) in self._conn.execute(
+                    "SELECT test_file, avg_duration_pass, num_pass FROM test_stats" + where +
+                    " AND num_pass > 0", params):
+                samples.setdefault(test_file, []).append((duration, num_pass))
+        return {
+            test_file: weighted_percentile(points, percentile)
+            for (test_file, points) in samples.items()
+        }
+
+    def test_stats_by_project(  # pylint: disable=too-many-arguments
+            self, evg_api, project: str, after_date: str, before_date: str, task: str,
+            variant: str, daily: bool = False) -> List[HistoricalTestStats]:
+        """
+        Return the statistics of each test, fetching the days missing from the store from Evergreen.
+
+        If Evergreen can't be reached because it is degraded, the statistics already in the store
+        are returned.
+
+        :param evg_api: Evergreen API.
+        :param project: Evergreen project to query.
+        :param after_date: First day to query, as YYYY-MM-DD.
+        :param before_date: Last day to query, as YYYY-MM-DD.
+        :param task: Task to query.
+        :param variant: Build variant to query.
+        :param daily: If true, return the statistics of each day separately.
+        :return: List of statistics, one per test, and day if 'daily' is true.
+        """
+        missing_days = self.get_missing_days(project, variant, task, after_date, before_date)
+        if missing_days:
+            # The days in between the missing ones are fetched again rather than split the query.
+            days = _date_range(missing_days[0], missing_days[-1])
+            try:
+                evg_test_stats = evg_api.test_stats_by_project(
+                    project, after_date=days[0].strftime(_DATE_FORMAT),
+                    before_date=days[-1].strftime(_DATE_FORMAT), tasks=[task],
+                    variants=[variant], group_by="test", group_num_days=1)
+            except requests.HTTPError as err:
+                if err.response.status_code != requests.codes.SERVICE_UNAVAILABLE:
+                    raise
+                LOGGER.warning("Evergreen is degraded, using the local test history",
+                               missing_days=len(missing_days))
+            else:
+                self.add_evergreen_stats(project, variant, task, days, evg_test_stats)
+                self.mark_fetched(project, variant, task, days)
+
+        return self.get_test_stats(project, after_date, before_date, tasks=[task],
+                                   variants=[variant], daily=daily)
+
+
+class HistoryBackedEvergreenApi(object):
+    """Evergreen API whose test_stats_by_project() queries are answered by a TestHistory."""
+
+    def __init__(self, evg_api, history: TestHistory):
+        """
+        Wrap 'evg_api' so its test statistics are read from 'history'.
+
+        :param evg_api: Evergreen API.
+        :param history: Local store of test statistics.
+        """
+        self._evg_api = evg_api
+        self._history = history
+
+    def __getattr__(self, name):
+        """Forward every other request to the Evergreen API."""
+        return getattr(self._evg_api, name)
+
+    def test_stats_by_project(  # pylint: disable=too-many-arguments
+            self, project: str, after_date: str, before_date: str, group_num_days: int = None,
+            requesters: str = None, tests: List[str] = None, tasks: List[str] = None,
+            variants: List[str] = None, distros: List[str] = None, group_by: str = None,
+            sort: str = None) -> List:
+        """
+        Return the statistics of each test of a single task and variant from the local store.
+
+        Other queries, e.g. by distro or grouped by several days but not the whole range, are sent
+        to Evergreen.
+        """
+        days = (_parse_date(before_date) - _parse_date(after_date)).days
+        group_num_days = group_num_days or 1
+        if (group_by == "test" and tasks is not None and len(tasks) == 1 and variants is not None
+                and len(variants) == 1 and not (requesters or tests or distros or sort)
+                and (group_num_days == 1 or group_num_days >= days)):
+            return self._history.test_stats_by_project(
+                self._evg_api, project, after_date, before_date, tasks[0], variants[0],
+                daily=group_num_days < days)
+
+        return self._evg_api.test_stats_by_project(
+            project, after_date, before_date, group_num_days=group_num_days,
+            requesters=requesters, tests=tests, tasks=tasks, variants=variants, distros=distros,
+            group_by=group_by, sort=sort)
+
+
+def wrap_evergreen_api(evg_api, history_file: Optional[str]):
+    """Return 'evg_api' backed by the store at 'history_file', or unchanged if it's not set."""
+    if evg_api is None or not history_file:
+        return evg_api
+    dirname = os.path.dirname(history_file)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    return HistoryBackedEvergreenApi(evg_api, TestHistory(history_file))
+
+
+def ingest_reports(history: TestHistory, project: str, variant: str, task: str,
+                   report_files: Iterable[str]) -> int:
+    """Add the report.json files to 'history' and return how many were new."""
+    num_added = 0
+    for report_file in report_files:
+        with open(report_file) as fh:
+            num_added += history.add_report(project, variant, task, json.load(fh))
+    return num_added
@@ -3,6 +3,7 @@
 from collections import defaultdict
 from collections import namedtuple
 import buildscripts.util.testname as testname  # pylint: disable=wrong-import-position
+from buildscripts.util.tdigest import TDigest
 
 TestRuntime = namedtuple('TestRuntime', ['test_name', 'runtime'])
 
@@ -15,12 +16,20 @@ def normalize_test_name(test_name):
 class TestStats(object):
     """Represent the test statistics for the task that is being analyzed."""
 
-    def __init__(self, evg_test_stats_results):
-        """Initialize the TestStats with raw results from the Evergreen API."""
-        # Mapping from test_file to {"num_run": X, "duration": Y} for tests
+    def __init__(self, evg_test_stats_results, percentiles=False):
+        """
+        Initialize the TestStats with raw results from the Evergreen API.
+
+        :param evg_test_stats_results: Documents returned by the Evergreen test_stats/ endpoint.
+        :param percentiles: Whether to keep a sketch of the durations of each test and hook so that
+            their percentiles can be returned by get_tests_runtimes().
+        """
+        self._percentiles = percentiles
+        # Mapping from test_file to {"num_run": X, "duration": Y, "digest": Z} for tests, where Z
+        # is a TDigest of the durations if percentiles are kept.
         self._runtime_by_test = defaultdict(dict)
         # Mapping from 'test_name:hook_name' to
-        #       {'test_name': {'hook_name': {"num_run": X, "duration": Y}}}
+        #       {'test_name': {'hook_name': {"num_run": X, "duration": Y, "digest": Z}}}
         self._hook_runtime_by_test = defaultdict(lambda: defaultdict(dict))
 
         for doc in evg_test_stats_results:
@@ -40,23 +49,27 @@ class TestStats(object):
     def _add_test_stats(self, test_file, duration, num_run):
         """Add the statistics for a test."""
         runtime_info = self._runtime_by_test[test_file]
-        self._add_runtime_info(runtime_info, duration, num_run)
+        self._add_runtime_info(runtime_info, duration, num_run, self._percentiles)
 
     def _add_test_hook_stats(self, test_file, duration, num_run):
         """Add the statistics for a hook."""
         test_name, hook_name = testname.split_test_hook_name(test_file)
         runtime_info = self._hook_runtime_by_test[test_name][hook_name]
-        self._add_runtime_info(runtime_info, duration, num_run)
+        self._add_runtime_info(runtime_info, duration, num_run, self._percentiles)
 
     @staticmethod
-    def _add_runtime_info(runtime_info, duration, num_run):
+    def _add_runtime_info(runtime_info, duration, num_run, percentiles=False):
         if not runtime_info:
             runtime_info["duration"] = duration
             runtime_info["num_run"] = num_run
+            if percentiles:
+                runtime_info["digest"] = TDigest()
         else:
             runtime_info["duration"] = TestStats._average(
                 runtime_info["duration"], runtime_info["num_run"], duration, num_run)
             runtime_info["num_run"] += num_run
+        if percentiles:
+            runtime_info["digest"].add(duration, num_run)
 
     @staticmethod
     def _average(value_a, num_a, value_b, num_b):
@@ -67,14 +80,32 @@ class TestStats(object):
         else:
             return float(value_a * num_a + value_b * num_b) / divisor
 
-    def get_tests_runtimes(self):
-        """Return the list of (test_file, runtime_in_secs) tuples ordered by decreasing runtime."""
+    @staticmethod
+    def _get_duration(runtime_info, percentile):
+        """Return the average duration, or the duration at 'percentile' if it is known."""
+        if percentile is not None:
+            duration = runtime_info["digest"].quantile(percentile / 100)
+            if duration is not None:
+                return duration
+        return runtime_info["duration"]
+
+    def get_tests_runtimes(self, percentile=None):
+        """
+        Return the list of (test_file, runtime_in_secs) tuples ordered by decreasing runtime.
+
+        :param percentile: Percentile of the runtimes to return, between 0 and 100, or None for the
+            average runtimes. The percentile of a test's runtime and those of its hooks are added
+            together, which overestimates the percentile of their total. Requires the TestStats to
+            have been created with percentiles=True.
+        """
+        if percentile is not None and not self._percentiles:
+            raise ValueError("TestStats was created without percentiles")
         tests = []
         for test_file, runtime_info in list(self._runtime_by_test.items()):
-            duration = runtime_info["duration"]
+            duration = self._get_duration(runtime_info, percentile)
             test_name = testname.get_short_name_from_test_file(test_file)
             for _, hook_runtime_info in self._hook_runtime_by_test[test_name].items():
-                duration += hook_runtime_info["duration"]
+                duration += self._get_duration(hook_runtime_info, percentile)
             test = TestRuntime(test_name=normalize_test_name(test_file), runtime=duration)
             tests.append(test)
         return sorted(tests, key=lambda x: x.runtime, reverse=True)
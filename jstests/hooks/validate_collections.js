@@ -107,9 +107,13 @@ function CollectionValidator() {
                 });
             }
 
+            // Background validation can't be combined with full validation.
+            const validateOptions = jsTest.options().validateBackground
+                ? {full: false, background: true}
+                : {full: true};
             const dbNames = conn.getDBNames();
             for (let dbName of dbNames) {
-                const validateRes = validatorFunc(conn.getDB(dbName), {full: true});
+                const validateRes = validatorFunc(conn.getDB(dbName), validateOptions);
                 if (validateRes.ok !== 1) {
                     return {ok: 0, host: host, validateRes: validateRes};
                 }
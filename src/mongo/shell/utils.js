@@ -321,6 +321,7 @@ jsTestOptions = function() {
                 ? TestData.skipValidationOnNamespaceNotFound
                 : true,
             skipValidationNamespaces: TestData.skipValidationNamespaces || [],
+            validateBackground: TestData.validateBackground || false,
             skipCheckingUUIDsConsistentAcrossCluster:
                 TestData.skipCheckingUUIDsConsistentAcrossCluster || false,
             skipCheckingIndexesConsistentAcrossCluster: